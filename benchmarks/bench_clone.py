@@ -0,0 +1,55 @@
+"""Measure CombatState clone throughput.
+
+Usage: python benchmarks/bench_clone.py [--encounter NAME] [--seconds S]
+"""
+
+import argparse
+import time
+
+import sts_sim
+
+
+def _mid_combat_state(encounter: str) -> sts_sim.CombatState:
+    """A started combat a couple of turns in, so piles and powers are populated."""
+    cs = sts_sim.create_encounter(encounter, seed=7)
+    cs.start_combat()
+    for _ in range(2):
+        if cs.combat_over:
+            break
+        cs.end_player_turn()
+        cs.roll_and_execute_monsters()
+    return cs
+
+
+def clones_per_second(fn, seconds: float) -> float:
+    """Call `fn` in batches until `seconds` have elapsed and return calls per second."""
+    batch = 1000
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        for _ in range(batch):
+            fn()
+        calls += batch
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return calls / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--encounter", default="slime_trio")
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    cs = _mid_combat_state(args.encounter)
+    target = cs.deep_clone()
+    results = {
+        "deep_clone": clones_per_second(cs.deep_clone, args.seconds),
+        "clone_into": clones_per_second(lambda: cs.clone_into(target), args.seconds),
+    }
+    for name, rate in results.items():
+        print(f"{name:>12}: {rate:,.0f} clones/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Run the native microbenchmarks and write the results as JSON.
+
+Times play_card for every Card (plain and upgraded), roll_and_execute_monsters for every
+monster type, deep_clone, and a full random-policy combat for every encounter, all inside
+the extension. Compare two result files with benchmarks/compare.py.
+
+Usage: python benchmarks/bench_native.py [--json PATH] [--groups G ...] [--min-time S]
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from importlib import metadata
+
+import sts_sim
+
+
+def build_info() -> dict:
+    """What was measured, so result files from different builds can be told apart."""
+    try:
+        version = metadata.version("sts_sim")
+    except metadata.PackageNotFoundError:
+        version = None
+    return {
+        "sts_sim": version,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--groups", nargs="+", help="play_card, monster_turn, clone, combat")
+    parser.add_argument("--min-time", type=float, default=0.05, help="seconds per case")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = sts_sim.run_native_benchmarks(args.groups, min_time=args.min_time, seed=args.seed)
+    for group, name, calls, ns in results:
+        print(f"{group:>12} {name:<28} {ns:>12,.1f} ns  ({calls:,} calls)")
+
+    if args.json:
+        report = {
+            "build": build_info(),
+            "min_time": args.min_time,
+            "seed": args.seed,
+            "benchmarks": [
+                {"group": group, "name": name, "calls": calls, "ns_per_call": ns}
+                for group, name, calls, ns in results
+            ],
+        }
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
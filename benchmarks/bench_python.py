@@ -0,0 +1,111 @@
+"""Python-facing overhead of the operations bench_native.py times inside the extension.
+
+Needs pytest-benchmark. The file is not collected by a plain `pytest` run; name it
+explicitly and pick where the JSON goes:
+
+    pytest benchmarks/bench_python.py --benchmark-json=python.json
+
+Compare two result files with benchmarks/compare.py.
+"""
+
+import random
+
+import pytest
+import sts_sim
+
+pytest.importorskip("pytest_benchmark")
+
+CARDS = sorted(
+    (card for card in vars(sts_sim.Card).values() if isinstance(card, sts_sim.Card)),
+    key=int,
+)
+ROUNDS = 200
+# Same cap on plays per turn as the native rollout loop.
+MAX_PLAYS_PER_TURN = 50
+
+
+def _card_fixture(card, upgraded):
+    """Same setup as the native play_card cases: Defect vs slime_trio, 10 energy."""
+    cs = sts_sim.create_encounter("slime_trio", seed=0, character=sts_sim.Character.Defect)
+    cs.start_combat()
+    cs.set_player_energy(10)
+    if upgraded:
+        cs.add_upgraded_card_to_hand(card)
+    else:
+        cs.add_card_to_hand(card)
+    hand_index = len(cs.get_hand()) - 1
+    target = cs.get_valid_targets()[0] if card.py_has_target else None
+    return cs, hand_index, target
+
+
+@pytest.mark.parametrize("upgraded", [False, True], ids=["base", "upgraded"])
+@pytest.mark.parametrize("card", CARDS, ids=lambda c: repr(c).split(".")[-1])
+def test_play_card(benchmark, card, upgraded):
+    base, hand_index, target = _card_fixture(card, upgraded)
+    benchmark.pedantic(
+        lambda cs: cs.play_card(hand_index, target),
+        setup=lambda: ((base.deep_clone(),), {}),
+        rounds=ROUNDS,
+    )
+
+
+@pytest.mark.parametrize("monster_id", sts_sim.MONSTER_IDS)
+def test_monster_turn(benchmark, monster_id):
+    """Keyed by monster id like the native monster_turn group, on the same monster."""
+    base = sts_sim.CombatState.new_with_character([sts_sim.create_monster(monster_id)], seed=0)
+    base.start_combat()
+    base.end_player_turn()
+    benchmark.pedantic(
+        lambda cs: cs.roll_and_execute_monsters(),
+        setup=lambda: ((base.deep_clone(),), {}),
+        rounds=ROUNDS,
+    )
+
+
+def test_deep_clone(benchmark):
+    cs = sts_sim.create_encounter("slime_trio", seed=0)
+    cs.start_combat()
+    for _ in range(2):
+        cs.end_player_turn()
+        cs.roll_and_execute_monsters()
+    benchmark(cs.deep_clone)
+
+
+def _random_combat(cs, rng, max_turns=50):
+    """Python mirror of the native play_out loop with the random policy: each step picks
+    uniformly among the playable cards plus ending the turn, and a random living target."""
+    while not cs.combat_over and cs.turn_number <= max_turns:
+        for _ in range(MAX_PLAYS_PER_TURN):
+            if cs.combat_over:
+                break
+            actions = cs.get_available_actions()
+            pick = rng.randrange(len(actions) + 1)
+            if pick == len(actions):
+                break
+            hand_index, _ci, needs_target = actions[pick]
+            target = None
+            if needs_target:
+                targets = cs.get_valid_targets()
+                if not targets:
+                    break
+                target = rng.choice(targets)
+            if not cs.play_card(hand_index, target, None):
+                break
+        if cs.combat_over:
+            break
+        cs.end_player_turn()
+        if cs.combat_over:
+            break
+        cs.roll_and_execute_monsters()
+
+
+@pytest.mark.parametrize("name", sts_sim.ENCOUNTER_NAMES)
+def test_combat(benchmark, name):
+    base = sts_sim.create_encounter(name, seed=0)
+    base.start_combat()
+    rng = random.Random(0)
+    benchmark.pedantic(
+        lambda cs: _random_combat(cs, rng),
+        setup=lambda: ((base.deep_clone(),), {}),
+        rounds=20,
+    )
@@ -0,0 +1,166 @@
+"""Report thread scaling and memory footprint for sizing rollout workers.
+
+Plays a fixed set of random-policy combats with run_combats_parallel at 1, 2, 4, ...
+threads (up to --max-threads, which is always included). Reports combats per second,
+parallel efficiency (rate / (threads * single-thread rate)) and peak RSS for each thread
+count. Each thread count runs in a fresh interpreter, so its peak RSS is its own and not
+the high-water mark of the runs before it. Also reports bytes per CombatState, both as
+counted by the state (footprint_bytes) and as resident memory per copy with allocator
+overhead included. Finally it reports clones per second, natively and through deep_clone.
+
+Usage: python benchmarks/bench_scaling.py [--combats N] [--max-threads T] [--json PATH]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import sts_sim
+from bench_native import build_info
+
+ENCOUNTERS = sts_sim.ENCOUNTER_NAMES
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def current_rss_bytes():
+    """Current resident set size, or None where /proc isn't available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def thread_counts(max_threads: int) -> list:
+    counts, t = [], 1
+    while t < max_threads:
+        counts.append(t)
+        t *= 2
+    return counts + [max_threads]
+
+
+def timed_run(combats: int, threads: int, policy: str) -> dict:
+    """Combats per second and peak RSS of this process for one thread count."""
+    encounters = [ENCOUNTERS[i % len(ENCOUNTERS)] for i in range(combats)]
+    seeds = list(range(combats))
+    # Warm up caches and the allocator before the timed run.
+    sts_sim.run_combats_parallel(encounters[:200], seeds[:200], policy=policy, threads=1)
+    start = time.perf_counter()
+    sts_sim.run_combats_parallel(encounters, seeds, policy=policy, threads=threads)
+    rate = combats / (time.perf_counter() - start)
+    return {"threads": threads, "combats_per_sec": rate, "peak_rss_bytes": peak_rss_bytes()}
+
+
+def scaling(combats: int, max_threads: int, policy: str) -> list:
+    """Combats per second, efficiency and peak RSS for each thread count.
+
+    ru_maxrss never goes down, so each thread count is timed in its own subprocess.
+    """
+    rows = []
+    for threads in thread_counts(max_threads):
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--combats", str(combats),
+             "--policy", policy, "--single-run", str(threads)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        row = json.loads(out)
+        single = rows[0]["combats_per_sec"] if rows else row["combats_per_sec"]
+        row["efficiency"] = row["combats_per_sec"] / (threads * single)
+        rows.append(row)
+    return rows
+
+
+def state_memory(copies: int) -> dict:
+    """Bytes per CombatState, counted by the state and measured as resident memory."""
+    footprints = {}
+    for name in ENCOUNTERS:
+        cs = sts_sim.create_encounter(name, seed=0)
+        cs.start_combat()
+        footprints[name] = cs.footprint_bytes()
+    cs = sts_sim.create_encounter("slime_trio", seed=0)
+    cs.start_combat()
+    before = current_rss_bytes()
+    held = [cs.deep_clone() for _ in range(copies)]
+    after = current_rss_bytes()
+    rss_per_state = (after - before) / copies if before is not None else None
+    del held
+    return {
+        "footprint_bytes": footprints,
+        "footprint_bytes_max": max(footprints.values()),
+        "rss_bytes_per_state": rss_per_state,
+        "rss_copies": copies,
+    }
+
+
+def clone_rates(seconds: float) -> dict:
+    native = sts_sim.run_native_benchmarks(["clone"], min_time=seconds)
+    ns = next(ns for _group, name, _calls, ns in native if name == "deep_clone")
+    cs = sts_sim.create_encounter("slime_trio", seed=0)
+    cs.start_combat()
+    calls, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for _ in range(1000):
+            cs.deep_clone()
+        calls += 1000
+    return {
+        "native_clones_per_sec": 1e9 / ns,
+        "python_clones_per_sec": calls / (time.perf_counter() - start),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--combats", type=int, default=20000)
+    parser.add_argument("--max-threads", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--policy", default="random")
+    parser.add_argument("--copies", type=int, default=100000, help="states held to measure RSS")
+    parser.add_argument("--seconds", type=float, default=1.0, help="time per clone rate")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--single-run", type=int, metavar="THREADS", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single_run is not None:
+        print(json.dumps(timed_run(args.combats, args.single_run, args.policy)))
+        return
+
+    rows = scaling(args.combats, args.max_threads, args.policy)
+    print(f"{'threads':>7} {'combats/s':>12} {'efficiency':>10} {'peak RSS':>10}")
+    for row in rows:
+        print(f"{row['threads']:>7} {row['combats_per_sec']:>12,.0f} "
+              f"{row['efficiency']:>10.0%} {row['peak_rss_bytes'] / 2**20:>8.1f}MB")
+
+    memory = state_memory(args.copies)
+    print(f"CombatState: {memory['footprint_bytes_max']:,} bytes max footprint", end="")
+    if memory["rss_bytes_per_state"] is not None:
+        print(f", {memory['rss_bytes_per_state']:,.0f} bytes resident per copy", end="")
+    print()
+
+    clones = clone_rates(args.seconds)
+    print(f"clones/s: {clones['native_clones_per_sec']:,.0f} native, "
+          f"{clones['python_clones_per_sec']:,.0f} via deep_clone")
+
+    if args.json:
+        report = {
+            "build": build_info(),
+            "combats": args.combats,
+            "policy": args.policy,
+            "scaling": rows,
+            "memory": memory,
+            "clones": clones,
+        }
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Compare two benchmark result files, e.g. from the main branch and a change.
+
+Reads JSON written by bench_native.py or by pytest-benchmark (--benchmark-json) and
+prints the per-case change in mean time, slowest regressions first.
+
+Usage: python benchmarks/compare.py BASE.json NEW.json [--threshold 1.10] [--all]
+Exits with status 1 if any case got slower than the threshold ratio.
+"""
+
+import argparse
+import json
+
+
+def load(path: str) -> dict:
+    """Mean nanoseconds per call keyed by case name, from either result format."""
+    with open(path) as f:
+        data = json.load(f)
+    cases = {}
+    for bench in data["benchmarks"]:
+        if "ns_per_call" in bench:
+            cases[f"{bench['group']}/{bench['name']}"] = bench["ns_per_call"]
+        else:
+            cases[bench["fullname"]] = bench["stats"]["mean"] * 1e9
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=1.10,
+                        help="new/base time ratio counted as a regression")
+    parser.add_argument("--all", action="store_true", help="list unchanged cases too")
+    args = parser.parse_args()
+
+    base, new = load(args.base), load(args.new)
+    common = sorted(base.keys() & new.keys(), key=lambda k: new[k] / base[k], reverse=True)
+    regressions = 0
+    for key in common:
+        ratio = new[key] / base[key]
+        slower = ratio > args.threshold
+        regressions += slower
+        if args.all or slower or ratio < 1 / args.threshold:
+            mark = "SLOWER" if slower else ("faster" if ratio < 1 / args.threshold else "")
+            print(f"{key:<48} {base[key]:>12,.1f} -> {new[key]:>12,.1f} ns  x{ratio:5.2f}  {mark}")
+    for key in sorted(base.keys() - new.keys()):
+        print(f"{key:<48} only in {args.base}")
+    for key in sorted(new.keys() - base.keys()):
+        print(f"{key:<48} only in {args.new}")
+    print(f"{len(common)} cases compared, {regressions} slower than x{args.threshold:.2f}")
+    raise SystemExit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+use pyo3::prelude::*;
+use std::cell::Cell;
+
+use crate::combat::CombatState;
+
+/// Hand slots addressable by a fixed-size action index.
+pub const MAX_HAND: usize = 10;
+/// Monster slots addressable as targets (Slime Boss's split peaks at 4 monsters).
+pub const MAX_MONSTERS: usize = 5;
+/// Distinct `choice` values addressable per card. Sized to MAX_HAND so Concentrate can
+/// discard any addressable hand; X costs (and Reinforced Body, Doppelganger) reach X = 9
+/// directly. With more energy the last slot stands for the largest X, so spending all
+/// energy stays legal and only the X values in between are not addressable.
+pub const MAX_CHOICES: usize = MAX_HAND;
+/// Index of the "end turn" action; card plays occupy the indices below it.
+pub const END_TURN_ACTION: usize = MAX_HAND * MAX_MONSTERS * MAX_CHOICES;
+/// Size of the flat action space: one index per (hand slot, target, choice) plus end turn.
+pub const NUM_ACTIONS: usize = END_TURN_ACTION + 1;
+
+/// A decoded player action. Untargeted cards use target 0 and cards without choices
+/// use choice 0.
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub enum Action {
+    Play { hand_index: usize, target: usize, choice: usize },
+    EndTurn,
+}
+
+impl Action {
+    /// Decode a flat action index. Returns None if out of range.
+    pub fn from_index(index: usize) -> Option<Action> {
+        if index == END_TURN_ACTION {
+            Some(Action::EndTurn)
+        } else if index < END_TURN_ACTION {
+            Some(Action::Play {
+                hand_index: index / (MAX_MONSTERS * MAX_CHOICES),
+                target: index / MAX_CHOICES % MAX_MONSTERS,
+                choice: index % MAX_CHOICES,
+            })
+        } else {
+            None
+        }
+    }
+
+    pub fn index(&self) -> usize {
+        match *self {
+            Action::Play { hand_index, target, choice } => {
+                (hand_index * MAX_MONSTERS + target) * MAX_CHOICES + choice
+            }
+            Action::EndTurn => END_TURN_ACTION,
+        }
+    }
+
+    /// The play_card arguments (hand_index, target_index, choice) for this action in
+    /// `state`, or None for end turn.
+    pub fn play_args(&self, state: &CombatState) -> Option<(usize, Option<usize>, Option<usize>)> {
+        match *self {
+            Action::Play { hand_index, target, choice } => {
+                let needs_target = state.player.hand_indices.get(hand_index)
+                    .map_or(false, |&deck_idx| state.deck[deck_idx].card.has_target());
+                let target = if needs_target { Some(target) } else { None };
+                let choice = match state.num_choices(hand_index) {
+                    0 => None,
+                    // Past MAX_CHOICES the last slot means the largest choice (all energy).
+                    n if n > MAX_CHOICES && choice == MAX_CHOICES - 1 => Some(n - 1),
+                    _ => Some(choice),
+                };
+                Some((hand_index, target, choice))
+            }
+            Action::EndTurn => None,
+        }
+    }
+}
+
+/// Fill `mask` (length NUM_ACTIONS) with 1 for legal actions and 0 otherwise. Each
+/// distinct play appears once: untargeted cards only in target slot 0, and cards without
+/// choices only in choice slot 0.
+pub fn write_action_mask(state: &CombatState, mask: &mut [u8]) {
+    write_action_mask_cells(state, Cell::from_mut(mask).as_slice_of_cells());
+}
+
+/// write_action_mask into shared cells, e.g. a writable Python buffer.
+pub fn write_action_mask_cells(state: &CombatState, mask: &[Cell<u8>]) {
+    for m in mask {
+        m.set(0);
+    }
+    if state.combat_over {
+        return;
+    }
+    mask[END_TURN_ACTION].set(1);
+    let mut targets = [false; MAX_MONSTERS];
+    for (t, m) in state.monsters.iter().take(MAX_MONSTERS).enumerate() {
+        targets[t] = !m.is_dead();
+    }
+    for (hand_index, &deck_idx) in state.player.hand_indices.iter().enumerate().take(MAX_HAND) {
+        let ci = state.deck[deck_idx];
+        if !state.can_play(ci) {
+            continue;
+        }
+        let choices = state.num_choices(hand_index).clamp(1, MAX_CHOICES);
+        for target in 0..MAX_MONSTERS {
+            let legal = if ci.card.has_target() { targets[target] } else { target == 0 };
+            if !legal {
+                continue;
+            }
+            for choice in 0..choices {
+                mask[Action::Play { hand_index, target, choice }.index()].set(1);
+            }
+        }
+    }
+}
+
+/// Apply an action. Ending the turn also runs the monster turn, so control returns at the
+/// start of the next player turn. Returns false if a card play was rejected.
+pub fn apply_action(state: &mut CombatState, action: Action) -> bool {
+    match action.play_args(state) {
+        Some((hand_index, target, choice)) => state.play_card(hand_index, target, choice),
+        None => {
+            state.end_player_turn();
+            state.roll_and_execute_monsters();
+            true
+        }
+    }
+}
+
+/// A step of an apply_actions script as given from Python: play_card arguments or the
+/// name of a phase.
+#[derive(FromPyObject)]
+pub enum ScriptArg {
+    Play(usize, Option<usize>, Option<usize>),
+    Name(String),
+}
+
+/// One step of a scripted sequence.
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub enum ScriptStep {
+    Play { hand_index: usize, target: Option<usize>, choice: Option<usize> },
+    /// end_player_turn
+    EndTurn,
+    /// roll_and_execute_monsters
+    Monsters,
+}
+
+impl ScriptStep {
+    pub fn from_arg(arg: ScriptArg) -> PyResult<ScriptStep> {
+        match arg {
+            ScriptArg::Play(hand_index, target, choice) => Ok(ScriptStep::Play { hand_index, target, choice }),
+            ScriptArg::Name(name) => match name.as_str() {
+                "end_turn" => Ok(ScriptStep::EndTurn),
+                "monsters" => Ok(ScriptStep::Monsters),
+                _ => Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                    format!("Unknown script step: {:?} (expected a play_card tuple, \"end_turn\" or \"monsters\")", name),
+                )),
+            },
+        }
+    }
+}
+
+/// Run `steps` in order, returning whether each one took effect: the play_card result
+/// for plays, and false for phases run after the combat ended. Later steps still run
+/// after a failed one. With `snapshots`, also returns a copy of the state after each step.
+pub fn apply_script(state: &mut CombatState, steps: &[ScriptStep], snapshots: bool) -> (Vec<bool>, Option<Vec<CombatState>>) {
+    let mut ok = Vec::with_capacity(steps.len());
+    let mut states = snapshots.then(|| Vec::with_capacity(steps.len()));
+    for &step in steps {
+        ok.push(match step {
+            ScriptStep::Play { hand_index, target, choice } => state.play_card(hand_index, target, choice),
+            ScriptStep::EndTurn => {
+                let live = !state.combat_over;
+                state.end_player_turn();
+                live
+            }
+            ScriptStep::Monsters => {
+                let live = !state.combat_over;
+                state.roll_and_execute_monsters();
+                live
+            }
+        });
+        if let Some(states) = states.as_mut() {
+            states.push(state.clone());
+        }
+    }
+    (ok, states)
+}
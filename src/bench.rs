@@ -0,0 +1,154 @@
+use std::time::{Duration, Instant};
+
+use pyo3::prelude::*;
+
+use crate::cards::{CardInstance, ALL_CARDS};
+use crate::combat::CombatState;
+use crate::encounters::{build_encounter, ENCOUNTER_NAMES};
+use crate::enemies::MonsterKind;
+use crate::enums::Character;
+use crate::rng;
+use crate::rollout::{play_out, Policy};
+
+/// Benchmark groups, in the order they run.
+pub const GROUPS: [&str; 4] = ["play_card", "monster_turn", "clone", "combat"];
+
+/// States prepared (untimed) per timed batch, so setup stays out of the measurement
+/// and the clock is read once per batch rather than once per call.
+const BATCH: usize = 64;
+
+/// One benchmark result: (group, name, timed calls, mean nanoseconds per call).
+pub type BenchResult = (&'static str, String, u64, f64);
+
+/// Run `op` on fresh copies of `base` until at least `min_time` of timed work has
+/// accumulated, returning (calls, mean ns per call). Restoring the copies between batches
+/// is not timed.
+fn time_on_copies(base: &CombatState, min_time: Duration, mut op: impl FnMut(usize, &mut CombatState)) -> (u64, f64) {
+    let mut states: Vec<CombatState> = (0..BATCH).map(|_| base.clone()).collect();
+    let mut calls = 0u64;
+    let mut elapsed = Duration::ZERO;
+    while elapsed < min_time || calls == 0 {
+        for s in states.iter_mut() {
+            s.clone_from(base);
+        }
+        let start = Instant::now();
+        for (i, s) in states.iter_mut().enumerate() {
+            op(calls as usize + i, s);
+        }
+        elapsed += start.elapsed();
+        calls += BATCH as u64;
+    }
+    (calls, elapsed.as_nanos() as f64 / calls as f64)
+}
+
+/// A started three-monster combat with plenty of energy and `card` added as the last
+/// card in hand. The Defect deck is used so orb cards have slots to channel into.
+fn card_fixture(card: CardInstance, seed: u64) -> (CombatState, usize, Option<usize>) {
+    let mut cs = build_encounter("slime_trio", Some(seed), Some(Character::Defect)).expect("known encounter");
+    cs.start_combat();
+    cs.player.energy = 10;
+    if card.upgraded {
+        cs.add_upgraded_card_to_hand(card.card);
+    } else {
+        cs.add_card_to_hand(card.card);
+    }
+    let hand_index = cs.player.hand_indices.len() - 1;
+    let target = if card.card.has_target() { cs.monsters.iter().position(|m| !m.is_dead()) } else { None };
+    (cs, hand_index, target)
+}
+
+fn bench_play_card(min_time: Duration, seed: u64, out: &mut Vec<BenchResult>) {
+    for card in ALL_CARDS {
+        for upgraded in [false, true] {
+            let (base, hand_index, target) = card_fixture(CardInstance::new(card, upgraded), seed);
+            let (calls, ns) = time_on_copies(&base, min_time, |_, s| {
+                s.play_card(hand_index, target, None);
+            });
+            let name = if upgraded { format!("{card:?}+") } else { format!("{card:?}") };
+            out.push(("play_card", name, calls, ns));
+        }
+    }
+}
+
+/// Each monster kind alone against the Ironclad, timed on its first monster turn. Cases
+/// are keyed by monster id, as in bench_python.py.
+fn bench_monster_turn(min_time: Duration, seed: u64, out: &mut Vec<BenchResult>) {
+    for kind in MonsterKind::ALL {
+        let Some(m) = kind.create() else { continue };
+        let mut base = CombatState::new_with_character(vec![m], Some(seed), None);
+        base.start_combat();
+        base.end_player_turn();
+        let (calls, ns) = time_on_copies(&base, min_time, |_, s| {
+            s.roll_and_execute_monsters();
+        });
+        out.push(("monster_turn", kind.id().to_string(), calls, ns));
+    }
+}
+
+/// Copying a combat a few turns in, with piles and powers populated.
+fn bench_clone(min_time: Duration, seed: u64, out: &mut Vec<BenchResult>) {
+    let mut base = build_encounter("slime_trio", Some(seed), None).expect("known encounter");
+    base.start_combat();
+    for _ in 0..2 {
+        base.end_player_turn();
+        base.roll_and_execute_monsters();
+    }
+    let mut calls = 0u64;
+    let start = Instant::now();
+    while start.elapsed() < min_time || calls == 0 {
+        for _ in 0..BATCH {
+            std::hint::black_box(base.clone());
+        }
+        calls += BATCH as u64;
+    }
+    out.push(("clone", "deep_clone".to_string(), calls, start.elapsed().as_nanos() as f64 / calls as f64));
+}
+
+/// Whole random-policy combats from the start of each encounter.
+fn bench_combat(min_time: Duration, seed: u64, out: &mut Vec<BenchResult>) {
+    for name in ENCOUNTER_NAMES {
+        let mut base = build_encounter(name, Some(seed), None).expect("known encounter");
+        base.start_combat();
+        let (calls, ns) = time_on_copies(&base, min_time, |i, s| {
+            let mut rng = rng::stream_rng(seed, i as u64);
+            play_out(s, Policy::Random, &mut rng, 50);
+        });
+        out.push(("combat", name.to_string(), calls, ns));
+    }
+}
+
+pub fn run(groups: &[&str], min_time: Duration, seed: u64) -> Vec<BenchResult> {
+    let mut out = Vec::new();
+    for &group in groups {
+        match group {
+            "play_card" => bench_play_card(min_time, seed, &mut out),
+            "monster_turn" => bench_monster_turn(min_time, seed, &mut out),
+            "clone" => bench_clone(min_time, seed, &mut out),
+            "combat" => bench_combat(min_time, seed, &mut out),
+            _ => unreachable!("groups are checked by the caller"),
+        }
+    }
+    out
+}
+
+/// Native microbenchmarks timed inside the extension, with no Python overhead: play_card
+/// for every Card (plain and upgraded, "+" suffix), roll_and_execute_monsters for every
+/// monster type, deep_clone, and a full random-policy combat for every encounter.
+/// Returns a list of (group, name, calls, mean ns per call). `groups` selects a subset
+/// of "play_card", "monster_turn", "clone" and "combat"; each case runs for at least
+/// `min_time` seconds.
+#[pyfunction]
+#[pyo3(signature = (groups=None, min_time=0.05, seed=0))]
+pub fn run_native_benchmarks(py: Python<'_>, groups: Option<Vec<String>>, min_time: f64, seed: u64) -> PyResult<Vec<BenchResult>> {
+    let min_time = Duration::try_from_secs_f64(min_time)
+        .map_err(|_| PyErr::new::<pyo3::exceptions::PyValueError, _>("min_time must be a non-negative number of seconds"))?;
+    let groups: Vec<&str> = match &groups {
+        None => GROUPS.to_vec(),
+        Some(names) => names.iter()
+            .map(|n| GROUPS.iter().copied().find(|g| g == n).ok_or_else(|| {
+                PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Unknown benchmark group: {}", n))
+            }))
+            .collect::<PyResult<_>>()?,
+    };
+    Ok(py.allow_threads(|| run(&groups, min_time, seed)))
+}
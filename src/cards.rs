@@ -1,6 +1,8 @@
 use pyo3::prelude::*;
+use pyo3::types::PyBytes;
 
 use crate::enums::{CardType, Character};
+use crate::serialize;
 
 /// Card identity — which card this is. Stats are determined by the Card + upgraded flag
 /// via CardInstance.
@@ -324,8 +326,73 @@ pub enum Card {
     Decay,
 }
 
+/// Number of Card variants (Decay must stay last).
+pub const NUM_CARDS: usize = Card::Decay as usize + 1;
+
+/// Every Card, in discriminant order.
+pub const ALL_CARDS: [Card; NUM_CARDS] = [
+    Card::StrikeRed, Card::DefendRed, Card::Bash, Card::StrikeGreen, Card::DefendGreen,
+    Card::Neutralize, Card::Survivor, Card::StrikeBlue, Card::DefendBlue, Card::Zap,
+    Card::Dualcast, Card::StrikePurple, Card::DefendPurple, Card::Eruption, Card::Vigilance,
+    Card::PoisonedStab, Card::DaggerThrow, Card::DaggerSpray, Card::SneakyStrike,
+    Card::Slice, Card::Backflip, Card::DodgeAndRoll, Card::Deflect, Card::CloakAndDagger,
+    Card::BladeDance, Card::Prepared, Card::DeadlyPoison, Card::Acrobatics,
+    Card::AccuracyCard, Card::AfterImageCard, Card::Backstab, Card::Bane, Card::Choke,
+    Card::Predator, Card::MasterfulStab, Card::Dash, Card::Finisher, Card::Flechettes,
+    Card::AllOutAttack, Card::Unload, Card::Blur, Card::BouncingFlask, Card::Concentrate,
+    Card::CalculatedGamble, Card::Catalyst, Card::CripplingCloud, Card::LegSweep,
+    Card::Outmaneuver, Card::PiercingWail, Card::EscapePlan, Card::Expertise,
+    Card::RiddleWithHoles, Card::Setup, Card::Terror, Card::FootworkCard,
+    Card::NoxiousFumesCard, Card::WellLaidPlansCard, Card::DistractionCard,
+    Card::InfiniteBlades, Card::DieDieDie, Card::GrandFinale, Card::Skewer,
+    Card::Adrenaline, Card::BulletTime, Card::Malaise, Card::StormOfSteel,
+    Card::Doppelganger, Card::CorpseExplosionCard, Card::AThousandCutsCard, Card::BurstCard,
+    Card::EnvenomCard, Card::ToolsOfTheTradeCard, Card::WraithFormCard, Card::Reflex,
+    Card::Tactician, Card::BallLightning, Card::Barrage, Card::BeamCell, Card::Claw,
+    Card::CompileDriver, Card::GoForTheEyes, Card::SweepingBeam, Card::ChargeBattery,
+    Card::Chaos, Card::Coolheaded, Card::Leap, Card::Recursion, Card::SteamBarrier,
+    Card::Blizzard, Card::ColdSnap, Card::DoomAndGloom, Card::FTL, Card::MelterCard,
+    Card::Scrape, Card::Streamline, Card::Sunder, Card::DarknessCard, Card::DoubleEnergy,
+    Card::Equilibrium, Card::ForceField, Card::Glacier, Card::Hologram, Card::Overclock,
+    Card::RecycleCard, Card::Reprogram, Card::StackCard, Card::TURBO, Card::ReinforcedBody,
+    Card::CapacitorCard, Card::ConsumeCard, Card::FusionCard, Card::HeatsinkCard,
+    Card::LoopCard, Card::MachineLearningCard, Card::StormCard, Card::AllForOne,
+    Card::CoreSurge, Card::Hyperbeam, Card::MeteorStrike, Card::ThunderStrike,
+    Card::AmplifyCard, Card::Fission, Card::MultiCast, Card::RainbowCard, Card::SeekCard,
+    Card::SkimCard, Card::TempestCard, Card::BufferCard, Card::DefragmentCard,
+    Card::EchoFormCard, Card::ElectrodynamicsCard, Card::StaticDischargeCard,
+    Card::FlurryOfBlows, Card::EmptyFist, Card::Consecrate, Card::CutThroughFate,
+    Card::JustLucky, Card::EmptyBody, Card::Protect, Card::Halt, Card::ThirdEye,
+    Card::Tranquility, Card::Crescendo, Card::Collect, Card::CrushJoints, Card::FearNoEvil,
+    Card::ForeignInfluence, Card::SashWhip, Card::Tantrum, Card::CarveReality,
+    Card::SandsOfTime, Card::WindmillStrike, Card::Wallop, Card::Weave, Card::SignatureMove,
+    Card::FlyingSleeves, Card::Conclude, Card::ReachHeaven, Card::EmptyMind,
+    Card::MeditateCard, Card::InnerPeace, Card::Indignation, Card::Swivel,
+    Card::Perseverance, Card::Pray, Card::Prostrate, Card::WreathOfFlameCard,
+    Card::BattleHymnCard, Card::SimmeringFuryCard, Card::MentalFortressCard,
+    Card::NirvanaCard, Card::LikeWaterCard, Card::ForesightCard, Card::StudyCard,
+    Card::RushdownCard, Card::Ragnarok, Card::BrillianceCard, Card::Blasphemy,
+    Card::DeusExMachina, Card::OmniscienceCard, Card::ScrawlCard, Card::VaultCard,
+    Card::WishCard, Card::SpiritShieldCard, Card::JudgmentCard, Card::WorshipCard,
+    Card::OmegaCard, Card::DevaFormCard, Card::DevotionCard, Card::EstablishmentCard,
+    Card::ConjureBladeCard, Card::Anger, Card::BodySlam, Card::Clash, Card::Cleave,
+    Card::Clothesline, Card::HeavyBlade, Card::IronWave, Card::PerfectedStrike,
+    Card::PommelStrike, Card::TwinStrike, Card::WildStrike, Card::Flex, Card::Havoc,
+    Card::SeeingRed, Card::ShrugItOff, Card::TrueGrit, Card::Warcry, Card::BloodForBlood,
+    Card::Carnage, Card::Headbutt, Card::Rampage, Card::SeverSoul, Card::Uppercut,
+    Card::Whirlwind, Card::BattleTrance, Card::BurningPact, Card::Disarm, Card::Entrench,
+    Card::FlameBarrier, Card::GhostlyArmor, Card::PowerThrough, Card::RageCard,
+    Card::SecondWind, Card::Sentinel, Card::Shockwave, Card::SpotWeakness, Card::Inflame,
+    Card::Metallicize, Card::CombustCard, Card::DarkEmbrace, Card::Evolve, Card::FeelNoPain,
+    Card::FireBreathing, Card::Rupture, Card::Bludgeon, Card::Feed, Card::FiendFire,
+    Card::Immolate, Card::DoubleTap, Card::Exhume, Card::LimitBreak, Card::Offering,
+    Card::Impervious, Card::Barricade, Card::BerserkCard, Card::Corruption, Card::DemonForm,
+    Card::Juggernaut, Card::Dazed, Card::Burn, Card::Wound, Card::Slimed, Card::VoidCard,
+    Card::AscendersBane, Card::Injury, Card::Pain, Card::Decay,
+];
+
 /// A card instance in a deck — wraps a Card identity with its upgraded state.
-#[pyclass]
+#[pyclass(module = "sts_sim")]
 #[derive(Clone, Copy, Debug, PartialEq, Eq, Hash)]
 pub struct CardInstance {
     #[pyo3(get)]
@@ -421,6 +488,30 @@ impl CardInstance {
         self.upgraded = true;
         true
     }
+
+    /// Compact, versioned binary encoding of this card instance. Inverse of from_bytes.
+    pub fn to_bytes<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+        serialize::to_pybytes(py, self)
+    }
+
+    /// Decode to_bytes output. Raises ValueError on malformed or incompatible data.
+    #[staticmethod]
+    pub fn from_bytes(data: &[u8]) -> PyResult<Self> {
+        serialize::from_bytes(data)
+    }
+
+    pub fn __getstate__<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+        serialize::to_pybytes(py, self)
+    }
+
+    pub fn __setstate__(&mut self, state: &[u8]) -> PyResult<()> {
+        *self = serialize::from_bytes(state)?;
+        Ok(())
+    }
+
+    pub fn __reduce__<'py>(slf: &Bound<'py, Self>) -> PyResult<serialize::Reduced<'py>> {
+        serialize::reduce(slf)
+    }
 }
 
 impl CardInstance {
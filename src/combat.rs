@@ -1,6 +1,6 @@
+use pyo3::buffer::PyBuffer;
 use pyo3::prelude::*;
-use rand::rngs::StdRng;
-use rand::seq::SliceRandom;
+use pyo3::types::PyBytes;
 use rand::SeedableRng;
 
 use crate::cards::{starter_deck, Card, CardInstance};
@@ -8,11 +8,23 @@ use crate::creature::{Monster, Player};
 use crate::damage::{apply_damage_to_monster, apply_damage_to_player, calculate_player_damage};
 use crate::enums::{CardType, Character, Intent, OrbType, PowerType, Stance};
 use crate::die::TheDie;
+use crate::draws;
 use crate::enemies;
+use crate::actions::{self, Action, ScriptArg, ScriptStep, NUM_ACTIONS};
+use crate::observation::{self, OBSERVATION_SIZE};
+use crate::perf;
+use crate::piles::CardPile;
 use crate::relics;
-
-#[pyclass]
-#[derive(Clone, Debug)]
+use crate::rng::{self, SimRng};
+use crate::serialize;
+use crate::state_hash;
+use crate::trace::{self, EventKind, Pile, Trace};
+use crate::turns;
+use crate::undo::{self, UndoLog};
+use crate::rollout::{self, Policy, RolloutResults};
+
+#[pyclass(module = "sts_sim")]
+#[derive(Debug)]
 pub struct CombatState {
     #[pyo3(get)]
     pub player: Player,
@@ -25,7 +37,12 @@ pub struct CombatState {
     pub monsters: Vec<Monster>,
     pub deck: Vec<CardInstance>,
     pub die: TheDie,
-    rng: StdRng,
+    pub(crate) rng: SimRng,
+    /// Journal for apply/undo; not part of the position and not copied by clones.
+    pub(crate) undo_log: UndoLog,
+    /// Event recorder, off unless enabled; not part of the position and not copied by
+    /// clones.
+    pub(crate) trace: Option<Box<Trace>>,
     pub stance_changed_this_turn: bool,
     pub has_card_been_played_this_turn: bool,
     pub cards_played_this_turn: Vec<(usize, Option<usize>)>,
@@ -35,6 +52,52 @@ pub struct CombatState {
     pub shivs_played_this_turn: i32,
 }
 
+// Field-wise clone_from reuses the target's buffers; see clone_into.
+impl Clone for CombatState {
+    fn clone(&self) -> Self {
+        let _perf = perf::clone();
+        CombatState {
+            player: self.player.clone(),
+            turn_number: self.turn_number,
+            combat_over: self.combat_over,
+            player_won: self.player_won,
+            monsters: self.monsters.clone(),
+            deck: self.deck.clone(),
+            die: self.die.clone(),
+            rng: self.rng.clone(),
+            undo_log: UndoLog::default(),
+            trace: None,
+            stance_changed_this_turn: self.stance_changed_this_turn,
+            has_card_been_played_this_turn: self.has_card_been_played_this_turn,
+            cards_played_this_turn: self.cards_played_this_turn.clone(),
+            player_damaged_this_combat: self.player_damaged_this_combat,
+            discarded_this_turn: self.discarded_this_turn,
+            cards_cost_zero_this_turn: self.cards_cost_zero_this_turn,
+            shivs_played_this_turn: self.shivs_played_this_turn,
+        }
+    }
+
+    fn clone_from(&mut self, source: &Self) {
+        let _perf = perf::clone();
+        self.player.clone_from(&source.player);
+        self.turn_number = source.turn_number;
+        self.combat_over = source.combat_over;
+        self.player_won = source.player_won;
+        self.monsters.clone_from(&source.monsters);
+        self.deck.clone_from(&source.deck);
+        self.die.clone_from(&source.die);
+        self.rng.clone_from(&source.rng);
+        self.undo_log.clear();
+        self.stance_changed_this_turn = source.stance_changed_this_turn;
+        self.has_card_been_played_this_turn = source.has_card_been_played_this_turn;
+        self.cards_played_this_turn.clone_from(&source.cards_played_this_turn);
+        self.player_damaged_this_combat = source.player_damaged_this_combat;
+        self.discarded_this_turn = source.discarded_this_turn;
+        self.cards_cost_zero_this_turn = source.cards_cost_zero_this_turn;
+        self.shivs_played_this_turn = source.shivs_played_this_turn;
+    }
+}
+
 impl CombatState {
     pub fn new(monsters: Vec<Monster>, seed: Option<u64>) -> Self {
         Self::new_with_character(monsters, seed, None)
@@ -51,7 +114,9 @@ impl CombatState {
             turn_number: 0,
             combat_over: false,
             player_won: false,
-            rng: StdRng::seed_from_u64(s.wrapping_add(1)),
+            rng: SimRng::seed_from_u64(s.wrapping_add(1)),
+            undo_log: UndoLog::default(),
+            trace: None,
             stance_changed_this_turn: false,
             cards_played_this_turn: Vec::new(),
             has_card_been_played_this_turn: false,
@@ -61,26 +126,90 @@ impl CombatState {
             shivs_played_this_turn: 0,
         }
     }
-}
 
-#[pymethods]
-impl CombatState {
-    #[staticmethod]
-    #[pyo3(name = "new_with_character")]
-    #[pyo3(signature = (monsters, seed=None, character=None))]
-    pub fn py_new_with_character(monsters: Vec<Monster>, seed: Option<u64>, character: Option<Character>) -> Self {
-        Self::new_with_character(monsters, seed, character)
+    /// Energy cost of playing `ci` right now: Corruption (skills), free play, Blood for
+    /// Blood, Masterful Stab and Bullet Time all adjust the printed cost. X-cost cards
+    /// report -1 unless made free.
+    pub fn effective_cost(&self, ci: CardInstance) -> i32 {
+        let corruption = self.player.get_power(PowerType::Corruption) > 0;
+        let is_skill = ci.card.card_type() == CardType::Skill;
+        let free_play = self.player.has_free_play(ci.card.card_type());
+        let mut effective_cost = if corruption && is_skill { 0 } else if free_play { 0 } else { ci.cost() };
+        // Blood for Blood: cost drops to magic_number after player takes damage
+        if ci.card == Card::BloodForBlood && self.player_damaged_this_combat {
+            effective_cost = ci.base_magic();
+        }
+        // MasterfulStab: costs 0 undamaged, base_magic (3/2) when damaged
+        if ci.card == Card::MasterfulStab {
+            effective_cost = if self.player_damaged_this_combat { ci.base_magic() } else { 0 };
+        }
+        // BulletTime: all cards cost 0 this turn
+        if self.cards_cost_zero_this_turn {
+            effective_cost = 0;
+        }
+        effective_cost
+    }
+
+    /// Whether `ci` can be played right now, ignoring targets: not unplayable, not an
+    /// attack while Entangled, and affordable with energy plus miracles.
+    pub fn can_play(&self, ci: CardInstance) -> bool {
+        if ci.card.unplayable() {
+            return false;
+        }
+        if ci.card.card_type() == CardType::Attack && self.player.get_power(PowerType::Entangled) > 0 {
+            return false;
+        }
+        let total_energy = self.player.energy + self.player.get_power(PowerType::MiracleCount);
+        self.effective_cost(ci) <= total_energy
+    }
+
+    /// Number of distinct outcomes reachable through play_card's `choice` argument for the
+    /// card at `hand_index` (choices 0..n), or 0 if the card ignores `choice`.
+    pub fn num_choices(&self, hand_index: usize) -> usize {
+        let Some(&deck_idx) = self.player.hand_indices.get(hand_index) else {
+            return 0;
+        };
+        let ci = self.deck[deck_idx];
+        // X-cost cards spend all remaining energy by default; choice picks a smaller X
+        let max_x = self.player.energy.max(0) as usize;
+        match ci.card {
+            Card::IronWave if ci.upgraded => 2,
+            Card::WishCard => 3,
+            // Discard up to the rest of the hand
+            Card::Concentrate => self.player.hand_indices.len(),
+            Card::ReinforcedBody => {
+                let min_x = if ci.upgraded { 0 } else { 1 };
+                max_x.saturating_sub(min_x) + 1
+            }
+            Card::Doppelganger => {
+                let mut levels: Vec<i32> = Vec::new();
+                for &(di, _) in &self.cards_played_this_turn {
+                    let c = self.deck[di].cost();
+                    if c >= 0 && c as usize <= max_x && !levels.contains(&c) {
+                        levels.push(c);
+                    }
+                }
+                if levels.is_empty() { max_x + 1 } else { levels.len() }
+            }
+            _ if ci.cost() == -1 => max_x + 1,
+            _ => 0,
+        }
     }
 
     /// Start combat: pre-battle setup, then start first player turn.
     pub fn start_combat(&mut self) {
+        trace::scoped(self, |s| s.start_combat_inner())
+    }
+
+    fn start_combat_inner(&mut self) {
         // Pre-battle: set up monster powers
         for i in 0..self.monsters.len() {
-            enemies::pre_battle(&mut self.monsters[i]);
+            enemies::pre_battle(self.monster_mut(i));
         }
 
         // Initialize draw pile with all deck indices
-        self.player.draw_pile = (0..self.deck.len()).collect();
+        undo::pile(&self.player, Pile::Draw);
+        self.player.draw_pile.set(0..self.deck.len(), &self.deck);
         self.shuffle_draw_pile();
 
         // Move innate cards to front of draw pile
@@ -106,7 +235,9 @@ impl CombatState {
     /// Start a new player turn: reset block (unless Barricade), gain energy, draw cards.
     pub fn start_player_turn(&mut self) {
         self.turn_number += 1;
+        trace::set_turn(self.turn_number);
         self.stance_changed_this_turn = false;
+        undo::cards_played(&self.cards_played_this_turn);
         self.cards_played_this_turn.clear();
         // Tracking for FTL
         self.has_card_been_played_this_turn = false;
@@ -134,10 +265,12 @@ impl CombatState {
         }
 
         // Clear NoDraw from previous turn
-        self.player.powers.remove(&PowerType::NoDraw);
+        undo::power(&self.player, PowerType::NoDraw);
+        self.player.powers.remove(PowerType::NoDraw);
 
         // Clear Entangled from previous turn
-        self.player.powers.remove(&PowerType::Entangled);
+        undo::power(&self.player, PowerType::Entangled);
+        self.player.powers.remove(PowerType::Entangled);
 
         // Relic hooks on turn start (Lantern, Bag of Preparation)
         let (extra_draw, extra_energy) = relics::on_turn_start(&mut self.player, self.turn_number);
@@ -183,7 +316,7 @@ impl CombatState {
         // NoxiousFumes (base): apply poison to first alive enemy at start of turn
         let noxious = self.player.get_power(PowerType::NoxiousFumes);
         if noxious > 0 {
-            for m in &mut self.monsters {
+            for m in self.monsters_mut() {
                 if !m.is_dead() {
                     m.apply_power(PowerType::Poison, noxious);
                     break;
@@ -193,7 +326,7 @@ impl CombatState {
         // NoxiousFumesAOE (upgraded): apply poison to all enemies at start of turn
         let noxious_aoe = self.player.get_power(PowerType::NoxiousFumesAOE);
         if noxious_aoe > 0 {
-            for m in &mut self.monsters {
+            for m in self.monsters_mut() {
                 if !m.is_dead() {
                     m.apply_power(PowerType::Poison, noxious_aoe);
                 }
@@ -204,8 +337,12 @@ impl CombatState {
     /// Play a card from hand by hand index, targeting monster at target_index.
     /// Optional choice param for cards with multiple modes (e.g. Iron Wave+ Spear=0/Shield=1).
     /// Returns true if the card was successfully played.
-    #[pyo3(signature = (hand_index, target_index=None, choice=None))]
     pub fn play_card(&mut self, hand_index: usize, target_index: Option<usize>, choice: Option<usize>) -> bool {
+        let _perf = self.player.hand_indices.get(hand_index).map(|&i| perf::play_card(self.deck[i].card));
+        trace::scoped(self, |s| s.play_card_inner(hand_index, target_index, choice))
+    }
+
+    fn play_card_inner(&mut self, hand_index: usize, target_index: Option<usize>, choice: Option<usize>) -> bool {
         if self.combat_over {
             return false;
         }
@@ -224,37 +361,13 @@ impl CombatState {
         let is_attack = card_inst.card.card_type() == CardType::Attack;
         let is_skill = card_inst.card.card_type() == CardType::Skill;
 
-        // Entangled: can't play attacks
-        if is_attack && self.player.get_power(PowerType::Entangled) > 0 {
+        // Entangled, cost and energy (including miracles) checks
+        if !self.can_play(card_inst) {
             return false;
         }
-
-        // Corruption: skills cost 0
         let corruption = self.player.get_power(PowerType::Corruption) > 0;
-        // free_play_for: next card of matching type is free
-        let card_type = card_inst.card.card_type();
-        let free_play = self.player.free_play_for.as_ref()
-            .map_or(false, |types| types.contains(&card_type));
-        let mut effective_cost = if corruption && is_skill { 0 } else if free_play { 0 } else { card_inst.cost() };
-        // Blood for Blood: cost drops to magic_number after player takes damage
-        if card_inst.card == Card::BloodForBlood && self.player_damaged_this_combat {
-            effective_cost = card_inst.base_magic();
-        }
-        // MasterfulStab: costs 0 undamaged, base_magic (3/2) when damaged
-        if card_inst.card == Card::MasterfulStab {
-            effective_cost = if self.player_damaged_this_combat { card_inst.base_magic() } else { 0 };
-        }
-        // BulletTime: all cards cost 0 this turn
-        if self.cards_cost_zero_this_turn {
-            effective_cost = 0;
-        }
-
-        // Check energy (including miracles as extra energy)
-        let miracles = self.player.get_power(PowerType::MiracleCount);
-        let total_energy = self.player.energy + miracles;
-        if effective_cost > total_energy {
-            return false;
-        }
+        let free_play = self.player.has_free_play(card_inst.card.card_type());
+        let effective_cost = self.effective_cost(card_inst);
 
         // Check target requirement
         if card_inst.card.has_target() && target_index.is_none() {
@@ -275,14 +388,17 @@ impl CombatState {
 
         // Consume free_play_for if used
         if free_play {
-            self.player.free_play_for = None;
+            self.player.free_play_for = 0;
         }
 
         // Remove from hand
-        self.player.hand_indices.remove(hand_index);
+        undo::pile(&self.player, Pile::Hand);
+        self.player.hand_indices.remove(hand_index, &self.deck);
+        trace::card_move(&self.deck, deck_index, Pile::Hand, Pile::Play);
 
         // Track non-X-cost attacks/skills for Doppelganger replay
         if (is_attack || is_skill) && card_inst.cost() >= 0 {
+            undo::cards_played(&self.cards_played_this_turn);
             self.cards_played_this_turn.push((deck_index, target_index));
         }
 
@@ -333,7 +449,7 @@ impl CombatState {
                 let ti = target_index.unwrap();
                 self.attack_hit(ti, card_inst.base_damage());
                 if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
-                    self.monsters[ti].apply_power(PowerType::Vulnerable, card_inst.base_magic());
+                    self.monster_mut(ti).apply_power(PowerType::Vulnerable, card_inst.base_magic());
                 }
             }
 
@@ -342,7 +458,7 @@ impl CombatState {
                 let ti = target_index.unwrap();
                 self.attack_hit(ti, card_inst.base_damage());
                 if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
-                    self.monsters[ti].apply_power(PowerType::Weak, card_inst.base_magic());
+                    self.monster_mut(ti).apply_power(PowerType::Weak, card_inst.base_magic());
                 }
             }
             Card::Survivor => {
@@ -382,7 +498,7 @@ impl CombatState {
                 let ti = target_index.unwrap();
                 self.attack_hit(ti, card_inst.base_damage());
                 if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
-                    self.monsters[ti].apply_power(PowerType::Poison, card_inst.base_magic());
+                    self.monster_mut(ti).apply_power(PowerType::Poison, card_inst.base_magic());
                 }
             }
             Card::DaggerThrow => {
@@ -442,7 +558,7 @@ impl CombatState {
             Card::DeadlyPoison => {
                 let ti = target_index.unwrap();
                 if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
-                    self.monsters[ti].apply_power(PowerType::Poison, card_inst.base_magic());
+                    self.monster_mut(ti).apply_power(PowerType::Poison, card_inst.base_magic());
                 }
             }
             Card::Acrobatics => {
@@ -545,7 +661,7 @@ impl CombatState {
             Card::BouncingFlask => {
                 let ti = target_index.unwrap();
                 if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
-                    self.monsters[ti].apply_power(PowerType::Poison, card_inst.base_magic());
+                    self.monster_mut(ti).apply_power(PowerType::Poison, card_inst.base_magic());
                 }
             }
             Card::Concentrate => {
@@ -576,16 +692,16 @@ impl CombatState {
                     if current_poison > 0 {
                         if card_inst.upgraded {
                             // Triple: add 2x current
-                            self.monsters[ti].apply_power(PowerType::Poison, current_poison * 2);
+                            self.monster_mut(ti).apply_power(PowerType::Poison, current_poison * 2);
                         } else {
                             // Double: add 1x current
-                            self.monsters[ti].apply_power(PowerType::Poison, current_poison);
+                            self.monster_mut(ti).apply_power(PowerType::Poison, current_poison);
                         }
                     }
                 }
             }
             Card::CripplingCloud => {
-                for m in &mut self.monsters {
+                for m in self.monsters_mut() {
                     if !m.is_dead() {
                         m.apply_power(PowerType::Poison, card_inst.base_magic());
                         m.apply_power(PowerType::Weak, 1);
@@ -596,7 +712,7 @@ impl CombatState {
                 let ti = target_index.unwrap();
                 self.player_gain_block(card_inst.base_block());
                 if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
-                    self.monsters[ti].apply_power(PowerType::Weak, card_inst.base_magic());
+                    self.monster_mut(ti).apply_power(PowerType::Weak, card_inst.base_magic());
                 }
             }
             Card::Outmaneuver => {
@@ -605,7 +721,7 @@ impl CombatState {
             }
             Card::PiercingWail => {
                 self.player_gain_block(card_inst.base_block());
-                for m in &mut self.monsters {
+                for m in self.monsters_mut() {
                     if !m.is_dead() {
                         m.apply_power(PowerType::Weak, card_inst.base_magic());
                     }
@@ -641,7 +757,7 @@ impl CombatState {
             Card::Terror => {
                 let ti = target_index.unwrap();
                 if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
-                    self.monsters[ti].apply_power(PowerType::Vulnerable, card_inst.base_magic());
+                    self.monster_mut(ti).apply_power(PowerType::Vulnerable, card_inst.base_magic());
                 }
             }
 
@@ -682,8 +798,8 @@ impl CombatState {
                 let weak_amount = x + card_inst.base_magic();
                 let ti = target_index.unwrap();
                 if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
-                    self.monsters[ti].apply_power(PowerType::Weak, weak_amount);
-                    self.monsters[ti].apply_power(PowerType::Poison, weak_amount);
+                    self.monster_mut(ti).apply_power(PowerType::Weak, weak_amount);
+                    self.monster_mut(ti).apply_power(PowerType::Poison, weak_amount);
                 }
             }
             Card::StormOfSteel => {
@@ -736,16 +852,23 @@ impl CombatState {
                         let replay_card_type = self.deck[replay_deck_index].card.card_type();
 
                         // Remove from discard or exhaust pile
+                        let mut from = Pile::None;
                         if let Some(pos) = self.player.discard_pile.iter().position(|&i| i == replay_deck_index) {
-                            self.player.discard_pile.remove(pos);
+                            undo::pile(&self.player, Pile::Discard);
+                            self.player.discard_pile.remove(pos, &self.deck);
+                            from = Pile::Discard;
                         } else if let Some(pos) = self.player.exhaust_pile.iter().position(|&i| i == replay_deck_index) {
-                            self.player.exhaust_pile.remove(pos);
+                            undo::pile(&self.player, Pile::Exhaust);
+                            self.player.exhaust_pile.remove(pos, &self.deck);
+                            from = Pile::Exhaust;
                         }
 
                         // Re-add to hand and replay
-                        self.player.hand_indices.push(replay_deck_index);
+                        undo::pile(&self.player, Pile::Hand);
+                        self.player.hand_indices.push(replay_deck_index, &self.deck);
+                        trace::card_move(&self.deck, replay_deck_index, from, Pile::Hand);
                         let replay_pos = self.player.hand_indices.len() - 1;
-                        self.player.free_play_for = Some(vec![replay_card_type]);
+                        self.player.set_free_play(replay_card_type);
                         self.play_card(replay_pos, stored_target, None);
                     }
                 }
@@ -753,7 +876,7 @@ impl CombatState {
             Card::CorpseExplosionCard => {
                 let ti = target_index.unwrap();
                 if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
-                    self.monsters[ti].apply_power(PowerType::Poison, card_inst.base_magic());
+                    self.monster_mut(ti).apply_power(PowerType::Poison, card_inst.base_magic());
                 }
                 // BG mod: CardDoesNotDiscardWhenPlayed — card is removed after play
                 purge_played_card = true;
@@ -819,7 +942,7 @@ impl CombatState {
                 for _ in 0..hits {
                     if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
                         let dmg = calculate_player_damage(&self.player, &self.monsters[ti], card_inst.base_damage());
-                        apply_damage_to_monster(&mut self.monsters[ti], dmg);
+                        apply_damage_to_monster(self.monster_mut(ti), dmg);
                     }
                 }
             }
@@ -829,12 +952,13 @@ impl CombatState {
                 if let Some(ti) = target_index {
                     if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
                         if card_inst.upgraded {
-                            self.monsters[ti].apply_power(PowerType::Vulnerable, 1);
+                            self.monster_mut(ti).apply_power(PowerType::Vulnerable, 1);
                         } else {
                             // Die-based: apply on die 1-3
+                            undo::die(&self.die);
                             let roll = self.die.roll();
                             if roll <= 3 {
-                                self.monsters[ti].apply_power(PowerType::Vulnerable, 1);
+                                self.monster_mut(ti).apply_power(PowerType::Vulnerable, 1);
                             }
                         }
                     }
@@ -857,11 +981,12 @@ impl CombatState {
                 if let Some(ti) = target_index {
                     if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
                         if card_inst.upgraded {
-                            self.monsters[ti].apply_power(PowerType::Weak, 1);
+                            self.monster_mut(ti).apply_power(PowerType::Weak, 1);
                         } else {
+                            undo::die(&self.die);
                             let roll = self.die.roll();
                             if roll >= 4 {
-                                self.monsters[ti].apply_power(PowerType::Weak, 1);
+                                self.monster_mut(ti).apply_power(PowerType::Weak, 1);
                             }
                         }
                     }
@@ -880,6 +1005,7 @@ impl CombatState {
             }
             Card::Chaos => {
                 // Channel a random orb type (die-based)
+                undo::die(&self.die);
                 let roll = self.die.roll();
                 let orb = match roll % 3 {
                     0 => OrbType::Lightning,
@@ -936,9 +1062,9 @@ impl CombatState {
                 // BG mod: remove all block first, then deal damage.
                 let ti = target_index.unwrap();
                 if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
-                    self.monsters[ti].block = 0;
+                    self.monster_mut(ti).block = 0;
                     let damage = calculate_player_damage(&self.player, &self.monsters[ti], card_inst.base_damage());
-                    apply_damage_to_monster(&mut self.monsters[ti], damage);
+                    apply_damage_to_monster(self.monster_mut(ti), damage);
                 }
             }
             Card::Scrape => {
@@ -977,8 +1103,11 @@ impl CombatState {
                 self.player_gain_block(card_inst.base_block());
                 // Return card from discard to hand (simplified: draw 1 from discard)
                 if !self.player.discard_pile.is_empty() {
-                    let idx = self.player.discard_pile.pop().unwrap();
-                    self.player.hand_indices.push(idx);
+                    undo::pile(&self.player, Pile::Discard);
+                    undo::pile(&self.player, Pile::Hand);
+                    let idx = self.player.discard_pile.pop(&self.deck).unwrap();
+                    self.player.hand_indices.push(idx, &self.deck);
+                    trace::card_move(&self.deck, idx, Pile::Discard, Pile::Hand);
                 }
             }
             Card::Overclock => {
@@ -989,8 +1118,11 @@ impl CombatState {
             Card::RecycleCard => {
                 // Exhaust a card from hand, gain its cost as energy (simplified: gain 1 energy)
                 if !self.player.hand_indices.is_empty() {
-                    let idx = self.player.hand_indices.pop().unwrap();
-                    self.player.exhaust_pile.push(idx);
+                    undo::pile(&self.player, Pile::Hand);
+                    undo::pile(&self.player, Pile::Exhaust);
+                    let idx = self.player.hand_indices.pop(&self.deck).unwrap();
+                    self.player.exhaust_pile.push(idx, &self.deck);
+                    trace::card_move(&self.deck, idx, Pile::Hand, Pile::Exhaust);
                     let card = self.deck[idx];
                     let cost = card.cost();
                     if cost > 0 {
@@ -1053,14 +1185,19 @@ impl CombatState {
                     .copied()
                     .collect();
                 for idx in &zero_cost_indices {
-                    self.player.discard_pile.retain(|&i| i != *idx);
-                    self.player.hand_indices.push(*idx);
+                    undo::pile(&self.player, Pile::Discard);
+                    undo::pile(&self.player, Pile::Hand);
+                    self.player.discard_pile.retain(|&i| i != *idx, &self.deck);
+                    self.player.hand_indices.push(*idx, &self.deck);
+                    trace::card_move(&self.deck, *idx, Pile::Discard, Pile::Hand);
                 }
             }
             Card::CoreSurge => {
                 // Remove Weak and Vulnerable from self, then attack
-                self.player.powers.remove(&PowerType::Weak);
-                self.player.powers.remove(&PowerType::Vulnerable);
+                undo::power(&self.player, PowerType::Weak);
+                undo::power(&self.player, PowerType::Vulnerable);
+                self.player.powers.remove(PowerType::Weak);
+                self.player.powers.remove(PowerType::Vulnerable);
                 self.attack_single(target_index, card_inst);
             }
             Card::Hyperbeam => {
@@ -1161,7 +1298,7 @@ impl CombatState {
                     if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
                         let bonus = card_inst.base_magic();
                         let damage = calculate_player_damage(&self.player, &self.monsters[ti], bonus);
-                        apply_damage_to_monster(&mut self.monsters[ti], damage);
+                        apply_damage_to_monster(self.monster_mut(ti), damage);
                     }
                 }
             }
@@ -1180,6 +1317,7 @@ impl CombatState {
             Card::JustLucky => {
                 self.attack_single(target_index, card_inst);
                 // Die roll: 1-3 scry, 4-6 block
+                undo::die(&self.die);
                 let roll = self.die.roll();
                 if roll <= 3 {
                     self.scry(card_inst.base_magic());
@@ -1224,8 +1362,8 @@ impl CombatState {
                 let ti = target_index.unwrap();
                 if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
                     let damage = calculate_player_damage(&self.player, &self.monsters[ti], card_inst.base_damage());
-                    apply_damage_to_monster(&mut self.monsters[ti], damage);
-                    self.monsters[ti].apply_power(PowerType::Weak, card_inst.base_magic());
+                    apply_damage_to_monster(self.monster_mut(ti), damage);
+                    self.monster_mut(ti).apply_power(PowerType::Weak, card_inst.base_magic());
                 }
             }
             Card::FearNoEvil | Card::ForeignInfluence | Card::CarveReality => {
@@ -1235,7 +1373,7 @@ impl CombatState {
                 let ti = target_index.unwrap();
                 if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
                     let damage = calculate_player_damage(&self.player, &self.monsters[ti], card_inst.base_damage());
-                    let hp_lost = apply_damage_to_monster(&mut self.monsters[ti], damage);
+                    let hp_lost = apply_damage_to_monster(self.monster_mut(ti), damage);
                     if hp_lost > 0 {
                         self.player_gain_block(hp_lost);
                     }
@@ -1245,8 +1383,8 @@ impl CombatState {
                 let ti = target_index.unwrap();
                 if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
                     let damage = calculate_player_damage(&self.player, &self.monsters[ti], card_inst.base_damage());
-                    apply_damage_to_monster(&mut self.monsters[ti], damage);
-                    self.monsters[ti].apply_power(PowerType::Vulnerable, card_inst.base_magic());
+                    apply_damage_to_monster(self.monster_mut(ti), damage);
+                    self.monster_mut(ti).apply_power(PowerType::Vulnerable, card_inst.base_magic());
                 }
             }
             Card::Tantrum => {
@@ -1256,7 +1394,7 @@ impl CombatState {
                     for _ in 0..hits {
                         if !self.monsters[ti].is_dead() {
                             let damage = calculate_player_damage(&self.player, &self.monsters[ti], card_inst.base_damage());
-                            apply_damage_to_monster(&mut self.monsters[ti], damage);
+                            apply_damage_to_monster(self.monster_mut(ti), damage);
                         }
                     }
                 }
@@ -1274,7 +1412,7 @@ impl CombatState {
                     let bonus = card_inst.base_magic() * retain_count;
                     let base = card_inst.base_damage() + bonus;
                     let damage = calculate_player_damage(&self.player, &self.monsters[ti], base);
-                    apply_damage_to_monster(&mut self.monsters[ti], damage);
+                    apply_damage_to_monster(self.monster_mut(ti), damage);
                 }
             }
             Card::WindmillStrike => {
@@ -1294,7 +1432,7 @@ impl CombatState {
                     for _ in 0..hits {
                         if !self.monsters[ti].is_dead() {
                             let damage = calculate_player_damage(&self.player, &self.monsters[ti], card_inst.base_damage());
-                            apply_damage_to_monster(&mut self.monsters[ti], damage);
+                            apply_damage_to_monster(self.monster_mut(ti), damage);
                         }
                     }
                 }
@@ -1312,7 +1450,7 @@ impl CombatState {
                     let bonus = card_inst.base_magic() * miracle_count;
                     let base = card_inst.base_damage() + bonus;
                     let damage = calculate_player_damage(&self.player, &self.monsters[ti], base);
-                    apply_damage_to_monster(&mut self.monsters[ti], damage);
+                    apply_damage_to_monster(self.monster_mut(ti), damage);
                 }
             }
 
@@ -1331,7 +1469,7 @@ impl CombatState {
             Card::Indignation => {
                 // In Wrath: apply vulnerability to all enemies, else: enter Wrath
                 if self.player.stance == Stance::Wrath {
-                    for m in &mut self.monsters {
+                    for m in self.monsters_mut() {
                         if !m.is_dead() {
                             m.apply_power(PowerType::Vulnerable, 1);
                         }
@@ -1342,7 +1480,7 @@ impl CombatState {
             }
             Card::Swivel => {
                 self.player_gain_block(card_inst.base_block());
-                self.player.free_play_for = Some(vec![CardType::Attack]);
+                self.player.set_free_play(CardType::Attack);
             }
             Card::Perseverance => {
                 self.player_gain_block(card_inst.base_block());
@@ -1400,7 +1538,7 @@ impl CombatState {
                 for _ in 0..total_hits {
                     if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
                         let damage = calculate_player_damage(&self.player, &self.monsters[ti], card_inst.base_damage());
-                        apply_damage_to_monster(&mut self.monsters[ti], damage);
+                        apply_damage_to_monster(self.monster_mut(ti), damage);
                     }
                 }
             }
@@ -1411,7 +1549,7 @@ impl CombatState {
                     if miracle_count > 0 {
                         let total = card_inst.base_damage() * miracle_count;
                         let damage = calculate_player_damage(&self.player, &self.monsters[ti], total);
-                        apply_damage_to_monster(&mut self.monsters[ti], damage);
+                        apply_damage_to_monster(self.monster_mut(ti), damage);
                     }
                     // 0 damage if no miracles
                 }
@@ -1420,9 +1558,12 @@ impl CombatState {
             // --- Watcher Rare Skills ---
             Card::Blasphemy => {
                 // Exhaust draw pile, apply Triple Attack power
-                let draw_copy: Vec<usize> = self.player.draw_pile.drain(..).collect();
+                undo::pile(&self.player, Pile::Draw);
+                undo::pile(&self.player, Pile::Exhaust);
+                let draw_copy: Vec<usize> = self.player.draw_pile.drain().collect();
                 for idx in draw_copy {
-                    self.player.exhaust_pile.push(idx);
+                    self.player.exhaust_pile.push(idx, &self.deck);
+                    trace::card_move(&self.deck, idx, Pile::Draw, Pile::Exhaust);
                 }
                 self.player.apply_power(PowerType::TripleAttack, 1);
             }
@@ -1437,9 +1578,12 @@ impl CombatState {
             }
             Card::VaultCard => {
                 // Discard hand, draw 5, gain 3 energy
-                let hand_copy: Vec<usize> = self.player.hand_indices.drain(..).collect();
+                undo::pile(&self.player, Pile::Hand);
+                undo::pile(&self.player, Pile::Discard);
+                let hand_copy: Vec<usize> = self.player.hand_indices.drain().collect();
                 for idx in hand_copy {
-                    self.player.discard_pile.push(idx);
+                    self.player.discard_pile.push(idx, &self.deck);
+                    trace::card_move(&self.deck, idx, Pile::Hand, Pile::Discard);
                 }
                 self.draw_cards(5);
                 self.player.energy += 3;
@@ -1474,7 +1618,7 @@ impl CombatState {
                 if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
                     if self.monsters[ti].hp <= card_inst.base_magic() {
                         // Instant kill
-                        self.monsters[ti].hp = 0;
+                        self.monster_mut(ti).hp = 0;
                     }
                 }
             }
@@ -1516,7 +1660,9 @@ impl CombatState {
             Card::Anger => {
                 self.attack_single(target_index, card_inst);
                 // BG mod: card goes to draw pile instead of discard (purgeOnUse)
-                self.player.draw_pile.push(deck_index);
+                undo::pile(&self.player, Pile::Draw);
+                self.player.draw_pile.push(deck_index, &self.deck);
+                trace::card_move(&self.deck, deck_index, Pile::Play, Pile::Draw);
                 purge_played_card = true;
             }
             Card::BodySlam => {
@@ -1524,7 +1670,7 @@ impl CombatState {
                 if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
                     // Damage equals current block
                     let damage = calculate_player_damage(&self.player, &self.monsters[ti], self.player.block);
-                    apply_damage_to_monster(&mut self.monsters[ti], damage);
+                    apply_damage_to_monster(self.monster_mut(ti), damage);
                 }
             }
             Card::Clash => {
@@ -1538,8 +1684,8 @@ impl CombatState {
                 let ti = target_index.unwrap();
                 if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
                     let damage = calculate_player_damage(&self.player, &self.monsters[ti], card_inst.base_damage());
-                    apply_damage_to_monster(&mut self.monsters[ti], damage);
-                    self.monsters[ti].apply_power(PowerType::Weak, card_inst.base_magic());
+                    apply_damage_to_monster(self.monster_mut(ti), damage);
+                    self.monster_mut(ti).apply_power(PowerType::Weak, card_inst.base_magic());
                 }
             }
             Card::HeavyBlade => {
@@ -1550,7 +1696,7 @@ impl CombatState {
                     let bonus_str = str_val * (card_inst.base_magic() - 1); // extra multiplied Str
                     let base = card_inst.base_damage() + bonus_str;
                     let damage = calculate_player_damage(&self.player, &self.monsters[ti], base);
-                    apply_damage_to_monster(&mut self.monsters[ti], damage);
+                    apply_damage_to_monster(self.monster_mut(ti), damage);
                 }
             }
             Card::IronWave => {
@@ -1560,7 +1706,7 @@ impl CombatState {
                     let ti = target_index.unwrap();
                     if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
                         let damage = calculate_player_damage(&self.player, &self.monsters[ti], 1);
-                        apply_damage_to_monster(&mut self.monsters[ti], damage);
+                        apply_damage_to_monster(self.monster_mut(ti), damage);
                     }
                 } else {
                     // Base card (1dmg/1blk) or upgraded Spear choice (2dmg/1blk)
@@ -1579,7 +1725,7 @@ impl CombatState {
                     let bonus = strike_count * card_inst.base_magic();
                     let base = card_inst.base_damage() + bonus;
                     let damage = calculate_player_damage(&self.player, &self.monsters[ti], base);
-                    apply_damage_to_monster(&mut self.monsters[ti], damage);
+                    apply_damage_to_monster(self.monster_mut(ti), damage);
                 }
             }
             Card::PommelStrike => {
@@ -1605,8 +1751,11 @@ impl CombatState {
                 self.attack_single(target_index, card_inst);
                 // Put a card from discard on top of draw pile (first card in discard)
                 if !self.player.discard_pile.is_empty() {
-                    let idx = self.player.discard_pile.remove(0);
-                    self.player.draw_pile.push(idx);
+                    undo::pile(&self.player, Pile::Discard);
+                    undo::pile(&self.player, Pile::Draw);
+                    let idx = self.player.discard_pile.remove(0, &self.deck);
+                    self.player.draw_pile.push(idx, &self.deck);
+                    trace::card_move(&self.deck, idx, Pile::Discard, Pile::Draw);
                 }
             }
             Card::Rampage => {
@@ -1619,7 +1768,7 @@ impl CombatState {
                     // Damage = number of cards in exhaust pile
                     let exhaust_count = self.player.exhaust_pile.len() as i32;
                     let damage = calculate_player_damage(&self.player, &self.monsters[ti], exhaust_count);
-                    apply_damage_to_monster(&mut self.monsters[ti], damage);
+                    apply_damage_to_monster(self.monster_mut(ti), damage);
                 }
             }
             Card::SeverSoul => {
@@ -1634,12 +1783,12 @@ impl CombatState {
                 let ti = target_index.unwrap();
                 if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
                     let damage = calculate_player_damage(&self.player, &self.monsters[ti], card_inst.base_damage());
-                    apply_damage_to_monster(&mut self.monsters[ti], damage);
+                    apply_damage_to_monster(self.monster_mut(ti), damage);
                     // Base: 1 Vuln + 1 Weak; Upgraded: 2 Vuln + 1 Weak
                     let vuln_stacks = card_inst.base_magic();
                     let weak_stacks = 1;
-                    self.monsters[ti].apply_power(PowerType::Vulnerable, vuln_stacks);
-                    self.monsters[ti].apply_power(PowerType::Weak, weak_stacks);
+                    self.monster_mut(ti).apply_power(PowerType::Vulnerable, vuln_stacks);
+                    self.monster_mut(ti).apply_power(PowerType::Weak, weak_stacks);
                 }
             }
             Card::Whirlwind => {
@@ -1661,7 +1810,7 @@ impl CombatState {
                 let ti = target_index.unwrap();
                 if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
                     let damage = calculate_player_damage(&self.player, &self.monsters[ti], card_inst.base_damage());
-                    apply_damage_to_monster(&mut self.monsters[ti], damage);
+                    apply_damage_to_monster(self.monster_mut(ti), damage);
                     if self.monsters[ti].is_dead() {
                         self.player.apply_power(PowerType::Strength, card_inst.base_magic());
                     }
@@ -1671,16 +1820,17 @@ impl CombatState {
                 let ti = target_index.unwrap();
                 if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
                     // Exhaust all hand cards, then deal one hit per card exhausted
-                    let hand_cards: Vec<usize> = self.player.hand_indices.drain(..).collect();
+                    undo::pile(&self.player, Pile::Hand);
+                    let hand_cards: Vec<usize> = self.player.hand_indices.drain().collect();
                     let hit_count = hand_cards.len();
                     for idx in hand_cards {
-                        self.on_exhaust_card(idx);
+                        self.on_exhaust_card(idx, Pile::Hand);
                     }
                     // Each hit is a separate DamageAction (base_damage + STR each)
                     for _ in 0..hit_count {
                         let hit_damage = calculate_player_damage(&self.player, &self.monsters[ti],
                             card_inst.base_damage());
-                        apply_damage_to_monster(&mut self.monsters[ti], hit_damage);
+                        apply_damage_to_monster(self.monster_mut(ti), hit_damage);
                     }
                 }
             }
@@ -1699,8 +1849,11 @@ impl CombatState {
             Card::Havoc => {
                 // Play the top card of draw pile for free, then exhaust it (unless Power)
                 if !self.player.draw_pile.is_empty() {
-                    let top_idx = self.player.draw_pile.pop().unwrap();
-                    self.player.hand_indices.push(top_idx);
+                    undo::pile(&self.player, Pile::Draw);
+                    undo::pile(&self.player, Pile::Hand);
+                    let top_idx = self.player.draw_pile.pop(&self.deck).unwrap();
+                    self.player.hand_indices.push(top_idx, &self.deck);
+                    trace::card_move(&self.deck, top_idx, Pile::Draw, Pile::Hand);
                     let top_card = self.deck[top_idx];
                     let hand_pos = self.player.hand_indices.len() - 1;
                     let auto_target = if top_card.card.has_target() {
@@ -1714,8 +1867,9 @@ impl CombatState {
                     // Exhaust the auto-played card (unless it's a Power, which is already removed)
                     if top_card.card.card_type() != CardType::Power {
                         if let Some(pos) = self.player.discard_pile.iter().position(|&i| i == top_idx) {
-                            self.player.discard_pile.remove(pos);
-                            self.on_exhaust_card(top_idx);
+                            undo::pile(&self.player, Pile::Discard);
+                            self.player.discard_pile.remove(pos, &self.deck);
+                            self.on_exhaust_card(top_idx, Pile::Discard);
                         }
                     }
                 }
@@ -1737,8 +1891,11 @@ impl CombatState {
                 self.draw_cards(card_inst.base_magic());
                 // Put last drawn card on top of draw pile (simplified)
                 if !self.player.hand_indices.is_empty() {
-                    let last_idx = self.player.hand_indices.pop().unwrap();
-                    self.player.draw_pile.push(last_idx);
+                    undo::pile(&self.player, Pile::Hand);
+                    undo::pile(&self.player, Pile::Draw);
+                    let last_idx = self.player.hand_indices.pop(&self.deck).unwrap();
+                    self.player.draw_pile.push(last_idx, &self.deck);
+                    trace::card_move(&self.deck, last_idx, Pile::Hand, Pile::Draw);
                 }
             }
 
@@ -1755,7 +1912,7 @@ impl CombatState {
             Card::Disarm => {
                 let ti = target_index.unwrap();
                 if ti < self.monsters.len() && !self.monsters[ti].is_dead() {
-                    self.monsters[ti].apply_power(PowerType::Weak, card_inst.base_magic());
+                    self.monster_mut(ti).apply_power(PowerType::Weak, card_inst.base_magic());
                 }
             }
             Card::Entrench => {
@@ -1791,10 +1948,11 @@ impl CombatState {
                     .collect();
                 let count = non_attacks.len() as i32;
                 for idx in &non_attacks {
-                    self.player.hand_indices.retain(|&i| i != *idx);
+                    undo::pile(&self.player, Pile::Hand);
+                    self.player.hand_indices.retain(|&i| i != *idx, &self.deck);
                 }
                 for idx in non_attacks {
-                    self.on_exhaust_card(idx);
+                    self.on_exhaust_card(idx, Pile::Hand);
                 }
                 if count > 0 {
                     self.player_gain_block(card_inst.base_block() * count);
@@ -1810,7 +1968,7 @@ impl CombatState {
                 // Base: 1 Vuln + 1 Weak; Upgraded: 1 Vuln + 2 Weak
                 let vuln_stacks = 1;
                 let weak_stacks = card_inst.base_magic();
-                for m in &mut self.monsters {
+                for m in self.monsters_mut() {
                     if !m.is_dead() {
                         m.apply_power(PowerType::Vulnerable, vuln_stacks);
                         m.apply_power(PowerType::Weak, weak_stacks);
@@ -1819,6 +1977,7 @@ impl CombatState {
             }
             Card::SpotWeakness => {
                 // Die-based: base succeeds on 1-3, upgraded on 1-4
+                undo::die(&self.die);
                 let die_val = self.die.roll();
                 let threshold = if card_inst.upgraded { 4 } else { 3 };
                 if die_val <= threshold {
@@ -1833,8 +1992,11 @@ impl CombatState {
             Card::Exhume => {
                 // Get a card from exhaust pile back to hand
                 if !self.player.exhaust_pile.is_empty() {
-                    let idx = self.player.exhaust_pile.remove(0);
-                    self.player.hand_indices.push(idx);
+                    undo::pile(&self.player, Pile::Exhaust);
+                    undo::pile(&self.player, Pile::Hand);
+                    let idx = self.player.exhaust_pile.remove(0, &self.deck);
+                    self.player.hand_indices.push(idx, &self.deck);
+                    trace::card_move(&self.deck, idx, Pile::Exhaust, Pile::Hand);
                 }
             }
             Card::LimitBreak => {
@@ -1904,7 +2066,7 @@ impl CombatState {
         // Consume Vulnerable on attacked monsters (1 stack per card, not per hit)
         for &ti in &vuln_targets {
             if ti < self.monsters.len() {
-                self.monsters[ti].reduce_power(PowerType::Vulnerable, 1);
+                self.monster_mut(ti).reduce_power(PowerType::Vulnerable, 1);
             }
         }
 
@@ -1924,7 +2086,7 @@ impl CombatState {
         // Anger (Nob): deal damage to player when a Skill is played (bypasses block)
         if is_skill {
             let mut anger_triggered = false;
-            for m in &mut self.monsters {
+            for m in &self.monsters {
                 if !m.is_dead() {
                     let anger = m.get_power(PowerType::Anger);
                     if anger > 0 {
@@ -1946,13 +2108,17 @@ impl CombatState {
             self.player.reduce_power(PowerType::Burst, 1);
             // Find the card in discard or exhaust pile and re-add to hand
             if let Some(pos) = self.player.discard_pile.iter().position(|&i| i == deck_index) {
-                self.player.discard_pile.remove(pos);
+                undo::pile(&self.player, Pile::Discard);
+                self.player.discard_pile.remove(pos, &self.deck);
             } else if let Some(pos) = self.player.exhaust_pile.iter().position(|&i| i == deck_index) {
-                self.player.exhaust_pile.remove(pos);
+                undo::pile(&self.player, Pile::Exhaust);
+                self.player.exhaust_pile.remove(pos, &self.deck);
             }
-            self.player.hand_indices.push(deck_index);
+            undo::pile(&self.player, Pile::Hand);
+            self.player.hand_indices.push(deck_index, &self.deck);
+            trace::card_move(&self.deck, deck_index, Pile::Play, Pile::Hand);
             let replay_pos = self.player.hand_indices.len() - 1;
-            self.player.free_play_for = Some(vec![CardType::Skill]);
+            self.player.set_free_play(CardType::Skill);
             self.play_card(replay_pos, target_index, choice);
             return true;
         }
@@ -1960,11 +2126,13 @@ impl CombatState {
         // DoubleTap: replay the attack as a full card play
         if is_attack && self.player.get_power(PowerType::DoubleTap) > 0 {
             self.player.reduce_power(PowerType::DoubleTap, 1);
-            self.player.hand_indices.push(deck_index);
+            undo::pile(&self.player, Pile::Hand);
+            self.player.hand_indices.push(deck_index, &self.deck);
+            trace::card_move(&self.deck, deck_index, Pile::Play, Pile::Hand);
             let replay_pos = self.player.hand_indices.len() - 1;
             let energy_after_play = self.player.energy;
             self.player.energy = original_energy; // Restore pre-play energy for X-cost
-            self.player.free_play_for = Some(vec![CardType::Attack]);
+            self.player.set_free_play(CardType::Attack);
             self.play_card(replay_pos, target_index, None);
             self.player.energy = energy_after_play; // Restore post-play energy
             return true;
@@ -1981,16 +2149,21 @@ impl CombatState {
             // Card already placed (e.g. Anger → draw pile); skip normal disposition
         } else if retain_played_card {
             // BG selfRetain: card returns to hand after play
-            self.player.hand_indices.push(deck_index);
+            undo::pile(&self.player, Pile::Hand);
+            self.player.hand_indices.push(deck_index, &self.deck);
+            trace::card_move(&self.deck, deck_index, Pile::Play, Pile::Hand);
         } else if is_power && !power_to_discard {
             // Power cards are simply removed from circulation
+            trace::card_move(&self.deck, deck_index, Pile::Play, Pile::None);
         } else {
             // Determine where card goes after play
             let should_exhaust = card_inst.exhausts() || (corruption && is_skill);
             if should_exhaust {
-                self.on_exhaust_card(deck_index);
+                self.on_exhaust_card(deck_index, Pile::Play);
             } else {
-                self.player.discard_pile.push(deck_index);
+                undo::pile(&self.player, Pile::Discard);
+                self.player.discard_pile.push(deck_index, &self.deck);
+                trace::card_move(&self.deck, deck_index, Pile::Play, Pile::Discard);
             }
         }
 
@@ -2003,8 +2176,12 @@ impl CombatState {
 
     /// End the player's turn: handle end-of-turn powers, ethereal cards, Burn/Decay, discard.
     pub fn end_player_turn(&mut self) {
+        trace::scoped(self, |s| s.end_player_turn_inner())
+    }
+
+    fn end_player_turn_inner(&mut self) {
         // Safety net: clear free_play_for at end of turn
-        self.player.free_play_for = None;
+        self.player.free_play_for = 0;
 
         // DemonForm: gain Strength at end of turn
         let demon_form = self.player.get_power(PowerType::DemonForm);
@@ -2022,7 +2199,7 @@ impl CombatState {
         let combust = self.player.get_power(PowerType::Combust);
         if combust > 0 {
             self.player.hp -= 1;
-            for m in &mut self.monsters {
+            for m in self.monsters_mut() {
                 if !m.is_dead() {
                     apply_damage_to_monster(m, combust);
                 }
@@ -2036,7 +2213,7 @@ impl CombatState {
         }
 
         // Process end-of-turn triggers on hand cards before discarding
-        let hand_copy: Vec<usize> = self.player.hand_indices.clone();
+        let hand_copy: Vec<usize> = self.player.hand_indices.to_vec();
 
         // Burn: deals self-damage at end of turn
         for &idx in &hand_copy {
@@ -2057,21 +2234,24 @@ impl CombatState {
         // Discard/exhaust remaining hand
         let mut new_hand: Vec<usize> = Vec::new();
         let mut exhaust_indices: Vec<usize> = Vec::new();
-        for idx in self.player.hand_indices.drain(..) {
+        undo::pile(&self.player, Pile::Hand);
+        undo::pile(&self.player, Pile::Discard);
+        for idx in self.player.hand_indices.drain() {
             let card_inst = self.deck[idx];
             if card_inst.card.retain() {
                 new_hand.push(idx);
             } else if card_inst.card.ethereal() {
                 exhaust_indices.push(idx);
             } else {
-                self.player.discard_pile.push(idx);
+                self.player.discard_pile.push(idx, &self.deck);
+                trace::card_move(&self.deck, idx, Pile::Hand, Pile::Discard);
             }
         }
-        self.player.hand_indices = new_hand;
+        self.player.hand_indices.set(new_hand, &self.deck);
 
         // Process exhaust triggers after hand is drained
         for idx in exhaust_indices {
-            self.on_exhaust_card(idx);
+            self.on_exhaust_card(idx, Pile::Hand);
         }
 
         // Wrath: take 1 damage at end of turn
@@ -2097,7 +2277,7 @@ impl CombatState {
         if omega > 0 {
             for i in 0..self.monsters.len() {
                 if !self.monsters[i].is_dead() {
-                    apply_damage_to_monster(&mut self.monsters[i], omega);
+                    apply_damage_to_monster(self.monster_mut(i), omega);
                 }
             }
             self.check_combat_end();
@@ -2107,7 +2287,8 @@ impl CombatState {
         let conclusion = self.player.get_power(PowerType::ConclusionPower);
         if conclusion > 0 {
             self.change_stance(Stance::Neutral);
-            self.player.powers.remove(&PowerType::ConclusionPower);
+            undo::power(&self.player, PowerType::ConclusionPower);
+            self.player.powers.remove(PowerType::ConclusionPower);
         }
 
         // Trigger orb passives at end of turn (Defect)
@@ -2126,13 +2307,19 @@ impl CombatState {
     /// Roll the die and execute all monster turns.
     /// Returns the die roll value.
     pub fn roll_and_execute_monsters(&mut self) -> u8 {
+        trace::scoped(self, |s| s.roll_and_execute_monsters_inner())
+    }
+
+    fn roll_and_execute_monsters_inner(&mut self) -> u8 {
         if self.combat_over {
             return 0;
         }
 
+        undo::die(&self.die);
         let roll = self.die.roll();
 
         // Relic: die-roll triggers (Vajra, Oddly Smooth Stone, Pen Nib, etc.)
+        undo::monsters(&self.monsters);
         let (extra_draw, extra_energy) = relics::on_die_roll(&mut self.player, &mut self.monsters, roll);
         self.player.energy += extra_energy;
         if extra_draw > 0 {
@@ -2145,6 +2332,7 @@ impl CombatState {
         }
 
         // Relic: Mercury Hourglass (deal 1 dmg to all enemies at start of monster turn)
+        undo::monsters(&self.monsters);
         relics::on_monster_turn_start(&self.player, &mut self.monsters);
 
         for i in 0..self.monsters.len() {
@@ -2152,6 +2340,8 @@ impl CombatState {
                 continue;
             }
 
+            undo::monster(&self.monsters, i);
+
             // Ritual fires at start of monster turn (not on first turn for Cultist)
             let ritual = self.monsters[i].get_power(PowerType::Ritual);
             if ritual > 0 && !self.monsters[i].first_turn {
@@ -2163,12 +2353,7 @@ impl CombatState {
 
             // Select move
             if self.monsters[i].die_controlled {
-                // Sentries use 2-char behavior (1-3→idx 0, 4-6→idx 1)
-                if self.monsters[i].behavior.len() == 2 {
-                    enemies::select_die_move_2char(&mut self.monsters[i], roll);
-                } else {
-                    enemies::select_die_move(&mut self.monsters[i], roll);
-                }
+                enemies::select_die_move(&mut self.monsters[i], roll);
             } else {
                 enemies::select_move(&mut self.monsters[i]);
             }
@@ -2199,9 +2384,11 @@ impl CombatState {
                 self.monsters[i].add_block(move_result.monster_gain_block);
             }
             if !move_result.spawn_monsters.is_empty() {
+                undo::monster_list(&self.monsters);
                 for new_monster in move_result.spawn_monsters {
                     self.monsters.push(new_monster);
                 }
+                trace::monsters_moved(&self.monsters);
                 // Run pre-battle for newly spawned monsters
                 let start = self.monsters.len() - 1;
                 // Pre-battle for spawned monsters happens after they're added
@@ -2269,53 +2456,204 @@ impl CombatState {
         roll
     }
 
+    /// Every outcome of roll_and_execute_monsters as (die faces, probability, state).
+    /// Faces that lead to the same state are grouped, so die-controlled monsters usually
+    /// give three outcomes. Each successor is exactly what roll_and_execute_monsters
+    /// produces when the die shows those faces, including the die's RNG having advanced;
+    /// later randomness (shuffles while drawing) still follows this state's RNG. A
+    /// locked die has a single face.
+    pub fn expand_monster_turn(&self) -> Vec<(Vec<u8>, f64, CombatState)> {
+        if self.combat_over {
+            return vec![((1..=6).collect(), 1.0, self.clone())];
+        }
+        let mut rolled = self.die.clone();
+        rolled.roll();
+        let faces: Vec<u8> = match self.die.locked_value {
+            Some(v) => vec![v],
+            None => (1..=6).collect(),
+        };
+        let p = 1.0 / faces.len() as f64;
+        let mut outcomes: Vec<(Vec<u8>, f64, CombatState)> = Vec::with_capacity(faces.len());
+        for face in faces {
+            let mut next = self.clone();
+            next.die.set_value(face);
+            next.roll_and_execute_monsters();
+            next.die.clone_from(&rolled);
+            let same = outcomes.iter_mut()
+                .find(|(_, _, s)| s.rng == next.rng && state_hash::canonical_eq(s, &next));
+            match same {
+                Some((group, prob, _)) => {
+                    group.push(face);
+                    *prob += p;
+                }
+                None => outcomes.push((vec![face], p, next)),
+            }
+        }
+        outcomes
+    }
+}
+
+// CombatState is handed to worker threads with the GIL released, so it must stay
+// Send + Sync (no Rc/RefCell state).
+const _: () = {
+    fn assert_thread_safe<T: Send + Sync>() {}
+    fn check() {
+        assert_thread_safe::<CombatState>();
+    }
+};
+
+#[pymethods]
+impl CombatState {
+    #[staticmethod]
+    #[pyo3(name = "new_with_character")]
+    #[pyo3(signature = (monsters, seed=None, character=None))]
+    pub fn py_new_with_character(monsters: Vec<Monster>, seed: Option<u64>, character: Option<Character>) -> Self {
+        Self::new_with_character(monsters, seed, character)
+    }
+
+    // The simulation entry points below release the GIL while they run, so
+    // independent combats can advance in parallel from Python threads.
+
+    /// Start combat: pre-battle setup, then start first player turn.
+    #[pyo3(name = "start_combat")]
+    fn py_start_combat(&mut self, py: Python<'_>) {
+        py.allow_threads(|| self.start_combat())
+    }
+
+    /// Start a new player turn: reset block (unless Barricade), gain energy, draw cards.
+    #[pyo3(name = "start_player_turn")]
+    fn py_start_player_turn(&mut self, py: Python<'_>) {
+        py.allow_threads(|| trace::scoped(self, |s| s.start_player_turn()))
+    }
+
+    /// Play a card from hand by hand index, targeting monster at target_index.
+    /// Optional choice param for cards with multiple modes (e.g. Iron Wave+ Spear=0/Shield=1).
+    /// Returns true if the card was successfully played.
+    #[pyo3(name = "play_card", signature = (hand_index, target_index=None, choice=None))]
+    fn py_play_card(&mut self, py: Python<'_>, hand_index: usize, target_index: Option<usize>, choice: Option<usize>) -> bool {
+        py.allow_threads(|| self.play_card(hand_index, target_index, choice))
+    }
+
+    /// Apply a script of steps in one call. Each step is a play_card tuple
+    /// (hand_index, target_index, choice), "end_turn" (end_player_turn) or "monsters"
+    /// (roll_and_execute_monsters). Returns (success per step, snapshots), where
+    /// snapshots is a copy of the state after each step if requested and None otherwise.
+    #[pyo3(signature = (steps, snapshots=false))]
+    pub fn apply_actions(&mut self, py: Python<'_>, steps: Vec<ScriptArg>, snapshots: bool) -> PyResult<(Vec<bool>, Option<Vec<CombatState>>)> {
+        let steps = steps.into_iter().map(ScriptStep::from_arg).collect::<PyResult<Vec<_>>>()?;
+        Ok(py.allow_threads(|| actions::apply_script(self, &steps, snapshots)))
+    }
+
+    /// End the player's turn: handle end-of-turn powers, ethereal cards, Burn/Decay, discard.
+    #[pyo3(name = "end_player_turn")]
+    fn py_end_player_turn(&mut self, py: Python<'_>) {
+        py.allow_threads(|| self.end_player_turn())
+    }
+
+    /// Roll the die and execute all monster turns.
+    /// Returns the die roll value.
+    #[pyo3(name = "roll_and_execute_monsters")]
+    fn py_roll_and_execute_monsters(&mut self, py: Python<'_>) -> u8 {
+        py.allow_threads(|| self.roll_and_execute_monsters())
+    }
+
+    /// Every outcome of drawing `count` cards with the draw pile's order treated as
+    /// unknown: a list of (cards drawn, probability, state after the draw), one entry per
+    /// distinct multiset of cards. Reshuffles the discard pile if the draw pile runs out.
+    #[pyo3(name = "enumerate_draws")]
+    fn py_enumerate_draws(&self, py: Python<'_>, count: usize) -> Vec<(Vec<CardInstance>, f64, CombatState)> {
+        py.allow_threads(|| draws::enumerate_draws(self, count))
+    }
+
+    /// Distinct positions reachable this turn by playing cards, before ending the turn:
+    /// a list of (plays, state) where plays is one sequence of play_card arguments
+    /// (hand_index, target, choice) reaching state. Orderings that reach the same
+    /// position are merged; at most `max_nodes` positions are explored.
+    #[pyo3(name = "enumerate_turn_outcomes")]
+    #[pyo3(signature = (max_nodes=10000))]
+    fn py_enumerate_turn_outcomes(&self, py: Python<'_>, max_nodes: usize) -> Vec<(Vec<turns::Play>, CombatState)> {
+        py.allow_threads(|| turns::enumerate_turn_outcomes(self, max_nodes))
+    }
+
+    /// Exact chance-node expansion of roll_and_execute_monsters: a list of
+    /// (faces, probability, state), one entry per distinct outcome of the die roll.
+    #[pyo3(name = "expand_monster_turn")]
+    fn py_expand_monster_turn(&self, py: Python<'_>) -> Vec<(Vec<u32>, f64, CombatState)> {
+        let outcomes = py.allow_threads(|| self.expand_monster_turn());
+        // Faces go out as a list of ints.
+        outcomes.into_iter()
+            .map(|(faces, p, state)| (faces.into_iter().map(u32::from).collect(), p, state))
+            .collect()
+    }
+
     /// Add a card to the deck and put it in hand.
     pub fn add_card_to_hand(&mut self, card: Card) {
         let idx = self.deck.len();
+        undo::deck(&self.deck);
+        undo::pile(&self.player, Pile::Hand);
         self.deck.push(CardInstance::new(card, false));
-        self.player.hand_indices.push(idx);
+        self.player.hand_indices.push(idx, &self.deck);
+        trace::card_move(&self.deck, idx, Pile::None, Pile::Hand);
     }
 
     /// Add an upgraded card to the deck and put it in hand.
     pub fn add_upgraded_card_to_hand(&mut self, card: Card) {
         let idx = self.deck.len();
+        undo::deck(&self.deck);
+        undo::pile(&self.player, Pile::Hand);
         self.deck.push(CardInstance::new(card, true));
-        self.player.hand_indices.push(idx);
+        self.player.hand_indices.push(idx, &self.deck);
+        trace::card_move(&self.deck, idx, Pile::None, Pile::Hand);
     }
 
     /// Add a card to the deck and put it in discard pile.
     pub fn add_card_to_discard(&mut self, card: Card) {
         let idx = self.deck.len();
+        undo::deck(&self.deck);
+        undo::pile(&self.player, Pile::Discard);
         self.deck.push(CardInstance::new(card, false));
-        self.player.discard_pile.push(idx);
+        self.player.discard_pile.push(idx, &self.deck);
+        trace::card_move(&self.deck, idx, Pile::None, Pile::Discard);
     }
 
     /// Add a card to the draw pile.
     pub fn add_card_to_draw(&mut self, card: Card) {
         let idx = self.deck.len();
+        undo::deck(&self.deck);
+        undo::pile(&self.player, Pile::Draw);
         self.deck.push(CardInstance::new(card, false));
-        self.player.draw_pile.push(idx);
+        self.player.draw_pile.push(idx, &self.deck);
+        trace::card_move(&self.deck, idx, Pile::None, Pile::Draw);
     }
 
     /// Add an upgraded card to the draw pile.
     pub fn add_upgraded_card_to_draw(&mut self, card: Card) {
         let idx = self.deck.len();
+        undo::deck(&self.deck);
+        undo::pile(&self.player, Pile::Draw);
         self.deck.push(CardInstance::new(card, true));
-        self.player.draw_pile.push(idx);
+        self.player.draw_pile.push(idx, &self.deck);
+        trace::card_move(&self.deck, idx, Pile::None, Pile::Draw);
     }
 
     /// Add an upgraded card to the discard pile.
     pub fn add_upgraded_card_to_discard(&mut self, card: Card) {
         let idx = self.deck.len();
+        undo::deck(&self.deck);
+        undo::pile(&self.player, Pile::Discard);
         self.deck.push(CardInstance::new(card, true));
-        self.player.discard_pile.push(idx);
+        self.player.discard_pile.push(idx, &self.deck);
+        trace::card_move(&self.deck, idx, Pile::None, Pile::Discard);
     }
 
     /// Add a card to the exhaust pile.
     pub fn add_card_to_exhaust(&mut self, card: Card) {
         let idx = self.deck.len();
+        undo::deck(&self.deck);
+        undo::pile(&self.player, Pile::Exhaust);
         self.deck.push(CardInstance::new(card, false));
-        self.player.exhaust_pile.push(idx);
+        self.player.exhaust_pile.push(idx, &self.deck);
+        trace::card_move(&self.deck, idx, Pile::None, Pile::Exhaust);
     }
 
     /// Deal damage to the player (for testing Blood for Blood, etc.)
@@ -2331,7 +2669,15 @@ impl CombatState {
         if deck_index >= self.deck.len() {
             return false;
         }
-        self.deck[deck_index].upgrade()
+        let upgraded = self.deck[deck_index].upgrade();
+        // The card's value changed under whichever pile holds it.
+        let p = &mut self.player;
+        for pile in [&mut p.draw_pile, &mut p.discard_pile, &mut p.exhaust_pile, &mut p.hand_indices] {
+            if pile.contains(&deck_index) {
+                pile.rehash(&self.deck);
+            }
+        }
+        upgraded
     }
 
     /// Get a list of monsters (for Python access).
@@ -2376,40 +2722,11 @@ impl CombatState {
 
     /// Get available actions: list of (hand_index, card_instance, needs_target) tuples.
     pub fn get_available_actions(&self) -> Vec<(usize, CardInstance, bool)> {
-        let mut actions = Vec::new();
-        let corruption = self.player.get_power(PowerType::Corruption) > 0;
-        let entangled = self.player.get_power(PowerType::Entangled) > 0;
-        let miracles = self.player.get_power(PowerType::MiracleCount);
-        let total_energy = self.player.energy + miracles;
-        for (hand_idx, &deck_idx) in self.player.hand_indices.iter().enumerate() {
-            let ci = self.deck[deck_idx];
-            if ci.card.unplayable() {
-                continue;
-            }
-            let is_attack = ci.card.card_type() == CardType::Attack;
-            let is_skill = ci.card.card_type() == CardType::Skill;
-
-            if entangled && is_attack {
-                continue;
-            }
-
-            let free_play = self.player.free_play_for.as_ref()
-                .map_or(false, |types| types.contains(&ci.card.card_type()));
-            let mut effective_cost = if corruption && is_skill { 0 } else if free_play { 0 } else { ci.cost() };
-            if ci.card == Card::BloodForBlood && self.player_damaged_this_combat {
-                effective_cost = ci.base_magic();
-            }
-            if ci.card == Card::MasterfulStab {
-                effective_cost = if self.player_damaged_this_combat { ci.base_magic() } else { 0 };
-            }
-            if self.cards_cost_zero_this_turn {
-                effective_cost = 0;
-            }
-            if effective_cost <= total_energy {
-                actions.push((hand_idx, ci, ci.card.has_target()));
-            }
-        }
-        actions
+        self.player.hand_indices.iter().enumerate()
+            .map(|(hand_idx, &deck_idx)| (hand_idx, self.deck[deck_idx]))
+            .filter(|&(_, ci)| self.can_play(ci))
+            .map(|(hand_idx, ci)| (hand_idx, ci, ci.card.has_target()))
+            .collect()
     }
 
     /// Get valid target indices (alive monsters).
@@ -2421,8 +2738,179 @@ impl CombatState {
     }
 
     /// Deep clone for MCTS search.
-    pub fn deep_clone(&self) -> CombatState {
-        self.clone()
+    pub fn deep_clone(&self, py: Python<'_>) -> CombatState {
+        py.allow_threads(|| self.clone())
+    }
+
+    /// Bytes a copy of this state occupies: the struct itself plus the buffers it owns
+    /// (piles, deck, monsters, relics, orbs). Monster name and id strings are shared
+    /// between copies and not counted, nor are the undo log and trace, which copies don't
+    /// carry. Allocator overhead is not included.
+    pub fn footprint_bytes(&self) -> usize {
+        fn buf<T>(v: &Vec<T>) -> usize {
+            v.capacity() * std::mem::size_of::<T>()
+        }
+        fn pile(v: &CardPile) -> usize {
+            v.capacity() * std::mem::size_of::<usize>()
+        }
+        let p = &self.player;
+        std::mem::size_of::<CombatState>()
+            + p.name.capacity()
+            + pile(&p.draw_pile) + pile(&p.discard_pile) + pile(&p.exhaust_pile) + pile(&p.hand_indices)
+            + buf(&p.relics) + buf(&p.orbs)
+            + buf(&self.monsters) + buf(&self.deck) + buf(&self.cards_played_this_turn)
+    }
+
+    /// Replace the shuffle RNG and the die's RNG with `stream` of `seed`, using the same
+    /// seed layout as construction. Stream 0 matches a state created with `seed`.
+    #[pyo3(signature = (seed, stream=0))]
+    pub fn reseed(&mut self, seed: u64, stream: u64) {
+        self.rng = rng::stream_rng(seed.wrapping_add(1), stream);
+        self.die.reseed(seed, stream);
+    }
+
+    /// Independent copy whose shuffle RNG and die are forked onto child stream
+    /// `stream_id`. The child depends only on this state and `stream_id`, so fork(i) is
+    /// reproducible wherever it runs; this state is unchanged.
+    pub fn fork(&self, stream_id: u64) -> CombatState {
+        let mut child = self.clone();
+        child.rng = rng::fork(&self.rng, stream_id);
+        child.die = self.die.fork(stream_id);
+        child
+    }
+
+    /// Copy this state into `other`, reusing `other`'s buffers instead of allocating.
+    pub fn clone_into(slf: &Bound<'_, Self>, other: &Bound<'_, Self>) {
+        if slf.is(other) {
+            return;
+        }
+        let source = slf.borrow();
+        let mut target = other.borrow_mut();
+        let (source, target) = (&*source, &mut *target);
+        slf.py().allow_threads(|| target.clone_from(source));
+    }
+
+    /// Play `n` independent rollouts of this state natively and return their results.
+    /// Each clone is reseeded from `seed` and the rollout index; this state is unchanged.
+    /// `policy` is one of "random", "greedy_damage", "block_when_threatened" or
+    /// "powers_first".
+    #[pyo3(signature = (n, policy="random", max_turns=50, seed=None))]
+    pub fn rollout_batch(&self, py: Python<'_>, n: usize, policy: &str, max_turns: i32, seed: Option<u64>) -> PyResult<RolloutResults> {
+        let policy = Policy::from_name(policy)?;
+        Ok(py.allow_threads(|| rollout::rollout_batch(self, n, policy, max_turns, seed.unwrap_or(0))))
+    }
+
+    /// Length of the mask written by action_mask.
+    #[staticmethod]
+    pub fn action_size() -> usize {
+        NUM_ACTIONS
+    }
+
+    /// Legal-action mask over the flat action space (hand slot x target x choice, then
+    /// end turn). Uses the same playability checks as get_available_actions. If `out` is
+    /// given it must be a writable, C-contiguous uint8 buffer of length action_size(); it
+    /// is filled in place and None is returned. Otherwise a list of bools is returned.
+    #[pyo3(signature = (out=None))]
+    pub fn action_mask(&self, py: Python<'_>, out: Option<&Bound<'_, PyAny>>) -> PyResult<Option<Vec<bool>>> {
+        let Some(out) = out else {
+            let mut mask = [0u8; NUM_ACTIONS];
+            actions::write_action_mask(self, &mut mask);
+            return Ok(Some(mask.iter().map(|&m| m != 0).collect()));
+        };
+        let buffer = PyBuffer::<u8>::get(out)?;
+        if buffer.item_count() != NUM_ACTIONS {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                format!("Action mask buffer must hold {} values, got {}", NUM_ACTIONS, buffer.item_count()),
+            ));
+        }
+        let cells = buffer.as_mut_slice(py).ok_or_else(|| {
+            PyErr::new::<pyo3::exceptions::PyValueError, _>("Action mask buffer must be writable and C-contiguous")
+        })?;
+        actions::write_action_mask_cells(self, cells);
+        buffer.release(py);
+        Ok(None)
+    }
+
+    /// Translate a flat action index into play_card arguments
+    /// (hand_index, target_index, choice) for this state, or None for end turn.
+    pub fn decode_action(&self, index: usize) -> PyResult<Option<(usize, Option<usize>, Option<usize>)>> {
+        let action = Action::from_index(index).ok_or_else(|| {
+            PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Invalid action: {}", index))
+        })?;
+        Ok(action.play_args(self))
+    }
+
+    /// Apply a flat action index (see action_mask) and return an undo token. Illegal
+    /// card plays leave the state unchanged but still return a token.
+    pub fn apply(&mut self, py: Python<'_>, action: usize) -> PyResult<usize> {
+        let action = Action::from_index(action).ok_or_else(|| {
+            PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Invalid action: {}", action))
+        })?;
+        Ok(py.allow_threads(|| undo::apply(self, action)))
+    }
+
+    /// Restore the exact state from before the apply call that returned `token`,
+    /// including RNG and die. Tokens from later apply calls become invalid.
+    pub fn undo(&mut self, token: usize) -> PyResult<()> {
+        if undo::undo(self, token) {
+            Ok(())
+        } else {
+            Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                format!("Invalid undo token: {} (journal depth {})", token, self.undo_log.depth()),
+            ))
+        }
+    }
+
+    /// Bytes of prior values held by the apply/undo journal, for comparison with
+    /// footprint_bytes.
+    pub fn journal_bytes(&self) -> usize {
+        self.undo_log.bytes()
+    }
+
+    /// Zobrist-style hash of the position. Hand, discard and exhaust order and deck
+    /// indices don't affect it; the shuffle RNG and the die are not included.
+    pub fn state_hash(&self) -> u64 {
+        state_hash::state_hash(self)
+    }
+
+    fn __hash__(&self) -> u64 {
+        state_hash::state_hash(self)
+    }
+
+    /// Positions are equal if they match in canonical form (see state_hash).
+    fn __eq__(&self, other: &CombatState) -> bool {
+        state_hash::canonical_eq(self, other)
+    }
+
+    /// Length of the vector written by encode_observation.
+    #[staticmethod]
+    pub fn observation_size() -> usize {
+        OBSERVATION_SIZE
+    }
+
+    /// Encode this state as a fixed-layout float32 feature vector. If `out` is given it must
+    /// be a writable, C-contiguous float32 buffer (e.g. a numpy array) of length
+    /// observation_size(); it is filled in place and None is returned. Otherwise a new
+    /// list is returned.
+    #[pyo3(signature = (out=None))]
+    pub fn encode_observation(&self, py: Python<'_>, out: Option<&Bound<'_, PyAny>>) -> PyResult<Option<Vec<f32>>> {
+        let Some(out) = out else {
+            let mut obs = vec![0.0; OBSERVATION_SIZE];
+            observation::encode(self, &mut obs);
+            return Ok(Some(obs));
+        };
+        let buffer = PyBuffer::<f32>::get(out)?;
+        if buffer.item_count() != OBSERVATION_SIZE {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                format!("Observation buffer must hold {} values, got {}", OBSERVATION_SIZE, buffer.item_count()),
+            ));
+        }
+        let cells = buffer.as_mut_slice(py).ok_or_else(|| {
+            PyErr::new::<pyo3::exceptions::PyValueError, _>("Observation buffer must be writable and C-contiguous")
+        })?;
+        observation::encode_cells(self, cells);
+        buffer.release(py);
+        Ok(None)
     }
 
     /// Apply a power to the player (for testing and scripting).
@@ -2535,10 +3023,107 @@ impl CombatState {
     pub fn get_miracles(&self) -> i32 {
         self.player.get_power(PowerType::MiracleCount)
     }
+
+    /// Compact, versioned binary encoding of the full combat state, RNG included. Inverse of from_bytes.
+    pub fn to_bytes<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+        serialize::to_pybytes(py, self)
+    }
+
+    /// Decode to_bytes output. Raises ValueError on malformed or incompatible data.
+    #[staticmethod]
+    pub fn from_bytes(data: &[u8]) -> PyResult<Self> {
+        serialize::from_bytes(data)
+    }
+
+    pub fn __getstate__<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+        serialize::to_pybytes(py, self)
+    }
+
+    pub fn __setstate__(&mut self, state: &[u8]) -> PyResult<()> {
+        *self = serialize::from_bytes(state)?;
+        Ok(())
+    }
+
+    pub fn __reduce__<'py>(slf: &Bound<'py, Self>) -> PyResult<serialize::Reduced<'py>> {
+        serialize::reduce(slf)
+    }
+
+    /// Start recording events (damage, block, powers, card moves, orbs, stances and die
+    /// rolls) into a ring buffer keeping the last `capacity`. Replaces any existing trace.
+    /// Copies of the state are not traced.
+    #[pyo3(signature = (capacity=4096))]
+    pub fn enable_trace(&mut self, capacity: usize) -> PyResult<()> {
+        if capacity == 0 {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>("trace capacity must be positive"));
+        }
+        self.trace = Some(Box::new(Trace::new(capacity)));
+        Ok(())
+    }
+
+    /// Stop recording and drop the recorded events.
+    pub fn disable_trace(&mut self) {
+        self.trace = None;
+    }
+
+    /// Drop the recorded events, keeping the trace enabled.
+    pub fn clear_trace(&mut self) {
+        if let Some(t) = self.trace.as_mut() {
+            t.clear();
+        }
+    }
+
+    #[getter]
+    pub fn trace_enabled(&self) -> bool {
+        self.trace.is_some()
+    }
+
+    /// Number of events overwritten because the ring buffer was full.
+    #[getter]
+    pub fn trace_dropped(&self) -> u64 {
+        self.trace.as_ref().map_or(0, |t| t.dropped())
+    }
+
+    /// Recorded events, oldest first, as packed little-endian records laid out as
+    /// trace_dtype(), e.g. np.frombuffer(data, dtype=np.dtype(CombatState.trace_dtype())).
+    pub fn trace_events<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+        let data = self.trace.as_ref().map(|t| t.to_bytes()).unwrap_or_default();
+        PyBytes::new(py, &data)
+    }
+
+    /// (field name, NumPy type string) pairs describing one trace_events record.
+    #[staticmethod]
+    pub fn trace_dtype() -> Vec<(&'static str, &'static str)> {
+        trace::EVENT_DTYPE.to_vec()
+    }
+
+    /// Names of the trace event kinds, indexed by a record's `kind`.
+    #[staticmethod]
+    pub fn trace_kinds() -> Vec<&'static str> {
+        trace::EVENT_KINDS.to_vec()
+    }
+
+    /// Names of the card piles, indexed by a card_move record's `src` and `dst`.
+    #[staticmethod]
+    pub fn trace_piles() -> Vec<&'static str> {
+        trace::PILES.to_vec()
+    }
 }
 
 impl CombatState {
-    fn draw_cards(&mut self, count: i32) {
+    /// Monster `i` for changing; records its prior value if an action is being journaled.
+    pub(crate) fn monster_mut(&mut self, i: usize) -> &mut Monster {
+        undo::monster(&self.monsters, i);
+        &mut self.monsters[i]
+    }
+
+    /// Every monster for changing; see monster_mut.
+    pub(crate) fn monsters_mut(&mut self) -> &mut [Monster] {
+        undo::monsters(&self.monsters);
+        &mut self.monsters
+    }
+
+    pub(crate) fn draw_cards(&mut self, count: i32) {
+        let _perf = perf::draw();
         // NoDraw: can't draw cards
         if self.player.get_power(PowerType::NoDraw) > 0 {
             return;
@@ -2552,7 +3137,8 @@ impl CombatState {
                 }
                 self.reshuffle_draw_pile();
             }
-            if let Some(deck_idx) = self.player.draw_pile.pop() {
+            undo::pile(&self.player, Pile::Draw);
+            if let Some(deck_idx) = self.player.draw_pile.pop(&self.deck) {
                 let card_inst = self.deck[deck_idx];
 
                 // Void: when drawn, lose 1 energy
@@ -2568,7 +3154,7 @@ impl CombatState {
                 if is_status || is_curse {
                     let fire_breathing = self.player.get_power(PowerType::FireBreathing);
                     if fire_breathing > 0 {
-                        for m in &mut self.monsters {
+                        for m in self.monsters_mut() {
                             if !m.is_dead() {
                                 apply_damage_to_monster(m, fire_breathing);
                             }
@@ -2576,7 +3162,9 @@ impl CombatState {
                     }
                 }
 
-                self.player.hand_indices.push(deck_idx);
+                undo::pile(&self.player, Pile::Hand);
+                self.player.hand_indices.push(deck_idx, &self.deck);
+                trace::card_move(&self.deck, deck_idx, Pile::Draw, Pile::Hand);
 
                 // Evolve: draw extra card on Status draw
                 if is_status {
@@ -2592,6 +3180,7 @@ impl CombatState {
 
     /// Draw cards without triggering on-draw power hooks (to prevent infinite loops).
     fn draw_cards_no_trigger(&mut self, count: i32) {
+        let _perf = perf::draw();
         for _ in 0..count {
             if self.player.draw_pile.is_empty() {
                 if self.player.discard_pile.is_empty() {
@@ -2599,29 +3188,40 @@ impl CombatState {
                 }
                 self.reshuffle_draw_pile();
             }
-            if let Some(deck_idx) = self.player.draw_pile.pop() {
+            undo::pile(&self.player, Pile::Draw);
+            if let Some(deck_idx) = self.player.draw_pile.pop(&self.deck) {
                 let card_inst = self.deck[deck_idx];
                 if card_inst.card == Card::VoidCard {
                     self.player.energy = (self.player.energy - 1).max(0);
                 }
-                self.player.hand_indices.push(deck_idx);
+                undo::pile(&self.player, Pile::Hand);
+                self.player.hand_indices.push(deck_idx, &self.deck);
+                trace::card_move(&self.deck, deck_idx, Pile::Draw, Pile::Hand);
             }
         }
     }
 
     fn shuffle_draw_pile(&mut self) {
-        self.player.draw_pile.shuffle(&mut self.rng);
+        undo::pile(&self.player, Pile::Draw);
+        undo::rng(&self.rng);
+        self.player.draw_pile.shuffle(&mut self.rng, &self.deck);
     }
 
-    fn reshuffle_draw_pile(&mut self) {
-        self.player.draw_pile.append(&mut self.player.discard_pile);
+    pub(crate) fn reshuffle_draw_pile(&mut self) {
+        let _perf = perf::reshuffle();
+        for &idx in &self.player.discard_pile {
+            trace::card_move(&self.deck, idx, Pile::Discard, Pile::Draw);
+        }
+        undo::pile(&self.player, Pile::Draw);
+        undo::pile(&self.player, Pile::Discard);
+        self.player.draw_pile.extend(self.player.discard_pile.drain(), &self.deck);
         self.shuffle_draw_pile();
         // Relic: Red Skull — +1 Str on shuffle
         relics::on_shuffle(&mut self.player);
         // A Thousand Cuts: deal damage to all enemies on shuffle
         let atc = self.player.get_power(PowerType::AThousandCuts);
         if atc > 0 {
-            for m in &mut self.monsters {
+            for m in self.monsters_mut() {
                 if !m.is_dead() {
                     apply_damage_to_monster(m, atc);
                 }
@@ -2639,13 +3239,16 @@ impl CombatState {
                 non_innate.push(idx);
             }
         }
-        self.player.draw_pile = non_innate;
-        self.player.draw_pile.extend(innate);
+        undo::pile(&self.player, Pile::Draw);
+        self.player.draw_pile.set(non_innate, &self.deck);
+        self.player.draw_pile.extend(innate, &self.deck);
     }
 
-    /// Called when a card is exhausted.
-    fn on_exhaust_card(&mut self, deck_index: usize) {
-        self.player.exhaust_pile.push(deck_index);
+    /// Called when a card is exhausted; `from` is the pile it was taken from.
+    fn on_exhaust_card(&mut self, deck_index: usize, from: Pile) {
+        undo::pile(&self.player, Pile::Exhaust);
+        self.player.exhaust_pile.push(deck_index, &self.deck);
+        trace::card_move(&self.deck, deck_index, from, Pile::Exhaust);
 
         // Sentinel: gain energy when exhausted
         let card = self.deck[deck_index];
@@ -2687,7 +3290,7 @@ impl CombatState {
             let jugg = self.player.get_power(PowerType::Juggernaut);
             if jugg > 0 {
                 // Deal damage to first alive monster (deterministic for simulation)
-                for m in &mut self.monsters {
+                for m in self.monsters_mut() {
                     if !m.is_dead() {
                         apply_damage_to_monster(m, jugg);
                         break;
@@ -2704,11 +3307,11 @@ impl CombatState {
             return 0;
         }
         let damage = calculate_player_damage(&self.player, &self.monsters[target_index], base_damage);
-        let hp_damage = apply_damage_to_monster(&mut self.monsters[target_index], damage);
+        let hp_damage = apply_damage_to_monster(self.monster_mut(target_index), damage);
         // Envenom: apply poison on any attack hit
         let envenom = self.player.get_power(PowerType::Envenom);
         if envenom > 0 && !self.monsters[target_index].is_dead() {
-            self.monsters[target_index].apply_power(PowerType::Poison, envenom);
+            self.monster_mut(target_index).apply_power(PowerType::Poison, envenom);
         }
         hp_damage
     }
@@ -2729,16 +3332,20 @@ impl CombatState {
     /// Exhaust a random card from hand.
     fn exhaust_random_from_hand(&mut self) {
         if !self.player.hand_indices.is_empty() {
-            let idx = self.player.hand_indices.remove(0);
-            self.on_exhaust_card(idx);
+            undo::pile(&self.player, Pile::Hand);
+            let idx = self.player.hand_indices.remove(0, &self.deck);
+            self.on_exhaust_card(idx, Pile::Hand);
         }
     }
 
     /// Discard a random card from hand.
     fn discard_random_from_hand(&mut self) {
         if !self.player.hand_indices.is_empty() {
-            let idx = self.player.hand_indices.remove(0);
-            self.player.discard_pile.push(idx);
+            undo::pile(&self.player, Pile::Hand);
+            undo::pile(&self.player, Pile::Discard);
+            let idx = self.player.hand_indices.remove(0, &self.deck);
+            self.player.discard_pile.push(idx, &self.deck);
+            trace::card_move(&self.deck, idx, Pile::Hand, Pile::Discard);
         }
     }
 
@@ -2749,13 +3356,16 @@ impl CombatState {
         if self.player.hand_indices.is_empty() {
             return false;
         }
+        undo::pile(&self.player, Pile::Hand);
+        undo::pile(&self.player, Pile::Discard);
         let idx = match hand_index {
             Some(hi) if hi < self.player.hand_indices.len() => {
-                self.player.hand_indices.remove(hi)
+                self.player.hand_indices.remove(hi, &self.deck)
             }
-            _ => self.player.hand_indices.pop().unwrap(),
+            _ => self.player.hand_indices.pop(&self.deck).unwrap(),
         };
-        self.player.discard_pile.push(idx);
+        self.player.discard_pile.push(idx, &self.deck);
+        trace::card_move(&self.deck, idx, Pile::Hand, Pile::Discard);
         self.discarded_this_turn = true;
 
         let card = self.deck[idx];
@@ -2770,8 +3380,11 @@ impl CombatState {
             self.player.energy += energy_gain;
             // Move from discard to exhaust
             if let Some(pos) = self.player.discard_pile.iter().position(|&i| i == idx) {
-                self.player.discard_pile.remove(pos);
-                self.player.exhaust_pile.push(idx);
+                undo::pile(&self.player, Pile::Discard);
+                undo::pile(&self.player, Pile::Exhaust);
+                self.player.discard_pile.remove(pos, &self.deck);
+                self.player.exhaust_pile.push(idx, &self.deck);
+                trace::card_move(&self.deck, idx, Pile::Discard, Pile::Exhaust);
             }
         }
 
@@ -2789,8 +3402,10 @@ impl CombatState {
 
     /// Change the player's stance. Handles exit/enter triggers.
     fn change_stance(&mut self, new_stance: Stance) {
+        let old_stance = self.player.stance;
         let (energy_gained, changed) = self.player.enter_stance(new_stance);
         if changed {
+            trace::stance(old_stance, new_stance);
             self.stance_changed_this_turn = true;
             self.player.energy += energy_gained;
 
@@ -2829,8 +3444,11 @@ impl CombatState {
         }
         // Remove from draw pile in reverse order to preserve indices
         for &i in to_discard.iter().rev() {
-            let deck_idx = self.player.draw_pile.remove(i);
-            self.player.discard_pile.push(deck_idx);
+            undo::pile(&self.player, Pile::Draw);
+            undo::pile(&self.player, Pile::Discard);
+            let deck_idx = self.player.draw_pile.remove(i, &self.deck);
+            self.player.discard_pile.push(deck_idx, &self.deck);
+            trace::card_move(&self.deck, deck_idx, Pile::Draw, Pile::Discard);
         }
 
         // Nirvana: gain block per scry
@@ -2847,6 +3465,7 @@ impl CombatState {
             // Process the auto-evoked orb
             self.process_evoke(evoked);
         }
+        trace::orb(EventKind::OrbChannel, orb);
     }
 
     /// Evoke the orb at the given index and process its effect.
@@ -2858,6 +3477,7 @@ impl CombatState {
 
     /// Process the evoke effect of an orb.
     fn process_evoke(&mut self, orb: OrbType) {
+        trace::orb(EventKind::OrbEvoke, orb);
         let evoke_bonus = self.player.get_power(PowerType::OrbEvoke);
         match orb {
             OrbType::Lightning => {
@@ -2868,14 +3488,14 @@ impl CombatState {
                     // Hit all enemies
                     for i in 0..self.monsters.len() {
                         if !self.monsters[i].is_dead() {
-                            apply_damage_to_monster(&mut self.monsters[i], dmg);
+                            apply_damage_to_monster(self.monster_mut(i), dmg);
                         }
                     }
                 } else {
                     // Hit random alive enemy (first alive for determinism)
                     for i in 0..self.monsters.len() {
                         if !self.monsters[i].is_dead() {
-                            apply_damage_to_monster(&mut self.monsters[i], dmg);
+                            apply_damage_to_monster(self.monster_mut(i), dmg);
                             break;
                         }
                     }
@@ -2892,7 +3512,7 @@ impl CombatState {
                 let dmg = (3 + evoke_bonus + amplify).max(0);
                 for i in 0..self.monsters.len() {
                     if !self.monsters[i].is_dead() {
-                        apply_damage_to_monster(&mut self.monsters[i], dmg);
+                        apply_damage_to_monster(self.monster_mut(i), dmg);
                     }
                 }
             }
@@ -2916,13 +3536,13 @@ impl CombatState {
                         if electro {
                             for i in 0..self.monsters.len() {
                                 if !self.monsters[i].is_dead() {
-                                    apply_damage_to_monster(&mut self.monsters[i], dmg);
+                                    apply_damage_to_monster(self.monster_mut(i), dmg);
                                 }
                             }
                         } else {
                             for i in 0..self.monsters.len() {
                                 if !self.monsters[i].is_dead() {
-                                    apply_damage_to_monster(&mut self.monsters[i], dmg);
+                                    apply_damage_to_monster(self.monster_mut(i), dmg);
                                     break;
                                 }
                             }
@@ -1,10 +1,19 @@
 use pyo3::prelude::*;
+use pyo3::types::PyBytes;
 use std::collections::HashMap;
+use std::sync::Arc;
 
 use crate::enums::{CardType, Character, Intent, OrbType, PowerType, Relic, Stance};
-
-#[pyclass]
-#[derive(Clone, Debug)]
+use crate::die::TheDie;
+use crate::enemies::MonsterKind;
+use crate::piles::CardPile;
+use crate::powers::Powers;
+use crate::serialize;
+use crate::trace::{self, Who};
+use crate::undo;
+
+#[pyclass(module = "sts_sim")]
+#[derive(Debug)]
 pub struct Player {
     #[pyo3(get, set)]
     pub name: String,
@@ -24,11 +33,11 @@ pub struct Player {
     pub draw_amount: i32,
     #[pyo3(get, set)]
     pub gold: i32,
-    pub powers: HashMap<PowerType, i32>,
-    pub draw_pile: Vec<usize>,    // indices into deck
-    pub discard_pile: Vec<usize>, // indices into deck
-    pub exhaust_pile: Vec<usize>, // indices into deck
-    pub hand_indices: Vec<usize>, // indices into deck
+    pub powers: Powers,
+    pub draw_pile: CardPile,    // indices into deck
+    pub discard_pile: CardPile, // indices into deck
+    pub exhaust_pile: CardPile, // indices into deck
+    pub hand_indices: CardPile, // indices into deck
     pub relics: Vec<Relic>,
     // Defect orb system
 
@@ -38,8 +47,58 @@ pub struct Player {
     pub orb_slots: i32,
     // Watcher stance system
     pub stance: Stance,
-    // Free play: next card of matching type costs 0 energy
-    pub free_play_for: Option<Vec<CardType>>,
+    // Free play: next card of matching type costs 0 energy (bitmask over CardType)
+    pub free_play_for: u8,
+}
+
+// Field-wise clone_from reuses the target's pile and string buffers, so cloning into an
+// existing state (CombatState::clone_into) doesn't allocate.
+impl Clone for Player {
+    fn clone(&self) -> Self {
+        Player {
+            name: self.name.clone(),
+            hp: self.hp,
+            max_hp: self.max_hp,
+            block: self.block,
+            block_cap: self.block_cap,
+            energy: self.energy,
+            max_energy: self.max_energy,
+            draw_amount: self.draw_amount,
+            gold: self.gold,
+            powers: self.powers,
+            draw_pile: self.draw_pile.clone(),
+            discard_pile: self.discard_pile.clone(),
+            exhaust_pile: self.exhaust_pile.clone(),
+            hand_indices: self.hand_indices.clone(),
+            relics: self.relics.clone(),
+            orbs: self.orbs.clone(),
+            orb_slots: self.orb_slots,
+            stance: self.stance,
+            free_play_for: self.free_play_for,
+        }
+    }
+
+    fn clone_from(&mut self, source: &Self) {
+        self.name.clone_from(&source.name);
+        self.hp = source.hp;
+        self.max_hp = source.max_hp;
+        self.block = source.block;
+        self.block_cap = source.block_cap;
+        self.energy = source.energy;
+        self.max_energy = source.max_energy;
+        self.draw_amount = source.draw_amount;
+        self.gold = source.gold;
+        self.powers = source.powers;
+        self.draw_pile.clone_from(&source.draw_pile);
+        self.discard_pile.clone_from(&source.discard_pile);
+        self.exhaust_pile.clone_from(&source.exhaust_pile);
+        self.hand_indices.clone_from(&source.hand_indices);
+        self.relics.clone_from(&source.relics);
+        self.orbs.clone_from(&source.orbs);
+        self.orb_slots = source.orb_slots;
+        self.stance = source.stance;
+        self.free_play_for = source.free_play_for;
+    }
 }
 
 #[pymethods]
@@ -64,16 +123,16 @@ impl Player {
             max_energy: 3,
             draw_amount: 5,
             gold: 0,
-            powers: HashMap::new(),
-            draw_pile: Vec::new(),
-            discard_pile: Vec::new(),
-            exhaust_pile: Vec::new(),
-            hand_indices: Vec::new(),
+            powers: Powers::new(),
+            draw_pile: CardPile::new(true),
+            discard_pile: CardPile::new(false),
+            exhaust_pile: CardPile::new(false),
+            hand_indices: CardPile::new(false),
             relics,
             orbs: Vec::new(),
             orb_slots: if ch == Character::Defect { 3 } else { 0 },
             stance: Stance::Neutral,
-            free_play_for: None,
+            free_play_for: 0,
         }
     }
 
@@ -82,33 +141,33 @@ impl Player {
     }
 
     pub fn get_power(&self, power: PowerType) -> i32 {
-        *self.powers.get(&power).unwrap_or(&0)
+        self.powers.get(power)
     }
 
     pub fn get_powers_dict(&self) -> HashMap<String, i32> {
-        self.powers.iter().map(|(k, v)| (format!("{:?}", k), *v)).collect()
+        self.powers.iter().map(|(k, v)| (format!("{:?}", k), v)).collect()
     }
 
     pub fn get_hand_indices(&self) -> Vec<usize> {
-        self.hand_indices.clone()
+        self.hand_indices.to_vec()
     }
 
     pub fn get_draw_pile(&self) -> Vec<usize> {
-        self.draw_pile.clone()
+        self.draw_pile.to_vec()
     }
 
     pub fn get_discard_pile(&self) -> Vec<usize> {
-        self.discard_pile.clone()
+        self.discard_pile.to_vec()
     }
 
     pub fn get_exhaust_pile(&self) -> Vec<usize> {
-        self.exhaust_pile.clone()
+        self.exhaust_pile.to_vec()
     }
 
     pub fn apply_power(&mut self, power: PowerType, amount: i32) {
         // Artifact blocks debuffs
         if amount > 0 && is_debuff(power) {
-            let artifact = self.powers.get(&PowerType::Artifact).copied().unwrap_or(0);
+            let artifact = self.powers.get(PowerType::Artifact);
             if artifact > 0 {
                 self.reduce_power(PowerType::Artifact, 1);
                 return;
@@ -116,18 +175,24 @@ impl Player {
         }
 
         let cap = power_cap(power);
-        let current = self.powers.entry(power).or_insert(0);
-        *current = (*current + amount).min(cap);
-        if *current <= 0 && !can_be_negative(power) {
-            self.powers.remove(&power);
+        let current = (self.powers.get(power) + amount).min(cap);
+        undo::power(self, power);
+        if current <= 0 && !can_be_negative(power) {
+            self.powers.remove(power);
+        } else {
+            self.powers.set(power, current);
         }
+        trace::power(Who::Player, power, amount);
     }
 
     pub fn reduce_power(&mut self, power: PowerType, amount: i32) {
-        if let Some(current) = self.powers.get_mut(&power) {
-            *current -= amount;
-            if *current <= 0 && !can_be_negative(power) {
-                self.powers.remove(&power);
+        if self.powers.contains(power) {
+            let current = self.powers.get(power) - amount;
+            undo::power(self, power);
+            if current <= 0 && !can_be_negative(power) {
+                self.powers.remove(power);
+            } else {
+                self.powers.set(power, current);
             }
         }
     }
@@ -151,11 +216,46 @@ impl Player {
     pub fn get_miracles(&self) -> i32 {
         self.get_power(PowerType::MiracleCount)
     }
+
+    /// Compact, versioned binary encoding of this player. Inverse of from_bytes.
+    pub fn to_bytes<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+        serialize::to_pybytes(py, self)
+    }
+
+    /// Decode to_bytes output. Raises ValueError on malformed or incompatible data.
+    #[staticmethod]
+    pub fn from_bytes(data: &[u8]) -> PyResult<Self> {
+        serialize::from_bytes(data)
+    }
+
+    pub fn __getstate__<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+        serialize::to_pybytes(py, self)
+    }
+
+    pub fn __setstate__(&mut self, state: &[u8]) -> PyResult<()> {
+        *self = serialize::from_bytes(state)?;
+        Ok(())
+    }
+
+    pub fn __reduce__<'py>(slf: &Bound<'py, Self>) -> PyResult<serialize::Reduced<'py>> {
+        serialize::reduce(slf)
+    }
 }
 
 impl Player {
+    /// Make the next card of `card_type` cost 0, replacing any pending free play.
+    pub fn set_free_play(&mut self, card_type: CardType) {
+        self.free_play_for = 1 << card_type as u8;
+    }
+
+    pub fn has_free_play(&self, card_type: CardType) -> bool {
+        self.free_play_for & (1 << card_type as u8) != 0
+    }
+
     pub fn add_block(&mut self, amount: i32) {
+        let before = self.block;
         self.block = (self.block + amount).min(self.block_cap);
+        trace::block(Who::Player, self.block - before);
     }
 
     pub fn is_dead(&self) -> bool {
@@ -171,6 +271,7 @@ impl Player {
         if self.orb_slots <= 0 {
             return None;
         }
+        undo::orbs(self);
         let mut evoked = None;
         if self.orbs.len() >= self.orb_slots as usize {
             // Auto-evoke first orb (index 0) when at capacity
@@ -183,6 +284,7 @@ impl Player {
     /// Remove and return orb at given index. Returns None if index invalid.
     pub fn remove_orb(&mut self, index: usize) -> Option<OrbType> {
         if index < self.orbs.len() {
+            undo::orbs(self);
             Some(self.orbs.remove(index))
         } else {
             None
@@ -191,6 +293,7 @@ impl Player {
 
     /// Remove all orbs and return them.
     pub fn remove_all_orbs(&mut self) -> Vec<OrbType> {
+        undo::orbs(self);
         std::mem::take(&mut self.orbs)
     }
 
@@ -210,21 +313,23 @@ impl Player {
     }
 }
 
-#[pyclass]
-#[derive(Clone, Debug)]
+#[pyclass(module = "sts_sim")]
+#[derive(Debug, PartialEq)]
 pub struct Monster {
-    #[pyo3(get, set)]
-    pub name: String,
+    pub name: Arc<str>,
     #[pyo3(get, set)]
     pub hp: i32,
     #[pyo3(get, set)]
     pub max_hp: i32,
     #[pyo3(get, set)]
     pub block: i32,
-    #[pyo3(get, set)]
-    pub monster_id: String,
-    #[pyo3(get, set)]
-    pub behavior: String,
+    // The id and behavior strings are kept for the Python API; simulation uses the
+    // decoded `kind` and `die_moves`. Arc<str> makes cloning them a refcount bump.
+    pub monster_id: Arc<str>,
+    pub kind: MonsterKind,
+    pub behavior: Arc<str>,
+    /// Move character for each die roll 1-6, decoded from `behavior`.
+    pub die_moves: [char; 6],
     #[pyo3(get, set)]
     pub die_controlled: bool,
     #[pyo3(get, set)]
@@ -233,39 +338,113 @@ pub struct Monster {
     pub turn_count: i32,
     #[pyo3(get, set)]
     pub half_dead: bool,
-    pub powers: HashMap<PowerType, i32>,
+    pub powers: Powers,
     pub current_move: char,
     pub intent: Intent,
 }
 
+impl Clone for Monster {
+    fn clone(&self) -> Self {
+        Monster {
+            name: self.name.clone(),
+            hp: self.hp,
+            max_hp: self.max_hp,
+            block: self.block,
+            monster_id: self.monster_id.clone(),
+            kind: self.kind,
+            behavior: self.behavior.clone(),
+            die_moves: self.die_moves,
+            die_controlled: self.die_controlled,
+            first_turn: self.first_turn,
+            turn_count: self.turn_count,
+            half_dead: self.half_dead,
+            powers: self.powers,
+            current_move: self.current_move,
+            intent: self.intent,
+        }
+    }
+
+    fn clone_from(&mut self, source: &Self) {
+        self.name.clone_from(&source.name);
+        self.hp = source.hp;
+        self.max_hp = source.max_hp;
+        self.block = source.block;
+        self.monster_id.clone_from(&source.monster_id);
+        self.kind = source.kind;
+        self.behavior.clone_from(&source.behavior);
+        self.die_moves = source.die_moves;
+        self.die_controlled = source.die_controlled;
+        self.first_turn = source.first_turn;
+        self.turn_count = source.turn_count;
+        self.half_dead = source.half_dead;
+        self.powers = source.powers;
+        self.current_move = source.current_move;
+        self.intent = source.intent;
+    }
+}
+
 #[pymethods]
 impl Monster {
     #[new]
     #[pyo3(signature = (name, hp, monster_id, behavior, die_controlled))]
     pub fn new(name: String, hp: i32, monster_id: String, behavior: String, die_controlled: bool) -> Self {
         Monster {
-            name,
+            name: name.into(),
             max_hp: hp,
             hp,
             block: 0,
-            monster_id,
-            behavior,
+            kind: MonsterKind::from_id(&monster_id),
+            monster_id: monster_id.into(),
+            die_moves: decode_behavior(&behavior),
+            behavior: behavior.into(),
             die_controlled,
             first_turn: true,
             turn_count: 0,
             half_dead: false,
-            powers: HashMap::new(),
+            powers: Powers::new(),
             current_move: ' ',
             intent: Intent::Unknown,
         }
     }
 
+    #[getter]
+    pub fn name(&self) -> &str {
+        &self.name
+    }
+
+    #[setter]
+    pub fn set_name(&mut self, name: String) {
+        self.name = name.into();
+    }
+
+    #[getter]
+    pub fn monster_id(&self) -> &str {
+        &self.monster_id
+    }
+
+    #[setter]
+    pub fn set_monster_id(&mut self, monster_id: String) {
+        self.kind = MonsterKind::from_id(&monster_id);
+        self.monster_id = monster_id.into();
+    }
+
+    #[getter]
+    pub fn behavior(&self) -> &str {
+        &self.behavior
+    }
+
+    #[setter]
+    pub fn set_behavior(&mut self, behavior: String) {
+        self.die_moves = decode_behavior(&behavior);
+        self.behavior = behavior.into();
+    }
+
     pub fn get_power(&self, power: PowerType) -> i32 {
-        *self.powers.get(&power).unwrap_or(&0)
+        self.powers.get(power)
     }
 
     pub fn get_powers_dict(&self) -> HashMap<String, i32> {
-        self.powers.iter().map(|(k, v)| (format!("{:?}", k), *v)).collect()
+        self.powers.iter().map(|(k, v)| (format!("{:?}", k), v)).collect()
     }
 
     pub fn get_current_move(&self) -> String {
@@ -282,6 +461,7 @@ impl Monster {
 
     pub fn add_block(&mut self, amount: i32) {
         self.block += amount;
+        trace::block(Who::monster(self), amount);
     }
 
     /// Directly reduce HP by amount (for testing scenarios).
@@ -292,7 +472,7 @@ impl Monster {
     pub fn apply_power(&mut self, power: PowerType, amount: i32) {
         // Artifact blocks debuffs
         if amount > 0 && is_debuff(power) {
-            let artifact = self.powers.get(&PowerType::Artifact).copied().unwrap_or(0);
+            let artifact = self.powers.get(PowerType::Artifact);
             if artifact > 0 {
                 self.reduce_power(PowerType::Artifact, 1);
                 return;
@@ -300,21 +480,76 @@ impl Monster {
         }
 
         let cap = power_cap(power);
-        let current = self.powers.entry(power).or_insert(0);
-        *current = (*current + amount).min(cap);
-        if *current <= 0 && !can_be_negative(power) {
-            self.powers.remove(&power);
+        let current = (self.powers.get(power) + amount).min(cap);
+        if current <= 0 && !can_be_negative(power) {
+            self.powers.remove(power);
+        } else {
+            self.powers.set(power, current);
         }
+        trace::power(Who::monster(self), power, amount);
     }
 
     pub fn reduce_power(&mut self, power: PowerType, amount: i32) {
-        if let Some(current) = self.powers.get_mut(&power) {
-            *current -= amount;
-            if *current <= 0 && !can_be_negative(power) {
-                self.powers.remove(&power);
+        if self.powers.contains(power) {
+            let current = self.powers.get(power) - amount;
+            if current <= 0 && !can_be_negative(power) {
+                self.powers.remove(power);
+            } else {
+                self.powers.set(power, current);
             }
         }
     }
+
+    /// Compact, versioned binary encoding of this monster. Inverse of from_bytes.
+    pub fn to_bytes<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+        serialize::to_pybytes(py, self)
+    }
+
+    /// Decode to_bytes output. Raises ValueError on malformed or incompatible data.
+    #[staticmethod]
+    pub fn from_bytes(data: &[u8]) -> PyResult<Self> {
+        serialize::from_bytes(data)
+    }
+
+    pub fn __getstate__<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+        serialize::to_pybytes(py, self)
+    }
+
+    pub fn __setstate__(&mut self, state: &[u8]) -> PyResult<()> {
+        *self = serialize::from_bytes(state)?;
+        Ok(())
+    }
+
+    pub fn __reduce__<'py>(slf: &Bound<'py, Self>) -> PyResult<serialize::Reduced<'py>> {
+        serialize::reduce(slf)
+    }
+}
+
+/// Decode a behavior string into the move for each die roll 1-6. Two-character
+/// behaviors (Sentries) split the die in halves; longer ones use TheDie::behavior_index.
+fn decode_behavior(behavior: &str) -> [char; 6] {
+    let chars: Vec<char> = behavior.chars().collect();
+    let mut moves = [' '; 6];
+    for (i, slot) in moves.iter_mut().enumerate() {
+        let roll = i as u8 + 1;
+        let idx = if chars.len() == 2 {
+            if roll <= 3 { 0 } else { 1 }
+        } else {
+            TheDie::behavior_index(roll)
+        };
+        *slot = chars.get(idx).copied().unwrap_or(' ');
+    }
+    moves
+}
+
+impl Monster {
+    /// Move character for a die roll (1-6).
+    pub fn die_move(&self, roll: u8) -> char {
+        match roll {
+            1..=6 => self.die_moves[roll as usize - 1],
+            _ => panic!("Invalid die roll: {}", roll),
+        }
+    }
 }
 
 /// Get the power cap for a given power type.
@@ -1,6 +1,8 @@
 use crate::creature::{Monster, Player};
+use crate::enemies::MonsterKind;
 use crate::enums::{PowerType, Stance};
 use crate::powers;
+use crate::trace::{self, Who};
 
 /// Full damage pipeline for monster attacking player.
 /// Pipeline: base + Strength → atDamageGive (Weak) → atDamageReceive (Vulnerable) → floor, min 0
@@ -55,6 +57,7 @@ pub fn apply_damage_to_player(player: &mut Player, damage: i32) -> i32 {
     player.block -= blocked;
     let hp_damage = damage - blocked;
     player.hp -= hp_damage;
+    trace::damage(Who::Player, hp_damage, blocked);
     hp_damage
 }
 
@@ -74,7 +77,7 @@ pub fn apply_damage_to_monster(monster: &mut Monster, damage: i32) -> i32 {
         if hp_damage > 0 && hp_damage < monster.hp {
             // Curl Up triggers: grant 2 block, then remove
             monster.add_block(2);
-            monster.powers.remove(&PowerType::CurlUp);
+            monster.powers.remove(PowerType::CurlUp);
         }
     }
 
@@ -82,9 +85,10 @@ pub fn apply_damage_to_monster(monster: &mut Monster, damage: i32) -> i32 {
     monster.block -= blocked;
     let hp_damage = damage - blocked;
     monster.hp -= hp_damage;
+    trace::damage(Who::monster(monster), hp_damage, blocked);
 
     // Slime Boss: when HP reaches 0, enter half_dead state (split pending)
-    if monster.hp <= 0 && monster.monster_id == "slime_boss" && !monster.half_dead {
+    if monster.hp <= 0 && monster.kind == MonsterKind::SlimeBoss && !monster.half_dead {
         monster.half_dead = true;
     }
 
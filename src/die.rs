@@ -1,12 +1,16 @@
 use pyo3::prelude::*;
-use rand::rngs::StdRng;
+use pyo3::types::PyBytes;
 use rand::{Rng, SeedableRng};
 
-#[pyclass]
-#[derive(Clone, Debug)]
+use crate::rng::{self, SimRng};
+use crate::serialize;
+use crate::trace;
+
+#[pyclass(module = "sts_sim")]
+#[derive(Clone, Debug, PartialEq)]
 pub struct TheDie {
-    rng: StdRng,
-    locked_value: Option<u8>,
+    pub(crate) rng: SimRng,
+    pub(crate) locked_value: Option<u8>,
 }
 
 #[pymethods]
@@ -15,17 +19,19 @@ impl TheDie {
     #[pyo3(signature = (seed=None))]
     pub fn new(seed: Option<u64>) -> Self {
         let rng = match seed {
-            Some(s) => StdRng::seed_from_u64(s),
-            None => StdRng::from_entropy(),
+            Some(s) => SimRng::seed_from_u64(s),
+            None => SimRng::from_entropy(),
         };
         TheDie { rng, locked_value: None }
     }
 
     pub fn roll(&mut self) -> u8 {
-        if let Some(v) = self.locked_value {
-            return v;
-        }
-        self.rng.gen_range(1..=6)
+        let face = match self.locked_value {
+            Some(v) => v,
+            None => self.rng.gen_range(1..=6),
+        };
+        trace::die_roll(face);
+        face
     }
 
     pub fn set_value(&mut self, value: u8) {
@@ -36,6 +42,17 @@ impl TheDie {
         self.locked_value = None;
     }
 
+    /// Replace the RNG with `stream` of `seed`, keeping any locked value.
+    #[pyo3(signature = (seed, stream=0))]
+    pub fn reseed(&mut self, seed: u64, stream: u64) {
+        self.rng = rng::stream_rng(seed, stream);
+    }
+
+    /// Copy of this die whose RNG is child stream `stream_id` of this die's RNG.
+    pub fn fork(&self, stream_id: u64) -> TheDie {
+        TheDie { rng: rng::fork(&self.rng, stream_id), locked_value: self.locked_value }
+    }
+
     #[staticmethod]
     pub fn behavior_index(roll: u8) -> usize {
         match roll {
@@ -45,4 +62,28 @@ impl TheDie {
             _ => panic!("Invalid die roll: {}", roll),
         }
     }
+
+    /// Compact, versioned binary encoding of the die, RNG included. Inverse of from_bytes.
+    pub fn to_bytes<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+        serialize::to_pybytes(py, self)
+    }
+
+    /// Decode to_bytes output. Raises ValueError on malformed or incompatible data.
+    #[staticmethod]
+    pub fn from_bytes(data: &[u8]) -> PyResult<Self> {
+        serialize::from_bytes(data)
+    }
+
+    pub fn __getstate__<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+        serialize::to_pybytes(py, self)
+    }
+
+    pub fn __setstate__(&mut self, state: &[u8]) -> PyResult<()> {
+        *self = serialize::from_bytes(state)?;
+        Ok(())
+    }
+
+    pub fn __reduce__<'py>(slf: &Bound<'py, Self>) -> PyResult<serialize::Reduced<'py>> {
+        serialize::reduce(slf)
+    }
 }
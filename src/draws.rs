@@ -0,0 +1,112 @@
+use crate::cards::CardInstance;
+use crate::combat::CombatState;
+use crate::enums::PowerType;
+use crate::piles::CardPile;
+
+/// Number of ways to choose `k` of `n` items, as a float (exact up to 2^53).
+fn binomial(n: usize, k: usize) -> f64 {
+    (0..k).fold(1.0, |acc, i| acc * (n - i) as f64 / (i + 1) as f64)
+}
+
+/// Distinct multisets of `k` cards drawn from `pile` (deck indices) when its order is
+/// unknown, with their probabilities. Copies of the same card are interchangeable, so
+/// each multiset is returned as the deck indices of the first matching copies in `pile`.
+pub fn draw_multisets(deck: &[CardInstance], pile: &[usize], k: usize) -> Vec<(Vec<usize>, f64)> {
+    let k = k.min(pile.len());
+    let mut groups: Vec<(CardInstance, Vec<usize>)> = Vec::new();
+    for &idx in pile {
+        match groups.iter_mut().find(|(ci, _)| *ci == deck[idx]) {
+            Some((_, copies)) => copies.push(idx),
+            None => groups.push((deck[idx], vec![idx])),
+        }
+    }
+    // Cards available in groups[g..], to prune choices that can't reach k.
+    let mut available = vec![0; groups.len() + 1];
+    for g in (0..groups.len()).rev() {
+        available[g] = available[g + 1] + groups[g].1.len();
+    }
+
+    struct Search<'a> {
+        groups: &'a [(CardInstance, Vec<usize>)],
+        available: &'a [usize],
+        total: f64,
+        chosen: Vec<usize>,
+        out: Vec<(Vec<usize>, f64)>,
+    }
+
+    fn recurse(s: &mut Search<'_>, g: usize, remaining: usize, ways: f64) {
+        if remaining == 0 {
+            s.out.push((s.chosen.clone(), ways / s.total));
+            return;
+        }
+        if g == s.groups.len() || s.available[g] < remaining {
+            return;
+        }
+        let copies = s.groups[g].1.len();
+        let skip_max = s.available[g + 1];
+        for take in (remaining.saturating_sub(skip_max)..=copies.min(remaining)).rev() {
+            let len = s.chosen.len();
+            s.chosen.extend_from_slice(&s.groups[g].1[..take]);
+            recurse(s, g + 1, remaining - take, ways * binomial(copies, take));
+            s.chosen.truncate(len);
+        }
+    }
+
+    let mut search = Search {
+        groups: &groups,
+        available: &available,
+        total: binomial(pile.len(), k),
+        chosen: Vec::with_capacity(k),
+        out: Vec::new(),
+    };
+    recurse(&mut search, 0, k, 1.0);
+    search.out
+}
+
+/// Move `chosen` to the top of the draw pile, keeping the rest in their current order.
+fn put_on_top(draw_pile: &mut CardPile, deck: &[CardInstance], chosen: &[usize]) {
+    draw_pile.retain(|i| !chosen.contains(i), deck);
+    // The draw pile is popped from the back.
+    draw_pile.extend(chosen.iter().rev().copied(), deck);
+}
+
+/// Every outcome of drawing `count` cards, treating the draw pile's order as unknown, as
+/// (cards drawn, probability, state after the draw). If the draw pile runs out, all of it
+/// is drawn, the discard pile is reshuffled as in a normal draw, and the remaining cards
+/// are enumerated from the reshuffled pile. Cards drawn by on-draw effects (Evolve) come
+/// from the top of the pile that remains and are not enumerated.
+pub fn enumerate_draws(state: &CombatState, count: usize) -> Vec<(Vec<CardInstance>, f64, CombatState)> {
+    let draw_len = state.player.draw_pile.len();
+    if count == 0 || state.player.get_power(PowerType::NoDraw) > 0
+        || draw_len + state.player.discard_pile.len() == 0
+    {
+        let mut next = state.clone();
+        next.draw_cards(count as i32);
+        return vec![(Vec::new(), 1.0, next)];
+    }
+
+    // Drawing past the end of the draw pile takes all of it, then reshuffles.
+    let (base, drawn, remaining) = if count > draw_len {
+        let mut base = state.clone();
+        base.draw_cards(draw_len as i32);
+        if base.player.draw_pile.is_empty() && !base.player.discard_pile.is_empty() {
+            base.reshuffle_draw_pile();
+        }
+        let drawn: Vec<CardInstance> = state.player.draw_pile.iter().rev().map(|&i| state.deck[i]).collect();
+        (base, drawn, count - draw_len)
+    } else {
+        (state.clone(), Vec::new(), count)
+    };
+
+    draw_multisets(&base.deck, &base.player.draw_pile, remaining)
+        .into_iter()
+        .map(|(chosen, p)| {
+            let mut next = base.clone();
+            put_on_top(&mut next.player.draw_pile, &next.deck, &chosen);
+            next.draw_cards(chosen.len() as i32);
+            let mut cards = drawn.clone();
+            cards.extend(chosen.iter().map(|&idx| base.deck[idx]));
+            (cards, p, next)
+        })
+        .collect()
+}
@@ -8,13 +8,39 @@ use crate::enemies::{
     acid_slime_m, spike_slime_m, spike_slime_s,
     fungi_beast, blue_slaver, red_slaver, looter, gremlin,
     gremlin_nob, lagavulin, sentry,
-    the_guardian, hexaghost, slime_boss,
+    the_guardian, hexaghost, slime_boss, MonsterKind,
 };
 
+/// Every encounter name accepted by `create_encounter`.
+pub const ENCOUNTER_NAMES: [&str; 20] = [
+    "jaw_worm", "cultist", "louse",
+    "cultist_and_spike_slime", "cultist_and_louse", "fungi_beasts", "slime_trio",
+    "3_louse_hard", "large_slime", "blue_slaver", "red_slaver", "looter",
+    "sneaky_gremlin_team", "angry_gremlin_team",
+    "gremlin_nob", "lagavulin", "sentries",
+    "the_guardian", "hexaghost", "slime_boss",
+];
+
 /// Create an encounter by name. Returns a CombatState ready to play.
 #[pyfunction]
 #[pyo3(signature = (name, seed=None, character=None))]
 pub fn create_encounter(name: &str, seed: Option<u64>, character: Option<Character>) -> PyResult<CombatState> {
+    build_encounter(name, seed, character).ok_or_else(|| {
+        PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Unknown encounter: {}", name))
+    })
+}
+
+/// Create a single monster by monster_id (e.g. "jaw_worm", "gremlin_wizard"), built as its
+/// encounter builds it. See MONSTER_IDS for the accepted ids.
+#[pyfunction]
+pub fn create_monster(monster_id: &str) -> PyResult<Monster> {
+    MonsterKind::from_id(monster_id).create().ok_or_else(|| {
+        PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Unknown monster: {}", monster_id))
+    })
+}
+
+/// Build an encounter by name without going through Python. Returns None for unknown names.
+pub fn build_encounter(name: &str, seed: Option<u64>, character: Option<Character>) -> Option<CombatState> {
     let s = seed.unwrap_or(0);
     let monsters = match name {
         // --- Easy / first-fight pool ---
@@ -56,8 +82,8 @@ pub fn create_encounter(name: &str, seed: Option<u64>, character: Option<Charact
             let mut m = acid_slime_m::create(b);
             m.hp = 8;
             m.max_hp = 8;
-            m.name = "Acid Slime (L)".to_string();
-            m.monster_id = "acid_slime_l".to_string();
+            m.set_name("Acid Slime (L)".to_string());
+            m.set_monster_id("acid_slime_l".to_string());
             vec![m]
         }
         "blue_slaver" => {
@@ -88,14 +114,10 @@ pub fn create_encounter(name: &str, seed: Option<u64>, character: Option<Charact
         "hexaghost" => vec![hexaghost::create()],
         "slime_boss" => vec![slime_boss::create()],
 
-        _ => {
-            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
-                format!("Unknown encounter: {}", name),
-            ))
-        }
+        _ => return None,
     };
 
-    Ok(CombatState::new_with_character(monsters, seed, character))
+    Some(CombatState::new_with_character(monsters, seed, character))
 }
 
 /// Create a 2-Louse encounter: 1 Red + 1 Green (behavior from pool based on seed).
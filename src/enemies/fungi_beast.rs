@@ -12,7 +12,7 @@ pub fn create(behavior: &str) -> Monster {
         true,
     );
     // Store strAmount as a custom power (Grow strength amount = 2 for normal)
-    m.powers.insert(PowerType::SporeCloud, 1);
+    m.powers.set(PowerType::SporeCloud, 1);
     m
 }
 
@@ -19,7 +19,138 @@ pub mod slime_boss;
 
 use crate::cards::Card;
 use crate::creature::{Monster, Player};
-use crate::die::TheDie;
+use crate::perf;
+
+/// Monster type used for move dispatch, decoded once from the monster_id string.
+/// Ids without a move table (e.g. test monsters, the split Acid Slime (L)) are Other.
+#[derive(Clone, Copy, Debug, PartialEq, Eq, Hash)]
+pub enum MonsterKind {
+    JawWorm,
+    Cultist,
+    RedLouse,
+    GreenLouse,
+    AcidSlimeM,
+    SpikeSlimeM,
+    SpikeSlimeS,
+    FungiBeast,
+    BlueSlaver,
+    RedSlaver,
+    Looter,
+    GremlinAngry,
+    GremlinSneaky,
+    GremlinFat,
+    GremlinWizard,
+    GremlinNob,
+    Lagavulin,
+    Sentry,
+    TheGuardian,
+    Hexaghost,
+    SlimeBoss,
+    Other,
+}
+
+impl MonsterKind {
+    pub fn from_id(id: &str) -> MonsterKind {
+        match id {
+            "jaw_worm" => MonsterKind::JawWorm,
+            "cultist" => MonsterKind::Cultist,
+            "red_louse" => MonsterKind::RedLouse,
+            "green_louse" => MonsterKind::GreenLouse,
+            "acid_slime_m" => MonsterKind::AcidSlimeM,
+            "spike_slime_m" => MonsterKind::SpikeSlimeM,
+            "spike_slime_s" => MonsterKind::SpikeSlimeS,
+            "fungi_beast" => MonsterKind::FungiBeast,
+            "blue_slaver" => MonsterKind::BlueSlaver,
+            "red_slaver" => MonsterKind::RedSlaver,
+            "looter" => MonsterKind::Looter,
+            "gremlin_angry" => MonsterKind::GremlinAngry,
+            "gremlin_sneaky" => MonsterKind::GremlinSneaky,
+            "gremlin_fat" => MonsterKind::GremlinFat,
+            "gremlin_wizard" => MonsterKind::GremlinWizard,
+            "gremlin_nob" => MonsterKind::GremlinNob,
+            "lagavulin" => MonsterKind::Lagavulin,
+            "sentry" => MonsterKind::Sentry,
+            "the_guardian" => MonsterKind::TheGuardian,
+            "hexaghost" => MonsterKind::Hexaghost,
+            "slime_boss" => MonsterKind::SlimeBoss,
+            _ => MonsterKind::Other,
+        }
+    }
+
+    /// Every kind, in discriminant order.
+    pub const ALL: [MonsterKind; NUM_MONSTER_KINDS] = [
+        MonsterKind::JawWorm, MonsterKind::Cultist, MonsterKind::RedLouse,
+        MonsterKind::GreenLouse, MonsterKind::AcidSlimeM, MonsterKind::SpikeSlimeM,
+        MonsterKind::SpikeSlimeS, MonsterKind::FungiBeast, MonsterKind::BlueSlaver,
+        MonsterKind::RedSlaver, MonsterKind::Looter, MonsterKind::GremlinAngry,
+        MonsterKind::GremlinSneaky, MonsterKind::GremlinFat, MonsterKind::GremlinWizard,
+        MonsterKind::GremlinNob, MonsterKind::Lagavulin, MonsterKind::Sentry,
+        MonsterKind::TheGuardian, MonsterKind::Hexaghost, MonsterKind::SlimeBoss,
+        MonsterKind::Other,
+    ];
+
+    /// The monster_id this kind is decoded from ("other" for Other).
+    pub fn id(self) -> &'static str {
+        match self {
+            MonsterKind::JawWorm => "jaw_worm",
+            MonsterKind::Cultist => "cultist",
+            MonsterKind::RedLouse => "red_louse",
+            MonsterKind::GreenLouse => "green_louse",
+            MonsterKind::AcidSlimeM => "acid_slime_m",
+            MonsterKind::SpikeSlimeM => "spike_slime_m",
+            MonsterKind::SpikeSlimeS => "spike_slime_s",
+            MonsterKind::FungiBeast => "fungi_beast",
+            MonsterKind::BlueSlaver => "blue_slaver",
+            MonsterKind::RedSlaver => "red_slaver",
+            MonsterKind::Looter => "looter",
+            MonsterKind::GremlinAngry => "gremlin_angry",
+            MonsterKind::GremlinSneaky => "gremlin_sneaky",
+            MonsterKind::GremlinFat => "gremlin_fat",
+            MonsterKind::GremlinWizard => "gremlin_wizard",
+            MonsterKind::GremlinNob => "gremlin_nob",
+            MonsterKind::Lagavulin => "lagavulin",
+            MonsterKind::Sentry => "sentry",
+            MonsterKind::TheGuardian => "the_guardian",
+            MonsterKind::Hexaghost => "hexaghost",
+            MonsterKind::SlimeBoss => "slime_boss",
+            MonsterKind::Other => "other",
+        }
+    }
+}
+
+/// Number of MonsterKind variants (Other must stay last).
+pub const NUM_MONSTER_KINDS: usize = MonsterKind::Other as usize + 1;
+
+impl MonsterKind {
+    /// One monster of this kind, built the way its encounter builds it (with the first
+    /// behavior pattern where there is a choice). None for Other.
+    pub fn create(self) -> Option<Monster> {
+        Some(match self {
+            MonsterKind::JawWorm => jaw_worm::create(),
+            MonsterKind::Cultist => cultist::create(),
+            MonsterKind::RedLouse => red_louse::create(),
+            MonsterKind::GreenLouse => green_louse::create("1W2"),
+            MonsterKind::AcidSlimeM => acid_slime_m::create("CAL"),
+            MonsterKind::SpikeSlimeM => spike_slime_m::create("2DV"),
+            MonsterKind::SpikeSlimeS => spike_slime_s::create(),
+            MonsterKind::FungiBeast => fungi_beast::create("21S"),
+            MonsterKind::BlueSlaver => blue_slaver::create("W2d"),
+            MonsterKind::RedSlaver => red_slaver::create("DV3"),
+            MonsterKind::Looter => looter::create(),
+            MonsterKind::GremlinAngry => gremlin::create_angry(),
+            MonsterKind::GremlinSneaky => gremlin::create_sneaky(),
+            MonsterKind::GremlinFat => gremlin::create_fat(),
+            MonsterKind::GremlinWizard => gremlin::create_wizard(),
+            MonsterKind::GremlinNob => gremlin_nob::create(),
+            MonsterKind::Lagavulin => lagavulin::create(),
+            MonsterKind::Sentry => sentry::create("D3", 7),
+            MonsterKind::TheGuardian => the_guardian::create(),
+            MonsterKind::Hexaghost => hexaghost::create(),
+            MonsterKind::SlimeBoss => slime_boss::create(),
+            MonsterKind::Other => return None,
+        })
+    }
+}
 
 /// Side effects from a monster's move that need to be processed by CombatState.
 #[derive(Default)]
@@ -34,47 +165,37 @@ pub struct MoveResult {
 
 /// Select a move for a die-controlled monster based on die roll.
 pub fn select_die_move(monster: &mut Monster, roll: u8) {
-    let idx = TheDie::behavior_index(roll);
-    let ch = monster.behavior.chars().nth(idx).unwrap_or(' ');
-
-    match monster.monster_id.as_str() {
-        "jaw_worm" => jaw_worm::set_move(monster, ch.to_ascii_lowercase()),
-        "red_louse" => red_louse::set_move(monster, ch),
-        "green_louse" => green_louse::set_move(monster, ch),
-        "acid_slime_m" => acid_slime_m::set_move(monster, ch),
-        "spike_slime_m" => spike_slime_m::set_move(monster, ch),
-        "fungi_beast" => fungi_beast::set_move(monster, ch),
-        "blue_slaver" => blue_slaver::set_move(monster, ch),
-        "red_slaver" => red_slaver::set_move(monster, ch),
-        "sentry" => sentry::set_move(monster, ch),
-        _ => {}
-    }
-}
+    let ch = monster.die_move(roll);
 
-/// Select die move for 2-char behavior monsters (sentries).
-/// Roll 1-3→char 0, 4-6→char 1.
-pub fn select_die_move_2char(monster: &mut Monster, roll: u8) {
-    match monster.monster_id.as_str() {
-        "sentry" => sentry::select_die_move(monster, roll),
+    match monster.kind {
+        MonsterKind::JawWorm => jaw_worm::set_move(monster, ch.to_ascii_lowercase()),
+        MonsterKind::RedLouse => red_louse::set_move(monster, ch),
+        MonsterKind::GreenLouse => green_louse::set_move(monster, ch),
+        MonsterKind::AcidSlimeM => acid_slime_m::set_move(monster, ch),
+        MonsterKind::SpikeSlimeM => spike_slime_m::set_move(monster, ch),
+        MonsterKind::FungiBeast => fungi_beast::set_move(monster, ch),
+        MonsterKind::BlueSlaver => blue_slaver::set_move(monster, ch),
+        MonsterKind::RedSlaver => red_slaver::set_move(monster, ch),
+        MonsterKind::Sentry => sentry::set_move(monster, ch),
         _ => {}
     }
 }
 
 /// Select move for non-die-controlled monster.
 pub fn select_move(monster: &mut Monster) {
-    match monster.monster_id.as_str() {
-        "cultist" => cultist::select_move(monster),
-        "spike_slime_s" => spike_slime_s::select_move(monster),
-        "looter" => looter::select_move(monster),
-        "gremlin_angry" => gremlin::select_move_angry(monster),
-        "gremlin_sneaky" => gremlin::select_move_sneaky(monster),
-        "gremlin_fat" => gremlin::select_move_fat(monster),
-        "gremlin_wizard" => gremlin::select_move_wizard(monster),
-        "gremlin_nob" => gremlin_nob::select_move(monster),
-        "lagavulin" => lagavulin::select_move(monster),
-        "the_guardian" => the_guardian::select_move(monster),
-        "hexaghost" => hexaghost::select_move(monster),
-        "slime_boss" => slime_boss::select_move(monster),
+    match monster.kind {
+        MonsterKind::Cultist => cultist::select_move(monster),
+        MonsterKind::SpikeSlimeS => spike_slime_s::select_move(monster),
+        MonsterKind::Looter => looter::select_move(monster),
+        MonsterKind::GremlinAngry => gremlin::select_move_angry(monster),
+        MonsterKind::GremlinSneaky => gremlin::select_move_sneaky(monster),
+        MonsterKind::GremlinFat => gremlin::select_move_fat(monster),
+        MonsterKind::GremlinWizard => gremlin::select_move_wizard(monster),
+        MonsterKind::GremlinNob => gremlin_nob::select_move(monster),
+        MonsterKind::Lagavulin => lagavulin::select_move(monster),
+        MonsterKind::TheGuardian => the_guardian::select_move(monster),
+        MonsterKind::Hexaghost => hexaghost::select_move(monster),
+        MonsterKind::SlimeBoss => slime_boss::select_move(monster),
         _ => {}
     }
 }
@@ -82,39 +203,40 @@ pub fn select_move(monster: &mut Monster) {
 /// Execute the current move for a monster against the player.
 /// Returns MoveResult with side effects to be processed by CombatState.
 pub fn execute_move(monster: &mut Monster, player: &mut Player) -> MoveResult {
-    match monster.monster_id.as_str() {
-        "jaw_worm" => jaw_worm::execute_move(monster, player),
-        "cultist" => cultist::execute_move(monster, player),
-        "red_louse" => red_louse::execute_move(monster, player),
-        "green_louse" => green_louse::execute_move(monster, player),
-        "acid_slime_m" => acid_slime_m::execute_move(monster, player),
-        "spike_slime_m" => spike_slime_m::execute_move(monster, player),
-        "spike_slime_s" => spike_slime_s::execute_move(monster, player),
-        "fungi_beast" => fungi_beast::execute_move(monster, player),
-        "blue_slaver" => blue_slaver::execute_move(monster, player),
-        "red_slaver" => red_slaver::execute_move(monster, player),
-        "looter" => looter::execute_move(monster, player),
-        "gremlin_angry" => gremlin::execute_move_angry(monster, player),
-        "gremlin_sneaky" => gremlin::execute_move_sneaky(monster, player),
-        "gremlin_fat" => gremlin::execute_move_fat(monster, player),
-        "gremlin_wizard" => gremlin::execute_move_wizard(monster, player),
-        "gremlin_nob" => gremlin_nob::execute_move(monster, player),
-        "lagavulin" => lagavulin::execute_move(monster, player),
-        "sentry" => sentry::execute_move(monster, player),
-        "the_guardian" => the_guardian::execute_move(monster, player),
-        "hexaghost" => hexaghost::execute_move(monster, player),
-        "slime_boss" => slime_boss::execute_move(monster, player),
+    let _perf = perf::monster_move(monster.kind);
+    match monster.kind {
+        MonsterKind::JawWorm => jaw_worm::execute_move(monster, player),
+        MonsterKind::Cultist => cultist::execute_move(monster, player),
+        MonsterKind::RedLouse => red_louse::execute_move(monster, player),
+        MonsterKind::GreenLouse => green_louse::execute_move(monster, player),
+        MonsterKind::AcidSlimeM => acid_slime_m::execute_move(monster, player),
+        MonsterKind::SpikeSlimeM => spike_slime_m::execute_move(monster, player),
+        MonsterKind::SpikeSlimeS => spike_slime_s::execute_move(monster, player),
+        MonsterKind::FungiBeast => fungi_beast::execute_move(monster, player),
+        MonsterKind::BlueSlaver => blue_slaver::execute_move(monster, player),
+        MonsterKind::RedSlaver => red_slaver::execute_move(monster, player),
+        MonsterKind::Looter => looter::execute_move(monster, player),
+        MonsterKind::GremlinAngry => gremlin::execute_move_angry(monster, player),
+        MonsterKind::GremlinSneaky => gremlin::execute_move_sneaky(monster, player),
+        MonsterKind::GremlinFat => gremlin::execute_move_fat(monster, player),
+        MonsterKind::GremlinWizard => gremlin::execute_move_wizard(monster, player),
+        MonsterKind::GremlinNob => gremlin_nob::execute_move(monster, player),
+        MonsterKind::Lagavulin => lagavulin::execute_move(monster, player),
+        MonsterKind::Sentry => sentry::execute_move(monster, player),
+        MonsterKind::TheGuardian => the_guardian::execute_move(monster, player),
+        MonsterKind::Hexaghost => hexaghost::execute_move(monster, player),
+        MonsterKind::SlimeBoss => slime_boss::execute_move(monster, player),
         _ => MoveResult::default(),
     }
 }
 
 /// Apply pre-battle setup for a monster.
 pub fn pre_battle(monster: &mut Monster) {
-    match monster.monster_id.as_str() {
-        "cultist" => cultist::pre_battle(monster),
-        "red_louse" => red_louse::pre_battle(monster),
-        "green_louse" => green_louse::pre_battle(monster),
-        "fungi_beast" => fungi_beast::pre_battle(monster),
+    match monster.kind {
+        MonsterKind::Cultist => cultist::pre_battle(monster),
+        MonsterKind::RedLouse => red_louse::pre_battle(monster),
+        MonsterKind::GreenLouse => green_louse::pre_battle(monster),
+        MonsterKind::FungiBeast => fungi_beast::pre_battle(monster),
         _ => {}
     }
 }
@@ -5,7 +5,8 @@ use crate::enums::{Intent, PowerType};
 use crate::enemies::MoveResult;
 
 /// Create a Sentry with given behavior and HP.
-/// Behaviors: "D3" (7 HP), "3D" (8 HP), "2D" (7 HP at A0)
+/// Behaviors: "D3" (7 HP), "3D" (8 HP), "2D" (7 HP at A0).
+/// 2-char behaviors split the die: 1-3→char 0, 4-6→char 1 (see Monster::die_moves).
 pub fn create(behavior: &str, hp: i32) -> Monster {
     Monster::new(
         "Sentry".to_string(),
@@ -16,13 +17,6 @@ pub fn create(behavior: &str, hp: i32) -> Monster {
     )
 }
 
-/// Sentry die move: 2-char behavior, 1-3→char 0, 4-6→char 1.
-pub fn select_die_move(monster: &mut Monster, roll: u8) {
-    let idx = if roll <= 3 { 0 } else { 1 };
-    let ch = monster.behavior.chars().nth(idx).unwrap_or(' ');
-    set_move(monster, ch);
-}
-
 pub fn set_move(monster: &mut Monster, ch: char) {
     monster.current_move = ch;
     monster.intent = match ch {
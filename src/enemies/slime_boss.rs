@@ -76,8 +76,8 @@ pub fn execute_move(monster: &mut Monster, player: &mut Player) -> MoveResult {
             let mut acid_l = acid_slime_m::create("CAL");
             acid_l.hp = 8;
             acid_l.max_hp = 8;
-            acid_l.name = "Acid Slime (L)".to_string();
-            acid_l.monster_id = "acid_slime_l".to_string();
+            acid_l.set_name("Acid Slime (L)".to_string());
+            acid_l.set_monster_id("acid_slime_l".to_string());
             result.spawn_monsters.push(acid_l);
             result.spawn_monsters.push(acid_slime_m::create("LCA"));
             result.spawn_monsters.push(spike_slime_m::create("V2D"));
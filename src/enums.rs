@@ -101,6 +101,34 @@ pub enum PowerType {
     ConjureBladePower, // Bonus damage to starter Strikes only
 }
 
+/// Number of PowerType variants (ConjureBladePower must stay last).
+pub const NUM_POWERS: usize = PowerType::ConjureBladePower as usize + 1;
+
+/// Every PowerType, in discriminant order.
+pub const ALL_POWERS: [PowerType; NUM_POWERS] = [
+    PowerType::Strength, PowerType::Vulnerable, PowerType::Weak, PowerType::Ritual,
+    PowerType::CurlUp, PowerType::Dexterity, PowerType::Thorns, PowerType::Metallicize,
+    PowerType::Barricade, PowerType::Rage, PowerType::FeelNoPain, PowerType::DarkEmbrace,
+    PowerType::Rupture, PowerType::Combust, PowerType::Evolve, PowerType::FireBreathing,
+    PowerType::Anger, PowerType::Entangled, PowerType::Artifact, PowerType::SporeCloud,
+    PowerType::Juggernaut, PowerType::DemonForm, PowerType::Corruption,
+    PowerType::DoubleTap, PowerType::NoDraw, PowerType::Berserk, PowerType::Shiv,
+    PowerType::Poison, PowerType::Accuracy, PowerType::AfterImage, PowerType::Envenom,
+    PowerType::NoxiousFumes, PowerType::NoxiousFumesAOE, PowerType::AThousandCuts,
+    PowerType::InfiniteBlades, PowerType::WellLaidPlans, PowerType::WraithForm,
+    PowerType::ToolsOfTheTrade, PowerType::Distraction, PowerType::CorpseExplosion,
+    PowerType::Burst, PowerType::Storm, PowerType::Loop, PowerType::BufferPower,
+    PowerType::Heatsink, PowerType::EchoForm, PowerType::DrawPerTurn,
+    PowerType::Electrodynamics, PowerType::OrbEvoke, PowerType::OrbPassive,
+    PowerType::StaticDischarge, PowerType::AmplifyDark, PowerType::EnergyPerTurn,
+    PowerType::TripleAttack, PowerType::MentalFortress, PowerType::Rushdown,
+    PowerType::LikeWater, PowerType::OmegaPower, PowerType::DevotionPower,
+    PowerType::SimmeringFury, PowerType::NirvanaPower, PowerType::ForesightPower,
+    PowerType::StudyPower, PowerType::DevaFormPower, PowerType::EstablishmentPower,
+    PowerType::BattleHymnPower, PowerType::ConclusionPower, PowerType::MiracleCount,
+    PowerType::LoseStrength, PowerType::ConjureBladePower,
+];
+
 #[pyclass(frozen, eq, eq_int, hash)]
 #[derive(Clone, Copy, Debug, PartialEq, Eq, Hash)]
 pub enum Stance {
@@ -135,6 +163,9 @@ pub enum Intent {
     Unknown,
 }
 
+/// Number of Intent variants (Unknown must stay last).
+pub const NUM_INTENTS: usize = Intent::Unknown as usize + 1;
+
 #[pyclass(frozen, eq, eq_int, hash)]
 #[derive(Clone, Copy, Debug, PartialEq, Eq, Hash)]
 pub enum Relic {
@@ -186,6 +217,22 @@ pub enum Relic {
     BirdFacedUrn,       // +1 block when playing Power
 }
 
+/// Number of Relic variants (BirdFacedUrn must stay last).
+pub const NUM_RELICS: usize = Relic::BirdFacedUrn as usize + 1;
+
+/// Every Relic, in discriminant order.
+pub const ALL_RELICS: [Relic; NUM_RELICS] = [
+    Relic::BurningBlood, Relic::RingOfTheSnake, Relic::Shivs, Relic::CrackedCore,
+    Relic::Miracles, Relic::Lantern, Relic::BagOfPreparation, Relic::Anchor,
+    Relic::Orichalcum, Relic::Vajra, Relic::OddlySmoothStone, Relic::PenNib,
+    Relic::HornCleat, Relic::HappyFlower, Relic::RedSkull, Relic::MeatOnTheBone,
+    Relic::MercuryHourglass, Relic::BlackBlood, Relic::CaptainsWheel, Relic::Sundial,
+    Relic::TungstenRod, Relic::RedMask, Relic::Necronomicon, Relic::InkBottle,
+    Relic::Pocketwatch, Relic::GremlinHorn, Relic::StoneCalendar, Relic::TheBoot,
+    Relic::Duality, Relic::BloodVial, Relic::FrozenCore, Relic::MutagenicStrength,
+    Relic::IncenseBurner, Relic::SneckoEye, Relic::BirdFacedUrn,
+];
+
 #[pyclass(frozen, eq, eq_int, hash)]
 #[derive(Clone, Copy, Debug, PartialEq, Eq, Hash)]
 pub enum EventType {
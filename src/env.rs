@@ -0,0 +1,234 @@
+use pyo3::buffer::{Element, PyBuffer};
+use pyo3::prelude::*;
+use pyo3::types::PyBytes;
+use rand::rngs::StdRng;
+use rand::{Rng, SeedableRng};
+
+use crate::actions::{apply_action, write_action_mask_cells, Action, NUM_ACTIONS};
+use crate::combat::CombatState;
+use crate::encounters::{build_encounter, ENCOUNTER_NAMES};
+use crate::enums::Character;
+use crate::observation::{encode_cells, OBSERVATION_SIZE};
+
+/// A batch of independent combats stepped together in one native call.
+///
+/// Outputs are contiguous buffers (anything supporting the buffer protocol, e.g. numpy
+/// arrays or array.array): observations are float32 of shape (num_envs,
+/// observation_size), rewards float32 (num_envs,), dones uint8 (num_envs,) and action
+/// masks uint8 of shape (num_envs, action_size). Buffers passed in are filled in place;
+/// omitted ones are allocated as array.array. Either way they are returned.
+/// Finished envs are reset immediately, so the returned observation and mask for a
+/// done env belong to its fresh combat.
+#[pyclass]
+pub struct VecCombatEnv {
+    envs: Vec<CombatState>,
+    encounter_pool: Vec<String>,
+    character: Option<Character>,
+    max_turns: i32,
+    rng: StdRng,
+}
+
+/// Build and start a new combat drawn from `pool`.
+fn fresh_combat(pool: &[String], character: Option<Character>, rng: &mut StdRng) -> CombatState {
+    let name = &pool[rng.gen_range(0..pool.len())];
+    let seed: u64 = rng.gen();
+    let mut state = build_encounter(name, Some(seed), character)
+        .expect("encounter pool is validated on construction");
+    state.start_combat();
+    state
+}
+
+/// The caller's output buffer, or a new zeroed array.array of `typecode` if none was
+/// given, checked to hold exactly `len` writable, C-contiguous items of T.
+fn output<'py, T: Element>(
+    py: Python<'py>,
+    given: Option<Bound<'py, PyAny>>,
+    typecode: &str,
+    len: usize,
+    what: &str,
+) -> PyResult<(Bound<'py, PyAny>, PyBuffer<T>)> {
+    let target = match given {
+        Some(target) => target,
+        None => {
+            let zeros = PyBytes::new(py, &vec![0u8; len * std::mem::size_of::<T>()]);
+            py.import("array")?.getattr("array")?.call1((typecode, zeros))?
+        }
+    };
+    let buffer = PyBuffer::<T>::get(&target)?;
+    if buffer.item_count() != len {
+        return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+            format!("{} buffer must hold {} values, got {}", what, len, buffer.item_count()),
+        ));
+    }
+    if buffer.as_mut_slice(py).is_none() {
+        return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+            format!("{} buffer must be writable and C-contiguous", what),
+        ));
+    }
+    Ok((target, buffer))
+}
+
+#[pymethods]
+impl VecCombatEnv {
+    #[new]
+    #[pyo3(signature = (num_envs, encounter_pool=None, character=None, seed=None, max_turns=50))]
+    fn new(
+        num_envs: usize,
+        encounter_pool: Option<Vec<String>>,
+        character: Option<Character>,
+        seed: Option<u64>,
+        max_turns: i32,
+    ) -> PyResult<Self> {
+        if num_envs == 0 {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                "num_envs must be at least 1",
+            ));
+        }
+        let encounter_pool = encounter_pool
+            .unwrap_or_else(|| ENCOUNTER_NAMES.iter().map(|s| s.to_string()).collect());
+        if encounter_pool.is_empty() {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                "encounter_pool must not be empty",
+            ));
+        }
+        if let Some(bad) = encounter_pool.iter().find(|n| !ENCOUNTER_NAMES.contains(&n.as_str())) {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                format!("Unknown encounter: {}", bad),
+            ));
+        }
+        let mut rng = StdRng::seed_from_u64(seed.unwrap_or(0));
+        let envs = (0..num_envs)
+            .map(|_| fresh_combat(&encounter_pool, character, &mut rng))
+            .collect();
+        Ok(VecCombatEnv {
+            envs,
+            encounter_pool,
+            character,
+            max_turns,
+            rng,
+        })
+    }
+
+    #[getter]
+    fn num_envs(&self) -> usize {
+        self.envs.len()
+    }
+
+    #[getter]
+    fn observation_size(&self) -> usize {
+        OBSERVATION_SIZE
+    }
+
+    #[getter]
+    fn action_size(&self) -> usize {
+        NUM_ACTIONS
+    }
+
+    /// Start a new combat in every env and write the initial observations and masks.
+    /// Returns (obs, masks).
+    #[pyo3(signature = (obs=None, masks=None))]
+    fn reset<'py>(
+        &mut self,
+        py: Python<'py>,
+        obs: Option<Bound<'py, PyAny>>,
+        masks: Option<Bound<'py, PyAny>>,
+    ) -> PyResult<(Bound<'py, PyAny>, Bound<'py, PyAny>)> {
+        let n = self.envs.len();
+        let (obs, obs_buf) = output::<f32>(py, obs, "f", n * OBSERVATION_SIZE, "Observation")?;
+        let (masks, mask_buf) = output::<u8>(py, masks, "B", n * NUM_ACTIONS, "Action mask")?;
+        py.allow_threads(|| {
+            for env in &mut self.envs {
+                *env = fresh_combat(&self.encounter_pool, self.character, &mut self.rng);
+            }
+        });
+        self.write_rows(py, &obs_buf, &mask_buf);
+        obs_buf.release(py);
+        mask_buf.release(py);
+        Ok((obs, masks))
+    }
+
+    /// Apply one action per env and write the resulting observations, rewards, dones
+    /// and masks; returns (obs, rewards, dones, masks). Reward is +1 for a win, -1 for a
+    /// loss and 0 otherwise; combats still running after max_turns are truncated with
+    /// reward 0. Illegal card plays are no-ops. Buffers are checked before any env
+    /// moves, so a bad buffer raises ValueError and leaves the batch untouched.
+    #[pyo3(signature = (actions, obs=None, rewards=None, dones=None, masks=None))]
+    fn step<'py>(
+        &mut self,
+        py: Python<'py>,
+        actions: Vec<usize>,
+        obs: Option<Bound<'py, PyAny>>,
+        rewards: Option<Bound<'py, PyAny>>,
+        dones: Option<Bound<'py, PyAny>>,
+        masks: Option<Bound<'py, PyAny>>,
+    ) -> PyResult<(Bound<'py, PyAny>, Bound<'py, PyAny>, Bound<'py, PyAny>, Bound<'py, PyAny>)> {
+        let n = self.envs.len();
+        if actions.len() != n {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                format!("Expected {} actions, got {}", n, actions.len()),
+            ));
+        }
+        let decoded = actions
+            .iter()
+            .map(|&a| Action::from_index(a).ok_or_else(|| {
+                PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("Invalid action: {}", a))
+            }))
+            .collect::<PyResult<Vec<Action>>>()?;
+        let (obs, obs_buf) = output::<f32>(py, obs, "f", n * OBSERVATION_SIZE, "Observation")?;
+        let (rewards, reward_buf) = output::<f32>(py, rewards, "f", n, "Reward")?;
+        let (dones, done_buf) = output::<u8>(py, dones, "B", n, "Done")?;
+        let (masks, mask_buf) = output::<u8>(py, masks, "B", n * NUM_ACTIONS, "Action mask")?;
+
+        // Outcomes are decided before finished envs are reset, so they are kept aside
+        // until the GIL is back and the buffers can be written.
+        let outcomes: Vec<(f32, bool)> = py.allow_threads(|| {
+            decoded.into_iter().zip(&mut self.envs).map(|(action, state)| {
+                if !state.combat_over {
+                    apply_action(state, action);
+                }
+                let outcome = if state.combat_over {
+                    (if state.player_won { 1.0 } else { -1.0 }, true)
+                } else if state.turn_number > self.max_turns {
+                    (0.0, true)
+                } else {
+                    (0.0, false)
+                };
+                if outcome.1 {
+                    *state = fresh_combat(&self.encounter_pool, self.character, &mut self.rng);
+                }
+                outcome
+            }).collect()
+        });
+        let reward_cells = reward_buf.as_mut_slice(py).expect("checked by output");
+        let done_cells = done_buf.as_mut_slice(py).expect("checked by output");
+        for (i, &(reward, done)) in outcomes.iter().enumerate() {
+            reward_cells[i].set(reward);
+            done_cells[i].set(done as u8);
+        }
+        self.write_rows(py, &obs_buf, &mask_buf);
+        obs_buf.release(py);
+        reward_buf.release(py);
+        done_buf.release(py);
+        mask_buf.release(py);
+        Ok((obs, rewards, dones, masks))
+    }
+
+    /// Copy of the combat currently running in env `index`.
+    fn get_state(&self, index: usize) -> PyResult<CombatState> {
+        self.envs.get(index).cloned().ok_or_else(|| {
+            PyErr::new::<pyo3::exceptions::PyIndexError, _>(format!("Env index out of range: {}", index))
+        })
+    }
+}
+
+impl VecCombatEnv {
+    /// Encode every env's observation and action mask straight into the output buffers.
+    fn write_rows(&self, py: Python<'_>, obs: &PyBuffer<f32>, masks: &PyBuffer<u8>) {
+        let obs = obs.as_mut_slice(py).expect("checked by output");
+        let masks = masks.as_mut_slice(py).expect("checked by output");
+        for (i, state) in self.envs.iter().enumerate() {
+            encode_cells(state, &obs[i * OBSERVATION_SIZE..(i + 1) * OBSERVATION_SIZE]);
+            write_action_mask_cells(state, &masks[i * NUM_ACTIONS..(i + 1) * NUM_ACTIONS]);
+        }
+    }
+}
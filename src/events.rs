@@ -1,7 +1,9 @@
 use pyo3::prelude::*;
+use pyo3::types::PyBytes;
 
 use crate::cards::{Card, CardInstance};
 use crate::enums::{EventType, Relic};
+use crate::serialize;
 
 /// Describes a single choice in an event.
 #[pyclass]
@@ -62,7 +64,7 @@ impl EventOutcome {
 }
 
 /// Event state machine. Tracks an event's current stage and applies choices.
-#[pyclass]
+#[pyclass(module = "sts_sim")]
 #[derive(Clone, Debug)]
 pub struct EventState {
     #[pyo3(get)]
@@ -72,7 +74,7 @@ pub struct EventState {
     #[pyo3(get)]
     pub done: bool,
     // Internal tracking
-    picks_made: i32,  // for KnowingSkull
+    pub(crate) picks_made: i32,  // for KnowingSkull
 }
 
 #[pymethods]
@@ -155,6 +157,30 @@ impl EventState {
         }
         outcome
     }
+
+    /// Compact, versioned binary encoding of this event state. Inverse of from_bytes.
+    pub fn to_bytes<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+        serialize::to_pybytes(py, self)
+    }
+
+    /// Decode to_bytes output. Raises ValueError on malformed or incompatible data.
+    #[staticmethod]
+    pub fn from_bytes(data: &[u8]) -> PyResult<Self> {
+        serialize::from_bytes(data)
+    }
+
+    pub fn __getstate__<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+        serialize::to_pybytes(py, self)
+    }
+
+    pub fn __setstate__(&mut self, state: &[u8]) -> PyResult<()> {
+        *self = serialize::from_bytes(state)?;
+        Ok(())
+    }
+
+    pub fn __reduce__<'py>(slf: &Bound<'py, Self>) -> PyResult<serialize::Reduced<'py>> {
+        serialize::reduce(slf)
+    }
 }
 
 // ============================================================
@@ -4,6 +4,7 @@ mod enums;
 mod creature;
 mod die;
 mod powers;
+mod piles;
 mod damage;
 mod cards;
 mod enemies;
@@ -15,6 +16,22 @@ mod map;
 mod rewards;
 mod shop;
 mod rest;
+mod rollout;
+mod parallel;
+mod actions;
+mod observation;
+mod env;
+mod state_hash;
+mod undo;
+mod rng;
+mod serialize;
+mod draws;
+mod mcts;
+mod turns;
+mod trace;
+mod perf;
+mod bench;
+mod run;
 
 #[pymodule]
 fn sts_sim(m: &Bound<'_, PyModule>) -> PyResult<()> {
@@ -45,10 +62,31 @@ fn sts_sim(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_class::<rest::RestSite>()?;
     m.add_class::<rest::RestChoice>()?;
     m.add_class::<rest::RestOutcome>()?;
+    m.add_class::<rollout::RolloutResults>()?;
+    m.add_class::<env::VecCombatEnv>()?;
+    m.add_class::<mcts::MctsTree>()?;
+    m.add_class::<mcts::MctsResult>()?;
+    m.add_class::<run::RunResult>()?;
+    m.add_class::<run::RunResults>()?;
     m.add_function(wrap_pyfunction!(encounters::create_encounter, m)?)?;
+    m.add_function(wrap_pyfunction!(encounters::create_monster, m)?)?;
     m.add_function(wrap_pyfunction!(events::create_event, m)?)?;
     m.add_function(wrap_pyfunction!(map::generate_map, m)?)?;
     m.add_function(wrap_pyfunction!(shop::create_shop, m)?)?;
     m.add_function(wrap_pyfunction!(rest::create_rest_site, m)?)?;
+    m.add_function(wrap_pyfunction!(parallel::run_combats_parallel, m)?)?;
+    m.add_function(wrap_pyfunction!(mcts::mcts_search, m)?)?;
+    m.add_function(wrap_pyfunction!(perf::set_perf_counters, m)?)?;
+    m.add_function(wrap_pyfunction!(perf::perf_counters, m)?)?;
+    m.add_function(wrap_pyfunction!(perf::reset_perf_counters, m)?)?;
+    m.add_function(wrap_pyfunction!(bench::run_native_benchmarks, m)?)?;
+    m.add_function(wrap_pyfunction!(run::simulate_run, m)?)?;
+    m.add_function(wrap_pyfunction!(run::simulate_runs, m)?)?;
+    let monster_ids: Vec<&str> = enemies::MonsterKind::ALL.iter()
+        .filter(|&&k| k != enemies::MonsterKind::Other)
+        .map(|k| k.id())
+        .collect();
+    m.add("MONSTER_IDS", monster_ids)?;
+    m.add("ENCOUNTER_NAMES", encounters::ENCOUNTER_NAMES.to_vec())?;
     Ok(())
 }
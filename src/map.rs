@@ -1,9 +1,11 @@
 use pyo3::prelude::*;
+use pyo3::types::PyBytes;
 use rand::rngs::StdRng;
 use rand::seq::SliceRandom;
 use rand::{Rng, SeedableRng};
 
 use crate::enums::RoomType;
+use crate::serialize;
 
 /// A single node on the Act 1 map.
 #[pyclass]
@@ -20,7 +22,7 @@ pub struct MapNode {
 }
 
 /// The full Act 1 map.
-#[pyclass]
+#[pyclass(module = "sts_sim")]
 #[derive(Clone, Debug)]
 pub struct ActMap {
     #[pyo3(get)]
@@ -56,6 +58,30 @@ impl ActMap {
             vec![]
         }
     }
+
+    /// Compact, versioned binary encoding of this map. Inverse of from_bytes.
+    pub fn to_bytes<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+        serialize::to_pybytes(py, self)
+    }
+
+    /// Decode to_bytes output. Raises ValueError on malformed or incompatible data.
+    #[staticmethod]
+    pub fn from_bytes(data: &[u8]) -> PyResult<Self> {
+        serialize::from_bytes(data)
+    }
+
+    pub fn __getstate__<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+        serialize::to_pybytes(py, self)
+    }
+
+    pub fn __setstate__(&mut self, state: &[u8]) -> PyResult<()> {
+        *self = serialize::from_bytes(state)?;
+        Ok(())
+    }
+
+    pub fn __reduce__<'py>(slf: &Bound<'py, Self>) -> PyResult<serialize::Reduced<'py>> {
+        serialize::reduce(slf)
+    }
 }
 
 // Layout templates: each row is a 7-char string, chars = room type
@@ -0,0 +1,600 @@
+use pyo3::prelude::*;
+use rand::Rng;
+use std::collections::VecDeque;
+use std::ops::Range;
+use std::sync::atomic::{AtomicU16, AtomicU32, AtomicU64, AtomicUsize, Ordering};
+use std::time::{Duration, Instant};
+
+use crate::actions::{apply_action, write_action_mask, Action, NUM_ACTIONS};
+use crate::combat::CombatState;
+use crate::parallel::parallel_map;
+use crate::rng::{self, SimRng};
+use crate::rollout::{play_out, Policy};
+
+/// Missing parent, child or sibling link.
+const NIL: u32 = u32::MAX;
+
+/// Tree node. Statistics are atomics so worker threads can update a shared tree without
+/// locks; the links are written once, before the node is published to its parent.
+#[derive(Debug)]
+struct Node {
+    parent: AtomicU32,
+    action: AtomicU16,
+    first_child: AtomicU32,
+    next_sibling: AtomicU32,
+    visits: AtomicU32,
+    /// f64 bits of the summed playout values.
+    value_sum: AtomicU64,
+}
+
+impl Node {
+    fn new(parent: u32, action: usize, visits: u32, value_sum: f64) -> Node {
+        Node {
+            parent: AtomicU32::new(parent),
+            action: AtomicU16::new(action as u16),
+            first_child: AtomicU32::new(NIL),
+            next_sibling: AtomicU32::new(NIL),
+            visits: AtomicU32::new(visits),
+            value_sum: AtomicU64::new(value_sum.to_bits()),
+        }
+    }
+
+    fn action(&self) -> usize {
+        self.action.load(Ordering::Relaxed) as usize
+    }
+
+    fn visits(&self) -> u32 {
+        self.visits.load(Ordering::Relaxed)
+    }
+
+    fn value_sum(&self) -> f64 {
+        f64::from_bits(self.value_sum.load(Ordering::Relaxed))
+    }
+
+    fn add_value(&self, value: f64) {
+        let _ = self.value_sum.fetch_update(Ordering::Relaxed, Ordering::Relaxed, |bits| {
+            Some((f64::from_bits(bits) + value).to_bits())
+        });
+    }
+}
+
+impl Clone for Node {
+    fn clone(&self) -> Node {
+        Node {
+            parent: AtomicU32::new(self.parent.load(Ordering::Relaxed)),
+            action: AtomicU16::new(self.action.load(Ordering::Relaxed)),
+            first_child: AtomicU32::new(self.first_child.load(Ordering::Relaxed)),
+            next_sibling: AtomicU32::new(self.next_sibling.load(Ordering::Relaxed)),
+            visits: AtomicU32::new(self.visits()),
+            value_sum: AtomicU64::new(self.value_sum.load(Ordering::Relaxed)),
+        }
+    }
+}
+
+/// Open-loop search tree: a node stands for a sequence of actions from the root, and its
+/// statistics average over every draw and die roll sampled along that sequence. Nodes
+/// live in an arena with the root at index 0, and a parent always comes before its
+/// children. Children are a linked list that grows by compare-and-swap at the head, so
+/// several threads can expand the same tree; `reserve` must make room first.
+#[derive(Debug)]
+pub struct Tree {
+    nodes: Vec<Node>,
+    used: AtomicU32,
+    iterations: u64,
+}
+
+impl Default for Tree {
+    fn default() -> Self {
+        Tree::new()
+    }
+}
+
+impl Clone for Tree {
+    fn clone(&self) -> Tree {
+        Tree {
+            nodes: self.nodes[..self.len()].to_vec(),
+            used: AtomicU32::new(self.len() as u32),
+            iterations: self.iterations,
+        }
+    }
+}
+
+impl Tree {
+    pub fn new() -> Tree {
+        Tree { nodes: vec![Node::new(NIL, 0, 0, 0.0)], used: AtomicU32::new(1), iterations: 0 }
+    }
+
+    pub fn len(&self) -> usize {
+        self.used.load(Ordering::Relaxed) as usize
+    }
+
+    /// Make room for `extra` more nodes without reallocating.
+    fn reserve(&mut self, extra: usize) {
+        let len = self.len();
+        self.nodes.truncate(len);
+        self.nodes.resize_with(len + extra, || Node::new(NIL, 0, 0, 0.0));
+    }
+
+    fn alloc(&self) -> u32 {
+        let id = self.used.fetch_add(1, Ordering::Relaxed);
+        assert!((id as usize) < self.nodes.len(), "search tree arena is full");
+        id
+    }
+
+    fn children(&self, node: u32) -> impl Iterator<Item = u32> + '_ {
+        let mut next = self.nodes[node as usize].first_child.load(Ordering::Acquire);
+        std::iter::from_fn(move || {
+            let c = next;
+            if c == NIL {
+                return None;
+            }
+            next = self.nodes[c as usize].next_sibling.load(Ordering::Relaxed);
+            Some(c)
+        })
+    }
+
+    fn child(&self, node: u32, action: usize) -> Option<u32> {
+        self.children(node).find(|&c| self.nodes[c as usize].action() == action)
+    }
+
+    /// The child of `node` for `action`, adding it if no thread has yet. `spare` holds a
+    /// slot allocated by an attempt that lost a race, for reuse by the next insert.
+    fn insert_child(&self, node: u32, action: usize, spare: &mut Option<u32>) -> u32 {
+        let link = &self.nodes[node as usize].first_child;
+        let mut head = link.load(Ordering::Acquire);
+        loop {
+            let mut c = head;
+            while c != NIL {
+                let n = &self.nodes[c as usize];
+                if n.action() == action {
+                    return c;
+                }
+                c = n.next_sibling.load(Ordering::Relaxed);
+            }
+            let id = *spare.get_or_insert_with(|| self.alloc());
+            let n = &self.nodes[id as usize];
+            n.parent.store(node, Ordering::Relaxed);
+            n.action.store(action as u16, Ordering::Relaxed);
+            n.next_sibling.store(head, Ordering::Relaxed);
+            match link.compare_exchange(head, id, Ordering::Release, Ordering::Acquire) {
+                Ok(_) => {
+                    *spare = None;
+                    return id;
+                }
+                Err(current) => head = current,
+            }
+        }
+    }
+
+    /// Copy of the subtree under `root`, renumbered breadth-first from 0. Unused and
+    /// unreachable arena slots are dropped.
+    fn subtree(&self, root: u32) -> Tree {
+        let r = &self.nodes[root as usize];
+        let mut out = Tree::new();
+        out.nodes[0] = Node::new(NIL, r.action(), r.visits(), r.value_sum());
+        let mut queue = VecDeque::from([(root, 0u32)]);
+        while let Some((old, new)) = queue.pop_front() {
+            let mut prev = NIL;
+            for c in self.children(old) {
+                let n = &self.nodes[c as usize];
+                let id = out.nodes.len() as u32;
+                out.nodes.push(Node::new(new, n.action(), n.visits(), n.value_sum()));
+                let link = if prev == NIL { &out.nodes[new as usize].first_child } else { &out.nodes[prev as usize].next_sibling };
+                link.store(id, Ordering::Relaxed);
+                prev = id;
+                queue.push_back((c, id));
+            }
+        }
+        out.used = AtomicU32::new(out.nodes.len() as u32);
+        out.iterations = r.visits() as u64;
+        out
+    }
+
+    /// Drop the unused end of the arena after a search; `compact` also drops slots a
+    /// lost insert race left allocated but unlinked.
+    fn finish(&mut self, compact: bool) {
+        self.nodes.truncate(self.len());
+        if compact {
+            let iterations = self.iterations;
+            *self = self.subtree(0);
+            self.iterations = iterations;
+        }
+    }
+
+    /// Re-root the tree at the child reached by `action`, keeping its subtree so its
+    /// statistics carry over to the next search. Returns false, leaving an empty tree,
+    /// if that action was never explored.
+    pub fn advance(&mut self, action: usize) -> bool {
+        match self.child(0, action) {
+            Some(child) => {
+                *self = self.subtree(child);
+                true
+            }
+            None => {
+                *self = Tree::new();
+                false
+            }
+        }
+    }
+
+    /// Add the statistics `worker` gathered on top of `base` into this tree, which must
+    /// start out equal to `base` (it may already hold other workers' results). `worker`
+    /// must be a clone of `base` grown by a single thread, so base nodes keep their ids.
+    fn merge(&mut self, base: &Tree, worker: &Tree) {
+        self.reserve(worker.len() - base.len());
+        let mut spare = None;
+        let mut ids: Vec<u32> = Vec::with_capacity(worker.len());
+        for (id, node) in worker.nodes[..worker.len()].iter().enumerate() {
+            let (target, visits, value_sum) = match base.nodes[..base.len()].get(id) {
+                Some(b) => (id as u32, node.visits() - b.visits(), node.value_sum() - b.value_sum()),
+                None => {
+                    let parent = ids[node.parent.load(Ordering::Relaxed) as usize];
+                    (self.insert_child(parent, node.action(), &mut spare), node.visits(), node.value_sum())
+                }
+            };
+            ids.push(target);
+            let t = &self.nodes[target as usize];
+            t.visits.fetch_add(visits, Ordering::Relaxed);
+            t.add_value(value_sum);
+        }
+        self.iterations += worker.iterations - base.iterations;
+        self.finish(false);
+    }
+}
+
+/// How several threads share one search.
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub enum Parallelism {
+    /// All threads grow one shared tree, with virtual loss spreading them over branches.
+    Tree,
+    /// Each thread grows its own copy of the tree; the copies are merged at the end.
+    Root,
+}
+
+impl Parallelism {
+    pub fn from_name(name: &str) -> PyResult<Parallelism> {
+        match name {
+            "tree" => Ok(Parallelism::Tree),
+            "root" => Ok(Parallelism::Root),
+            _ => Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                format!("Unknown parallel mode: {}", name),
+            )),
+        }
+    }
+}
+
+#[derive(Clone, Copy, Debug)]
+pub struct SearchParams {
+    pub iterations: usize,
+    pub exploration: f64,
+    pub policy: Policy,
+    pub max_turns: i32,
+    pub seed: u64,
+    /// Visits added to each node on the way down and taken back on the way up, so other
+    /// threads see in-flight paths as losses and pick different branches.
+    pub virtual_loss: u32,
+    /// Stop early once this much time has passed.
+    pub time_limit: Option<Duration>,
+}
+
+/// Value of a finished playout in [0, 1]: 0 for a loss or running out of turns, and 0.5
+/// plus half the fraction of HP kept for a win, so the search prefers winning first and
+/// winning healthy second.
+pub fn outcome_value(state: &CombatState) -> f64 {
+    if !state.player_won {
+        return 0.0;
+    }
+    let hp = state.player.hp.max(0) as f64 / state.player.max_hp.max(1) as f64;
+    0.5 + 0.5 * hp.min(1.0)
+}
+
+/// Reusable per-worker buffers, so iterations don't allocate once warm.
+struct Scratch {
+    sim: CombatState,
+    mask: [u8; NUM_ACTIONS],
+    untried: Vec<usize>,
+    path: Vec<u32>,
+    spare: Option<u32>,
+}
+
+impl Scratch {
+    fn new(root: &CombatState) -> Scratch {
+        Scratch { sim: root.clone(), mask: [0; NUM_ACTIONS], untried: Vec::new(), path: Vec::new(), spare: None }
+    }
+}
+
+/// One selection, expansion, playout and backup pass. `stream` picks the random
+/// outcomes for this iteration: the order of the draw pile (unknown to the player),
+/// later shuffles and die rolls, and the rollout policy's choices.
+fn iterate(tree: &Tree, root: &CombatState, params: &SearchParams, stream: u64, s: &mut Scratch) {
+    let mut rng: SimRng = rng::stream_rng(params.seed, stream);
+    let sim = &mut s.sim;
+    sim.clone_from(root);
+    sim.rng = rng::fork(&root.rng, stream);
+    sim.die = root.die.fork(stream);
+    sim.player.draw_pile.shuffle(&mut rng, &sim.deck);
+
+    let vl = params.virtual_loss;
+    s.path.clear();
+    s.path.push(0);
+    tree.nodes[0].visits.fetch_add(vl, Ordering::Relaxed);
+    let mut node = 0u32;
+    while !sim.combat_over && sim.turn_number <= params.max_turns {
+        write_action_mask(sim, &mut s.mask);
+        s.untried.clear();
+        s.untried.extend((0..NUM_ACTIONS).filter(|&a| s.mask[a] != 0));
+        let mut best = None;
+        let mut best_score = f64::NEG_INFINITY;
+        let log_n = (tree.nodes[node as usize].visits().max(1) as f64).ln();
+        for c in tree.children(node) {
+            let child = &tree.nodes[c as usize];
+            let action = child.action();
+            if s.mask[action] == 0 {
+                continue;
+            }
+            s.untried.retain(|&a| a != action);
+            let n = child.visits().max(1) as f64;
+            let score = child.value_sum() / n + params.exploration * (log_n / n).sqrt();
+            if score > best_score {
+                best_score = score;
+                best = Some(c);
+            }
+        }
+        if !s.untried.is_empty() {
+            let action = s.untried[rng.gen_range(0..s.untried.len())];
+            node = tree.insert_child(node, action, &mut s.spare);
+            tree.nodes[node as usize].visits.fetch_add(vl, Ordering::Relaxed);
+            s.path.push(node);
+            apply_action(sim, Action::from_index(action).expect("masked actions are in range"));
+            break;
+        }
+        // Every legal action has a child; follow the best by UCB1.
+        let Some(c) = best else { break };
+        node = c;
+        tree.nodes[node as usize].visits.fetch_add(vl, Ordering::Relaxed);
+        s.path.push(node);
+        apply_action(sim, Action::from_index(tree.nodes[node as usize].action()).expect("tree actions are in range"));
+    }
+
+    if !sim.combat_over {
+        play_out(sim, params.policy, &mut rng, params.max_turns);
+    }
+    let value = outcome_value(sim);
+    for &id in &s.path {
+        let n = &tree.nodes[id as usize];
+        if vl != 1 {
+            n.visits.fetch_add(1u32.wrapping_sub(vl), Ordering::Relaxed);
+        }
+        n.add_value(value);
+    }
+}
+
+/// Most iterations run between arena resizes (unless the tree is already bigger), so a
+/// time-limited search with a large iteration cap doesn't reserve nodes it never uses.
+const ROUND: usize = 1 << 16;
+
+/// Run iterations taken from the shared counter `next` until it reaches `end` or
+/// `deadline` passes. Returns the number run and whether a spare arena slot was left.
+fn work(tree: &Tree, root: &CombatState, params: &SearchParams, first_stream: u64,
+        next: &AtomicUsize, end: usize, deadline: Option<Instant>) -> (usize, bool) {
+    let mut scratch = Scratch::new(root);
+    let mut done = 0;
+    while deadline.map_or(true, |d| Instant::now() < d) {
+        let i = next.fetch_add(1, Ordering::Relaxed);
+        if i >= end {
+            break;
+        }
+        iterate(tree, root, params, first_stream + i as u64, &mut scratch);
+        done += 1;
+    }
+    (done, scratch.spare.is_some())
+}
+
+/// Run iterations `streams` (offset by `first_stream`) into `tree` on `threads` threads
+/// sharing it, in rounds that each reserve room for their new nodes.
+fn grow(tree: &mut Tree, root: &CombatState, params: &SearchParams, first_stream: u64,
+        streams: Range<usize>, threads: usize, deadline: Option<Instant>) -> usize {
+    let mut done = 0;
+    let mut start = streams.start;
+    while start < streams.end && deadline.map_or(true, |d| Instant::now() < d) {
+        let end = streams.end.min(start + ROUND.max(tree.len()));
+        tree.reserve(end - start + threads);
+        let next = AtomicUsize::new(start);
+        let shared: &Tree = tree;
+        let workers = parallel_map(threads, threads, |_| {
+            work(shared, root, params, first_stream, &next, end, deadline)
+        });
+        done += workers.iter().map(|w| w.0).sum::<usize>();
+        tree.finish(workers.iter().any(|w| w.1));
+        start = end;
+    }
+    tree.iterations += done as u64;
+    done
+}
+
+/// Run up to `params.iterations` iterations into `tree` from `root` and return how many
+/// ran. Iteration i uses random stream `tree.iterations + i`, so a single-threaded search
+/// is reproducible; a tree-parallel one depends on how the threads interleave.
+pub fn search(tree: &mut Tree, root: &CombatState, params: &SearchParams, threads: usize, mode: Parallelism) -> usize {
+    let threads = threads.max(1).min(params.iterations.max(1));
+    let deadline = params.time_limit.map(|t| Instant::now() + t);
+    let first_stream = tree.iterations;
+    match mode {
+        Parallelism::Tree => grow(tree, root, params, first_stream, 0..params.iterations, threads, deadline),
+        Parallelism::Root => {
+            // Worker w owns a contiguous block of streams.
+            let base = tree.clone();
+            let workers = parallel_map(threads, threads, |w| {
+                let start = params.iterations * w / threads;
+                let end = params.iterations * (w + 1) / threads;
+                let mut local = base.clone();
+                grow(&mut local, root, params, first_stream, start..end, 1, deadline);
+                local
+            });
+            for worker in &workers {
+                tree.merge(&base, worker);
+            }
+            (tree.iterations - first_stream) as usize
+        }
+    }
+}
+
+/// Per-action statistics at the root: every legal action in `root`, with the visits
+/// and mean value of its child (0 if never explored).
+pub fn root_stats(tree: &Tree, root: &CombatState) -> (Vec<usize>, Vec<u32>, Vec<f64>) {
+    let mut mask = [0u8; NUM_ACTIONS];
+    write_action_mask(root, &mut mask);
+    let actions: Vec<usize> = (0..NUM_ACTIONS).filter(|&a| mask[a] != 0).collect();
+    let mut visits = Vec::with_capacity(actions.len());
+    let mut values = Vec::with_capacity(actions.len());
+    for &a in &actions {
+        match tree.child(0, a).map(|c| &tree.nodes[c as usize]) {
+            Some(n) if n.visits() > 0 => {
+                visits.push(n.visits());
+                values.push(n.value_sum() / n.visits() as f64);
+            }
+            _ => {
+                visits.push(0);
+                values.push(0.0);
+            }
+        }
+    }
+    (actions, visits, values)
+}
+
+/// Search tree kept between moves. Pass it to mcts_search, then call advance() with the
+/// action actually played so the next search starts from that subtree.
+#[pyclass]
+#[derive(Clone, Debug, Default)]
+pub struct MctsTree {
+    pub tree: Tree,
+}
+
+#[pymethods]
+impl MctsTree {
+    #[new]
+    pub fn new() -> Self {
+        MctsTree { tree: Tree::new() }
+    }
+
+    /// Re-root at the child for flat action index `action`. Returns False (and clears the
+    /// tree) if the action was never explored.
+    pub fn advance(&mut self, action: usize) -> bool {
+        self.tree.advance(action)
+    }
+
+    /// Iterations that passed through the current root.
+    #[getter]
+    pub fn root_visits(&self) -> u32 {
+        self.tree.nodes[0].visits()
+    }
+
+    fn __len__(&self) -> usize {
+        self.tree.len()
+    }
+}
+
+/// Root statistics of a search, one entry per legal action.
+#[pyclass]
+#[derive(Clone, Debug, Default)]
+pub struct MctsResult {
+    /// Flat action indices (see CombatState.action_mask).
+    #[pyo3(get)]
+    pub action_indices: Vec<usize>,
+    /// play_card arguments (hand_index, target, choice) per action, or None for end turn.
+    #[pyo3(get)]
+    pub actions: Vec<Option<(usize, Option<usize>, Option<usize>)>>,
+    #[pyo3(get)]
+    pub visits: Vec<u32>,
+    /// Mean playout value in [0, 1] per action (see mcts_search).
+    #[pyo3(get)]
+    pub values: Vec<f64>,
+    /// Iterations run by this search (fewer than requested if time_limit ran out).
+    #[pyo3(get)]
+    pub iterations: usize,
+}
+
+#[pymethods]
+impl MctsResult {
+    fn __len__(&self) -> usize {
+        self.action_indices.len()
+    }
+
+    /// Flat index of the most visited action (ties go to the higher value), or None if
+    /// there are no legal actions.
+    pub fn best_action(&self) -> Option<usize> {
+        (0..self.action_indices.len())
+            .max_by(|&a, &b| {
+                self.visits[a].cmp(&self.visits[b])
+                    .then(self.values[a].total_cmp(&self.values[b]))
+            })
+            .map(|i| self.action_indices[i])
+    }
+}
+
+/// Monte Carlo tree search from `state` over the flat action space (hand slot x target x
+/// choice, plus end turn). Playouts use `rollout_policy` and are scored 0 for a loss or
+/// running past `max_turns`, and 0.5 plus half the fraction of HP kept for a win. The
+/// search is open-loop: each iteration samples its own draw pile order, shuffles and die
+/// rolls. Pass an MctsTree to keep statistics between moves.
+///
+/// With `threads` > 1, `parallel="tree"` has every thread grow one shared tree, using
+/// `virtual_loss` to keep them on different branches, and `parallel="root"` grows one
+/// tree per thread and merges them. `time_limit` (seconds) stops the search early;
+/// `iterations` is then an upper bound. Only single-threaded searches are reproducible.
+#[pyfunction]
+#[pyo3(signature = (state, iterations=1000, exploration=1.4, rollout_policy="random", threads=1, tree=None, max_turns=50, seed=None, parallel="tree", virtual_loss=1, time_limit=None))]
+pub fn mcts_search(
+    py: Python<'_>,
+    state: &CombatState,
+    iterations: usize,
+    exploration: f64,
+    rollout_policy: &str,
+    threads: usize,
+    tree: Option<&Bound<'_, MctsTree>>,
+    max_turns: i32,
+    seed: Option<u64>,
+    parallel: &str,
+    virtual_loss: u32,
+    time_limit: Option<f64>,
+) -> PyResult<MctsResult> {
+    let policy = Policy::from_name(rollout_policy)?;
+    let mode = Parallelism::from_name(parallel)?;
+    if !(exploration >= 0.0 && exploration.is_finite()) {
+        return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+            format!("exploration must be a non-negative number (got {})", exploration),
+        ));
+    }
+    let time_limit = match time_limit {
+        Some(t) if t >= 0.0 && t.is_finite() => Some(Duration::from_secs_f64(t)),
+        Some(t) => {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                format!("time_limit must be a non-negative number of seconds (got {})", t),
+            ))
+        }
+        None => None,
+    };
+    if state.turn_number == 0 {
+        return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+            "Combat has not started; call start_combat() first",
+        ));
+    }
+    let iterations = if state.combat_over { 0 } else { iterations };
+    let params = SearchParams {
+        iterations, exploration, policy, max_turns, seed: seed.unwrap_or(0), virtual_loss, time_limit,
+    };
+    let mut local = MctsTree::new();
+    let mut shared = tree.map(|t| t.try_borrow_mut()).transpose()?;
+    let tree = match shared.as_mut() {
+        Some(t) => &mut t.tree,
+        None => &mut local.tree,
+    };
+    let (iterations, (action_indices, visits, values)) = py.allow_threads(|| {
+        let done = if iterations > 0 { search(tree, state, &params, threads, mode) } else { 0 };
+        (done, root_stats(tree, state))
+    });
+    let actions = action_indices.iter()
+        .map(|&a| Action::from_index(a).expect("masked actions are in range").play_args(state))
+        .collect();
+    Ok(MctsResult { action_indices, actions, visits, values, iterations })
+}
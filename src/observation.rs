@@ -0,0 +1,112 @@
+use std::cell::Cell;
+
+use crate::actions::MAX_MONSTERS;
+use crate::cards::NUM_CARDS;
+use crate::combat::CombatState;
+use crate::enums::{OrbType, Stance, NUM_INTENTS, NUM_POWERS};
+
+// Fixed observation layout (all values are raw, unnormalized f32):
+//   player scalars    hp, max_hp, block, energy, max_energy, turn_number
+//   stance            one-hot [Neutral, Wrath, Calm]
+//   orbs              orb_slots, then count of [Lightning, Frost, Dark]
+//   player powers     NUM_POWERS amounts, indexed by PowerType
+//   pile sizes        hand, draw, discard, exhaust
+//   hand              NUM_CARDS counts, indexed by Card
+//   draw pile         NUM_CARDS counts, indexed by Card
+//   discard pile      NUM_CARDS counts, indexed by Card
+//   exhaust pile      NUM_CARDS counts, indexed by Card
+//   monsters          MAX_MONSTERS slots of MONSTER_FEATURES; empty slots are zero
+const PLAYER_SCALARS: usize = 6;
+const STANCES: usize = 3;
+const ORB_FEATURES: usize = 4;
+const PILE_SIZES: usize = 4;
+/// Per-monster features: alive, hp, max_hp, block, intent one-hot, powers.
+pub const MONSTER_FEATURES: usize = 4 + NUM_INTENTS + NUM_POWERS;
+
+const PLAYER_OFFSET: usize = 0;
+const STANCE_OFFSET: usize = PLAYER_OFFSET + PLAYER_SCALARS;
+const ORB_OFFSET: usize = STANCE_OFFSET + STANCES;
+const POWER_OFFSET: usize = ORB_OFFSET + ORB_FEATURES;
+const PILE_OFFSET: usize = POWER_OFFSET + NUM_POWERS;
+const HAND_OFFSET: usize = PILE_OFFSET + PILE_SIZES;
+const DRAW_OFFSET: usize = HAND_OFFSET + NUM_CARDS;
+const DISCARD_OFFSET: usize = DRAW_OFFSET + NUM_CARDS;
+const EXHAUST_OFFSET: usize = DISCARD_OFFSET + NUM_CARDS;
+const MONSTER_OFFSET: usize = EXHAUST_OFFSET + NUM_CARDS;
+
+/// Length of the observation vector.
+pub const OBSERVATION_SIZE: usize = MONSTER_OFFSET + MAX_MONSTERS * MONSTER_FEATURES;
+
+/// Encode `state` into `out`, which must be exactly OBSERVATION_SIZE long.
+pub fn encode(state: &CombatState, out: &mut [f32]) {
+    encode_cells(state, Cell::from_mut(out).as_slice_of_cells());
+}
+
+/// Encode `state` into shared cells, e.g. a writable Python buffer.
+pub fn encode_cells(state: &CombatState, out: &[Cell<f32>]) {
+    assert_eq!(out.len(), OBSERVATION_SIZE, "observation buffer has the wrong length");
+    for c in out {
+        c.set(0.0);
+    }
+    let set = |i: usize, v: f32| out[i].set(v);
+    let add = |i: usize, v: f32| out[i].set(out[i].get() + v);
+    let p = &state.player;
+
+    let scalars = [p.hp, p.max_hp, p.block, p.energy, p.max_energy, state.turn_number];
+    for (i, v) in scalars.iter().enumerate() {
+        set(PLAYER_OFFSET + i, *v as f32);
+    }
+
+    let stance = match p.stance {
+        Stance::Neutral => 0,
+        Stance::Wrath => 1,
+        Stance::Calm => 2,
+    };
+    set(STANCE_OFFSET + stance, 1.0);
+
+    set(ORB_OFFSET, p.orb_slots as f32);
+    for orb in &p.orbs {
+        let slot = match orb {
+            OrbType::Lightning => 1,
+            OrbType::Frost => 2,
+            OrbType::Dark => 3,
+        };
+        add(ORB_OFFSET + slot, 1.0);
+    }
+
+    for (power, amount) in p.powers.iter() {
+        set(POWER_OFFSET + power as usize, amount as f32);
+    }
+
+    set(PILE_OFFSET, p.hand_indices.len() as f32);
+    set(PILE_OFFSET + 1, p.draw_pile.len() as f32);
+    set(PILE_OFFSET + 2, p.discard_pile.len() as f32);
+    set(PILE_OFFSET + 3, p.exhaust_pile.len() as f32);
+
+    let piles = [
+        (HAND_OFFSET, &p.hand_indices),
+        (DRAW_OFFSET, &p.draw_pile),
+        (DISCARD_OFFSET, &p.discard_pile),
+        (EXHAUST_OFFSET, &p.exhaust_pile),
+    ];
+    for (offset, pile) in piles {
+        for &deck_idx in pile {
+            add(offset + state.deck[deck_idx].card as usize, 1.0);
+        }
+    }
+
+    for (slot, m) in state.monsters.iter().take(MAX_MONSTERS).enumerate() {
+        let base = MONSTER_OFFSET + slot * MONSTER_FEATURES;
+        if m.is_dead() {
+            continue;
+        }
+        set(base, 1.0);
+        set(base + 1, m.hp as f32);
+        set(base + 2, m.max_hp as f32);
+        set(base + 3, m.block as f32);
+        set(base + 4 + m.intent as usize, 1.0);
+        for (power, amount) in m.powers.iter() {
+            set(base + 4 + NUM_INTENTS + power as usize, amount as f32);
+        }
+    }
+}
@@ -0,0 +1,128 @@
+use pyo3::prelude::*;
+use rand::SeedableRng;
+use std::collections::HashSet;
+use std::sync::atomic::{AtomicUsize, Ordering};
+
+use crate::cards::CardInstance;
+use crate::encounters::build_encounter;
+use crate::enums::Character;
+use crate::rng::SimRng;
+use crate::rollout::{play_out, Policy, RolloutResults};
+
+/// Number of worker threads to use when the caller doesn't say.
+pub fn default_threads() -> usize {
+    std::thread::available_parallelism().map(|n| n.get()).unwrap_or(1)
+}
+
+/// Evaluate `f(i)` for every i in 0..n on `threads` worker threads, returning results in
+/// index order. Workers pull small chunks from a shared counter, so uneven job lengths
+/// (a jaw worm next to a boss fight) still balance across threads.
+pub fn parallel_map<T, F>(n: usize, threads: usize, f: F) -> Vec<T>
+where
+    T: Send,
+    F: Fn(usize) -> T + Sync,
+{
+    let threads = threads.max(1).min(n.max(1));
+    if threads == 1 {
+        return (0..n).map(&f).collect();
+    }
+    let chunk = (n / (threads * 8)).clamp(1, 256);
+    let next = AtomicUsize::new(0);
+    let parts: Vec<Vec<(usize, T)>> = std::thread::scope(|scope| {
+        let workers: Vec<_> = (0..threads)
+            .map(|_| {
+                scope.spawn(|| {
+                    let mut local = Vec::new();
+                    loop {
+                        let start = next.fetch_add(chunk, Ordering::Relaxed);
+                        if start >= n {
+                            break;
+                        }
+                        for i in start..(start + chunk).min(n) {
+                            local.push((i, f(i)));
+                        }
+                    }
+                    local
+                })
+            })
+            .collect();
+        workers.into_iter().map(|w| w.join().expect("worker thread panicked")).collect()
+    });
+
+    let mut slots: Vec<Option<T>> = (0..n).map(|_| None).collect();
+    for (i, value) in parts.into_iter().flatten() {
+        slots[i] = Some(value);
+    }
+    slots.into_iter().map(|v| v.expect("every index is evaluated once")).collect()
+}
+
+/// Pick element `i` of a per-combat argument that is either broadcast (length 1) or
+/// given once per combat.
+fn broadcast<T>(values: &[T], i: usize) -> &T {
+    if values.len() == 1 { &values[0] } else { &values[i] }
+}
+
+fn check_len(name: &str, len: usize, n: usize) -> PyResult<()> {
+    if len == 1 || len == n {
+        Ok(())
+    } else {
+        Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+            "{} must have length 1 or {} (got {})", name, n, len,
+        )))
+    }
+}
+
+/// Build and play out one combat per seed on a pool of worker threads.
+///
+/// `encounters`, `characters` and `decks` are either a single value broadcast to every
+/// combat or one value per seed. A missing deck means the character's starter deck.
+/// Results are in seed order and don't depend on the thread count.
+#[pyfunction]
+#[pyo3(signature = (encounters, seeds, characters=None, decks=None, policy="random", threads=None, max_turns=50))]
+pub fn run_combats_parallel(
+    py: Python<'_>,
+    encounters: Vec<String>,
+    seeds: Vec<u64>,
+    characters: Option<Vec<Character>>,
+    decks: Option<Vec<Vec<CardInstance>>>,
+    policy: &str,
+    threads: Option<usize>,
+    max_turns: i32,
+) -> PyResult<RolloutResults> {
+    let policy = Policy::from_name(policy)?;
+    let n = seeds.len();
+    let characters = characters.unwrap_or_else(|| vec![Character::Ironclad]);
+    check_len("encounters", encounters.len(), n)?;
+    check_len("characters", characters.len(), n)?;
+    if let Some(d) = &decks {
+        check_len("decks", d.len(), n)?;
+    }
+    let names: HashSet<&str> = encounters.iter().map(|e| e.as_str()).collect();
+    for name in names {
+        if build_encounter(name, Some(0), None).is_none() {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                format!("Unknown encounter: {}", name),
+            ));
+        }
+    }
+    if n == 0 {
+        return Ok(RolloutResults::default());
+    }
+
+    let threads = threads.unwrap_or_else(default_threads);
+    let outcomes = py.allow_threads(|| {
+        parallel_map(n, threads, |i| {
+            let seed = seeds[i];
+            let name = broadcast(&encounters, i);
+            let character = *broadcast(&characters, i);
+            let mut state = build_encounter(name, Some(seed), Some(character))
+                .expect("encounter names are validated up front");
+            if let Some(d) = &decks {
+                state.deck = broadcast(d, i).clone();
+            }
+            let mut rng = SimRng::seed_from_u64(seed.wrapping_add(2));
+            play_out(&mut state, policy, &mut rng, max_turns)
+        })
+    });
+    Ok(outcomes.into_iter().collect())
+}
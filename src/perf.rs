@@ -0,0 +1,180 @@
+use std::collections::HashMap;
+use std::sync::atomic::{AtomicBool, AtomicU64, Ordering};
+use std::time::Instant;
+
+use pyo3::prelude::*;
+
+use crate::cards::{Card, ALL_CARDS, NUM_CARDS};
+use crate::enemies::{MonsterKind, NUM_MONSTER_KINDS};
+
+// Process-wide hot-path counters, off by default. Each instrumented call site holds a
+// Sample guard; with counting off that is a single relaxed load. With counting on, every
+// call is counted and one call in SAMPLE_EVERY per counter is timed, so the clock reads
+// stay off most calls. Times are inclusive: a card replayed by Havoc or Double Tap is
+// also inside the time of the card that played it.
+static ENABLED: AtomicBool = AtomicBool::new(false);
+static SAMPLE_EVERY: AtomicU64 = AtomicU64::new(16);
+
+/// Relic hooks in relics.rs.
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub enum RelicHook {
+    CombatStart,
+    TurnStart,
+    TurnEnd,
+    DieRoll,
+    CardPlay,
+    Shuffle,
+    Victory,
+    MonsterTurnStart,
+}
+
+const RELIC_HOOKS: [&str; 8] = [
+    "on_combat_start", "on_turn_start", "on_turn_end", "on_die_roll", "on_card_play",
+    "on_shuffle", "on_victory", "on_monster_turn_start",
+];
+
+// Counter slots: one per card, one per monster kind, then the single counters, then one
+// per relic hook.
+const PLAY_CARD: usize = 0;
+const MONSTER_MOVE: usize = PLAY_CARD + NUM_CARDS;
+const CLONE: usize = MONSTER_MOVE + NUM_MONSTER_KINDS;
+const DRAW: usize = CLONE + 1;
+const RESHUFFLE: usize = DRAW + 1;
+const RELIC_HOOK: usize = RESHUFFLE + 1;
+const NUM_SLOTS: usize = RELIC_HOOK + RELIC_HOOKS.len();
+
+struct Counter {
+    calls: AtomicU64,
+    timed: AtomicU64,
+    ns: AtomicU64,
+}
+
+static COUNTERS: [Counter; NUM_SLOTS] = [const {
+    Counter { calls: AtomicU64::new(0), timed: AtomicU64::new(0), ns: AtomicU64::new(0) }
+}; NUM_SLOTS];
+
+/// Records one call on creation and, for sampled calls, its duration on drop.
+pub struct Sample(Option<(usize, Instant)>);
+
+impl Drop for Sample {
+    fn drop(&mut self) {
+        if let Some((slot, start)) = self.0 {
+            let c = &COUNTERS[slot];
+            c.timed.fetch_add(1, Ordering::Relaxed);
+            c.ns.fetch_add(start.elapsed().as_nanos() as u64, Ordering::Relaxed);
+        }
+    }
+}
+
+#[inline]
+fn sample(slot: usize) -> Sample {
+    if !ENABLED.load(Ordering::Relaxed) {
+        return Sample(None);
+    }
+    start(slot)
+}
+
+#[cold]
+fn start(slot: usize) -> Sample {
+    let n = COUNTERS[slot].calls.fetch_add(1, Ordering::Relaxed);
+    if n % SAMPLE_EVERY.load(Ordering::Relaxed) == 0 {
+        Sample(Some((slot, Instant::now())))
+    } else {
+        Sample(None)
+    }
+}
+
+#[inline]
+pub fn play_card(card: Card) -> Sample {
+    sample(PLAY_CARD + card as usize)
+}
+
+#[inline]
+pub fn monster_move(kind: MonsterKind) -> Sample {
+    sample(MONSTER_MOVE + kind as usize)
+}
+
+#[inline]
+pub fn clone() -> Sample {
+    sample(CLONE)
+}
+
+#[inline]
+pub fn draw() -> Sample {
+    sample(DRAW)
+}
+
+#[inline]
+pub fn reshuffle() -> Sample {
+    sample(RESHUFFLE)
+}
+
+#[inline]
+pub fn relic_hook(hook: RelicHook) -> Sample {
+    sample(RELIC_HOOK + hook as usize)
+}
+
+fn counts(slot: usize) -> Option<HashMap<&'static str, u64>> {
+    let c = &COUNTERS[slot];
+    let calls = c.calls.load(Ordering::Relaxed);
+    if calls == 0 {
+        return None;
+    }
+    Some(HashMap::from([
+        ("calls", calls),
+        ("timed", c.timed.load(Ordering::Relaxed)),
+        ("ns", c.ns.load(Ordering::Relaxed)),
+    ]))
+}
+
+fn group(
+    base: usize,
+    names: impl IntoIterator<Item = String>,
+) -> HashMap<String, HashMap<&'static str, u64>> {
+    names.into_iter()
+        .enumerate()
+        .filter_map(|(i, name)| counts(base + i).map(|c| (name, c)))
+        .collect()
+}
+
+/// Turn hot-path counters on or off for the whole process and set how often calls are
+/// timed (every `sample_every`-th call per counter; 1 times every call). Counts are kept
+/// when turning off; see reset_perf_counters.
+#[pyfunction]
+#[pyo3(signature = (enabled=true, sample_every=16))]
+pub fn set_perf_counters(enabled: bool, sample_every: u64) -> PyResult<()> {
+    if sample_every == 0 {
+        return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>("sample_every must be positive"));
+    }
+    SAMPLE_EVERY.store(sample_every, Ordering::Relaxed);
+    ENABLED.store(enabled, Ordering::Relaxed);
+    Ok(())
+}
+
+/// Counters gathered since the last reset, as {category: {key: {"calls", "timed", "ns"}}}.
+/// Categories are "play_card" (keyed by Card name), "monster_move" (keyed by monster_id),
+/// "clone", "draw", "reshuffle" (keyed by "total") and "relic_hook" (keyed by hook).
+/// "ns" is the total time of the "timed" calls, so ns / timed is the mean cost per call.
+/// Keys that were never hit are left out.
+#[pyfunction]
+pub fn perf_counters() -> HashMap<&'static str, HashMap<String, HashMap<&'static str, u64>>> {
+    let total = || std::iter::once("total".to_string());
+    HashMap::from([
+        ("play_card", group(PLAY_CARD, ALL_CARDS.iter().map(|c| format!("{c:?}")))),
+        ("monster_move", group(MONSTER_MOVE, MonsterKind::ALL.iter().map(|k| k.id().to_string()))),
+        ("clone", group(CLONE, total())),
+        ("draw", group(DRAW, total())),
+        ("reshuffle", group(RESHUFFLE, total())),
+        ("relic_hook", group(RELIC_HOOK, RELIC_HOOKS.iter().map(|h| h.to_string()))),
+    ])
+}
+
+/// Zero every counter.
+#[pyfunction]
+pub fn reset_perf_counters() {
+    for c in &COUNTERS {
+        c.calls.store(0, Ordering::Relaxed);
+        c.timed.store(0, Ordering::Relaxed);
+        c.ns.store(0, Ordering::Relaxed);
+    }
+}
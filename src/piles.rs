@@ -0,0 +1,151 @@
+use std::fmt;
+use std::ops::Deref;
+
+use rand::seq::SliceRandom;
+use rand::Rng;
+
+use crate::cards::CardInstance;
+use crate::state_hash;
+
+/// A pile of deck indices (the last one is the top) with a running sum of the
+/// state_hash keys of its cards, so hashing a state doesn't walk its piles. The draw
+/// pile is ordered and keys each card by position; the other piles are multisets.
+/// Reads go through the slice; changes go through the methods below, which take the
+/// deck to look up card values.
+pub struct CardPile {
+    cards: Vec<usize>,
+    ordered: bool,
+    hash: u64,
+}
+
+impl Clone for CardPile {
+    fn clone(&self) -> Self {
+        CardPile { cards: self.cards.clone(), ordered: self.ordered, hash: self.hash }
+    }
+
+    fn clone_from(&mut self, source: &Self) {
+        self.cards.clone_from(&source.cards);
+        self.ordered = source.ordered;
+        self.hash = source.hash;
+    }
+}
+
+// Formats as the list of deck indices; the hash is derived from them and the deck.
+impl fmt::Debug for CardPile {
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+        self.cards.fmt(f)
+    }
+}
+
+impl Deref for CardPile {
+    type Target = [usize];
+
+    fn deref(&self) -> &[usize] {
+        &self.cards
+    }
+}
+
+impl<'a> IntoIterator for &'a CardPile {
+    type Item = &'a usize;
+    type IntoIter = std::slice::Iter<'a, usize>;
+
+    fn into_iter(self) -> Self::IntoIter {
+        self.cards.iter()
+    }
+}
+
+impl CardPile {
+    /// An empty pile; `ordered` for the draw pile.
+    pub fn new(ordered: bool) -> Self {
+        CardPile { cards: Vec::new(), ordered, hash: 0 }
+    }
+
+    /// A pile holding `cards` with a hash computed elsewhere, e.g. read back from bytes.
+    pub(crate) fn with_hash(cards: Vec<usize>, ordered: bool, hash: u64) -> Self {
+        CardPile { cards, ordered, hash }
+    }
+
+    /// Running hash of the pile's canonical form.
+    #[inline]
+    pub fn hash(&self) -> u64 {
+        self.hash
+    }
+
+    pub fn capacity(&self) -> usize {
+        self.cards.capacity()
+    }
+
+    #[inline]
+    fn key(&self, pos: usize, ci: CardInstance) -> u64 {
+        state_hash::pile_key(if self.ordered { pos } else { 0 }, ci)
+    }
+
+    /// Sum of the keys of the cards from `from` up.
+    fn keys_from(&self, from: usize, deck: &[CardInstance]) -> u64 {
+        self.cards[from..].iter().enumerate().fold(0u64, |h, (i, &idx)| {
+            h.wrapping_add(self.key(from + i, deck[idx]))
+        })
+    }
+
+    /// Recompute the hash from scratch, e.g. after a card in the pile was upgraded.
+    pub fn rehash(&mut self, deck: &[CardInstance]) {
+        self.hash = self.keys_from(0, deck);
+    }
+
+    #[inline]
+    pub fn push(&mut self, idx: usize, deck: &[CardInstance]) {
+        self.hash = self.hash.wrapping_add(self.key(self.cards.len(), deck[idx]));
+        self.cards.push(idx);
+    }
+
+    #[inline]
+    pub fn pop(&mut self, deck: &[CardInstance]) -> Option<usize> {
+        let idx = self.cards.pop()?;
+        self.hash = self.hash.wrapping_sub(self.key(self.cards.len(), deck[idx]));
+        Some(idx)
+    }
+
+    /// Remove and return the card at `pos`; cards above it move down one position.
+    pub fn remove(&mut self, pos: usize, deck: &[CardInstance]) -> usize {
+        if !self.ordered {
+            let idx = self.cards.remove(pos);
+            self.hash = self.hash.wrapping_sub(self.key(0, deck[idx]));
+            return idx;
+        }
+        let above = self.keys_from(pos, deck);
+        let idx = self.cards.remove(pos);
+        self.hash = self.hash.wrapping_sub(above).wrapping_add(self.keys_from(pos, deck));
+        idx
+    }
+
+    pub fn retain(&mut self, keep: impl FnMut(&usize) -> bool, deck: &[CardInstance]) {
+        self.cards.retain(keep);
+        self.rehash(deck);
+    }
+
+    pub fn extend(&mut self, cards: impl IntoIterator<Item = usize>, deck: &[CardInstance]) {
+        for idx in cards {
+            self.push(idx, deck);
+        }
+    }
+
+    /// Remove every card, in pile order.
+    pub fn drain(&mut self) -> std::vec::Drain<'_, usize> {
+        self.hash = 0;
+        self.cards.drain(..)
+    }
+
+    /// Replace the contents with `cards`.
+    pub fn set(&mut self, cards: impl IntoIterator<Item = usize>, deck: &[CardInstance]) {
+        self.cards.clear();
+        self.hash = 0;
+        self.extend(cards, deck);
+    }
+
+    pub fn shuffle<R: Rng + ?Sized>(&mut self, rng: &mut R, deck: &[CardInstance]) {
+        self.cards.shuffle(rng);
+        if self.ordered {
+            self.rehash(deck);
+        }
+    }
+}
@@ -1,4 +1,94 @@
-use crate::enums::PowerType;
+use crate::enums::{PowerType, ALL_POWERS, NUM_POWERS};
+use crate::state_hash;
+
+/// Fixed-size power table indexed by PowerType discriminant. `present` records which
+/// powers have an entry, so a power that can go negative (e.g. Strength) still shows
+/// up with amount 0 after being brought back to zero. `hash` is the running sum of the
+/// state_hash keys of the entries.
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub struct Powers {
+    amounts: [i32; NUM_POWERS],
+    present: u128,
+    hash: u64,
+}
+
+impl Default for Powers {
+    fn default() -> Self {
+        Powers::new()
+    }
+}
+
+impl Powers {
+    pub fn new() -> Self {
+        Powers { amounts: [0; NUM_POWERS], present: 0, hash: 0 }
+    }
+
+    /// Amount of `power`, or 0 if it has no entry.
+    #[inline]
+    pub fn get(&self, power: PowerType) -> i32 {
+        self.amounts[power as usize]
+    }
+
+    #[inline]
+    pub fn contains(&self, power: PowerType) -> bool {
+        self.present & (1u128 << power as usize) != 0
+    }
+
+    /// Set the amount of `power`, creating its entry if needed.
+    #[inline]
+    pub fn set(&mut self, power: PowerType, amount: i32) {
+        self.remove(power);
+        self.hash = self.hash.wrapping_add(state_hash::power_key(power, amount));
+        self.amounts[power as usize] = amount;
+        self.present |= 1u128 << power as usize;
+    }
+
+    #[inline]
+    pub fn remove(&mut self, power: PowerType) {
+        if self.contains(power) {
+            self.hash = self.hash.wrapping_sub(state_hash::power_key(power, self.get(power)));
+        }
+        self.amounts[power as usize] = 0;
+        self.present &= !(1u128 << power as usize);
+    }
+
+    pub fn len(&self) -> usize {
+        self.present.count_ones() as usize
+    }
+
+    pub fn is_empty(&self) -> bool {
+        self.present == 0
+    }
+
+    /// Running hash of the entries.
+    #[inline]
+    pub fn hash(&self) -> u64 {
+        self.hash
+    }
+
+    /// Iterate over the powers that have an entry, in PowerType order.
+    pub fn iter(&self) -> PowersIter<'_> {
+        PowersIter { powers: self, remaining: self.present }
+    }
+}
+
+pub struct PowersIter<'a> {
+    powers: &'a Powers,
+    remaining: u128,
+}
+
+impl Iterator for PowersIter<'_> {
+    type Item = (PowerType, i32);
+
+    fn next(&mut self) -> Option<(PowerType, i32)> {
+        if self.remaining == 0 {
+            return None;
+        }
+        let i = self.remaining.trailing_zeros() as usize;
+        self.remaining &= self.remaining - 1;
+        Some((ALL_POWERS[i], self.powers.amounts[i]))
+    }
+}
 
 /// Calculate damage modifier from attacker's powers (atDamageGive step).
 /// BG mod Weak: flat -1 damage per attack.
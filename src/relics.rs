@@ -1,9 +1,12 @@
 use crate::creature::{Monster, Player};
 use crate::damage::apply_damage_to_monster;
 use crate::enums::{CardType, PowerType, Relic};
+use crate::perf::{self, RelicHook};
+use crate::undo;
 
 /// Called at start of combat (after pre-battle, before first draw).
 pub fn on_combat_start(player: &mut Player) {
+    let _perf = perf::relic_hook(RelicHook::CombatStart);
     if player.has_relic(Relic::Anchor) {
         player.add_block(2);
     }
@@ -25,6 +28,7 @@ pub fn on_combat_start(player: &mut Player) {
 /// Called at start of player turn.
 /// Returns extra cards to draw and extra energy.
 pub fn on_turn_start(player: &mut Player, turn_number: i32) -> (i32, i32) {
+    let _perf = perf::relic_hook(RelicHook::TurnStart);
     let mut extra_draw = 0;
     let mut extra_energy = 0;
 
@@ -43,6 +47,7 @@ pub fn on_turn_start(player: &mut Player, turn_number: i32) -> (i32, i32) {
 
 /// Called at end of player turn.
 pub fn on_turn_end(player: &mut Player) {
+    let _perf = perf::relic_hook(RelicHook::TurnEnd);
     // Orichalcum: +1 block if player has 0 block
     if player.has_relic(Relic::Orichalcum) && player.block == 0 {
         player.add_block(1);
@@ -52,13 +57,15 @@ pub fn on_turn_end(player: &mut Player) {
     let lose_str = player.get_power(PowerType::LoseStrength);
     if lose_str > 0 {
         player.apply_power(PowerType::Strength, -lose_str);
-        player.powers.remove(&PowerType::LoseStrength);
+        undo::power(player, PowerType::LoseStrength);
+        player.powers.remove(PowerType::LoseStrength);
     }
 }
 
 /// Called when the die is rolled for monsters. Triggers die-controlled relics.
 /// Returns (extra_draw, extra_energy) from relics.
 pub fn on_die_roll(player: &mut Player, monsters: &mut [Monster], roll: u8) -> (i32, i32) {
+    let _perf = perf::relic_hook(RelicHook::DieRoll);
     let mut extra_draw = 0;
     let mut extra_energy = 0;
 
@@ -197,6 +204,7 @@ pub fn on_die_roll(player: &mut Player, monsters: &mut [Monster], roll: u8) -> (
 
 /// Called when a card is played. Triggers on-card-play relics.
 pub fn on_card_play(player: &mut Player, card_type: CardType) {
+    let _perf = perf::relic_hook(RelicHook::CardPlay);
     // Bird-Faced Urn: +1 block when playing a Power card
     if player.has_relic(Relic::BirdFacedUrn) && card_type == CardType::Power {
         player.add_block(1);
@@ -205,6 +213,7 @@ pub fn on_card_play(player: &mut Player, card_type: CardType) {
 
 /// Called when draw pile is reshuffled (discard→draw).
 pub fn on_shuffle(player: &mut Player) {
+    let _perf = perf::relic_hook(RelicHook::Shuffle);
     // Red Skull: +1 Str when deck is shuffled
     if player.has_relic(Relic::RedSkull) {
         player.apply_power(PowerType::Strength, 1);
@@ -213,6 +222,7 @@ pub fn on_shuffle(player: &mut Player) {
 
 /// Called on combat victory.
 pub fn on_victory(player: &mut Player) {
+    let _perf = perf::relic_hook(RelicHook::Victory);
     // Burning Blood: heal 1 HP on victory
     if player.has_relic(Relic::BurningBlood) {
         player.heal(1);
@@ -232,6 +242,7 @@ pub fn on_victory(player: &mut Player) {
 
 /// Called at start of each monster turn (for MercuryHourglass).
 pub fn on_monster_turn_start(player: &Player, monsters: &mut [Monster]) {
+    let _perf = perf::relic_hook(RelicHook::MonsterTurnStart);
     // Mercury Hourglass: deal 1 damage to all enemies at start of turn
     if player.has_relic(Relic::MercuryHourglass) {
         for m in monsters.iter_mut() {
@@ -1,10 +1,12 @@
 use pyo3::prelude::*;
-use rand::rngs::StdRng;
+use pyo3::types::PyBytes;
 use rand::seq::SliceRandom;
 use rand::SeedableRng;
 
 use crate::cards::{Card, CardInstance};
 use crate::enums::{CardRarity, Character};
+use crate::rng::SimRng;
+use crate::serialize;
 
 /// The Ironclad card reward pool, split by rarity.
 fn ironclad_commons() -> Vec<Card> {
@@ -148,12 +150,12 @@ fn watcher_rares() -> Vec<Card> {
 
 /// The reward deck for Ironclad: 2x each common, 1x each uncommon, 2 golden tickets.
 /// Golden tickets represent rare pulls when drawn.
-#[pyclass]
+#[pyclass(module = "sts_sim")]
 #[derive(Clone, Debug)]
 pub struct RewardDeck {
-    cards: Vec<(Card, CardRarity)>,
-    rare_pool: Vec<Card>,
-    rng: StdRng,
+    pub(crate) cards: Vec<(Card, CardRarity)>,
+    pub(crate) rare_pool: Vec<Card>,
+    pub(crate) rng: SimRng,
 }
 
 #[pymethods]
@@ -162,7 +164,7 @@ impl RewardDeck {
     #[pyo3(signature = (seed=None, character=None))]
     pub fn new(seed: Option<u64>, character: Option<Character>) -> Self {
         let s = seed.unwrap_or(0);
-        let mut rng = StdRng::seed_from_u64(s);
+        let mut rng = SimRng::seed_from_u64(s);
         let ch = character.unwrap_or(Character::Ironclad);
 
         let (commons_fn, uncommons_fn, rares_fn) = match ch {
@@ -231,6 +233,30 @@ impl RewardDeck {
     pub fn remaining(&self) -> usize {
         self.cards.len()
     }
+
+    /// Compact, versioned binary encoding of the reward deck, RNG included. Inverse of from_bytes.
+    pub fn to_bytes<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+        serialize::to_pybytes(py, self)
+    }
+
+    /// Decode to_bytes output. Raises ValueError on malformed or incompatible data.
+    #[staticmethod]
+    pub fn from_bytes(data: &[u8]) -> PyResult<Self> {
+        serialize::from_bytes(data)
+    }
+
+    pub fn __getstate__<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+        serialize::to_pybytes(py, self)
+    }
+
+    pub fn __setstate__(&mut self, state: &[u8]) -> PyResult<()> {
+        *self = serialize::from_bytes(state)?;
+        Ok(())
+    }
+
+    pub fn __reduce__<'py>(slf: &Bound<'py, Self>) -> PyResult<serialize::Reduced<'py>> {
+        serialize::reduce(slf)
+    }
 }
 
 impl RewardDeck {
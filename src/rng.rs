@@ -0,0 +1,37 @@
+use rand::SeedableRng;
+use rand_chacha::ChaCha12Rng;
+
+/// RNG carried by simulation state. It is the generator behind rand's StdRng, so seeded
+/// streams are unchanged, and it exposes its seed, stream and word position so the state
+/// can be saved and restored exactly.
+///
+/// ChaCha is counter-based: output block n of stream s is a pure function of (key, s, n).
+/// Selecting a stream or position is O(1), which makes forking cheap.
+pub type SimRng = ChaCha12Rng;
+
+fn mix(mut x: u64) -> u64 {
+    x = x.wrapping_add(0x9E37_79B9_7F4A_7C15);
+    x = (x ^ (x >> 30)).wrapping_mul(0xBF58_476D_1CE4_E5B9);
+    x = (x ^ (x >> 27)).wrapping_mul(0x94D0_49BB_1331_11EB);
+    x ^ (x >> 31)
+}
+
+/// Generator for `stream` of `seed`. Stream 0 is the plain seed_from_u64 sequence.
+pub fn stream_rng(seed: u64, stream: u64) -> SimRng {
+    let mut rng = SimRng::seed_from_u64(seed);
+    rng.set_stream(stream);
+    rng
+}
+
+/// Child generator `stream_id` of `rng`, which is not advanced. The child keeps the
+/// parent's key and starts at position 0 of a stream derived from the parent's stream,
+/// position and `stream_id`. Forking the same parent state with the same id always gives
+/// the same child, and different ids give independent streams.
+pub fn fork(rng: &SimRng, stream_id: u64) -> SimRng {
+    let pos = rng.get_word_pos();
+    let parent = mix(mix(mix(rng.get_stream()) ^ pos as u64) ^ (pos >> 64) as u64);
+    let mut child = rng.clone();
+    child.set_stream(mix(parent ^ stream_id));
+    child.set_word_pos(0);
+    child
+}
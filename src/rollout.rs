@@ -0,0 +1,230 @@
+use pyo3::prelude::*;
+use rand::Rng;
+
+use crate::cards::CardInstance;
+use crate::combat::CombatState;
+use crate::damage::calculate_player_damage;
+use crate::enums::{CardType, Intent};
+use crate::rng::{self, SimRng};
+
+/// Cap on card plays within one turn, so zero-cost loops (e.g. retained cards that
+/// return to hand) can't stall a rollout.
+const MAX_PLAYS_PER_TURN: usize = 50;
+
+/// Action-selection policy for native rollouts.
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub enum Policy {
+    /// Uniform over the playable cards plus ending the turn.
+    Random,
+    /// Play the card that deals the most damage to the weakest monster; random once no
+    /// playable card deals damage.
+    GreedyDamage,
+    /// When a monster's intent is an attack and the player has no block, play the card
+    /// with the most block first; otherwise play like GreedyDamage.
+    BlockWhenThreatened,
+    /// Play power cards as soon as they are affordable, otherwise play like GreedyDamage.
+    PowersFirst,
+}
+
+/// Names accepted by Policy::from_name, in declaration order.
+pub const POLICY_NAMES: [&str; 4] = ["random", "greedy_damage", "block_when_threatened", "powers_first"];
+
+impl Policy {
+    pub fn from_name(name: &str) -> PyResult<Policy> {
+        match name {
+            "random" => Ok(Policy::Random),
+            "greedy_damage" => Ok(Policy::GreedyDamage),
+            "block_when_threatened" => Ok(Policy::BlockWhenThreatened),
+            "powers_first" => Ok(Policy::PowersFirst),
+            _ => Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                format!("Unknown policy: {} (expected one of {})", name, POLICY_NAMES.join(", ")),
+            )),
+        }
+    }
+}
+
+/// Result of playing out a single combat.
+#[derive(Clone, Copy, Debug, Default)]
+pub struct Outcome {
+    pub won: bool,
+    pub hp_left: i32,
+    pub turns: i32,
+    pub damage_taken: i32,
+}
+
+/// Columnar results of a batch of rollouts, one entry per rollout.
+#[pyclass]
+#[derive(Clone, Debug, Default)]
+pub struct RolloutResults {
+    #[pyo3(get)]
+    pub won: Vec<bool>,
+    #[pyo3(get)]
+    pub hp_left: Vec<i32>,
+    #[pyo3(get)]
+    pub turns: Vec<i32>,
+    #[pyo3(get)]
+    pub damage_taken: Vec<i32>,
+}
+
+#[pymethods]
+impl RolloutResults {
+    fn __len__(&self) -> usize {
+        self.won.len()
+    }
+
+    /// Fraction of rollouts that ended in a player win.
+    pub fn win_rate(&self) -> f64 {
+        if self.won.is_empty() {
+            return 0.0;
+        }
+        self.won.iter().filter(|&&w| w).count() as f64 / self.won.len() as f64
+    }
+}
+
+impl RolloutResults {
+    pub fn with_capacity(n: usize) -> Self {
+        RolloutResults {
+            won: Vec::with_capacity(n),
+            hp_left: Vec::with_capacity(n),
+            turns: Vec::with_capacity(n),
+            damage_taken: Vec::with_capacity(n),
+        }
+    }
+
+    pub fn push(&mut self, outcome: Outcome) {
+        self.won.push(outcome.won);
+        self.hp_left.push(outcome.hp_left);
+        self.turns.push(outcome.turns);
+        self.damage_taken.push(outcome.damage_taken);
+    }
+}
+
+impl FromIterator<Outcome> for RolloutResults {
+    fn from_iter<I: IntoIterator<Item = Outcome>>(iter: I) -> Self {
+        let iter = iter.into_iter();
+        let mut results = RolloutResults::with_capacity(iter.size_hint().0);
+        for outcome in iter {
+            results.push(outcome);
+        }
+        results
+    }
+}
+
+/// Play a combat to completion (or until `max_turns` is exceeded) with the given policy.
+/// Starts the combat first if it hasn't been started yet.
+pub fn play_out(state: &mut CombatState, policy: Policy, rng: &mut SimRng, max_turns: i32) -> Outcome {
+    let start_hp = state.player.hp;
+    if state.turn_number == 0 {
+        state.start_combat();
+    }
+    while !state.combat_over && state.turn_number <= max_turns {
+        play_turn(state, policy, rng);
+        if state.combat_over {
+            break;
+        }
+        state.end_player_turn();
+        if state.combat_over {
+            break;
+        }
+        state.roll_and_execute_monsters();
+    }
+    let hp_left = state.player.hp.max(0);
+    Outcome {
+        won: state.player_won,
+        hp_left,
+        turns: state.turn_number,
+        damage_taken: (start_hp - hp_left).max(0),
+    }
+}
+
+/// Play cards for the current player turn until the policy chooses to end it.
+fn play_turn(state: &mut CombatState, policy: Policy, rng: &mut SimRng) {
+    for _ in 0..MAX_PLAYS_PER_TURN {
+        if state.combat_over {
+            return;
+        }
+        let actions = state.get_available_actions();
+        let pick = match policy {
+            Policy::Random => random_pick(&actions, rng),
+            Policy::GreedyDamage => best_damage(state, &actions).or_else(|| random_pick(&actions, rng)),
+            Policy::BlockWhenThreatened => (state.player.block == 0 && threatened(state))
+                .then(|| best_block(&actions)).flatten()
+                .or_else(|| best_damage(state, &actions))
+                .or_else(|| random_pick(&actions, rng)),
+            Policy::PowersFirst => actions.iter().position(|a| a.1.card.card_type() == CardType::Power)
+                .or_else(|| best_damage(state, &actions))
+                .or_else(|| random_pick(&actions, rng)),
+        };
+        let Some(pick) = pick else { return };
+        let (hand_index, _, needs_target) = actions[pick];
+        let target = if needs_target {
+            let targets = state.get_valid_targets();
+            if targets.is_empty() {
+                return;
+            }
+            match policy {
+                Policy::Random => Some(targets[rng.gen_range(0..targets.len())]),
+                _ => weakest_target(state),
+            }
+        } else {
+            None
+        };
+        if !state.play_card(hand_index, target, None) {
+            return;
+        }
+    }
+}
+
+/// Uniform pick among `actions` plus ending the turn (None).
+fn random_pick(actions: &[(usize, CardInstance, bool)], rng: &mut SimRng) -> Option<usize> {
+    // Last slot is "end turn"
+    let pick = rng.gen_range(0..=actions.len());
+    (pick < actions.len()).then_some(pick)
+}
+
+/// Living monster with the least HP plus block, the one focused by heuristic policies.
+fn weakest_target(state: &CombatState) -> Option<usize> {
+    state.get_valid_targets().into_iter().min_by_key(|&i| state.monsters[i].hp + state.monsters[i].block)
+}
+
+/// Action dealing the most damage to the weakest monster, if any deals damage.
+fn best_damage(state: &CombatState, actions: &[(usize, CardInstance, bool)]) -> Option<usize> {
+    let target = &state.monsters[weakest_target(state)?];
+    actions.iter().enumerate()
+        .map(|(i, a)| (i, a.1.base_damage()))
+        .filter(|&(_, base)| base > 0)
+        .map(|(i, base)| (i, calculate_player_damage(&state.player, target, base)))
+        .max_by_key(|&(i, damage)| (damage, std::cmp::Reverse(i)))
+        .map(|(i, _)| i)
+}
+
+/// Action granting the most block, if any grants block.
+fn best_block(actions: &[(usize, CardInstance, bool)]) -> Option<usize> {
+    actions.iter().enumerate()
+        .filter(|(_, a)| a.1.base_block() > 0)
+        .max_by_key(|&(i, a)| (a.1.base_block(), std::cmp::Reverse(i)))
+        .map(|(i, _)| i)
+}
+
+/// Whether a living monster is expected to attack. Moves are rolled at the start of the
+/// monster turn, so the intent seen during the player turn is the monster's last move.
+fn threatened(state: &CombatState) -> bool {
+    state.monsters.iter().filter(|m| !m.is_dead()).any(|m| matches!(
+        m.intent,
+        Intent::Attack | Intent::AttackBuff | Intent::AttackDebuff | Intent::AttackDefend
+    ))
+}
+
+/// Clone `state` `n` times and play every clone out. Rollout i reseeds its shuffle RNG,
+/// die and policy RNG to stream i of `seed`, so each rollout is reproducible on its own,
+/// independent of `n` and of where it runs.
+pub fn rollout_batch(state: &CombatState, n: usize, policy: Policy, max_turns: i32, seed: u64) -> RolloutResults {
+    (0..n)
+        .map(|i| {
+            let mut sim = state.clone();
+            sim.reseed(seed, i as u64);
+            let mut rng = rng::stream_rng(seed.wrapping_add(2), i as u64);
+            play_out(&mut sim, policy, &mut rng, max_turns)
+        })
+        .collect()
+}
@@ -0,0 +1,619 @@
+use pyo3::prelude::*;
+use rand::seq::SliceRandom;
+use rand::Rng;
+
+use crate::cards::{starter_deck, Card, CardInstance};
+use crate::creature::Player;
+use crate::encounters::build_encounter;
+use crate::enums::{CardType, Character, EventType, Relic, RoomType};
+use crate::events::{EventOutcome, EventState};
+use crate::map::{generate_map, ActMap};
+use crate::parallel::{default_threads, parallel_map};
+use crate::rest::RestSite;
+use crate::rewards::{get_card_rarity, RewardDeck};
+use crate::rng::{self, SimRng};
+use crate::rollout::{play_out, Policy};
+use crate::shop::create_shop;
+
+/// Normal fights drawn from the easy pool before switching to the strong pool.
+const EASY_FIGHTS: usize = 3;
+const EASY_POOL: [&str; 3] = ["jaw_worm", "cultist", "louse"];
+const STRONG_POOL: [&str; 11] = [
+    "cultist_and_spike_slime", "cultist_and_louse", "fungi_beasts", "slime_trio",
+    "3_louse_hard", "large_slime", "blue_slaver", "red_slaver", "looter",
+    "sneaky_gremlin_team", "angry_gremlin_team",
+];
+const ELITE_POOL: [&str; 3] = ["gremlin_nob", "lagavulin", "sentries"];
+const BOSS_POOL: [&str; 3] = ["the_guardian", "hexaghost", "slime_boss"];
+
+const EVENT_POOL: [EventType; 9] = [
+    EventType::BigFish, EventType::GoldenIdol, EventType::GoldenWing,
+    EventType::WorldOfGoop, EventType::Cleric, EventType::LivingWall,
+    EventType::ScrapOoze, EventType::DeadAdventurer, EventType::KnowingSkull,
+];
+
+/// Relics handed out by elites and treasure rooms: the common and uncommon relics.
+const RELIC_POOL: [Relic; 12] = [
+    Relic::Lantern, Relic::BagOfPreparation, Relic::Anchor, Relic::Orichalcum,
+    Relic::Vajra, Relic::OddlySmoothStone, Relic::PenNib, Relic::HornCleat,
+    Relic::HappyFlower, Relic::RedSkull, Relic::MeatOnTheBone, Relic::MercuryHourglass,
+];
+
+/// Gold for winning a normal or elite fight. The engine has no combat gold rules, so
+/// these sit on the scale of shop prices (2-6) and event payouts (2-3).
+const MONSTER_GOLD: i32 = 1;
+const ELITE_GOLD: i32 = 2;
+/// Gold from a treasure room once every relic in RELIC_POOL is owned.
+const TREASURE_GOLD: i32 = 3;
+
+/// Cards offered by a card reward.
+const CARD_CHOICES: i32 = 3;
+
+/// Cap on choices within one event, since Scrap Ooze can be retried indefinitely.
+const MAX_EVENT_STEPS: usize = 16;
+
+/// How the run picks the next room among the current node's connections. Only rooms
+/// that still lead to the boss are considered.
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub enum PathPolicy {
+    /// Uniform over the next rooms.
+    Random,
+    /// Fewest fights: rooms without combat first, then monsters, then elites.
+    Safe,
+    /// Most rewards: elites first, then monsters, then everything else.
+    Aggressive,
+}
+
+/// Names accepted by PathPolicy::from_name, in declaration order.
+pub const PATH_POLICY_NAMES: [&str; 3] = ["random", "safe", "aggressive"];
+
+impl PathPolicy {
+    pub fn from_name(name: &str) -> PyResult<PathPolicy> {
+        match name {
+            "random" => Ok(PathPolicy::Random),
+            "safe" => Ok(PathPolicy::Safe),
+            "aggressive" => Ok(PathPolicy::Aggressive),
+            _ => Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                format!("Unknown path policy: {} (expected one of {})", name, PATH_POLICY_NAMES.join(", ")),
+            )),
+        }
+    }
+
+    fn pick(self, map: &ActMap, options: &[usize], rng: &mut SimRng) -> Option<usize> {
+        let risk = |i: &usize| match map.nodes[*i].room_type {
+            RoomType::Elite => 2,
+            RoomType::Monster => 1,
+            _ => 0,
+        };
+        let best = match self {
+            PathPolicy::Random => return options.choose(rng).copied(),
+            PathPolicy::Safe => options.iter().map(risk).min()?,
+            PathPolicy::Aggressive => options.iter().map(risk).max()?,
+        };
+        let tied: Vec<usize> = options.iter().copied().filter(|i| risk(i) == best).collect();
+        tied.choose(rng).copied()
+    }
+}
+
+/// Which card to take from a card reward, and which card to buy at a shop.
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub enum DraftPolicy {
+    /// Never add cards: skip every card reward and buy nothing.
+    Skip,
+    /// Take a uniformly random offered card.
+    Random,
+    /// Take the rarest offered card, the first one on ties.
+    Rarest,
+}
+
+/// Names accepted by DraftPolicy::from_name, in declaration order.
+pub const DRAFT_POLICY_NAMES: [&str; 3] = ["skip", "random", "rarest"];
+
+impl DraftPolicy {
+    pub fn from_name(name: &str) -> PyResult<DraftPolicy> {
+        match name {
+            "skip" => Ok(DraftPolicy::Skip),
+            "random" => Ok(DraftPolicy::Random),
+            "rarest" => Ok(DraftPolicy::Rarest),
+            _ => Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                format!("Unknown draft policy: {} (expected one of {})", name, DRAFT_POLICY_NAMES.join(", ")),
+            )),
+        }
+    }
+
+    /// Index of the card to take from `offered`, or None to take nothing.
+    fn pick(self, offered: &[CardInstance], rng: &mut SimRng) -> Option<usize> {
+        if offered.is_empty() {
+            return None;
+        }
+        match self {
+            DraftPolicy::Skip => None,
+            DraftPolicy::Random => Some(rng.gen_range(0..offered.len())),
+            DraftPolicy::Rarest => (0..offered.len())
+                .min_by_key(|&i| std::cmp::Reverse(get_card_rarity(offered[i].card) as u8)),
+        }
+    }
+}
+
+/// The three policies and the per-combat turn cap that drive a run.
+#[derive(Clone, Copy, Debug)]
+pub struct RunPolicies {
+    pub path: PathPolicy,
+    pub draft: DraftPolicy,
+    pub combat: Policy,
+    pub max_turns: i32,
+}
+
+/// Result of one Act 1 run.
+#[pyclass]
+#[derive(Clone, Debug)]
+pub struct RunResult {
+    /// True if the boss was beaten.
+    #[pyo3(get)]
+    pub won: bool,
+    /// Rooms entered, including the one the run ended in.
+    #[pyo3(get)]
+    pub floor: i32,
+    #[pyo3(get)]
+    pub hp: i32,
+    #[pyo3(get)]
+    pub max_hp: i32,
+    #[pyo3(get)]
+    pub gold: i32,
+    #[pyo3(get)]
+    pub deck: Vec<CardInstance>,
+    #[pyo3(get)]
+    pub relics: Vec<Relic>,
+    /// Room type of every room entered, in order.
+    #[pyo3(get)]
+    pub path: Vec<RoomType>,
+    /// Combats fought, and player turns summed over them.
+    #[pyo3(get)]
+    pub combats: i32,
+    #[pyo3(get)]
+    pub turns: i32,
+}
+
+/// Columnar results of a batch of runs, one entry per run.
+#[pyclass]
+#[derive(Clone, Debug, Default)]
+pub struct RunResults {
+    #[pyo3(get)]
+    pub won: Vec<bool>,
+    #[pyo3(get)]
+    pub floor: Vec<i32>,
+    #[pyo3(get)]
+    pub hp: Vec<i32>,
+    #[pyo3(get)]
+    pub gold: Vec<i32>,
+    #[pyo3(get)]
+    pub deck_size: Vec<i32>,
+    #[pyo3(get)]
+    pub combats: Vec<i32>,
+    #[pyo3(get)]
+    pub turns: Vec<i32>,
+}
+
+#[pymethods]
+impl RunResults {
+    fn __len__(&self) -> usize {
+        self.won.len()
+    }
+
+    /// Fraction of runs that beat the boss.
+    pub fn win_rate(&self) -> f64 {
+        if self.won.is_empty() {
+            return 0.0;
+        }
+        self.won.iter().filter(|&&w| w).count() as f64 / self.won.len() as f64
+    }
+}
+
+impl FromIterator<RunResult> for RunResults {
+    fn from_iter<I: IntoIterator<Item = RunResult>>(iter: I) -> Self {
+        let mut results = RunResults::default();
+        for run in iter {
+            results.won.push(run.won);
+            results.floor.push(run.floor);
+            results.hp.push(run.hp);
+            results.gold.push(run.gold);
+            results.deck_size.push(run.deck.len() as i32);
+            results.combats.push(run.combats);
+            results.turns.push(run.turns);
+        }
+        results
+    }
+}
+
+fn is_basic(card: Card) -> bool {
+    matches!(
+        card,
+        Card::StrikeRed | Card::StrikeGreen | Card::StrikeBlue | Card::StrikePurple
+            | Card::DefendRed | Card::DefendGreen | Card::DefendBlue | Card::DefendPurple
+    )
+}
+
+/// Card to remove: a curse, then a Strike, then a Defend. Never the last card.
+fn removal_target(deck: &[CardInstance]) -> Option<usize> {
+    if deck.len() <= 1 {
+        return None;
+    }
+    deck.iter().position(|c| c.card.card_type() == CardType::Curse)
+        .or_else(|| deck.iter().position(|c| is_basic(c.card) && c.card.card_type() == CardType::Attack))
+        .or_else(|| deck.iter().position(|c| is_basic(c.card)))
+}
+
+/// Card to upgrade: the first upgradable non-basic card, else the first upgradable card.
+fn upgrade_target(deck: &[CardInstance]) -> Option<usize> {
+    let upgradable = |c: &CardInstance| !c.upgraded && c.card.can_upgrade();
+    deck.iter().position(|c| upgradable(c) && !is_basic(c.card))
+        .or_else(|| deck.iter().position(upgradable))
+}
+
+/// Map nodes indexed by [row][col].
+fn rolls_die(event_type: EventType) -> bool {
+    matches!(event_type, EventType::ScrapOoze | EventType::DeadAdventurer)
+}
+
+/// The HP change of taking `choice`, or of the worst die roll if it leads to one.
+fn worst_hp_change(event: &EventState, choice: i32) -> i32 {
+    let mut event = event.clone();
+    let outcome = event.choose(choice);
+    if !rolls_die(event.event_type) || outcome.done {
+        return outcome.hp_change;
+    }
+    (1..=6).map(|roll| event.clone().resolve_die_roll(roll).hp_change).min().unwrap_or(0)
+}
+
+fn node_index(map: &ActMap) -> [[Option<usize>; 7]; 13] {
+    let mut index = [[None; 7]; 13];
+    for (i, n) in map.nodes.iter().enumerate() {
+        index[n.row as usize][n.col as usize] = Some(i);
+    }
+    index
+}
+
+/// Whether each node has a path to the boss. Some top-row rooms have no connections,
+/// so the path policies only ever see rooms that don't dead-end.
+fn leads_to_boss(map: &ActMap, index: &[[Option<usize>; 7]; 13]) -> Vec<bool> {
+    let mut viable = vec![false; map.nodes.len()];
+    for row in 0..13 {
+        for i in index[row].iter().flatten().copied() {
+            let node = &map.nodes[i];
+            viable[i] = node.room_type == RoomType::Boss
+                || node.connections.iter().any(|&(r, c)| {
+                    index[r as usize][c as usize].is_some_and(|j| viable[j])
+                });
+        }
+    }
+    viable
+}
+
+/// Everything a run carries from room to room.
+struct Run {
+    character: Character,
+    hp: i32,
+    max_hp: i32,
+    gold: i32,
+    deck: Vec<CardInstance>,
+    relics: Vec<Relic>,
+    rewards: RewardDeck,
+    /// Room, reward and event decisions; combats get their own stream.
+    rng: SimRng,
+    combat_rng: SimRng,
+    fights: usize,
+    combats: i32,
+    turns: i32,
+}
+
+impl Run {
+    fn new(seed: u64, character: Character) -> Self {
+        let player = Player::new(Some(character));
+        let mut rng = rng::stream_rng(seed, 1);
+        let rewards = RewardDeck::new(Some(rng.gen()), Some(character));
+        Run {
+            character,
+            hp: player.hp,
+            max_hp: player.max_hp,
+            gold: player.gold,
+            deck: starter_deck(character),
+            relics: player.relics,
+            rewards,
+            rng,
+            combat_rng: rng::stream_rng(seed, 2),
+            fights: 0,
+            combats: 0,
+            turns: 0,
+        }
+    }
+
+    /// Play `encounter` with the carried HP, gold, deck and relics. Returns true on a win.
+    fn fight(&mut self, encounter: &str, p: &RunPolicies) -> bool {
+        let mut state = build_encounter(encounter, Some(self.rng.gen()), Some(self.character))
+            .expect("encounter pools only hold known names");
+        state.player.hp = self.hp;
+        state.player.max_hp = self.max_hp;
+        state.player.gold = self.gold;
+        state.player.relics.clone_from(&self.relics);
+        state.deck.clone_from(&self.deck);
+        let outcome = play_out(&mut state, p.combat, &mut self.combat_rng, p.max_turns);
+        self.combats += 1;
+        self.turns += outcome.turns;
+        self.hp = outcome.hp_left;
+        self.max_hp = state.player.max_hp;
+        self.gold = state.player.gold;
+        outcome.won
+    }
+
+    fn monster_room(&mut self, p: &RunPolicies) -> bool {
+        let pool: &[&str] = if self.fights < EASY_FIGHTS { &EASY_POOL } else { &STRONG_POOL };
+        let encounter = *pool.choose(&mut self.rng).expect("pools are non-empty");
+        self.fights += 1;
+        if !self.fight(encounter, p) {
+            return false;
+        }
+        self.gold += MONSTER_GOLD;
+        self.card_reward(p.draft);
+        true
+    }
+
+    fn elite_room(&mut self, p: &RunPolicies) -> bool {
+        let encounter = *ELITE_POOL.choose(&mut self.rng).expect("pools are non-empty");
+        if !self.fight(encounter, p) {
+            return false;
+        }
+        self.gold += ELITE_GOLD;
+        self.relic_reward();
+        self.card_reward(p.draft);
+        true
+    }
+
+    fn card_reward(&mut self, draft: DraftPolicy) {
+        let offered = self.rewards.draw_rewards(CARD_CHOICES);
+        if let Some(i) = draft.pick(&offered, &mut self.rng) {
+            self.deck.push(offered[i]);
+        }
+    }
+
+    /// Add a random unowned relic from RELIC_POOL. Returns false if all are owned.
+    fn relic_reward(&mut self) -> bool {
+        let unowned: Vec<Relic> = RELIC_POOL.iter().copied().filter(|r| !self.relics.contains(r)).collect();
+        match unowned.choose(&mut self.rng) {
+            Some(&relic) => {
+                self.relics.push(relic);
+                true
+            }
+            None => false,
+        }
+    }
+
+    fn treasure_room(&mut self) {
+        if !self.relic_reward() {
+            self.gold += TREASURE_GOLD;
+        }
+    }
+
+    /// Rest when at least 2 HP are missing, so the heal isn't mostly wasted; otherwise smith.
+    fn rest_room(&mut self) {
+        let mut site = RestSite::new();
+        let can_smith = upgrade_target(&self.deck).is_some();
+        let choice = if self.max_hp - self.hp >= 2 || !can_smith { 0 } else { 1 };
+        let outcome = site.choose(choice);
+        self.hp = (self.hp + outcome.hp_healed).min(self.max_hp);
+        if outcome.needs_card_select {
+            if let Some(i) = upgrade_target(&self.deck) {
+                self.deck[i].upgrade();
+            }
+        }
+    }
+
+    /// Buy one card with the draft policy if any is affordable, then pay for a removal
+    /// if there's gold left and something worth removing.
+    fn shop_room(&mut self, draft: DraftPolicy) {
+        let shop = create_shop(Some(self.rng.gen()), Some(self.character));
+        let (cards, prices): (Vec<CardInstance>, Vec<i32>) = shop.items.iter()
+            .filter(|item| item.price <= self.gold)
+            .filter_map(|item| item.card.map(|c| (c, item.price)))
+            .unzip();
+        if let Some(i) = draft.pick(&cards, &mut self.rng) {
+            self.deck.push(cards[i]);
+            self.gold -= prices[i];
+        }
+        if self.gold >= shop.removal_cost {
+            if let Some(i) = removal_target(&self.deck) {
+                self.deck.remove(i);
+                self.gold -= shop.removal_cost;
+            }
+        }
+    }
+
+    /// Play a random event, choosing uniformly among the enabled choices that can't kill
+    /// the player, counting the worst die roll. Leaves the event when every enabled
+    /// choice could be lethal. Returns false if the run ends here.
+    fn event_room(&mut self, p: &RunPolicies) -> bool {
+        let event_type = *EVENT_POOL.choose(&mut self.rng).expect("pools are non-empty");
+        let mut event = EventState::new(event_type);
+        for _ in 0..MAX_EVENT_STEPS {
+            let choices = event.get_choices(self.gold, self.hp, self.max_hp, Some(self.deck.clone()));
+            let safe: Vec<i32> = (0..choices.len() as i32)
+                .filter(|&i| choices[i as usize].enabled && self.hp + worst_hp_change(&event, i) > 0)
+                .collect();
+            let Some(&choice) = safe.choose(&mut self.rng) else { break };
+            let mut outcome = event.choose(choice);
+            if rolls_die(event_type) && !outcome.done {
+                let roll = self.rng.gen_range(1..=6);
+                outcome = event.resolve_die_roll(roll);
+                if event_type == EventType::DeadAdventurer && roll <= 2 {
+                    return self.elite_room(p);
+                }
+            }
+            self.apply_event_outcome(&outcome, p.draft);
+            if self.hp <= 0 {
+                return false;
+            }
+            if outcome.done {
+                break;
+            }
+        }
+        true
+    }
+
+    fn apply_event_outcome(&mut self, outcome: &EventOutcome, draft: DraftPolicy) {
+        self.max_hp += outcome.max_hp_change;
+        self.hp = (self.hp + outcome.hp_change).min(self.max_hp);
+        self.gold = (self.gold + outcome.gold_change).max(0);
+        self.deck.extend_from_slice(&outcome.cards_added);
+        if let Some(relic) = outcome.relic_added {
+            if !self.relics.contains(&relic) {
+                self.relics.push(relic);
+            }
+        }
+        if let Some(i) = outcome.card_upgraded_index.filter(|&i| i < self.deck.len()) {
+            self.deck[i].upgrade();
+        }
+        if let Some(i) = outcome.card_removed_index.filter(|&i| i < self.deck.len()) {
+            self.deck.remove(i);
+        }
+        if outcome.needs_card_select {
+            self.card_select(&outcome.card_select_action, draft);
+        }
+    }
+
+    /// Apply a card-select action ("remove", "upgrade", "transform" or "add") to the deck.
+    fn card_select(&mut self, action: &str, draft: DraftPolicy) {
+        match action {
+            "upgrade" => {
+                if let Some(i) = upgrade_target(&self.deck) {
+                    self.deck[i].upgrade();
+                }
+            }
+            "remove" => {
+                if let Some(i) = removal_target(&self.deck) {
+                    self.deck.remove(i);
+                }
+            }
+            "transform" => {
+                if let Some(i) = removal_target(&self.deck) {
+                    self.deck.remove(i);
+                    self.deck.extend(self.rewards.draw_rewards(1));
+                }
+            }
+            "add" => self.card_reward(draft),
+            _ => {}
+        }
+    }
+}
+
+/// Play one Act 1 run: walk the map for `seed` from the start room to the boss, resolving
+/// each room and carrying HP, gold, deck and relics between them. The run ends at the
+/// first lost combat (a combat that reaches `max_turns` counts as lost) or at 0 HP.
+pub fn play_run(seed: u64, character: Character, p: &RunPolicies) -> RunResult {
+    let map = generate_map(Some(seed));
+    let index = node_index(&map);
+    let viable = leads_to_boss(&map, &index);
+    let mut run = Run::new(seed, character);
+    let boss = *BOSS_POOL.choose(&mut run.rng).expect("pools are non-empty");
+
+    let mut path = Vec::with_capacity(13);
+    let mut won = false;
+    let mut options: Vec<usize> = index[12].iter().flatten().copied().filter(|&i| viable[i]).collect();
+    while let Some(i) = p.path.pick(&map, &options, &mut run.rng) {
+        let node = &map.nodes[i];
+        path.push(node.room_type);
+        let alive = match node.room_type {
+            RoomType::Monster => run.monster_room(p),
+            RoomType::Elite => run.elite_room(p),
+            RoomType::Boss => {
+                won = run.fight(boss, p);
+                break;
+            }
+            RoomType::Rest => {
+                run.rest_room();
+                true
+            }
+            RoomType::Shop => {
+                run.shop_room(p.draft);
+                true
+            }
+            RoomType::Event => run.event_room(p),
+            RoomType::Treasure => {
+                run.treasure_room();
+                true
+            }
+            RoomType::Empty => true,
+        };
+        if !alive {
+            break;
+        }
+        options = node.connections.iter()
+            .filter_map(|&(r, c)| index[r as usize][c as usize])
+            .filter(|&j| viable[j])
+            .collect();
+    }
+
+    RunResult {
+        won,
+        floor: path.len() as i32,
+        hp: run.hp.max(0),
+        max_hp: run.max_hp,
+        gold: run.gold,
+        deck: run.deck,
+        relics: run.relics,
+        path,
+        combats: run.combats,
+        turns: run.turns,
+    }
+}
+
+fn parse_policies(path_policy: &str, draft_policy: &str, combat_policy: &str, max_turns: i32) -> PyResult<RunPolicies> {
+    Ok(RunPolicies {
+        path: PathPolicy::from_name(path_policy)?,
+        draft: DraftPolicy::from_name(draft_policy)?,
+        combat: Policy::from_name(combat_policy)?,
+        max_turns,
+    })
+}
+
+/// Play one Act 1 run natively. Monster, elite and boss rooms are fought with
+/// `combat_policy` (a rollout policy name); `path_policy` is "random", "safe" or
+/// "aggressive"; `draft_policy` ("skip", "random" or "rarest") picks card rewards and
+/// shop purchases. The same seed and policies always give the same run.
+#[pyfunction]
+#[pyo3(signature = (seed=None, character=None, path_policy="random", draft_policy="random", combat_policy="greedy_damage", max_turns=50))]
+pub fn simulate_run(
+    py: Python<'_>,
+    seed: Option<u64>,
+    character: Option<Character>,
+    path_policy: &str,
+    draft_policy: &str,
+    combat_policy: &str,
+    max_turns: i32,
+) -> PyResult<RunResult> {
+    let policies = parse_policies(path_policy, draft_policy, combat_policy, max_turns)?;
+    let character = character.unwrap_or(Character::Ironclad);
+    let seed = seed.unwrap_or(0);
+    Ok(py.allow_threads(|| play_run(seed, character, &policies)))
+}
+
+/// Play one run per seed on a pool of worker threads, with the same arguments as
+/// simulate_run. Results are in seed order and don't depend on the thread count.
+#[pyfunction]
+#[pyo3(signature = (seeds, character=None, path_policy="random", draft_policy="random", combat_policy="greedy_damage", threads=None, max_turns=50))]
+pub fn simulate_runs(
+    py: Python<'_>,
+    seeds: Vec<u64>,
+    character: Option<Character>,
+    path_policy: &str,
+    draft_policy: &str,
+    combat_policy: &str,
+    threads: Option<usize>,
+    max_turns: i32,
+) -> PyResult<RunResults> {
+    let policies = parse_policies(path_policy, draft_policy, combat_policy, max_turns)?;
+    let character = character.unwrap_or(Character::Ironclad);
+    let threads = threads.unwrap_or_else(default_threads);
+    let runs = py.allow_threads(|| {
+        parallel_map(seeds.len(), threads, |i| play_run(seeds[i], character, &policies))
+    });
+    Ok(runs.into_iter().collect())
+}
@@ -0,0 +1,637 @@
+use pyo3::prelude::*;
+use pyo3::types::PyBytes;
+use pyo3::PyClass;
+use rand::SeedableRng;
+use std::sync::Arc;
+
+use crate::cards::{Card, CardInstance, ALL_CARDS};
+use crate::combat::CombatState;
+use crate::creature::{Monster, Player};
+use crate::die::TheDie;
+use crate::enums::{
+    CardRarity, EventType, Intent, OrbType, PowerType, Relic, RoomType, Stance, ALL_POWERS,
+    ALL_RELICS,
+};
+use crate::events::EventState;
+use crate::map::{ActMap, MapNode};
+use crate::piles::CardPile;
+use crate::powers::Powers;
+use crate::rewards::RewardDeck;
+use crate::rng::SimRng;
+use crate::shop::{ShopItem, ShopState};
+use crate::undo::UndoLog;
+
+// Byte format: MAGIC, FORMAT_VERSION, a tag naming the top-level type, then the value.
+// Integers are LEB128 varints (signed ones zigzag-encoded), enums are their
+// discriminant, strings and vectors are length-prefixed. RNGs are stored as seed,
+// stream and word position, so a decoded state continues the exact same random
+// sequence. Bump FORMAT_VERSION whenever the encoding of any type changes.
+
+const MAGIC: &[u8; 3] = b"STS";
+const FORMAT_VERSION: u8 = 1;
+
+fn invalid(msg: String) -> PyErr {
+    PyErr::new::<pyo3::exceptions::PyValueError, _>(msg)
+}
+
+/// Cursor over encoded bytes.
+pub struct Reader<'a> {
+    data: &'a [u8],
+    pos: usize,
+}
+
+impl<'a> Reader<'a> {
+    fn take(&mut self, n: usize) -> PyResult<&'a [u8]> {
+        let end = self.pos.checked_add(n).filter(|&end| end <= self.data.len())
+            .ok_or_else(|| invalid(format!("Truncated data at byte {}", self.pos)))?;
+        let bytes = &self.data[self.pos..end];
+        self.pos = end;
+        Ok(bytes)
+    }
+
+    fn byte(&mut self) -> PyResult<u8> {
+        Ok(self.take(1)?[0])
+    }
+
+    fn varint(&mut self) -> PyResult<u64> {
+        let mut value = 0u64;
+        for shift in (0..64).step_by(7) {
+            let b = self.byte()?;
+            value |= ((b & 0x7F) as u64) << shift;
+            if b & 0x80 == 0 {
+                return Ok(value);
+            }
+        }
+        Err(invalid(format!("Varint too long at byte {}", self.pos)))
+    }
+}
+
+fn write_varint(out: &mut Vec<u8>, mut v: u64) {
+    while v >= 0x80 {
+        out.push((v as u8) | 0x80);
+        v >>= 7;
+    }
+    out.push(v as u8);
+}
+
+/// A value with a binary encoding.
+pub trait Codec: Sized {
+    fn encode(&self, out: &mut Vec<u8>);
+    fn decode(r: &mut Reader<'_>) -> PyResult<Self>;
+}
+
+/// A type that can be serialized on its own, identified by `TAG` in the header.
+pub trait Record: Codec {
+    const TAG: u8;
+}
+
+pub fn to_bytes<T: Record>(value: &T) -> Vec<u8> {
+    let mut out = Vec::with_capacity(256);
+    out.extend_from_slice(MAGIC);
+    out.push(FORMAT_VERSION);
+    out.push(T::TAG);
+    value.encode(&mut out);
+    out
+}
+
+pub fn from_bytes<T: Record>(data: &[u8]) -> PyResult<T> {
+    let mut r = Reader { data, pos: 0 };
+    if r.take(MAGIC.len()).ok() != Some(&MAGIC[..]) {
+        return Err(invalid("Not sts_sim serialized data".to_string()));
+    }
+    let version = r.byte()?;
+    if version != FORMAT_VERSION {
+        return Err(invalid(format!(
+            "Unsupported format version {} (expected {})", version, FORMAT_VERSION
+        )));
+    }
+    let tag = r.byte()?;
+    if tag != T::TAG {
+        return Err(invalid(format!("Data holds type tag {}, expected {}", tag, T::TAG)));
+    }
+    let value = T::decode(&mut r)?;
+    if r.pos != data.len() {
+        return Err(invalid(format!("{} trailing bytes", data.len() - r.pos)));
+    }
+    Ok(value)
+}
+
+pub fn to_pybytes<'py, T: Record>(py: Python<'py>, value: &T) -> Bound<'py, PyBytes> {
+    PyBytes::new(py, &to_bytes(value))
+}
+
+/// Return value of `__reduce__`: unpickling calls `cls.from_bytes(data)`.
+pub type Reduced<'py> = (Bound<'py, PyAny>, (Bound<'py, PyBytes>,));
+
+pub fn reduce<'py, T: Record + PyClass>(slf: &Bound<'py, T>) -> PyResult<Reduced<'py>> {
+    let from_bytes = slf.get_type().getattr("from_bytes")?;
+    let data = to_pybytes(slf.py(), &*slf.borrow());
+    Ok((from_bytes, (data,)))
+}
+
+impl Codec for bool {
+    fn encode(&self, out: &mut Vec<u8>) {
+        out.push(*self as u8);
+    }
+
+    fn decode(r: &mut Reader<'_>) -> PyResult<Self> {
+        match r.byte()? {
+            0 => Ok(false),
+            1 => Ok(true),
+            b => Err(invalid(format!("Invalid bool {}", b))),
+        }
+    }
+}
+
+impl Codec for u8 {
+    fn encode(&self, out: &mut Vec<u8>) {
+        out.push(*self);
+    }
+
+    fn decode(r: &mut Reader<'_>) -> PyResult<Self> {
+        r.byte()
+    }
+}
+
+impl Codec for u64 {
+    fn encode(&self, out: &mut Vec<u8>) {
+        write_varint(out, *self);
+    }
+
+    fn decode(r: &mut Reader<'_>) -> PyResult<Self> {
+        r.varint()
+    }
+}
+
+impl Codec for usize {
+    fn encode(&self, out: &mut Vec<u8>) {
+        write_varint(out, *self as u64);
+    }
+
+    fn decode(r: &mut Reader<'_>) -> PyResult<Self> {
+        let v = r.varint()?;
+        usize::try_from(v).map_err(|_| invalid(format!("Length {} out of range", v)))
+    }
+}
+
+impl Codec for i32 {
+    fn encode(&self, out: &mut Vec<u8>) {
+        write_varint(out, ((*self << 1) ^ (*self >> 31)) as u32 as u64);
+    }
+
+    fn decode(r: &mut Reader<'_>) -> PyResult<Self> {
+        let v = u32::try_from(r.varint()?).map_err(|_| invalid("i32 out of range".to_string()))?;
+        Ok((v >> 1) as i32 ^ -((v & 1) as i32))
+    }
+}
+
+impl Codec for char {
+    fn encode(&self, out: &mut Vec<u8>) {
+        write_varint(out, *self as u64);
+    }
+
+    fn decode(r: &mut Reader<'_>) -> PyResult<Self> {
+        let v = r.varint()?;
+        u32::try_from(v).ok().and_then(char::from_u32)
+            .ok_or_else(|| invalid(format!("Invalid char {}", v)))
+    }
+}
+
+impl Codec for String {
+    fn encode(&self, out: &mut Vec<u8>) {
+        self.len().encode(out);
+        out.extend_from_slice(self.as_bytes());
+    }
+
+    fn decode(r: &mut Reader<'_>) -> PyResult<Self> {
+        let len = usize::decode(r)?;
+        let bytes = r.take(len)?;
+        String::from_utf8(bytes.to_vec()).map_err(|_| invalid("Invalid UTF-8 string".to_string()))
+    }
+}
+
+impl Codec for Arc<str> {
+    fn encode(&self, out: &mut Vec<u8>) {
+        self.len().encode(out);
+        out.extend_from_slice(self.as_bytes());
+    }
+
+    fn decode(r: &mut Reader<'_>) -> PyResult<Self> {
+        Ok(String::decode(r)?.into())
+    }
+}
+
+/// Encode `items` the way a Vec of them is encoded.
+fn encode_slice<T: Codec>(items: &[T], out: &mut Vec<u8>) {
+    items.len().encode(out);
+    for item in items {
+        item.encode(out);
+    }
+}
+
+impl<T: Codec> Codec for Vec<T> {
+    fn encode(&self, out: &mut Vec<u8>) {
+        encode_slice(self, out);
+    }
+
+    fn decode(r: &mut Reader<'_>) -> PyResult<Self> {
+        let len = usize::decode(r)?;
+        // Every element takes at least one byte, which bounds the allocation.
+        if len > r.data.len() - r.pos {
+            return Err(invalid(format!("Length {} exceeds remaining data", len)));
+        }
+        (0..len).map(|_| T::decode(r)).collect()
+    }
+}
+
+impl<T: Codec> Codec for Option<T> {
+    fn encode(&self, out: &mut Vec<u8>) {
+        match self {
+            Some(v) => {
+                out.push(1);
+                v.encode(out);
+            }
+            None => out.push(0),
+        }
+    }
+
+    fn decode(r: &mut Reader<'_>) -> PyResult<Self> {
+        if bool::decode(r)? { Ok(Some(T::decode(r)?)) } else { Ok(None) }
+    }
+}
+
+impl<A: Codec, B: Codec> Codec for (A, B) {
+    fn encode(&self, out: &mut Vec<u8>) {
+        self.0.encode(out);
+        self.1.encode(out);
+    }
+
+    fn decode(r: &mut Reader<'_>) -> PyResult<Self> {
+        Ok((A::decode(r)?, B::decode(r)?))
+    }
+}
+
+/// Encode a fieldless enum as its discriminant, decoding through a table of every
+/// variant in discriminant order.
+macro_rules! enum_codec {
+    ($ty:ident, $all:expr) => {
+        impl Codec for $ty {
+            fn encode(&self, out: &mut Vec<u8>) {
+                (*self as usize).encode(out);
+            }
+
+            fn decode(r: &mut Reader<'_>) -> PyResult<Self> {
+                let i = usize::decode(r)?;
+                $all.get(i).copied()
+                    .ok_or_else(|| invalid(format!("Invalid {} {}", stringify!($ty), i)))
+            }
+        }
+    };
+}
+
+enum_codec!(Card, ALL_CARDS);
+enum_codec!(Relic, ALL_RELICS);
+enum_codec!(PowerType, ALL_POWERS);
+enum_codec!(Stance, [Stance::Neutral, Stance::Wrath, Stance::Calm]);
+enum_codec!(OrbType, [OrbType::Lightning, OrbType::Frost, OrbType::Dark]);
+enum_codec!(CardRarity, [CardRarity::Common, CardRarity::Uncommon, CardRarity::Rare]);
+enum_codec!(Intent, [
+    Intent::Attack, Intent::AttackBuff, Intent::AttackDebuff, Intent::AttackDefend,
+    Intent::Defend, Intent::DefendBuff, Intent::Buff, Intent::Debuff, Intent::StrongDebuff,
+    Intent::Sleep, Intent::Stun, Intent::Escape, Intent::Unknown,
+]);
+enum_codec!(RoomType, [
+    RoomType::Monster, RoomType::Elite, RoomType::Rest, RoomType::Shop, RoomType::Event,
+    RoomType::Treasure, RoomType::Boss, RoomType::Empty,
+]);
+enum_codec!(EventType, [
+    EventType::BigFish, EventType::GoldenIdol, EventType::GoldenWing, EventType::WorldOfGoop,
+    EventType::Cleric, EventType::LivingWall, EventType::ScrapOoze, EventType::DeadAdventurer,
+    EventType::KnowingSkull,
+]);
+
+impl Codec for Powers {
+    fn encode(&self, out: &mut Vec<u8>) {
+        self.len().encode(out);
+        for (power, amount) in self.iter() {
+            power.encode(out);
+            amount.encode(out);
+        }
+    }
+
+    fn decode(r: &mut Reader<'_>) -> PyResult<Self> {
+        let mut powers = Powers::new();
+        for _ in 0..usize::decode(r)? {
+            let power = PowerType::decode(r)?;
+            powers.set(power, i32::decode(r)?);
+        }
+        Ok(powers)
+    }
+}
+
+impl Codec for SimRng {
+    fn encode(&self, out: &mut Vec<u8>) {
+        out.extend_from_slice(&self.get_seed());
+        self.get_stream().encode(out);
+        out.extend_from_slice(&self.get_word_pos().to_le_bytes());
+    }
+
+    fn decode(r: &mut Reader<'_>) -> PyResult<Self> {
+        let seed: [u8; 32] = r.take(32)?.try_into().expect("took 32 bytes");
+        let stream = u64::decode(r)?;
+        let word_pos = u128::from_le_bytes(r.take(16)?.try_into().expect("took 16 bytes"));
+        let mut rng = SimRng::from_seed(seed);
+        rng.set_stream(stream);
+        rng.set_word_pos(word_pos);
+        Ok(rng)
+    }
+}
+
+impl Codec for CardInstance {
+    fn encode(&self, out: &mut Vec<u8>) {
+        self.card.encode(out);
+        self.upgraded.encode(out);
+    }
+
+    fn decode(r: &mut Reader<'_>) -> PyResult<Self> {
+        Ok(CardInstance { card: Card::decode(r)?, upgraded: bool::decode(r)? })
+    }
+}
+
+impl Codec for TheDie {
+    fn encode(&self, out: &mut Vec<u8>) {
+        self.rng.encode(out);
+        self.locked_value.encode(out);
+    }
+
+    fn decode(r: &mut Reader<'_>) -> PyResult<Self> {
+        let rng = SimRng::decode(r)?;
+        let locked_value: Option<u8> = Option::decode(r)?;
+        // A locked face outside 1..=6 would panic in behavior_index/die_move later.
+        if let Some(v) = locked_value.filter(|v| !(1..=6).contains(v)) {
+            return Err(invalid(format!("Locked die value {} is not a face of the die", v)));
+        }
+        Ok(TheDie { rng, locked_value })
+    }
+}
+
+// A pile's hash is stored with it: a Player decoded on its own has no deck to
+// recompute it from. CombatState recomputes it anyway once the deck is known.
+fn encode_pile(pile: &CardPile, out: &mut Vec<u8>) {
+    encode_slice(pile, out);
+    pile.hash().encode(out);
+}
+
+fn decode_pile(r: &mut Reader<'_>, ordered: bool) -> PyResult<CardPile> {
+    let cards = Codec::decode(r)?;
+    Ok(CardPile::with_hash(cards, ordered, Codec::decode(r)?))
+}
+
+impl Codec for Player {
+    fn encode(&self, out: &mut Vec<u8>) {
+        self.name.encode(out);
+        self.hp.encode(out);
+        self.max_hp.encode(out);
+        self.block.encode(out);
+        self.block_cap.encode(out);
+        self.energy.encode(out);
+        self.max_energy.encode(out);
+        self.draw_amount.encode(out);
+        self.gold.encode(out);
+        self.powers.encode(out);
+        encode_pile(&self.draw_pile, out);
+        encode_pile(&self.discard_pile, out);
+        encode_pile(&self.exhaust_pile, out);
+        encode_pile(&self.hand_indices, out);
+        self.relics.encode(out);
+        self.orbs.encode(out);
+        self.orb_slots.encode(out);
+        self.stance.encode(out);
+        self.free_play_for.encode(out);
+    }
+
+    fn decode(r: &mut Reader<'_>) -> PyResult<Self> {
+        Ok(Player {
+            name: Codec::decode(r)?,
+            hp: Codec::decode(r)?,
+            max_hp: Codec::decode(r)?,
+            block: Codec::decode(r)?,
+            block_cap: Codec::decode(r)?,
+            energy: Codec::decode(r)?,
+            max_energy: Codec::decode(r)?,
+            draw_amount: Codec::decode(r)?,
+            gold: Codec::decode(r)?,
+            powers: Codec::decode(r)?,
+            draw_pile: decode_pile(r, true)?,
+            discard_pile: decode_pile(r, false)?,
+            exhaust_pile: decode_pile(r, false)?,
+            hand_indices: decode_pile(r, false)?,
+            relics: Codec::decode(r)?,
+            orbs: Codec::decode(r)?,
+            orb_slots: Codec::decode(r)?,
+            stance: Codec::decode(r)?,
+            free_play_for: Codec::decode(r)?,
+        })
+    }
+}
+
+impl Codec for Monster {
+    // kind and die_moves are decoded from monster_id and behavior, as the setters do.
+    fn encode(&self, out: &mut Vec<u8>) {
+        self.name.encode(out);
+        self.hp.encode(out);
+        self.max_hp.encode(out);
+        self.block.encode(out);
+        self.monster_id.encode(out);
+        self.behavior.encode(out);
+        self.die_controlled.encode(out);
+        self.first_turn.encode(out);
+        self.turn_count.encode(out);
+        self.half_dead.encode(out);
+        self.powers.encode(out);
+        self.current_move.encode(out);
+        self.intent.encode(out);
+    }
+
+    fn decode(r: &mut Reader<'_>) -> PyResult<Self> {
+        let name = String::decode(r)?;
+        let hp = i32::decode(r)?;
+        let max_hp = i32::decode(r)?;
+        let block = i32::decode(r)?;
+        let monster_id = String::decode(r)?;
+        let behavior = String::decode(r)?;
+        let die_controlled = bool::decode(r)?;
+        let mut m = Monster::new(name, hp, monster_id, behavior, die_controlled);
+        m.max_hp = max_hp;
+        m.block = block;
+        m.first_turn = Codec::decode(r)?;
+        m.turn_count = Codec::decode(r)?;
+        m.half_dead = Codec::decode(r)?;
+        m.powers = Codec::decode(r)?;
+        m.current_move = Codec::decode(r)?;
+        m.intent = Codec::decode(r)?;
+        Ok(m)
+    }
+}
+
+impl Codec for CombatState {
+    fn encode(&self, out: &mut Vec<u8>) {
+        self.player.encode(out);
+        self.turn_number.encode(out);
+        self.combat_over.encode(out);
+        self.player_won.encode(out);
+        self.monsters.encode(out);
+        self.deck.encode(out);
+        self.die.encode(out);
+        self.rng.encode(out);
+        self.stance_changed_this_turn.encode(out);
+        self.has_card_been_played_this_turn.encode(out);
+        self.cards_played_this_turn.encode(out);
+        self.player_damaged_this_combat.encode(out);
+        self.discarded_this_turn.encode(out);
+        self.cards_cost_zero_this_turn.encode(out);
+        self.shivs_played_this_turn.encode(out);
+    }
+
+    fn decode(r: &mut Reader<'_>) -> PyResult<Self> {
+        let mut state = CombatState {
+            player: Codec::decode(r)?,
+            turn_number: Codec::decode(r)?,
+            combat_over: Codec::decode(r)?,
+            player_won: Codec::decode(r)?,
+            monsters: Codec::decode(r)?,
+            deck: Codec::decode(r)?,
+            die: Codec::decode(r)?,
+            rng: Codec::decode(r)?,
+            undo_log: UndoLog::default(),
+            trace: None,
+            stance_changed_this_turn: Codec::decode(r)?,
+            has_card_been_played_this_turn: Codec::decode(r)?,
+            cards_played_this_turn: Codec::decode(r)?,
+            player_damaged_this_combat: Codec::decode(r)?,
+            discarded_this_turn: Codec::decode(r)?,
+            cards_cost_zero_this_turn: Codec::decode(r)?,
+            shivs_played_this_turn: Codec::decode(r)?,
+        };
+        // Piles index into the deck; reject data that would panic later.
+        let p = &state.player;
+        let in_deck = |&i: &usize| i < state.deck.len();
+        let piles_valid = p.draw_pile.iter().all(in_deck)
+            && p.discard_pile.iter().all(in_deck)
+            && p.exhaust_pile.iter().all(in_deck)
+            && p.hand_indices.iter().all(in_deck)
+            && state.cards_played_this_turn.iter().all(|(i, _)| in_deck(i));
+        if !piles_valid {
+            return Err(invalid("Pile index out of range of the deck".to_string()));
+        }
+        let p = &mut state.player;
+        for pile in [&mut p.draw_pile, &mut p.discard_pile, &mut p.exhaust_pile, &mut p.hand_indices] {
+            pile.rehash(&state.deck);
+        }
+        Ok(state)
+    }
+}
+
+impl Codec for MapNode {
+    fn encode(&self, out: &mut Vec<u8>) {
+        self.row.encode(out);
+        self.col.encode(out);
+        self.room_type.encode(out);
+        self.connections.encode(out);
+    }
+
+    fn decode(r: &mut Reader<'_>) -> PyResult<Self> {
+        Ok(MapNode {
+            row: Codec::decode(r)?,
+            col: Codec::decode(r)?,
+            room_type: Codec::decode(r)?,
+            connections: Codec::decode(r)?,
+        })
+    }
+}
+
+impl Codec for ActMap {
+    fn encode(&self, out: &mut Vec<u8>) {
+        self.nodes.encode(out);
+        self.layout_id.encode(out);
+    }
+
+    fn decode(r: &mut Reader<'_>) -> PyResult<Self> {
+        Ok(ActMap { nodes: Codec::decode(r)?, layout_id: Codec::decode(r)? })
+    }
+}
+
+impl Codec for RewardDeck {
+    fn encode(&self, out: &mut Vec<u8>) {
+        self.cards.encode(out);
+        self.rare_pool.encode(out);
+        self.rng.encode(out);
+    }
+
+    fn decode(r: &mut Reader<'_>) -> PyResult<Self> {
+        Ok(RewardDeck {
+            cards: Codec::decode(r)?,
+            rare_pool: Codec::decode(r)?,
+            rng: Codec::decode(r)?,
+        })
+    }
+}
+
+impl Codec for ShopItem {
+    fn encode(&self, out: &mut Vec<u8>) {
+        self.name.encode(out);
+        self.price.encode(out);
+        self.item_type.encode(out);
+        self.card.encode(out);
+        self.relic.encode(out);
+    }
+
+    fn decode(r: &mut Reader<'_>) -> PyResult<Self> {
+        Ok(ShopItem {
+            name: Codec::decode(r)?,
+            price: Codec::decode(r)?,
+            item_type: Codec::decode(r)?,
+            card: Codec::decode(r)?,
+            relic: Codec::decode(r)?,
+        })
+    }
+}
+
+impl Codec for ShopState {
+    fn encode(&self, out: &mut Vec<u8>) {
+        self.items.encode(out);
+        self.removal_cost.encode(out);
+    }
+
+    fn decode(r: &mut Reader<'_>) -> PyResult<Self> {
+        Ok(ShopState { items: Codec::decode(r)?, removal_cost: Codec::decode(r)? })
+    }
+}
+
+impl Codec for EventState {
+    fn encode(&self, out: &mut Vec<u8>) {
+        self.event_type.encode(out);
+        self.stage.encode(out);
+        self.done.encode(out);
+        self.picks_made.encode(out);
+    }
+
+    fn decode(r: &mut Reader<'_>) -> PyResult<Self> {
+        Ok(EventState {
+            event_type: Codec::decode(r)?,
+            stage: Codec::decode(r)?,
+            done: Codec::decode(r)?,
+            picks_made: Codec::decode(r)?,
+        })
+    }
+}
+
+impl Record for CombatState { const TAG: u8 = 1; }
+impl Record for Player { const TAG: u8 = 2; }
+impl Record for Monster { const TAG: u8 = 3; }
+impl Record for CardInstance { const TAG: u8 = 4; }
+impl Record for TheDie { const TAG: u8 = 5; }
+impl Record for ActMap { const TAG: u8 = 6; }
+impl Record for RewardDeck { const TAG: u8 = 7; }
+impl Record for ShopState { const TAG: u8 = 8; }
+impl Record for EventState { const TAG: u8 = 9; }
@@ -1,4 +1,5 @@
 use pyo3::prelude::*;
+use pyo3::types::PyBytes;
 use rand::rngs::StdRng;
 use rand::seq::SliceRandom;
 use rand::SeedableRng;
@@ -6,6 +7,7 @@ use rand::SeedableRng;
 use crate::cards::{Card, CardInstance};
 use crate::enums::{CardRarity, Character, Relic};
 use crate::rewards::{card_price, get_card_rarity};
+use crate::serialize;
 
 /// A shop item for sale.
 #[pyclass]
@@ -24,7 +26,7 @@ pub struct ShopItem {
 }
 
 /// The shop state.
-#[pyclass]
+#[pyclass(module = "sts_sim")]
 #[derive(Clone, Debug)]
 pub struct ShopState {
     #[pyo3(get)]
@@ -45,6 +47,30 @@ impl ShopState {
     pub fn get_removal_cost(&self) -> i32 {
         self.removal_cost
     }
+
+    /// Compact, versioned binary encoding of this shop. Inverse of from_bytes.
+    pub fn to_bytes<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+        serialize::to_pybytes(py, self)
+    }
+
+    /// Decode to_bytes output. Raises ValueError on malformed or incompatible data.
+    #[staticmethod]
+    pub fn from_bytes(data: &[u8]) -> PyResult<Self> {
+        serialize::from_bytes(data)
+    }
+
+    pub fn __getstate__<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+        serialize::to_pybytes(py, self)
+    }
+
+    pub fn __setstate__(&mut self, state: &[u8]) -> PyResult<()> {
+        *self = serialize::from_bytes(state)?;
+        Ok(())
+    }
+
+    pub fn __reduce__<'py>(slf: &Bound<'py, Self>) -> PyResult<serialize::Reduced<'py>> {
+        serialize::reduce(slf)
+    }
 }
 
 /// Generate a shop with cards and a relic for sale.
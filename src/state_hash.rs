@@ -0,0 +1,239 @@
+use crate::cards::{Card, CardInstance};
+use crate::combat::CombatState;
+use crate::creature::Monster;
+use crate::enums::PowerType;
+
+// Canonical form of a combat position, shared by state_hash and canonical_eq:
+//   - hand, discard pile, exhaust pile and cards played this turn are multisets of
+//     (card, upgraded); deck indices and ordering are ignored
+//   - the draw pile is ordered, since it determines future draws
+//   - powers are compared as maps (an entry with amount 0 still counts)
+//   - the shuffle RNG and the die are not part of the position
+// Cards played this turn are kept in order when the deck holds a Doppelganger, which
+// replays the most recent card of a given cost.
+//
+// The hash is Zobrist-style: every feature contributes an independent pseudo-random
+// key and keys are summed, so multisets hash the same in any order and repeated cards
+// don't cancel out. Piles (CardPile) and power tables (Powers) keep a running sum of
+// their keys, updated as cards move and powers change, so state_hash only walks the
+// fixed-size parts of the state.
+
+const TAG_SCALAR: u64 = 1;
+const TAG_PLAYER_POWER: u64 = 2;
+const TAG_HAND: u64 = 3;
+const TAG_DRAW: u64 = 4;
+const TAG_DISCARD: u64 = 5;
+const TAG_EXHAUST: u64 = 6;
+const TAG_PLAYED: u64 = 7;
+const TAG_PLAYED_ORDER: u64 = 8;
+const TAG_ORB: u64 = 9;
+const TAG_RELIC: u64 = 10;
+const TAG_MONSTER: u64 = 11;
+const TAG_MONSTER_POWER: u64 = 12;
+const TAG_PILE_CARD: u64 = 13;
+const TAG_POWER: u64 = 14;
+
+fn mix(mut x: u64) -> u64 {
+    x = x.wrapping_add(0x9E37_79B9_7F4A_7C15);
+    x = (x ^ (x >> 30)).wrapping_mul(0xBF58_476D_1CE4_E5B9);
+    x = (x ^ (x >> 27)).wrapping_mul(0x94D0_49BB_1331_11EB);
+    x ^ (x >> 31)
+}
+
+/// Pseudo-random key for feature `tag` at position `a` with value `b`.
+fn key(tag: u64, a: u64, b: u64) -> u64 {
+    mix(mix(mix(tag) ^ a) ^ b)
+}
+
+fn str_value(s: &str) -> u64 {
+    // FNV-1a
+    s.bytes().fold(0xCBF2_9CE4_8422_2325, |h, b| (h ^ b as u64).wrapping_mul(0x0000_0100_0000_01B3))
+}
+
+fn card_value(ci: CardInstance) -> u64 {
+    ((ci.card as u64) << 1) | ci.upgraded as u64
+}
+
+// Running sums are updated on every card move and power change, so their keys take a
+// single mix of the packed feature; distinct features never share an input.
+
+/// Key of `ci` at position `pos` of a pile; multiset piles pass 0 for every card.
+#[inline]
+pub(crate) fn pile_key(pos: usize, ci: CardInstance) -> u64 {
+    mix(TAG_PILE_CARD << 56 | (pos as u64) << 32 | card_value(ci))
+}
+
+/// Key of a power entry.
+#[inline]
+pub(crate) fn power_key(power: PowerType, amount: i32) -> u64 {
+    mix(TAG_POWER << 56 | (power as u64) << 32 | amount as u32 as u64)
+}
+
+fn has_doppelganger(state: &CombatState) -> bool {
+    state.deck.iter().any(|ci| ci.card == Card::Doppelganger)
+}
+
+fn monster_hash(m: &Monster, slot: u64) -> u64 {
+    let fields = [
+        str_value(&m.name),
+        m.hp as u64,
+        m.max_hp as u64,
+        m.block as u64,
+        str_value(&m.monster_id),
+        str_value(&m.behavior),
+        m.die_controlled as u64,
+        m.first_turn as u64,
+        m.turn_count as u64,
+        m.half_dead as u64,
+        m.current_move as u64,
+        m.intent as u64,
+    ];
+    let h = fields.iter().enumerate().fold(0u64, |h, (i, &v)| {
+        h.wrapping_add(key(TAG_MONSTER, (slot << 16) | i as u64, v))
+    });
+    h.wrapping_add(key(TAG_MONSTER_POWER, slot, m.powers.hash()))
+}
+
+/// Hash of the canonical form of `state`. States that compare equal under
+/// canonical_eq always hash the same.
+pub fn state_hash(state: &CombatState) -> u64 {
+    let p = &state.player;
+    let mut h = 0u64;
+    let mut add = |k: u64| h = h.wrapping_add(k);
+
+    let scalars = [
+        str_value(&p.name),
+        p.hp as u64,
+        p.max_hp as u64,
+        p.block as u64,
+        p.block_cap as u64,
+        p.energy as u64,
+        p.max_energy as u64,
+        p.draw_amount as u64,
+        p.gold as u64,
+        p.orb_slots as u64,
+        p.stance as u64,
+        state.turn_number as u64,
+        state.combat_over as u64,
+        state.player_won as u64,
+        state.stance_changed_this_turn as u64,
+        state.has_card_been_played_this_turn as u64,
+        state.player_damaged_this_combat as u64,
+        state.discarded_this_turn as u64,
+        state.cards_cost_zero_this_turn as u64,
+        state.shivs_played_this_turn as u64,
+        p.free_play_for as u64,
+    ];
+    for (i, &v) in scalars.iter().enumerate() {
+        add(key(TAG_SCALAR, i as u64, v));
+    }
+
+    add(key(TAG_PLAYER_POWER, 0, p.powers.hash()));
+    add(key(TAG_HAND, 0, p.hand_indices.hash()));
+    add(key(TAG_DRAW, 0, p.draw_pile.hash()));
+    add(key(TAG_DISCARD, 0, p.discard_pile.hash()));
+    add(key(TAG_EXHAUST, 0, p.exhaust_pile.hash()));
+
+    let ordered = has_doppelganger(state);
+    for (pos, &(idx, target)) in state.cards_played_this_turn.iter().enumerate() {
+        add(key(TAG_PLAYED, 0, card_value(state.deck[idx])));
+        if ordered {
+            let target = target.map_or(0, |t| t as u64 + 1);
+            add(key(TAG_PLAYED_ORDER, pos as u64, (card_value(state.deck[idx]) << 8) | target));
+        }
+    }
+
+    for (pos, &orb) in p.orbs.iter().enumerate() {
+        add(key(TAG_ORB, pos as u64, orb as u64));
+    }
+    for (pos, &relic) in p.relics.iter().enumerate() {
+        add(key(TAG_RELIC, pos as u64, relic as u64));
+    }
+
+    for (slot, m) in state.monsters.iter().enumerate() {
+        add(monster_hash(m, slot as u64));
+    }
+    h
+}
+
+fn sorted_cards(state: &CombatState, pile: &[usize]) -> Vec<u64> {
+    let mut cards: Vec<u64> = pile.iter().map(|&i| card_value(state.deck[i])).collect();
+    cards.sort_unstable();
+    cards
+}
+
+fn same_cards_in_order(a: &CombatState, pa: &[usize], b: &CombatState, pb: &[usize]) -> bool {
+    pa.len() == pb.len() && pa.iter().zip(pb).all(|(&i, &j)| a.deck[i] == b.deck[j])
+}
+
+fn same_monster(a: &Monster, b: &Monster) -> bool {
+    a.name == b.name
+        && a.hp == b.hp
+        && a.max_hp == b.max_hp
+        && a.block == b.block
+        && a.monster_id == b.monster_id
+        && a.behavior == b.behavior
+        && a.die_controlled == b.die_controlled
+        && a.first_turn == b.first_turn
+        && a.turn_count == b.turn_count
+        && a.half_dead == b.half_dead
+        && a.current_move == b.current_move
+        && a.intent == b.intent
+        && a.powers == b.powers
+}
+
+/// Whether `a` and `b` are the same position in canonical form.
+pub fn canonical_eq(a: &CombatState, b: &CombatState) -> bool {
+    let (pa, pb) = (&a.player, &b.player);
+    let scalars_equal = pa.name == pb.name
+        && pa.hp == pb.hp
+        && pa.max_hp == pb.max_hp
+        && pa.block == pb.block
+        && pa.block_cap == pb.block_cap
+        && pa.energy == pb.energy
+        && pa.max_energy == pb.max_energy
+        && pa.draw_amount == pb.draw_amount
+        && pa.gold == pb.gold
+        && pa.orb_slots == pb.orb_slots
+        && pa.stance == pb.stance
+        && pa.orbs == pb.orbs
+        && pa.relics == pb.relics
+        && pa.free_play_for == pb.free_play_for
+        && pa.powers == pb.powers
+        && a.turn_number == b.turn_number
+        && a.combat_over == b.combat_over
+        && a.player_won == b.player_won
+        && a.stance_changed_this_turn == b.stance_changed_this_turn
+        && a.has_card_been_played_this_turn == b.has_card_been_played_this_turn
+        && a.player_damaged_this_combat == b.player_damaged_this_combat
+        && a.discarded_this_turn == b.discarded_this_turn
+        && a.cards_cost_zero_this_turn == b.cards_cost_zero_this_turn
+        && a.shivs_played_this_turn == b.shivs_played_this_turn;
+    if !scalars_equal
+        || a.monsters.len() != b.monsters.len()
+        || !a.monsters.iter().zip(&b.monsters).all(|(x, y)| same_monster(x, y))
+        || !same_cards_in_order(a, &pa.draw_pile, b, &pb.draw_pile)
+    {
+        return false;
+    }
+    if sorted_cards(a, &pa.hand_indices) != sorted_cards(b, &pb.hand_indices)
+        || sorted_cards(a, &pa.discard_pile) != sorted_cards(b, &pb.discard_pile)
+        || sorted_cards(a, &pa.exhaust_pile) != sorted_cards(b, &pb.exhaust_pile)
+    {
+        return false;
+    }
+
+    let ordered = has_doppelganger(a);
+    if ordered != has_doppelganger(b) {
+        return false;
+    }
+    let played_a: Vec<usize> = a.cards_played_this_turn.iter().map(|&(i, _)| i).collect();
+    let played_b: Vec<usize> = b.cards_played_this_turn.iter().map(|&(i, _)| i).collect();
+    if ordered {
+        let targets_a = a.cards_played_this_turn.iter().map(|&(_, t)| t);
+        let targets_b = b.cards_played_this_turn.iter().map(|&(_, t)| t);
+        same_cards_in_order(a, &played_a, b, &played_b) && targets_a.eq(targets_b)
+    } else {
+        sorted_cards(a, &played_a) == sorted_cards(b, &played_b)
+    }
+}
@@ -0,0 +1,307 @@
+use std::cell::{Cell, RefCell};
+
+use crate::cards::CardInstance;
+use crate::combat::CombatState;
+use crate::creature::Monster;
+use crate::enums::{OrbType, PowerType, Stance};
+
+// Events are recorded from deep inside the simulation (damage and power helpers only see
+// a creature), so the recorder of the state being simulated is parked in a thread-local
+// for the duration of each top-level call (see `scoped`). With no recorder installed,
+// every hook is a single thread-local flag test.
+thread_local! {
+    static ENABLED: Cell<bool> = const { Cell::new(false) };
+    static ACTIVE: RefCell<Option<Active>> = const { RefCell::new(None) };
+}
+
+/// What happened, stored in Event::kind.
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+#[repr(u8)]
+pub enum EventKind {
+    /// amount = HP lost, extra = damage absorbed by block.
+    Damage = 0,
+    /// amount = block gained.
+    Block = 1,
+    /// code = PowerType, amount = amount applied.
+    Power = 2,
+    /// code = Card, src/dst = Pile, amount = deck index, extra = 1 if upgraded.
+    CardMove = 3,
+    /// code = OrbType.
+    OrbChannel = 4,
+    /// code = OrbType.
+    OrbEvoke = 5,
+    /// code = new Stance, extra = previous Stance.
+    Stance = 6,
+    /// amount = face rolled.
+    DieRoll = 7,
+}
+
+/// Names of the event kinds, indexed by EventKind.
+pub const EVENT_KINDS: [&str; 8] = [
+    "damage", "block", "power", "card_move", "orb_channel", "orb_evoke", "stance", "die_roll",
+];
+
+/// Card locations for CardMove events. None is outside the piles: cards created mid-combat
+/// come from it and played powers go to it.
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+#[repr(u8)]
+pub enum Pile {
+    None = 0,
+    Draw = 1,
+    Hand = 2,
+    Discard = 3,
+    Exhaust = 4,
+    /// A card being played, between leaving the hand and its destination pile.
+    Play = 5,
+}
+
+/// Names of the piles, indexed by Pile.
+pub const PILES: [&str; 6] = ["none", "draw", "hand", "discard", "exhaust", "play"];
+
+/// Event::target for events on the player and for events with no target.
+pub const TARGET_PLAYER: i8 = -1;
+pub const TARGET_NONE: i8 = -2;
+
+/// One compact trace record; `target` is a monster index, TARGET_PLAYER or TARGET_NONE.
+#[derive(Clone, Copy, Debug, Default, PartialEq, Eq)]
+pub struct Event {
+    /// Position in the full event stream since the trace was enabled or cleared.
+    pub seq: u32,
+    pub turn: u16,
+    pub kind: u8,
+    pub target: i8,
+    pub code: u16,
+    pub src: u8,
+    pub dst: u8,
+    pub amount: i32,
+    pub extra: i32,
+}
+
+/// Field names and NumPy type strings of the packed record layout written by to_bytes.
+pub const EVENT_DTYPE: [(&str, &str); 9] = [
+    ("seq", "<u4"), ("turn", "<u2"), ("kind", "u1"), ("target", "i1"), ("code", "<u2"),
+    ("src", "u1"), ("dst", "u1"), ("amount", "<i4"), ("extra", "<i4"),
+];
+pub const EVENT_SIZE: usize = 20;
+
+impl Event {
+    fn write(&self, out: &mut Vec<u8>) {
+        out.extend_from_slice(&self.seq.to_le_bytes());
+        out.extend_from_slice(&self.turn.to_le_bytes());
+        out.push(self.kind);
+        out.push(self.target as u8);
+        out.extend_from_slice(&self.code.to_le_bytes());
+        out.push(self.src);
+        out.push(self.dst);
+        out.extend_from_slice(&self.amount.to_le_bytes());
+        out.extend_from_slice(&self.extra.to_le_bytes());
+    }
+}
+
+/// Ring buffer of the most recent events, allocated up front.
+#[derive(Clone, Debug)]
+pub struct Trace {
+    events: Vec<Event>,
+    capacity: usize,
+    /// Slot the next event goes to once the buffer is full.
+    next: usize,
+    /// Events recorded since the last clear, including overwritten ones.
+    total: u64,
+}
+
+impl Trace {
+    pub fn new(capacity: usize) -> Trace {
+        Trace { events: Vec::with_capacity(capacity), capacity, next: 0, total: 0 }
+    }
+
+    pub fn clear(&mut self) {
+        self.events.clear();
+        self.next = 0;
+        self.total = 0;
+    }
+
+    fn push(&mut self, mut event: Event) {
+        event.seq = self.total as u32;
+        self.total += 1;
+        if self.events.len() < self.capacity {
+            self.events.push(event);
+        } else {
+            self.events[self.next] = event;
+            self.next = (self.next + 1) % self.capacity;
+        }
+    }
+
+    /// Events still in the buffer, oldest first.
+    pub fn events(&self) -> impl Iterator<Item = &Event> {
+        self.events[self.next..].iter().chain(&self.events[..self.next])
+    }
+
+    /// Events overwritten because the buffer was full.
+    pub fn dropped(&self) -> u64 {
+        self.total - self.events.len() as u64
+    }
+
+    /// Packed records, oldest first, in the EVENT_DTYPE layout.
+    pub fn to_bytes(&self) -> Vec<u8> {
+        let mut out = Vec::with_capacity(self.events.len() * EVENT_SIZE);
+        for event in self.events() {
+            event.write(&mut out);
+        }
+        out
+    }
+}
+
+/// The installed recorder and what's needed to fill in events from leaf hooks.
+struct Active {
+    trace: Box<Trace>,
+    /// Address range of the state's monsters, to turn a &Monster into its index.
+    monsters: (usize, usize),
+    turn: i32,
+}
+
+fn monster_range(monsters: &[Monster]) -> (usize, usize) {
+    let start = monsters.as_ptr() as usize;
+    (start, start + std::mem::size_of_val(monsters))
+}
+
+/// Restores the previously installed recorder even if the call panics.
+struct Restore(Option<Option<Active>>);
+
+impl Drop for Restore {
+    fn drop(&mut self) {
+        if let Some(prev) = self.0.take() {
+            ENABLED.set(prev.is_some());
+            ACTIVE.set(prev);
+        }
+    }
+}
+
+/// Run `f` on `state` with its recorder (if any) receiving the events `f` triggers.
+/// Nested calls on the same state find the recorder already taken and just run.
+pub fn scoped<R>(state: &mut CombatState, f: impl FnOnce(&mut CombatState) -> R) -> R {
+    let Some(trace) = state.trace.take() else {
+        return f(state);
+    };
+    let active = Active { trace, monsters: monster_range(&state.monsters), turn: state.turn_number };
+    let mut restore = Restore(Some(ACTIVE.replace(Some(active))));
+    ENABLED.set(true);
+    let result = f(state);
+    let prev = restore.0.take().expect("restored once");
+    ENABLED.set(prev.is_some());
+    state.trace = ACTIVE.replace(prev).map(|a| a.trace);
+    result
+}
+
+#[inline]
+fn enabled() -> bool {
+    ENABLED.get()
+}
+
+#[cold]
+fn record(kind: EventKind, who: Who, code: u16, src: Pile, dst: Pile, amount: i32, extra: i32) {
+    ACTIVE.with_borrow_mut(|active| {
+        let Some(active) = active.as_mut() else { return };
+        let target = match who {
+            Who::Player => TARGET_PLAYER,
+            Who::None => TARGET_NONE,
+            Who::Monster(addr) => {
+                let (start, end) = active.monsters;
+                if (start..end).contains(&addr) {
+                    ((addr - start) / std::mem::size_of::<Monster>()) as i8
+                } else {
+                    TARGET_NONE
+                }
+            }
+        };
+        active.trace.push(Event {
+            seq: 0,
+            turn: active.turn.clamp(0, u16::MAX as i32) as u16,
+            kind: kind as u8,
+            target,
+            code,
+            src: src as u8,
+            dst: dst as u8,
+            amount,
+            extra,
+        });
+    });
+}
+
+/// Who an event happened to; monsters are identified by address until recorded.
+#[derive(Clone, Copy)]
+pub enum Who {
+    Player,
+    Monster(usize),
+    None,
+}
+
+impl Who {
+    pub fn monster(m: &Monster) -> Who {
+        Who::Monster(m as *const Monster as usize)
+    }
+}
+
+/// Call after the monster list may have been reallocated (monsters spawned).
+#[inline]
+pub fn monsters_moved(monsters: &[Monster]) {
+    if enabled() {
+        ACTIVE.with_borrow_mut(|a| if let Some(a) = a.as_mut() { a.monsters = monster_range(monsters) });
+    }
+}
+
+#[inline]
+pub fn set_turn(turn: i32) {
+    if enabled() {
+        ACTIVE.with_borrow_mut(|a| if let Some(a) = a.as_mut() { a.turn = turn });
+    }
+}
+
+#[inline]
+pub fn damage(who: Who, hp_lost: i32, blocked: i32) {
+    if enabled() {
+        record(EventKind::Damage, who, 0, Pile::None, Pile::None, hp_lost, blocked);
+    }
+}
+
+#[inline]
+pub fn block(who: Who, amount: i32) {
+    if enabled() {
+        record(EventKind::Block, who, 0, Pile::None, Pile::None, amount, 0);
+    }
+}
+
+#[inline]
+pub fn power(who: Who, power: PowerType, amount: i32) {
+    if enabled() {
+        record(EventKind::Power, who, power as u16, Pile::None, Pile::None, amount, 0);
+    }
+}
+
+#[inline]
+pub fn card_move(deck: &[CardInstance], deck_index: usize, src: Pile, dst: Pile) {
+    if enabled() {
+        let ci = deck[deck_index];
+        record(EventKind::CardMove, Who::Player, ci.card as u16, src, dst, deck_index as i32, ci.upgraded as i32);
+    }
+}
+
+#[inline]
+pub fn orb(kind: EventKind, orb: OrbType) {
+    if enabled() {
+        record(kind, Who::Player, orb as u16, Pile::None, Pile::None, 0, 0);
+    }
+}
+
+#[inline]
+pub fn stance(old: Stance, new: Stance) {
+    if enabled() {
+        record(EventKind::Stance, Who::Player, new as u16, Pile::None, Pile::None, 0, old as i32);
+    }
+}
+
+#[inline]
+pub fn die_roll(face: u8) {
+    if enabled() {
+        record(EventKind::DieRoll, Who::None, 0, Pile::None, Pile::None, face as i32, 0);
+    }
+}
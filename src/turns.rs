@@ -0,0 +1,67 @@
+use std::collections::HashMap;
+
+use crate::actions::{apply_action, write_action_mask, Action, END_TURN_ACTION, NUM_ACTIONS};
+use crate::combat::CombatState;
+use crate::state_hash;
+
+/// play_card arguments: (hand_index, target, choice).
+pub type Play = (usize, Option<usize>, Option<usize>);
+
+struct Node {
+    parent: usize,
+    play: Option<Play>,
+    state: CombatState,
+}
+
+/// Every distinct position the player can end the current turn in, each with one sequence
+/// of play_card calls that reaches it, starting with `state` itself and an empty sequence.
+/// Sequences are explored breadth-first and positions that are equal in canonical form
+/// (see state_hash; the shuffle RNG and die are ignored) are merged and expanded once,
+/// keeping the first, shortest sequence found. Positions where the combat ended are not
+/// expanded. Exploration stops once `max_nodes` positions have been found.
+pub fn enumerate_turn_outcomes(state: &CombatState, max_nodes: usize) -> Vec<(Vec<Play>, CombatState)> {
+    let mut nodes = vec![Node { parent: usize::MAX, play: None, state: state.clone() }];
+    let mut seen: HashMap<u64, Vec<usize>> = HashMap::new();
+    seen.entry(state_hash::state_hash(state)).or_default().push(0);
+    let mut mask = [0u8; NUM_ACTIONS];
+    let mut next = 0;
+    'expand: while next < nodes.len() {
+        let id = next;
+        next += 1;
+        if nodes[id].state.combat_over {
+            continue;
+        }
+        write_action_mask(&nodes[id].state, &mut mask);
+        for a in (0..END_TURN_ACTION).filter(|&a| mask[a] != 0) {
+            if nodes.len() >= max_nodes {
+                break 'expand;
+            }
+            let action = Action::from_index(a).expect("masked actions are in range");
+            let play = action.play_args(&nodes[id].state).expect("only card plays are expanded");
+            let mut child = nodes[id].state.clone();
+            if !apply_action(&mut child, action) {
+                continue;
+            }
+            let bucket = seen.entry(state_hash::state_hash(&child)).or_default();
+            if bucket.iter().any(|&n| state_hash::canonical_eq(&nodes[n].state, &child)) {
+                continue;
+            }
+            bucket.push(nodes.len());
+            nodes.push(Node { parent: id, play: Some(play), state: child });
+        }
+    }
+
+    let plays: Vec<Vec<Play>> = (0..nodes.len())
+        .map(|id| {
+            let mut seq = Vec::new();
+            let mut n = id;
+            while let Some(play) = nodes[n].play {
+                seq.push(play);
+                n = nodes[n].parent;
+            }
+            seq.reverse();
+            seq
+        })
+        .collect();
+    plays.into_iter().zip(nodes.into_iter().map(|n| n.state)).collect()
+}
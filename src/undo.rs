@@ -0,0 +1,424 @@
+use std::cell::{Cell, RefCell};
+
+use crate::actions::{apply_action, Action};
+use crate::cards::CardInstance;
+use crate::combat::CombatState;
+use crate::creature::{Monster, Player};
+use crate::die::TheDie;
+use crate::enums::{OrbType, PowerType, Stance};
+use crate::piles::CardPile;
+use crate::rng::SimRng;
+use crate::trace::Pile;
+
+// Prior values are recorded at the mutation sites, some of them deep inside the
+// simulation (power and orb helpers only see the player), so the journal of the state
+// being applied to is parked in a thread-local for the duration of `apply`. Outside
+// `apply`, every hook is a single thread-local flag test.
+thread_local! {
+    static ACTIVE: Cell<bool> = const { Cell::new(false) };
+    static JOURNAL: RefCell<UndoLog> = RefCell::new(UndoLog::default());
+}
+
+/// Fixed-size fields of a combat, saved whole by every entry. Together they are smaller
+/// than recording which of them changed.
+#[derive(Clone, Copy)]
+struct Scalars {
+    hp: i32,
+    max_hp: i32,
+    block: i32,
+    block_cap: i32,
+    energy: i32,
+    max_energy: i32,
+    draw_amount: i32,
+    gold: i32,
+    orb_slots: i32,
+    stance: Stance,
+    free_play_for: u8,
+    turn_number: i32,
+    combat_over: bool,
+    player_won: bool,
+    stance_changed_this_turn: bool,
+    has_card_been_played_this_turn: bool,
+    player_damaged_this_combat: bool,
+    discarded_this_turn: bool,
+    cards_cost_zero_this_turn: bool,
+    shivs_played_this_turn: i32,
+}
+
+impl Scalars {
+    fn of(state: &CombatState) -> Scalars {
+        let p = &state.player;
+        Scalars {
+            hp: p.hp,
+            max_hp: p.max_hp,
+            block: p.block,
+            block_cap: p.block_cap,
+            energy: p.energy,
+            max_energy: p.max_energy,
+            draw_amount: p.draw_amount,
+            gold: p.gold,
+            orb_slots: p.orb_slots,
+            stance: p.stance,
+            free_play_for: p.free_play_for,
+            turn_number: state.turn_number,
+            combat_over: state.combat_over,
+            player_won: state.player_won,
+            stance_changed_this_turn: state.stance_changed_this_turn,
+            has_card_been_played_this_turn: state.has_card_been_played_this_turn,
+            player_damaged_this_combat: state.player_damaged_this_combat,
+            discarded_this_turn: state.discarded_this_turn,
+            cards_cost_zero_this_turn: state.cards_cost_zero_this_turn,
+            shivs_played_this_turn: state.shivs_played_this_turn,
+        }
+    }
+
+    fn restore(&self, state: &mut CombatState) {
+        let p = &mut state.player;
+        p.hp = self.hp;
+        p.max_hp = self.max_hp;
+        p.block = self.block;
+        p.block_cap = self.block_cap;
+        p.energy = self.energy;
+        p.max_energy = self.max_energy;
+        p.draw_amount = self.draw_amount;
+        p.gold = self.gold;
+        p.orb_slots = self.orb_slots;
+        p.stance = self.stance;
+        p.free_play_for = self.free_play_for;
+        state.turn_number = self.turn_number;
+        state.combat_over = self.combat_over;
+        state.player_won = self.player_won;
+        state.stance_changed_this_turn = self.stance_changed_this_turn;
+        state.has_card_been_played_this_turn = self.has_card_been_played_this_turn;
+        state.player_damaged_this_combat = self.player_damaged_this_combat;
+        state.discarded_this_turn = self.discarded_this_turn;
+        state.cards_cost_zero_this_turn = self.cards_cost_zero_this_turn;
+        state.shivs_played_this_turn = self.shivs_played_this_turn;
+    }
+}
+
+fn pile_mut(player: &mut Player, pile: Pile) -> &mut CardPile {
+    match pile {
+        Pile::Hand => &mut player.hand_indices,
+        Pile::Draw => &mut player.draw_pile,
+        Pile::Discard => &mut player.discard_pile,
+        Pile::Exhaust => &mut player.exhaust_pile,
+        Pile::None | Pile::Play => unreachable!("{:?} holds no cards", pile),
+    }
+}
+
+/// One recorded prior value. Variable-size values go on the log's typed stacks in the
+/// same order, so undo pops them back off in reverse.
+#[derive(Clone, Copy)]
+enum Saved {
+    /// Prior contents of a pile: the top `len` entries of `indices`.
+    Pile(Pile, usize),
+    /// Prior orbs: the top `len` entries of `orbs`.
+    Orbs(usize),
+    /// Prior plays this turn: the top `len` entries of `plays`.
+    CardsPlayed(usize),
+    /// Prior amount of a player power; None if it had no entry.
+    Power(PowerType, Option<i32>),
+    /// Prior value of monster `i`: the top of `monsters`.
+    Monster(usize),
+    /// The monster list before monsters were added: the top `len` entries of `monsters`.
+    Monsters(usize),
+    /// Cards are only ever appended to the deck; truncate back to this length.
+    DeckLen(usize),
+    /// Prior shuffle RNG: the top of `rngs`.
+    Rng,
+    /// Prior die: the top of `dies`.
+    Die,
+}
+
+// Values that are saved at most once per entry, as bits of UndoLog::touched.
+const TOUCHED_HAND: u16 = 1 << 0;
+const TOUCHED_DRAW: u16 = 1 << 1;
+const TOUCHED_DISCARD: u16 = 1 << 2;
+const TOUCHED_EXHAUST: u16 = 1 << 3;
+const TOUCHED_ORBS: u16 = 1 << 4;
+const TOUCHED_PLAYS: u16 = 1 << 5;
+const TOUCHED_MONSTERS: u16 = 1 << 6;
+const TOUCHED_DECK: u16 = 1 << 7;
+const TOUCHED_RNG: u16 = 1 << 8;
+const TOUCHED_DIE: u16 = 1 << 9;
+
+struct Entry {
+    scalars: Scalars,
+    /// Length of `saved` when the entry was opened.
+    saved: usize,
+}
+
+/// Per-state journal of applied actions. Each entry holds the fixed-size scalars plus
+/// the prior value of each pile, power, monster, RNG or die the action went on to
+/// change, recorded where it was changed. Saved values live on stacks that are reused
+/// across entries, so a warm journal doesn't allocate.
+#[derive(Default)]
+pub struct UndoLog {
+    entries: Vec<Entry>,
+    saved: Vec<Saved>,
+    indices: Vec<usize>,
+    orbs: Vec<OrbType>,
+    plays: Vec<(usize, Option<usize>)>,
+    monsters: Vec<Monster>,
+    rngs: Vec<SimRng>,
+    dies: Vec<TheDie>,
+    /// TOUCHED_* bits already saved by the open entry.
+    touched: u16,
+    /// Monsters (by index, up to 64) already saved by the open entry.
+    touched_monsters: u64,
+}
+
+impl std::fmt::Debug for UndoLog {
+    fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
+        write!(f, "UndoLog(depth={})", self.entries.len())
+    }
+}
+
+impl UndoLog {
+    pub fn depth(&self) -> usize {
+        self.entries.len()
+    }
+
+    /// Bytes of prior values held for the open entries.
+    pub fn bytes(&self) -> usize {
+        fn used<T>(v: &Vec<T>) -> usize {
+            v.len() * std::mem::size_of::<T>()
+        }
+        used(&self.entries) + used(&self.saved) + used(&self.indices) + used(&self.orbs)
+            + used(&self.plays) + used(&self.monsters) + used(&self.rngs) + used(&self.dies)
+    }
+
+    /// Forget all entries, keeping allocated buffers.
+    pub fn clear(&mut self) {
+        self.entries.clear();
+        self.saved.clear();
+        self.indices.clear();
+        self.orbs.clear();
+        self.plays.clear();
+        self.monsters.clear();
+        self.rngs.clear();
+        self.dies.clear();
+    }
+
+    /// True the first time `bit` is touched by the open entry.
+    fn first(&mut self, bit: u16) -> bool {
+        let first = self.touched & bit == 0;
+        self.touched |= bit;
+        first
+    }
+
+    fn save_monster(&mut self, monsters: &[Monster], i: usize) {
+        let bit = 1u64.checked_shl(i as u32).unwrap_or(0);
+        if self.touched & TOUCHED_MONSTERS != 0 || self.touched_monsters & bit != 0 {
+            return;
+        }
+        self.touched_monsters |= bit;
+        self.monsters.push(monsters[i].clone());
+        self.saved.push(Saved::Monster(i));
+    }
+
+    fn restore(&mut self, state: &mut CombatState, saved: Saved) {
+        fn pop_into<T>(stack: &mut Vec<T>, len: usize, into: &mut Vec<T>) {
+            into.clear();
+            into.extend(stack.drain(stack.len() - len..));
+        }
+        match saved {
+            Saved::Pile(pile, len) => {
+                // Rehashed rather than saved: a card may have been upgraded since.
+                let from = self.indices.len() - len;
+                pile_mut(&mut state.player, pile).set(self.indices.drain(from..), &state.deck);
+            }
+            Saved::Orbs(len) => pop_into(&mut self.orbs, len, &mut state.player.orbs),
+            Saved::CardsPlayed(len) => pop_into(&mut self.plays, len, &mut state.cards_played_this_turn),
+            Saved::Power(power, Some(amount)) => state.player.powers.set(power, amount),
+            Saved::Power(power, None) => state.player.powers.remove(power),
+            Saved::Monster(i) => state.monsters[i] = self.monsters.pop().expect("saved monster"),
+            Saved::Monsters(len) => pop_into(&mut self.monsters, len, &mut state.monsters),
+            Saved::DeckLen(len) => state.deck.truncate(len),
+            Saved::Rng => state.rng = self.rngs.pop().expect("saved rng"),
+            Saved::Die => state.die = self.dies.pop().expect("saved die"),
+        }
+    }
+}
+
+#[inline]
+fn active() -> bool {
+    ACTIVE.get()
+}
+
+#[cold]
+fn record(f: impl FnOnce(&mut UndoLog)) {
+    JOURNAL.with_borrow_mut(f);
+}
+
+/// Call before changing `pile` of the player.
+#[inline]
+pub fn pile(player: &Player, pile: Pile) {
+    if active() {
+        record(|log| {
+            let (bit, cards) = match pile {
+                Pile::Hand => (TOUCHED_HAND, &player.hand_indices),
+                Pile::Draw => (TOUCHED_DRAW, &player.draw_pile),
+                Pile::Discard => (TOUCHED_DISCARD, &player.discard_pile),
+                Pile::Exhaust => (TOUCHED_EXHAUST, &player.exhaust_pile),
+                Pile::None | Pile::Play => return,
+            };
+            if log.first(bit) {
+                log.indices.extend_from_slice(cards);
+                log.saved.push(Saved::Pile(pile, cards.len()));
+            }
+        });
+    }
+}
+
+/// Call before changing the player's orbs.
+#[inline]
+pub fn orbs(player: &Player) {
+    if active() {
+        record(|log| {
+            if log.first(TOUCHED_ORBS) {
+                log.orbs.extend_from_slice(&player.orbs);
+                log.saved.push(Saved::Orbs(player.orbs.len()));
+            }
+        });
+    }
+}
+
+/// Call before changing the player's amount of `power`.
+#[inline]
+pub fn power(player: &Player, power: PowerType) {
+    if active() {
+        record(|log| {
+            let prior = player.powers.contains(power).then(|| player.powers.get(power));
+            log.saved.push(Saved::Power(power, prior));
+        });
+    }
+}
+
+/// Call before changing the cards played this turn.
+#[inline]
+pub fn cards_played(played: &[(usize, Option<usize>)]) {
+    if active() {
+        record(|log| {
+            if log.first(TOUCHED_PLAYS) {
+                log.plays.extend_from_slice(played);
+                log.saved.push(Saved::CardsPlayed(played.len()));
+            }
+        });
+    }
+}
+
+/// Call before changing monster `i`.
+#[inline]
+pub fn monster(monsters: &[Monster], i: usize) {
+    if active() {
+        record(|log| log.save_monster(monsters, i));
+    }
+}
+
+/// Call before changing any or all of the monsters.
+#[inline]
+pub fn monsters(monsters: &[Monster]) {
+    if active() {
+        record(|log| (0..monsters.len()).for_each(|i| log.save_monster(monsters, i)));
+    }
+}
+
+/// Call before adding monsters.
+#[inline]
+pub fn monster_list(monsters: &[Monster]) {
+    if active() {
+        record(|log| {
+            if log.first(TOUCHED_MONSTERS) {
+                log.monsters.extend_from_slice(monsters);
+                log.saved.push(Saved::Monsters(monsters.len()));
+            }
+        });
+    }
+}
+
+/// Call before appending cards to the deck.
+#[inline]
+pub fn deck(deck: &[CardInstance]) {
+    if active() {
+        record(|log| {
+            if log.first(TOUCHED_DECK) {
+                log.saved.push(Saved::DeckLen(deck.len()));
+            }
+        });
+    }
+}
+
+/// Call before drawing from the shuffle RNG.
+#[inline]
+pub fn rng(rng: &SimRng) {
+    if active() {
+        record(|log| {
+            if log.first(TOUCHED_RNG) {
+                log.rngs.push(rng.clone());
+                log.saved.push(Saved::Rng);
+            }
+        });
+    }
+}
+
+/// Call before rolling or otherwise changing the die.
+#[inline]
+pub fn die(die: &TheDie) {
+    if active() {
+        record(|log| {
+            if log.first(TOUCHED_DIE) {
+                log.dies.push(die.clone());
+                log.saved.push(Saved::Die);
+            }
+        });
+    }
+}
+
+/// Clears the active flag even if the action panics.
+struct Deactivate;
+
+impl Drop for Deactivate {
+    fn drop(&mut self) {
+        ACTIVE.set(false);
+    }
+}
+
+/// Apply `action` to `state`, journaling how to reverse it. Returns the token to pass
+/// to `undo` to get back to the state before this call.
+pub fn apply(state: &mut CombatState, action: Action) -> usize {
+    let scalars = Scalars::of(state);
+    let log = &mut state.undo_log;
+    let token = log.entries.len();
+    log.entries.push(Entry { scalars, saved: log.saved.len() });
+    log.touched = 0;
+    log.touched_monsters = 0;
+
+    JOURNAL.with_borrow_mut(|journal| std::mem::swap(journal, &mut state.undo_log));
+    ACTIVE.set(true);
+    let deactivate = Deactivate;
+    apply_action(state, action);
+    drop(deactivate);
+    JOURNAL.with_borrow_mut(|journal| std::mem::swap(journal, &mut state.undo_log));
+    token
+}
+
+/// Restore the state from before the `apply` call that returned `token`, discarding it
+/// and every later entry. Returns false if `token` is not in the journal.
+pub fn undo(state: &mut CombatState, token: usize) -> bool {
+    if token >= state.undo_log.entries.len() {
+        return false;
+    }
+    let mut log = std::mem::take(&mut state.undo_log);
+    while log.entries.len() > token {
+        let entry = log.entries.pop().expect("depth checked above");
+        while log.saved.len() > entry.saved {
+            let saved = log.saved.pop().expect("length checked above");
+            log.restore(state, saved);
+        }
+        entry.scalars.restore(state);
+    }
+    state.undo_log = log;
+    true
+}
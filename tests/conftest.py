@@ -30,3 +30,13 @@ def cultist_combat():
 def louse_combat():
     """A combat state against 2x Louse with seed 42."""
     return sts_sim.create_encounter("louse", seed=42)
+
+
+@pytest.fixture
+def started_combat():
+    """Factory for a started combat: started_combat(name="jaw_worm", seed=3, character=None)."""
+    def make(name="jaw_worm", seed=3, character=None):
+        cs = sts_sim.create_encounter(name, seed=seed, character=character)
+        cs.start_combat()
+        return cs
+    return make
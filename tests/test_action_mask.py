@@ -0,0 +1,89 @@
+"""Tests for the fixed-shape legal action mask."""
+from array import array
+
+import pytest
+import sts_sim
+
+
+def test_action_mask_shape_and_end_turn(started_combat):
+    cs = started_combat()
+    mask = cs.action_mask()
+    assert len(mask) == sts_sim.CombatState.action_size()
+    assert mask[-1] is True
+    assert cs.decode_action(len(mask) - 1) is None
+
+
+def test_action_mask_matches_available_actions(started_combat):
+    cs = started_combat("cultist_and_louse", seed=4)
+    mask = cs.action_mask()
+    decoded = [cs.decode_action(i) for i, ok in enumerate(mask[:-1]) if ok]
+    targets = set(cs.get_valid_targets())
+    available = {hand_idx: needs_target for hand_idx, _ci, needs_target in cs.get_available_actions()}
+    assert {hand_idx for hand_idx, _t, _c in decoded} == set(available)
+    for hand_idx, target, choice in decoded:
+        if available[hand_idx]:
+            assert target in targets
+        else:
+            assert target is None
+        assert choice is None
+
+
+def test_every_masked_action_is_playable(started_combat):
+    cs = started_combat("slime_trio", seed=2)
+    mask = cs.action_mask()
+    for i, ok in enumerate(mask[:-1]):
+        if not ok:
+            continue
+        sim = cs.deep_clone()
+        assert sim.play_card(*sim.decode_action(i))
+
+
+def test_action_mask_respects_energy(started_combat):
+    cs = started_combat()
+    cs.set_player_energy(0)
+    mask = cs.action_mask()
+    costly = {hand_idx for hand_idx, ci in enumerate(cs.get_hand()) if ci.py_cost > 0}
+    for i, ok in enumerate(mask[:-1]):
+        if ok:
+            assert cs.decode_action(i)[0] not in costly
+
+
+def test_action_mask_into_buffer(started_combat):
+    cs = started_combat()
+    out = array("B", [7]) * sts_sim.CombatState.action_size()
+    assert cs.action_mask(out) is None
+    assert [bool(v) for v in out] == cs.action_mask()
+    with pytest.raises(ValueError):
+        cs.action_mask(array("B", [0]) * 3)
+
+
+def test_decode_action_rejects_out_of_range(started_combat):
+    cs = started_combat()
+    with pytest.raises(ValueError):
+        cs.decode_action(sts_sim.CombatState.action_size())
+
+
+def _choices_for(cs, hand_index):
+    return [cs.decode_action(i)[2] for i, ok in enumerate(cs.action_mask()[:-1])
+            if ok and cs.decode_action(i)[0] == hand_index]
+
+
+def test_concentrate_reaches_every_discard_count(started_combat):
+    cs = started_combat(character=sts_sim.Character.Silent)
+    for _ in range(3):
+        cs.add_card_to_hand(sts_sim.Card.StrikeGreen)
+    cs.add_card_to_hand(sts_sim.Card.Concentrate)
+    hand = cs.get_hand()
+    assert len(hand) > 6
+    assert _choices_for(cs, len(hand) - 1) == list(range(len(hand)))
+
+
+def test_x_cost_with_more_energy_than_slots_can_spend_it_all(started_combat):
+    cs = started_combat()
+    cs.set_player_energy(15)
+    cs.add_card_to_hand(sts_sim.Card.Whirlwind)
+    choices = _choices_for(cs, len(cs.get_hand()) - 1)
+    # X = 0..8 directly, and the last slot spends all 15 energy
+    assert choices == list(range(9)) + [15]
+    cs.play_card(len(cs.get_hand()) - 1, None, choices[-1])
+    assert cs.player.energy == 0
@@ -0,0 +1,66 @@
+"""Tests for applying a script of actions in one call."""
+import pytest
+import sts_sim
+
+
+def _first_play(cs):
+    hand_index, _ci, needs_target = cs.get_available_actions()[0]
+    target = cs.get_valid_targets()[0] if needs_target else None
+    return (hand_index, target, None)
+
+
+def test_script_matches_individual_calls(started_combat):
+    cs = started_combat("cultist_and_louse", seed=5)
+    manual = cs.deep_clone()
+    script = []
+    for _ in range(3):
+        if manual.combat_over:
+            break
+        step = _first_play(manual)
+        assert manual.play_card(*step)
+        manual.end_player_turn()
+        manual.roll_and_execute_monsters()
+        script += [step, "end_turn", "monsters"]
+    ok, snapshots = cs.apply_actions(script)
+    assert ok == [True] * len(script)
+    assert snapshots is None
+    assert cs.to_bytes() == manual.to_bytes()
+
+
+def test_failed_steps_are_reported_and_skipped(started_combat):
+    cs = started_combat()
+    ok, _ = cs.apply_actions([(99, None, None), _first_play(cs)])
+    assert ok == [False, True]
+
+
+def test_snapshots_after_each_step(started_combat):
+    cs = started_combat()
+    start = cs.deep_clone()
+    script = [_first_play(cs), "end_turn", "monsters"]
+    ok, snapshots = cs.apply_actions(script, snapshots=True)
+    assert len(snapshots) == len(script) == len(ok)
+    assert snapshots[-1].to_bytes() == cs.to_bytes()
+    start.play_card(*script[0])
+    assert snapshots[0].to_bytes() == start.to_bytes()
+
+
+def test_phases_fail_after_combat_ends(started_combat):
+    cs = started_combat()
+    # Passing every turn eventually loses the combat.
+    for _ in range(200):
+        if cs.combat_over:
+            break
+        cs.apply_actions(["end_turn", "monsters"])
+    assert cs.combat_over
+    ok, _ = cs.apply_actions(["end_turn", "monsters"])
+    assert ok == [False, False]
+
+
+def test_unknown_step_rejected_before_running(started_combat):
+    cs = started_combat()
+    before = cs.to_bytes()
+    with pytest.raises(ValueError):
+        cs.apply_actions([_first_play(cs), "pass"])
+    assert cs.to_bytes() == before
+    with pytest.raises(TypeError):
+        cs.apply_actions([1.5])
@@ -0,0 +1,49 @@
+"""Tests for copying combat state into an existing object."""
+import pytest
+import sts_sim
+
+
+def test_clone_into_copies_state():
+    src = sts_sim.create_encounter("slime_trio", seed=3)
+    src.start_combat()
+    src.end_player_turn()
+    src.roll_and_execute_monsters()
+    dst = sts_sim.create_encounter("jaw_worm", seed=9)
+    src.clone_into(dst)
+    assert dst == src
+    assert len(dst.get_monsters()) == len(src.get_monsters())
+    assert [ci.card for ci in dst.get_draw_pile()] == [ci.card for ci in src.get_draw_pile()]
+
+
+def test_clone_into_is_independent():
+    src = sts_sim.create_encounter("cultist", seed=1)
+    src.start_combat()
+    dst = src.deep_clone()
+    src.clone_into(dst)
+    dst.end_player_turn()
+    assert dst != src
+
+
+def test_clone_into_continues_identically():
+    src = sts_sim.create_encounter("jaw_worm", seed=5)
+    src.start_combat()
+    dst = sts_sim.create_encounter("louse", seed=0)
+    src.clone_into(dst)
+    for cs in (src, dst):
+        cs.end_player_turn()
+        cs.roll_and_execute_monsters()
+    assert dst == src
+
+
+def test_clone_into_self_and_bad_target():
+    cs = sts_sim.create_encounter("jaw_worm", seed=5)
+    cs.clone_into(cs)
+    with pytest.raises(TypeError):
+        cs.clone_into("not a combat")
+
+
+def test_footprint_bytes_grows_with_monsters():
+    one = sts_sim.create_encounter("jaw_worm", seed=0)
+    three = sts_sim.create_encounter("slime_trio", seed=0)
+    assert 0 < one.footprint_bytes() < three.footprint_bytes()
+    assert one.deep_clone().footprint_bytes() <= one.footprint_bytes()
@@ -127,3 +127,22 @@ def test_jaw_worm_behavior_mapping():
     # So just verify the behavior string is correct
     monsters = cs.get_monsters()
     assert monsters[0].behavior == "sda"
+
+
+def test_monster_id_setter_changes_dispatch():
+    """Renaming a monster's id switches which move table it uses."""
+    m = sts_sim.Monster("Mystery", 20, "test", "", False)
+    m.monster_id = "cultist"
+    assert m.monster_id == "cultist"
+    cs = sts_sim.CombatState.new_with_character([m], seed=1)
+    cs.start_combat()
+    # Cultist pre-battle grants Ritual
+    assert cs.get_monsters()[0].get_power(sts_sim.PowerType.Ritual) == 1
+
+
+def test_behavior_setter_roundtrips():
+    m = sts_sim.Monster("Sentry", 7, "sentry", "D3", True)
+    m.behavior = "3D"
+    m.name = "Other Sentry"
+    assert m.behavior == "3D"
+    assert m.name == "Other Sentry"
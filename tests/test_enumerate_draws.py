@@ -0,0 +1,63 @@
+"""Tests for exact enumeration of card draws."""
+from collections import Counter
+from math import comb
+
+import pytest
+import sts_sim
+
+
+def _key(cards):
+    return tuple(sorted((str(ci.card), ci.upgraded) for ci in cards))
+
+
+@pytest.mark.parametrize("count", [1, 2, 3])
+def test_probabilities_match_hypergeometric(count, started_combat):
+    cs = started_combat()
+    pile = Counter(_key([ci]) for ci in cs.get_draw_pile())
+    outcomes = cs.enumerate_draws(count)
+    assert sum(p for _c, p, _s in outcomes) == pytest.approx(1.0)
+    assert len({_key(cards) for cards, _p, _s in outcomes}) == len(outcomes)
+    total = comb(sum(pile.values()), count)
+    for cards, p, _s in outcomes:
+        drawn = Counter(_key([ci]) for ci in cards)
+        ways = 1
+        for card, k in drawn.items():
+            ways *= comb(pile[card], k)
+        assert p == pytest.approx(ways / total)
+
+
+def test_successor_holds_drawn_cards(started_combat):
+    cs = started_combat()
+    hand = _key(cs.get_hand())
+    for cards, _p, state in cs.enumerate_draws(2):
+        assert len(state.get_hand()) == len(cs.get_hand()) + 2
+        assert Counter(_key(state.get_hand())) == Counter(hand) + Counter(_key(cards))
+        assert len(state.get_draw_pile()) == len(cs.get_draw_pile()) - 2
+
+
+def test_draw_past_pile_reshuffles_discard(started_combat):
+    cs = started_combat()
+    cs.end_player_turn()
+    draw = len(cs.get_draw_pile())
+    discard = len(cs.get_discard_pile())
+    assert discard > 0
+    outcomes = cs.enumerate_draws(draw + 1)
+    assert sum(p for _c, p, _s in outcomes) == pytest.approx(1.0)
+    for cards, _p, state in outcomes:
+        assert len(cards) == draw + 1
+        assert len(state.get_discard_pile()) == 0
+        assert len(state.get_draw_pile()) == discard - 1
+
+
+def test_state_is_unchanged(started_combat):
+    cs = started_combat()
+    before = cs.to_bytes()
+    cs.enumerate_draws(3)
+    assert cs.to_bytes() == before
+
+
+def test_zero_draw(started_combat):
+    cs = started_combat()
+    (outcome,) = cs.enumerate_draws(0)
+    assert outcome[0] == []
+    assert outcome[1] == 1.0
@@ -0,0 +1,61 @@
+"""Tests for enumerating the distinct end-of-turn positions of a player turn."""
+import pytest
+import sts_sim
+
+
+def _replay(cs, plays):
+    state = cs.deep_clone()
+    for hand_index, target, choice in plays:
+        assert state.play_card(hand_index, target, choice)
+    return state
+
+
+def test_first_outcome_is_ending_turn_immediately(started_combat):
+    cs = started_combat(seed=4)
+    outcomes = cs.enumerate_turn_outcomes()
+    plays, state = outcomes[0]
+    assert plays == []
+    assert state == cs
+
+
+@pytest.mark.parametrize("name,character", [
+    ("jaw_worm", sts_sim.Character.Ironclad),
+    ("cultist_and_louse", sts_sim.Character.Silent),
+    ("sentries", sts_sim.Character.Defect),
+    ("slime_trio", sts_sim.Character.Watcher),
+])
+def test_sequences_replay_to_distinct_states(name, character, started_combat):
+    cs = started_combat(name, seed=4, character=character)
+    outcomes = cs.enumerate_turn_outcomes()
+    assert len({hash(state) for _plays, state in outcomes}) == len(outcomes)
+    for plays, state in outcomes:
+        assert _replay(cs, plays) == state
+
+
+def _count_sequences(cs):
+    total = 1
+    for action, legal in enumerate(cs.action_mask()[:-1]):
+        if legal:
+            token = cs.apply(action)
+            total += _count_sequences(cs)
+            cs.undo(token)
+    return total
+
+
+def test_orderings_are_merged(started_combat):
+    cs = started_combat("jaw_worm", seed=4, character=sts_sim.Character.Silent)
+    outcomes = cs.enumerate_turn_outcomes()
+    assert 1 < len(outcomes) < _count_sequences(cs)
+
+
+def test_max_nodes_caps_exploration(started_combat):
+    cs = started_combat(seed=4)
+    assert len(cs.enumerate_turn_outcomes(max_nodes=1)) == 1
+    assert len(cs.enumerate_turn_outcomes(max_nodes=3)) == 3
+
+
+def test_state_is_unchanged(started_combat):
+    cs = started_combat(seed=4)
+    before = cs.to_bytes()
+    cs.enumerate_turn_outcomes()
+    assert cs.to_bytes() == before
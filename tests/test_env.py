@@ -0,0 +1,113 @@
+"""Tests for the vectorized combat environment."""
+import random
+from array import array
+
+import pytest
+import sts_sim
+
+
+def _buffers(env):
+    n = env.num_envs
+    obs = array("f", [0.0]) * (n * env.observation_size)
+    rewards = array("f", [0.0]) * n
+    dones = array("B", [0]) * n
+    masks = array("B", [0]) * (n * env.action_size)
+    return obs, rewards, dones, masks
+
+
+def _mask_row(env, masks, i):
+    return masks[i * env.action_size:(i + 1) * env.action_size]
+
+
+def test_reset_writes_observations_and_masks():
+    env = sts_sim.VecCombatEnv(4, ["jaw_worm"], seed=1)
+    obs, _rewards, _dones, masks = _buffers(env)
+    env.reset(obs, masks)
+    for i in range(env.num_envs):
+        row = obs[i * env.observation_size:(i + 1) * env.observation_size]
+        # Player hp is the first feature
+        assert row[0] == env.get_state(i).player.hp
+        # Ending the turn is always legal in a running combat
+        assert _mask_row(env, masks, i)[env.action_size - 1] == 1
+
+
+def test_random_masked_play_auto_resets():
+    env = sts_sim.VecCombatEnv(8, ["cultist", "louse"], seed=3)
+    obs, rewards, dones, masks = _buffers(env)
+    env.reset(obs, masks)
+    rng = random.Random(0)
+    finished = 0
+    for _ in range(400):
+        actions = []
+        for i in range(env.num_envs):
+            legal = [a for a, ok in enumerate(_mask_row(env, masks, i)) if ok]
+            actions.append(rng.choice(legal))
+        env.step(actions, obs, rewards, dones, masks)
+        for i in range(env.num_envs):
+            if dones[i]:
+                finished += 1
+                assert rewards[i] in (-1.0, 0.0, 1.0)
+                # Auto-reset leaves a fresh, running combat behind
+                assert not env.get_state(i).combat_over
+            else:
+                assert rewards[i] == 0.0
+    assert finished > 0
+
+
+def test_same_seed_is_reproducible():
+    def run(seed):
+        env = sts_sim.VecCombatEnv(3, seed=seed)
+        obs, rewards, dones, masks = _buffers(env)
+        env.reset(obs, masks)
+        end_turn = env.action_size - 1
+        for _ in range(20):
+            env.step([end_turn] * 3, obs, rewards, dones, masks)
+        return list(obs), list(rewards), list(dones)
+
+    assert run(7) == run(7)
+
+
+def test_allocates_omitted_buffers():
+    env = sts_sim.VecCombatEnv(3, ["jaw_worm"], seed=2)
+    obs, masks = env.reset()
+    assert len(obs) == 3 * env.observation_size
+    assert len(masks) == 3 * env.action_size
+    assert obs[0] == env.get_state(0).player.hp
+    given = _buffers(env)
+    out = env.step([env.action_size - 1] * 3, *given)
+    assert all(a is b for a, b in zip(out, given))
+    obs, rewards, dones, masks = env.step([env.action_size - 1] * 3)
+    assert (len(obs), len(rewards), len(dones), len(masks)) == tuple(len(b) for b in given)
+
+
+def test_bad_buffer_leaves_batch_untouched():
+    env = sts_sim.VecCombatEnv(2, ["jaw_worm"], seed=4)
+    twin = sts_sim.VecCombatEnv(2, ["jaw_worm"], seed=4)
+    env.reset()
+    twin.reset()
+    obs, rewards, dones, masks = _buffers(env)
+    short = array("B", [0]) * (env.action_size * env.num_envs - 1)
+    end_turn = [env.action_size - 1] * 2
+    with pytest.raises(ValueError):
+        env.step(end_turn, obs, rewards, dones, short)
+    with pytest.raises(ValueError):
+        env.step(end_turn, obs[:-1], rewards, dones, masks)
+    with pytest.raises(ValueError):
+        env.reset(obs, short)
+    # A rejected call neither steps nor resets, so both batches stay in lockstep.
+    assert env.step(end_turn) == twin.step(end_turn)
+
+
+def test_rejects_bad_arguments():
+    with pytest.raises(ValueError):
+        sts_sim.VecCombatEnv(2, ["no_such_fight"])
+    with pytest.raises(ValueError):
+        sts_sim.VecCombatEnv(0)
+    env = sts_sim.VecCombatEnv(2, ["jaw_worm"])
+    obs, rewards, dones, masks = _buffers(env)
+    with pytest.raises(ValueError):
+        env.step([0], obs, rewards, dones, masks)
+    with pytest.raises(ValueError):
+        env.step([0, env.action_size], obs, rewards, dones, masks)
+    with pytest.raises(IndexError):
+        env.get_state(2)
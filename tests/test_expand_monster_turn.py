@@ -0,0 +1,53 @@
+"""Tests for exact expansion of the monster turn's die roll."""
+import pytest
+import sts_sim
+
+
+def _after_player_turn(name="jaw_worm", seed=3):
+    cs = sts_sim.create_encounter(name, seed=seed)
+    cs.start_combat()
+    cs.end_player_turn()
+    return cs
+
+
+@pytest.mark.parametrize("name", ["jaw_worm", "cultist_and_louse", "slime_trio", "gremlin_nob"])
+def test_outcomes_partition_the_die(name):
+    cs = _after_player_turn(name)
+    outcomes = cs.expand_monster_turn()
+    faces = sorted(f for group, _p, _s in outcomes for f in group)
+    assert faces == [1, 2, 3, 4, 5, 6]
+    assert sum(p for _g, p, _s in outcomes) == pytest.approx(1.0)
+    for group, p, _s in outcomes:
+        assert p == pytest.approx(len(group) / 6)
+
+
+def test_matches_real_roll():
+    cs = _after_player_turn("slime_trio", seed=5)
+    outcomes = cs.expand_monster_turn()
+    real = cs.deep_clone()
+    roll = real.roll_and_execute_monsters()
+    (state,) = [s for group, _p, s in outcomes if roll in group]
+    assert state.to_bytes() == real.to_bytes()
+
+
+def test_distinct_outcomes_differ():
+    cs = _after_player_turn()
+    states = [s for _g, _p, s in cs.expand_monster_turn()]
+    for i, a in enumerate(states):
+        for b in states[i + 1:]:
+            assert a.to_bytes() != b.to_bytes()
+
+
+def test_state_is_unchanged():
+    cs = _after_player_turn()
+    before = cs.to_bytes()
+    cs.expand_monster_turn()
+    assert cs.to_bytes() == before
+
+
+def test_locked_die_has_one_outcome():
+    cs = _after_player_turn()
+    cs.set_die_value(4)
+    (outcome,) = cs.expand_monster_turn()
+    assert outcome[0] == [4]
+    assert outcome[1] == 1.0
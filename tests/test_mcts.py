@@ -0,0 +1,115 @@
+"""Tests for native Monte Carlo tree search."""
+import pytest
+import sts_sim
+
+
+def test_one_entry_per_legal_action(started_combat):
+    cs = started_combat("cultist_and_louse", seed=4)
+    result = sts_sim.mcts_search(cs, iterations=200, seed=1)
+    legal = [i for i, ok in enumerate(cs.action_mask()) if ok]
+    assert result.action_indices == legal
+    assert len(result) == len(legal)
+    assert result.actions == [cs.decode_action(i) for i in legal]
+    assert len(result.visits) == len(result.values) == len(legal)
+    assert all(0.0 <= v <= 1.0 for v in result.values)
+
+
+def test_every_iteration_visits_one_root_action(started_combat):
+    cs = started_combat()
+    result = sts_sim.mcts_search(cs, iterations=300, seed=2)
+    assert result.iterations == 300
+    assert sum(result.visits) == 300
+
+
+def test_best_action_is_legal_and_most_visited(started_combat):
+    cs = started_combat("gremlin_nob", seed=1)
+    result = sts_sim.mcts_search(cs, iterations=200, seed=3)
+    best = result.best_action()
+    assert cs.action_mask()[best]
+    assert result.visits[result.action_indices.index(best)] == max(result.visits)
+
+
+def test_search_is_reproducible_and_leaves_state_untouched(started_combat):
+    cs = started_combat("slime_trio", seed=5)
+    before = cs.to_bytes()
+    a = sts_sim.mcts_search(cs, iterations=150, seed=9)
+    b = sts_sim.mcts_search(cs, iterations=150, seed=9)
+    assert a.visits == b.visits
+    assert a.values == b.values
+    assert cs.to_bytes() == before
+
+
+def test_tree_reuse_keeps_subtree(started_combat):
+    cs = started_combat()
+    tree = sts_sim.MctsTree()
+    result = sts_sim.mcts_search(cs, iterations=300, tree=tree, seed=4)
+    assert tree.root_visits == 300
+    best = result.best_action()
+    kept = result.visits[result.action_indices.index(best)]
+    cs.apply(best)
+    assert tree.advance(best)
+    assert tree.root_visits == kept
+    sts_sim.mcts_search(cs, iterations=100, tree=tree, seed=4)
+    assert tree.root_visits == kept + 100
+
+
+def test_advance_to_unexplored_action_clears_tree():
+    tree = sts_sim.MctsTree()
+    assert not tree.advance(0)
+    assert tree.root_visits == 0
+    assert len(tree) == 1
+
+
+@pytest.mark.parametrize("parallel", ["tree", "root"])
+def test_threads_count_every_iteration(parallel, started_combat):
+    cs = started_combat("cultist", seed=2)
+    result = sts_sim.mcts_search(cs, iterations=400, threads=4, parallel=parallel, seed=1)
+    assert result.iterations == 400
+    assert sum(result.visits) == 400
+
+
+def test_tree_parallel_reuses_shared_tree(started_combat):
+    cs = started_combat("the_guardian", seed=1)
+    tree = sts_sim.MctsTree()
+    sts_sim.mcts_search(cs, iterations=300, threads=4, tree=tree, virtual_loss=3, seed=2)
+    sts_sim.mcts_search(cs, iterations=300, threads=4, tree=tree, seed=3)
+    assert tree.root_visits == 600
+    assert len(tree) <= 601
+
+
+def test_time_limit_stops_early(started_combat):
+    cs = started_combat("hexaghost", seed=1)
+    result = sts_sim.mcts_search(cs, iterations=10**7, threads=2, time_limit=0.05)
+    assert 0 < result.iterations < 10**7
+    assert sum(result.visits) == result.iterations
+
+
+def test_finished_combat_runs_no_iterations(started_combat):
+    cs = started_combat()
+    # Strike the Jaw Worm until it dies; each play is paid for, so this always ends.
+    for _ in range(20):
+        if cs.combat_over:
+            break
+        cs.set_player_energy(3)
+        cs.add_card_to_hand(sts_sim.Card.StrikeRed)
+        cs.play_card(len(cs.get_hand()) - 1, cs.get_valid_targets()[0])
+    assert cs.combat_over and cs.player_won
+    result = sts_sim.mcts_search(cs, iterations=50)
+    assert result.iterations == 0
+    assert len(result) == 0
+    assert result.best_action() is None
+
+
+def test_rejects_bad_arguments():
+    cs = sts_sim.create_encounter("jaw_worm", seed=3)
+    with pytest.raises(ValueError):
+        sts_sim.mcts_search(cs)
+    cs.start_combat()
+    with pytest.raises(ValueError):
+        sts_sim.mcts_search(cs, exploration=-1.0)
+    with pytest.raises(ValueError):
+        sts_sim.mcts_search(cs, rollout_policy="nope")
+    with pytest.raises(ValueError):
+        sts_sim.mcts_search(cs, parallel="leaf")
+    with pytest.raises(ValueError):
+        sts_sim.mcts_search(cs, time_limit=-1.0)
@@ -0,0 +1,41 @@
+"""Tests for the native benchmark runner behind benchmarks/bench_native.py."""
+import pytest
+import sts_sim
+
+
+def test_groups_and_cases():
+    results = sts_sim.run_native_benchmarks(["clone", "monster_turn"], min_time=0.0)
+    groups = {group for group, _name, _calls, _ns in results}
+    assert groups == {"clone", "monster_turn"}
+    names = {name for group, name, _calls, _ns in results if group == "monster_turn"}
+    assert {"jaw_worm", "gremlin_wizard", "slime_boss"} <= names
+    assert all(calls > 0 and ns > 0 for _group, _name, calls, ns in results)
+
+
+def test_every_card_plain_and_upgraded():
+    results = sts_sim.run_native_benchmarks(["play_card"], min_time=0.0)
+    names = [name for _group, name, _calls, _ns in results]
+    assert "StrikeRed" in names and "StrikeRed+" in names
+    assert len(names) == len(set(names)) and len(names) % 2 == 0
+
+
+def test_one_combat_per_encounter():
+    results = sts_sim.run_native_benchmarks(["combat"], min_time=0.0)
+    assert len(results) == 20
+    assert "the_guardian" in {name for _group, name, _calls, _ns in results}
+
+
+def test_rejects_bad_arguments():
+    with pytest.raises(ValueError):
+        sts_sim.run_native_benchmarks(["nope"])
+    with pytest.raises(ValueError):
+        sts_sim.run_native_benchmarks(min_time=-1.0)
+
+
+def test_monster_turn_cases_are_keyed_by_monster_id():
+    results = sts_sim.run_native_benchmarks(["monster_turn"], min_time=0.0)
+    assert [name for _group, name, _calls, _ns in results] == sts_sim.MONSTER_IDS
+    for monster_id in sts_sim.MONSTER_IDS:
+        assert sts_sim.create_monster(monster_id).monster_id == monster_id
+    with pytest.raises(ValueError):
+        sts_sim.create_monster("other")
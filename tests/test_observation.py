@@ -0,0 +1,69 @@
+"""Tests for the fixed-layout observation encoding."""
+from array import array
+
+import pytest
+import sts_sim
+
+
+def test_encode_observation_returns_fixed_length_list(started_combat):
+    cs = started_combat()
+    obs = cs.encode_observation()
+    assert len(obs) == sts_sim.CombatState.observation_size()
+    assert obs[0] == cs.player.hp
+    assert obs[1] == cs.player.max_hp
+
+
+def test_encode_observation_into_buffer_matches_list(started_combat):
+    cs = started_combat()
+    out = array("f", [-1.0]) * sts_sim.CombatState.observation_size()
+    assert cs.encode_observation(out) is None
+    assert list(out) == cs.encode_observation()
+
+
+def _members(enum):
+    return [v for v in vars(enum).values() if isinstance(v, enum)]
+
+
+# Layout from src/observation.rs: player scalars (6), stance one-hot (3), orbs (4),
+# player powers (one per PowerType), pile sizes (4), then one block of per-Card counts
+# for each of hand, draw, discard and exhaust.
+NUM_POWERS = max(int(p) for p in _members(sts_sim.PowerType)) + 1
+NUM_CARDS = max(int(c) for c in _members(sts_sim.Card)) + 1
+HAND_OFFSET = 6 + 3 + 4 + NUM_POWERS + 4
+
+
+def test_encode_observation_counts_every_card(started_combat):
+    cs = started_combat()
+    cs.end_player_turn()
+    cs.roll_and_execute_monsters()  # discard pile now populated too
+    obs = cs.encode_observation()
+    piles = [cs.get_hand(), cs.get_draw_pile(), cs.get_discard_pile(), cs.get_exhaust_pile()]
+    assert sum(len(pile) for pile in piles) == len(cs.get_deck())
+    for block, pile in enumerate(piles):
+        offset = HAND_OFFSET + block * NUM_CARDS
+        for card in _members(sts_sim.Card):
+            expected = sum(1 for ci in pile if ci.card == card)
+            assert obs[offset + int(card)] == expected, (block, card)
+    cs.end_player_turn()
+    assert cs.encode_observation() != obs
+
+
+def test_encode_observation_reflects_powers(started_combat):
+    cs = started_combat()
+    before = cs.encode_observation()
+    cs.apply_player_power(sts_sim.PowerType.Strength, 3)
+    after = cs.encode_observation()
+    changed = [i for i, (a, b) in enumerate(zip(before, after)) if a != b]
+    assert len(changed) == 1
+    assert after[changed[0]] == 3.0
+
+
+def test_encode_observation_rejects_bad_buffers(started_combat):
+    cs = started_combat()
+    size = sts_sim.CombatState.observation_size()
+    with pytest.raises(ValueError):
+        cs.encode_observation(array("f", [0.0]) * (size - 1))
+    with pytest.raises((ValueError, BufferError)):
+        cs.encode_observation(array("d", [0.0]) * size)
+    with pytest.raises((ValueError, BufferError, TypeError)):
+        cs.encode_observation(bytes(4 * size))
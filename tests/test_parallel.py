@@ -0,0 +1,69 @@
+"""Tests for the multi-threaded combat runner."""
+import pytest
+import sts_sim
+
+ALL_ENCOUNTERS = [
+    "jaw_worm", "cultist", "louse",
+    "cultist_and_spike_slime", "cultist_and_louse", "fungi_beasts", "slime_trio",
+    "3_louse_hard", "large_slime", "blue_slaver", "red_slaver", "looter",
+    "sneaky_gremlin_team", "angry_gremlin_team",
+    "gremlin_nob", "lagavulin", "sentries",
+    "the_guardian", "hexaghost", "slime_boss",
+]
+
+
+def test_run_combats_parallel_columnar_results():
+    results = sts_sim.run_combats_parallel(["jaw_worm"], list(range(50)), threads=2)
+    assert len(results) == 50
+    for col in (results.won, results.hp_left, results.turns, results.damage_taken):
+        assert len(col) == 50
+    assert all(d >= 0 for d in results.damage_taken)
+    assert all(h >= 0 for h in results.hp_left)
+
+
+def test_run_combats_parallel_independent_of_thread_count():
+    seeds = list(range(40))
+    one = sts_sim.run_combats_parallel(["cultist"], seeds, threads=1)
+    many = sts_sim.run_combats_parallel(["cultist"], seeds, threads=4)
+    assert one.won == many.won
+    assert one.hp_left == many.hp_left
+    assert one.turns == many.turns
+    assert one.damage_taken == many.damage_taken
+
+
+def test_run_combats_parallel_every_encounter():
+    assert list(sts_sim.ENCOUNTER_NAMES) == ALL_ENCOUNTERS
+    results = sts_sim.run_combats_parallel(ALL_ENCOUNTERS, list(range(len(ALL_ENCOUNTERS))))
+    assert len(results) == len(ALL_ENCOUNTERS)
+
+
+def test_run_combats_parallel_per_combat_characters_and_decks():
+    chars = [sts_sim.Character.Ironclad, sts_sim.Character.Silent]
+    strike = sts_sim.CardInstance(sts_sim.Card.StrikeRed)
+    decks = [[strike] * 10, [sts_sim.CardInstance(sts_sim.Card.StrikeGreen)] * 10]
+    results = sts_sim.run_combats_parallel(
+        ["jaw_worm"], [1, 2], characters=chars, decks=decks,
+    )
+    assert len(results) == 2
+
+
+def test_run_combats_parallel_matches_create_encounter_rollout():
+    # Same seed should give the same result regardless of batch composition
+    a = sts_sim.run_combats_parallel(["louse"], [11])
+    b = sts_sim.run_combats_parallel(["jaw_worm", "louse"], [3, 11])
+    assert a.turns[0] == b.turns[1]
+    assert a.won[0] == b.won[1]
+
+
+def test_run_combats_parallel_rejects_bad_arguments():
+    with pytest.raises(ValueError):
+        sts_sim.run_combats_parallel(["no_such_fight"], [1, 2])
+    with pytest.raises(ValueError):
+        sts_sim.run_combats_parallel(["jaw_worm", "cultist"], [1, 2, 3])
+    with pytest.raises(ValueError):
+        sts_sim.run_combats_parallel(["jaw_worm"], [1], policy="nonsense")
+
+
+def test_run_combats_parallel_empty():
+    results = sts_sim.run_combats_parallel(["jaw_worm"], [])
+    assert len(results) == 0
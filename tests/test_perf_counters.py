@@ -0,0 +1,59 @@
+"""Tests for the native hot-path performance counters."""
+import pytest
+import sts_sim
+
+
+@pytest.fixture
+def counters():
+    sts_sim.reset_perf_counters()
+    sts_sim.set_perf_counters(True, sample_every=1)
+    yield
+    sts_sim.set_perf_counters(False)
+    sts_sim.reset_perf_counters()
+
+
+def test_off_by_default_records_nothing(started_combat):
+    sts_sim.reset_perf_counters()
+    started_combat(seed=1).rollout_batch(5, seed=1)
+    assert all(not keys for keys in sts_sim.perf_counters().values())
+
+
+def test_categories_and_keys(counters, started_combat):
+    cs = started_combat(seed=1)
+    hand_index, ci, needs_target = cs.get_available_actions()[0]
+    assert cs.play_card(hand_index, 0 if needs_target else None)
+    cs.end_player_turn()
+    cs.roll_and_execute_monsters()
+    cs.deep_clone()
+    counts = sts_sim.perf_counters()
+    assert set(counts) == {"play_card", "monster_move", "clone", "draw", "reshuffle", "relic_hook"}
+    assert counts["play_card"][repr(ci.card).split(".")[-1]]["calls"] == 1
+    assert counts["monster_move"]["jaw_worm"]["calls"] == 1
+    assert counts["clone"]["total"]["calls"] >= 1
+    assert counts["draw"]["total"]["calls"] >= 1
+    assert counts["relic_hook"]["on_die_roll"]["calls"] == 1
+    entries = [entry for keys in counts.values() for entry in keys.values()]
+    assert all(entry["timed"] == entry["calls"] for entry in entries)
+    assert sum(entry["ns"] for entry in entries) > 0
+
+
+def test_sampling_times_a_subset(counters, started_combat):
+    sts_sim.set_perf_counters(True, sample_every=8)
+    started_combat("cultist_and_louse", seed=1).rollout_batch(50, seed=2)
+    entry = sts_sim.perf_counters()["relic_hook"]["on_card_play"]
+    assert 0 < entry["timed"] < entry["calls"]
+
+
+def test_reset_and_disable(counters, started_combat):
+    started_combat(seed=1).rollout_batch(5, seed=1)
+    assert sts_sim.perf_counters()["monster_move"]
+    sts_sim.reset_perf_counters()
+    assert all(not keys for keys in sts_sim.perf_counters().values())
+    sts_sim.set_perf_counters(False)
+    started_combat(seed=1).rollout_batch(5, seed=1)
+    assert all(not keys for keys in sts_sim.perf_counters().values())
+
+
+def test_rejects_zero_sample_interval():
+    with pytest.raises(ValueError):
+        sts_sim.set_perf_counters(True, sample_every=0)
@@ -0,0 +1,111 @@
+"""Tests for pickling and the binary to_bytes/from_bytes encoding."""
+import copy
+import pickle
+
+import pytest
+import sts_sim
+
+
+def _mid_combat(name="slime_trio", seed=3):
+    cs = sts_sim.create_encounter(name, seed=seed)
+    cs.start_combat()
+    cs.play_card(0, 0)
+    return cs
+
+
+def _advance(cs):
+    cs.end_player_turn()
+    cs.roll_and_execute_monsters()
+
+
+def test_combat_state_round_trip():
+    cs = _mid_combat()
+    data = cs.to_bytes()
+    assert isinstance(data, bytes)
+    loaded = sts_sim.CombatState.from_bytes(data)
+    assert loaded.to_bytes() == data
+    assert loaded == cs
+
+
+def test_pickled_combat_continues_identically():
+    cs = _mid_combat("cultist_and_louse", seed=7)
+    loaded = pickle.loads(pickle.dumps(cs))
+    for _ in range(3):
+        _advance(cs)
+        _advance(loaded)
+    # Identical bytes include the shuffle RNG and the die.
+    assert loaded.to_bytes() == cs.to_bytes()
+
+
+def test_copy_module_uses_encoding():
+    cs = _mid_combat()
+    for other in (copy.copy(cs), copy.deepcopy(cs)):
+        assert other is not cs
+        assert other.to_bytes() == cs.to_bytes()
+
+
+def test_setstate_replaces_contents():
+    cs = _mid_combat()
+    other = sts_sim.create_encounter("jaw_worm", seed=0)
+    other.__setstate__(cs.__getstate__())
+    assert other.to_bytes() == cs.to_bytes()
+
+
+@pytest.mark.parametrize("make", [
+    lambda: _mid_combat().player,
+    lambda: _mid_combat().get_monsters()[0],
+    lambda: sts_sim.CardInstance(sts_sim.Card.Bash, True),
+    lambda: sts_sim.TheDie(seed=4),
+    lambda: sts_sim.generate_map(seed=2),
+    lambda: sts_sim.RewardDeck(seed=5),
+    lambda: sts_sim.create_shop(seed=1),
+    lambda: sts_sim.create_event("knowing_skull"),
+])
+def test_pickle_round_trip(make):
+    obj = make()
+    loaded = pickle.loads(pickle.dumps(obj))
+    assert type(loaded) is type(obj)
+    assert loaded.to_bytes() == obj.to_bytes()
+
+
+def test_player_round_trip_keeps_pile_hashes():
+    cs = _mid_combat()
+    _advance(cs)
+    data = cs.player.to_bytes()
+    # Each pile's running hash is encoded with it, so a standalone Player re-encodes
+    # to the same bytes instead of zeroed hashes.
+    assert sts_sim.Player.from_bytes(data).to_bytes() == data
+
+
+def test_rng_state_survives_pickle():
+    deck = sts_sim.RewardDeck(seed=5)
+    deck.draw_rewards(3)
+    loaded = pickle.loads(pickle.dumps(deck))
+    assert [ci.card for ci in loaded.draw_rewards(3)] == [ci.card for ci in deck.draw_rewards(3)]
+    die = sts_sim.TheDie(seed=9)
+    die.roll()
+    loaded = pickle.loads(pickle.dumps(die))
+    assert [loaded.roll() for _ in range(10)] == [die.roll() for _ in range(10)]
+
+
+def test_from_bytes_rejects_bad_data():
+    data = _mid_combat().to_bytes()
+    with pytest.raises(ValueError):
+        sts_sim.CombatState.from_bytes(data[:-1])
+    with pytest.raises(ValueError):
+        sts_sim.CombatState.from_bytes(data + b"\0")
+    with pytest.raises(ValueError):
+        sts_sim.CombatState.from_bytes(b"not a state")
+    with pytest.raises(ValueError):
+        sts_sim.Player.from_bytes(data)
+
+
+def test_from_bytes_rejects_locked_die_value_off_the_die():
+    die = sts_sim.TheDie(seed=9)
+    die.set_value(4)
+    data = die.to_bytes()
+    assert data[-1] == 4  # the locked value is encoded last
+    assert sts_sim.TheDie.from_bytes(data).roll() == 4
+    for bad in (0, 7, 255):
+        with pytest.raises(ValueError):
+            sts_sim.TheDie.from_bytes(data[:-1] + bytes([bad]))
@@ -49,3 +49,22 @@ def test_powers_dict():
     powers = monsters[0].get_powers_dict()
     assert "Ritual" in powers
     assert powers["Ritual"] == 1
+
+
+def test_powers_dict_keeps_zeroed_strength():
+    """Strength can go negative, so bringing it back to 0 keeps its entry."""
+    cs = sts_sim.create_encounter("jaw_worm", seed=42)
+    cs.apply_player_power(sts_sim.PowerType.Strength, 2)
+    cs.apply_player_power(sts_sim.PowerType.Strength, -2)
+    assert cs.player.get_powers_dict() == {"Strength": 0}
+    cs.apply_player_power(sts_sim.PowerType.Strength, -1)
+    assert cs.player.get_powers_dict() == {"Strength": -1}
+
+
+def test_powers_dict_drops_expired_debuffs():
+    cs = sts_sim.create_encounter("jaw_worm", seed=42)
+    cs.apply_player_power(sts_sim.PowerType.Weak, 1)
+    assert cs.player.get_powers_dict() == {"Weak": 1}
+    cs.apply_player_power(sts_sim.PowerType.Weak, -1)
+    assert cs.player.get_powers_dict() == {}
+    assert cs.get_player_power(sts_sim.PowerType.Weak) == 0
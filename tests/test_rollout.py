@@ -0,0 +1,94 @@
+"""Tests for native batched rollouts."""
+import pytest
+import sts_sim
+
+
+def test_rollout_batch_returns_one_result_per_rollout():
+    cs = sts_sim.create_encounter("jaw_worm", seed=42)
+    results = cs.rollout_batch(16)
+    assert len(results) == 16
+    assert len(results.won) == 16
+    assert len(results.hp_left) == 16
+    assert len(results.turns) == 16
+
+
+def test_rollout_batch_plays_to_completion():
+    cs = sts_sim.create_encounter("cultist", seed=42)
+    results = cs.rollout_batch(32, max_turns=100)
+    for won, hp, turns in zip(results.won, results.hp_left, results.turns):
+        assert turns >= 1
+        if won:
+            assert hp > 0
+        assert hp >= 0
+
+
+def test_rollout_batch_respects_max_turns():
+    cs = sts_sim.create_encounter("the_guardian", seed=1)
+    results = cs.rollout_batch(8, max_turns=2)
+    assert all(t <= 3 for t in results.turns)
+
+
+def test_rollout_batch_is_reproducible():
+    cs = sts_sim.create_encounter("louse", seed=3)
+    a = cs.rollout_batch(20, seed=7)
+    b = cs.rollout_batch(20, seed=7)
+    assert a.won == b.won
+    assert a.hp_left == b.hp_left
+    assert a.turns == b.turns
+
+
+def test_rollout_batch_leaves_state_untouched():
+    cs = sts_sim.create_encounter("jaw_worm", seed=42)
+    cs.start_combat()
+    hand_before = [c.card for c in cs.get_hand()]
+    cs.rollout_batch(10)
+    assert cs.turn_number == 1
+    assert not cs.combat_over
+    assert [c.card for c in cs.get_hand()] == hand_before
+
+
+def test_rollout_batch_from_started_combat():
+    cs = sts_sim.create_encounter("jaw_worm", seed=42)
+    cs.start_combat()
+    results = cs.rollout_batch(10)
+    assert 0.0 <= results.win_rate() <= 1.0
+
+
+def test_rollout_batch_unknown_policy():
+    cs = sts_sim.create_encounter("jaw_worm", seed=42)
+    with pytest.raises(ValueError):
+        cs.rollout_batch(4, policy="nonsense")
+
+
+POLICIES = ["random", "greedy_damage", "block_when_threatened", "powers_first"]
+
+
+@pytest.mark.parametrize("policy", POLICIES)
+def test_rollout_policies_play_to_completion(policy):
+    cs = sts_sim.create_encounter("cultist_and_louse", seed=5)
+    a = cs.rollout_batch(20, policy=policy, seed=1)
+    b = cs.rollout_batch(20, policy=policy, seed=1)
+    assert len(a) == 20
+    assert a.turns == b.turns
+    assert a.hp_left == b.hp_left
+    assert all(t >= 1 for t in a.turns)
+
+
+def test_greedy_damage_beats_random():
+    wins = {}
+    for policy in ("random", "greedy_damage"):
+        total = 0.0
+        for name in ("jaw_worm", "cultist", "slime_trio", "gremlin_nob"):
+            cs = sts_sim.create_encounter(name, seed=3)
+            total += cs.rollout_batch(200, policy=policy, seed=7).win_rate()
+        wins[policy] = total
+    assert wins["greedy_damage"] > wins["random"]
+
+
+@pytest.mark.parametrize("policy", POLICIES)
+def test_policies_accepted_by_parallel_runner_and_search(policy):
+    results = sts_sim.run_combats_parallel(["jaw_worm"], [1, 2], policy=policy, threads=1)
+    assert len(results) == 2
+    cs = sts_sim.create_encounter("jaw_worm", seed=1)
+    cs.start_combat()
+    assert sum(sts_sim.mcts_search(cs, iterations=50, rollout_policy=policy).visits) == 50
@@ -0,0 +1,100 @@
+"""Tests for the native Act 1 run driver."""
+import pytest
+import sts_sim
+
+RoomType = sts_sim.RoomType
+
+
+def test_simulate_run_walks_the_map():
+    run = sts_sim.simulate_run(seed=3)
+    assert run.floor == len(run.path) >= 1
+    assert run.path[0] == RoomType.Monster  # every layout starts on a monster
+    assert 0 <= run.hp <= run.max_hp
+    assert run.gold >= 0
+    assert run.combats >= 1
+    if run.won:
+        assert run.path[-1] == RoomType.Boss
+        assert run.floor == 13
+
+
+def test_simulate_run_follows_map_connections():
+    for seed in range(20):
+        act_map = sts_sim.generate_map(seed=seed)
+        run = sts_sim.simulate_run(seed=seed, path_policy="safe")
+        rows = [act_map.get_row(12 - floor) for floor in range(run.floor)]
+        for room, row in zip(run.path, rows):
+            assert room in {node.room_type for node in row}
+
+
+def test_simulate_run_is_deterministic():
+    a = sts_sim.simulate_run(seed=7, draft_policy="rarest")
+    b = sts_sim.simulate_run(seed=7, draft_policy="rarest")
+    assert a.won == b.won
+    assert a.path == b.path
+    assert [(c.card, c.upgraded) for c in a.deck] == [(c.card, c.upgraded) for c in b.deck]
+    assert a.relics == b.relics
+    assert (a.hp, a.gold, a.turns) == (b.hp, b.gold, b.turns)
+
+
+def test_skip_draft_never_adds_reward_cards():
+    starter = sts_sim.create_encounter("jaw_worm", seed=0).get_deck()
+    for seed in range(20):
+        run = sts_sim.simulate_run(seed=seed, draft_policy="skip", path_policy="aggressive")
+        if RoomType.Event not in run.path:
+            assert len(run.deck) <= len(starter)
+
+
+def test_events_never_kill_the_run():
+    # Seeds 114 and 262 reach an event at low HP where every enabled choice is lethal.
+    # A run lost in an event room must have died in the Dead Adventurer's elite fight,
+    # i.e. played one more combat than its monster and elite rooms.
+    for policy in ("random", "safe"):
+        for seed in range(300):
+            run = sts_sim.simulate_run(seed=seed, path_policy=policy,
+                                       combat_policy="random" if policy == "safe" else "greedy_damage")
+            if run.won or run.path[-1] != RoomType.Event:
+                continue
+            fights = sum(room in (RoomType.Monster, RoomType.Elite) for room in run.path)
+            assert run.combats == fights + 1, seed
+
+
+def test_simulate_run_every_character_and_policy():
+    for character in (sts_sim.Character.Ironclad, sts_sim.Character.Silent,
+                      sts_sim.Character.Defect, sts_sim.Character.Watcher):
+        for path in ("random", "safe", "aggressive"):
+            for draft in ("skip", "random", "rarest"):
+                run = sts_sim.simulate_run(seed=1, character=character, path_policy=path,
+                                           draft_policy=draft, combat_policy="random")
+                assert run.floor >= 1
+
+
+def test_simulate_runs_matches_simulate_run():
+    seeds = list(range(30))
+    batch = sts_sim.simulate_runs(seeds, path_policy="safe", threads=2)
+    assert len(batch) == 30
+    for seed in (0, 13, 29):
+        run = sts_sim.simulate_run(seed=seed, path_policy="safe")
+        assert batch.won[seed] == run.won
+        assert batch.floor[seed] == run.floor
+        assert batch.hp[seed] == run.hp
+        assert batch.deck_size[seed] == len(run.deck)
+    assert 0.0 <= batch.win_rate() <= 1.0
+
+
+def test_simulate_runs_independent_of_thread_count():
+    seeds = list(range(40))
+    one = sts_sim.simulate_runs(seeds, threads=1)
+    many = sts_sim.simulate_runs(seeds, threads=4)
+    assert one.won == many.won
+    assert one.floor == many.floor
+    assert one.gold == many.gold
+    assert one.turns == many.turns
+
+
+def test_simulate_run_rejects_unknown_policies():
+    with pytest.raises(ValueError):
+        sts_sim.simulate_run(seed=0, path_policy="teleport")
+    with pytest.raises(ValueError):
+        sts_sim.simulate_run(seed=0, draft_policy="hoard")
+    with pytest.raises(ValueError):
+        sts_sim.simulate_runs([0], combat_policy="no_such_policy")
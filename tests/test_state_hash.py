@@ -0,0 +1,87 @@
+"""Tests for the canonical state hash and equality."""
+import random
+
+import sts_sim
+
+
+def _hand_index(cs, card):
+    return [ci.card for ci in cs.get_hand()].index(card)
+
+
+def _opening_with_strike_and_defend():
+    for seed in range(50):
+        cs = sts_sim.create_encounter("jaw_worm", seed=seed)
+        cs.start_combat()
+        hand = [ci.card for ci in cs.get_hand()]
+        if sts_sim.Card.StrikeRed in hand and sts_sim.Card.DefendRed in hand:
+            return cs
+    raise AssertionError("no opening hand with both Strike and Defend")
+
+
+def test_play_order_transposes():
+    cs = _opening_with_strike_and_defend()
+    a = cs.deep_clone()
+    assert a.play_card(_hand_index(a, sts_sim.Card.StrikeRed), 0)
+    assert a.play_card(_hand_index(a, sts_sim.Card.DefendRed))
+    b = cs.deep_clone()
+    assert b.play_card(_hand_index(b, sts_sim.Card.DefendRed))
+    assert b.play_card(_hand_index(b, sts_sim.Card.StrikeRed), 0)
+    assert a == b
+    assert a.state_hash() == b.state_hash()
+    assert hash(a) == hash(b)
+    assert len({a, b}) == 1
+
+
+def test_hash_tracks_position_changes():
+    cs = _opening_with_strike_and_defend()
+    before = cs.state_hash()
+    assert cs.deep_clone().state_hash() == before
+    other = cs.deep_clone()
+    other.apply_player_power(sts_sim.PowerType.Strength, 1)
+    assert other != cs
+    assert other.state_hash() != before
+    other = cs.deep_clone()
+    other.play_card(_hand_index(other, sts_sim.Card.DefendRed))
+    assert other != cs
+    assert other.state_hash() != before
+
+
+def test_equality_with_other_types():
+    cs = sts_sim.create_encounter("jaw_worm", seed=1)
+    assert cs != 1
+    assert cs != "jaw_worm"
+
+
+def test_running_hash_follows_upgrades(started_combat):
+    """Piles keep their hash up to date as cards move, including cards upgraded while
+    in a pile, so the order of an upgrade and a turn's card moves doesn't matter."""
+    cs = started_combat("cultist", seed=4)
+    for i in range(len(cs.get_deck())):
+        a = cs.deep_clone()
+        a.upgrade_card(i)
+        a.end_player_turn()
+        b = cs.deep_clone()
+        b.end_player_turn()
+        b.upgrade_card(i)
+        assert a == b
+        assert a.state_hash() == b.state_hash()
+
+
+def test_running_hash_matches_recomputed(started_combat):
+    """Piles and powers keep their hash up to date as the combat runs; decoding a
+    state recomputes it from scratch."""
+    rng = random.Random(5)
+    cs = started_combat("cultist_and_louse", seed=4)
+    tokens = []
+    for _ in range(120):
+        if cs.combat_over:
+            break
+        if tokens and rng.random() < 0.2:
+            cs.undo(tokens.pop())
+        else:
+            if rng.random() < 0.1:
+                cs.upgrade_card(rng.randrange(len(cs.get_deck())))
+            legal = [i for i, ok in enumerate(cs.action_mask()) if ok]
+            tokens.append(cs.apply(rng.choice(legal)))
+        copy = sts_sim.CombatState.from_bytes(cs.to_bytes())
+        assert copy.state_hash() == cs.state_hash()
@@ -0,0 +1,49 @@
+"""Tests that combat simulation can run from multiple Python threads."""
+from concurrent.futures import ThreadPoolExecutor
+
+import sts_sim
+
+
+def _play_scripted_combat(seed):
+    """Play strikes at the first target until the combat ends; return a summary."""
+    cs = sts_sim.create_encounter("jaw_worm", seed=seed)
+    cs.start_combat()
+    while not cs.combat_over and cs.turn_number < 30:
+        played = True
+        while played and not cs.combat_over:
+            played = False
+            for hand_idx, _ci, needs_target in cs.get_available_actions():
+                if cs.play_card(hand_idx, 0 if needs_target else None):
+                    played = True
+                    break
+        if cs.combat_over:
+            break
+        cs.end_player_turn()
+        cs.roll_and_execute_monsters()
+    return cs.player_won, cs.player.hp, cs.turn_number
+
+
+def test_threaded_combats_match_serial():
+    seeds = list(range(16))
+    serial = [_play_scripted_combat(s) for s in seeds]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        threaded = list(pool.map(_play_scripted_combat, seeds))
+    assert threaded == serial
+
+
+def test_threaded_rollout_batches_match_serial():
+    cs = sts_sim.create_encounter("cultist", seed=5)
+    serial = [cs.rollout_batch(8, seed=s).turns for s in range(8)]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        threaded = list(pool.map(lambda s: cs.rollout_batch(8, seed=s).turns, range(8)))
+    assert threaded == serial
+
+
+def test_deep_clone_from_threads():
+    cs = sts_sim.create_encounter("jaw_worm", seed=42)
+    cs.start_combat()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        clones = list(pool.map(lambda _: cs.deep_clone(), range(8)))
+    for c in clones:
+        assert c.turn_number == cs.turn_number
+        assert [ci.card for ci in c.get_hand()] == [ci.card for ci in cs.get_hand()]
@@ -0,0 +1,103 @@
+"""Tests for the opt-in combat event trace."""
+import struct
+
+import pytest
+import sts_sim
+
+CombatState = sts_sim.CombatState
+RECORD = "<IHBbHBBii"
+FIELDS = [name for name, _ in CombatState.trace_dtype()]
+KINDS = CombatState.trace_kinds()
+PILES = CombatState.trace_piles()
+
+
+def _events(cs):
+    return [dict(zip(FIELDS, rec)) for rec in struct.iter_unpack(RECORD, cs.trace_events())]
+
+
+def _play_turns(cs, turns=3):
+    for _ in range(turns):
+        if cs.combat_over:
+            break
+        actions = cs.get_available_actions()
+        if actions:
+            hand_index, _ci, needs_target = actions[0]
+            cs.play_card(hand_index, cs.get_valid_targets()[0] if needs_target else None)
+        cs.end_player_turn()
+        cs.roll_and_execute_monsters()
+
+
+def test_dtype_matches_record_layout():
+    assert struct.calcsize(RECORD) == 20
+    assert FIELDS == ["seq", "turn", "kind", "target", "code", "src", "dst", "amount", "extra"]
+    assert KINDS[0] == "damage" and "card_move" in KINDS and "die_roll" in KINDS
+    assert PILES[0] == "none" and "exhaust" in PILES
+
+
+def test_disabled_by_default():
+    cs = sts_sim.create_encounter("jaw_worm", seed=1)
+    cs.start_combat()
+    _play_turns(cs)
+    assert not cs.trace_enabled
+    assert cs.trace_events() == b""
+    assert cs.trace_dropped == 0
+
+
+def test_records_a_combat():
+    cs = sts_sim.create_encounter("jaw_worm", seed=1)
+    cs.enable_trace()
+    cs.start_combat()
+    _play_turns(cs)
+    events = _events(cs)
+    assert [e["seq"] for e in events] == list(range(len(events)))
+    kinds = {KINDS[e["kind"]] for e in events}
+    assert {"card_move", "die_roll"} <= kinds
+    draws = [e for e in events if KINDS[e["kind"]] == "card_move"
+             and (PILES[e["src"]], PILES[e["dst"]]) == ("draw", "hand")]
+    assert len(draws) >= 5
+    assert all(1 <= e["amount"] <= 6 for e in events if KINDS[e["kind"]] == "die_roll")
+    assert events[-1]["turn"] >= events[0]["turn"]
+
+
+def test_damage_to_monster_targets_its_index():
+    cs = sts_sim.create_encounter("cultist_and_louse", seed=2)
+    cs.start_combat()
+    cs.enable_trace()
+    attack = next(i for i, _ci, needs_target in cs.get_available_actions() if needs_target)
+    assert cs.play_card(attack, 1)
+    hits = [e for e in _events(cs) if KINDS[e["kind"]] == "damage"]
+    assert hits and all(e["target"] == 1 for e in hits)
+    assert sum(e["amount"] + e["extra"] for e in hits) > 0
+
+
+def test_ring_buffer_keeps_newest():
+    cs = sts_sim.create_encounter("jaw_worm", seed=1)
+    cs.enable_trace(capacity=8)
+    cs.start_combat()
+    _play_turns(cs)
+    events = _events(cs)
+    assert len(events) == 8
+    assert cs.trace_dropped > 0
+    assert events[0]["seq"] == cs.trace_dropped
+    cs.clear_trace()
+    assert cs.trace_events() == b"" and cs.trace_dropped == 0
+    cs.disable_trace()
+    assert not cs.trace_enabled
+
+
+def test_copies_are_not_traced_and_play_identically():
+    traced = sts_sim.create_encounter("slime_trio", seed=3)
+    plain = traced.deep_clone()
+    traced.enable_trace()
+    assert not traced.deep_clone().trace_enabled
+    traced.start_combat()
+    plain.start_combat()
+    _play_turns(traced)
+    _play_turns(plain)
+    assert traced.to_bytes() == plain.to_bytes()
+
+
+def test_rejects_zero_capacity():
+    cs = sts_sim.create_encounter("jaw_worm", seed=1)
+    with pytest.raises(ValueError):
+        cs.enable_trace(capacity=0)
@@ -0,0 +1,100 @@
+"""Tests for apply/undo journaling."""
+import random
+
+import pytest
+import sts_sim
+
+
+def _legal(cs):
+    return [i for i, ok in enumerate(cs.action_mask()) if ok]
+
+
+def _summary(cs):
+    return (
+        cs.player.hp, cs.player.block, cs.player.energy, cs.turn_number,
+        [ci.card for ci in cs.get_hand()],
+        [ci.card for ci in cs.get_draw_pile()],
+        [ci.card for ci in cs.get_discard_pile()],
+        [(m.hp, m.block, m.get_current_move()) for m in cs.get_monsters()],
+        cs.player.get_powers_dict(),
+    )
+
+
+def test_undo_restores_prior_state():
+    cs = sts_sim.create_encounter("slime_trio", seed=8)
+    cs.start_combat()
+    before = _summary(cs)
+    snapshot = cs.deep_clone()
+    end_turn = sts_sim.CombatState.action_size() - 1
+    token = cs.apply(_legal(cs)[0])
+    cs.apply(end_turn)
+    assert _summary(cs) != before
+    cs.undo(token)
+    assert _summary(cs) == before
+    assert cs == snapshot
+
+
+def test_undo_restores_rng_and_die():
+    """After undo, the same actions replay to the same outcome."""
+    cs = sts_sim.create_encounter("jaw_worm", seed=2)
+    cs.start_combat()
+    end_turn = sts_sim.CombatState.action_size() - 1
+    token = cs.apply(end_turn)
+    first = _summary(cs)
+    cs.apply(end_turn)
+    cs.undo(token)
+    cs.apply(end_turn)
+    assert _summary(cs) == first
+
+
+def test_random_walk_with_backtracking():
+    rng = random.Random(4)
+    cs = sts_sim.create_encounter("cultist_and_louse", seed=6)
+    cs.start_combat()
+    snapshots = []
+    for _ in range(150):
+        if snapshots and rng.random() < 0.3:
+            t = rng.randrange(len(snapshots))
+            cs.undo(t)
+            assert _summary(cs) == snapshots[t]
+            del snapshots[t:]
+            continue
+        if cs.combat_over:
+            break
+        snapshots.append(_summary(cs))
+        assert cs.apply(rng.choice(_legal(cs))) == len(snapshots) - 1
+
+
+def test_undo_rejects_stale_tokens():
+    cs = sts_sim.create_encounter("jaw_worm", seed=2)
+    cs.start_combat()
+    with pytest.raises(ValueError):
+        cs.undo(0)
+    t0 = cs.apply(sts_sim.CombatState.action_size() - 1)
+    t1 = cs.apply(sts_sim.CombatState.action_size() - 1)
+    cs.undo(t0)
+    with pytest.raises(ValueError):
+        cs.undo(t1)
+    with pytest.raises(ValueError):
+        cs.apply(sts_sim.CombatState.action_size())
+
+
+def test_journal_bytes_follow_apply_and_undo(started_combat):
+    """The journal keeps prior values of what changed; it never copies the state."""
+    cs = started_combat("cultist_and_louse", seed=3)
+    end_turn = sts_sim.CombatState.action_size() - 1
+    sts_sim.reset_perf_counters()
+    sts_sim.set_perf_counters(True, sample_every=1)
+    try:
+        for _ in range(3):
+            token = cs.apply(_legal(cs)[0])
+            assert 0 < cs.journal_bytes() < cs.footprint_bytes()
+            cs.apply(end_turn)
+            cs.undo(token)
+            assert cs.journal_bytes() == 0
+        assert not sts_sim.perf_counters()["clone"]
+        cs.deep_clone()
+        assert sts_sim.perf_counters()["clone"]["total"]["calls"] == 1
+    finally:
+        sts_sim.set_perf_counters(False)
+        sts_sim.reset_perf_counters()